@@ -29,6 +29,7 @@ import cmk.utils.debug
 import cmk.utils.log as log
 import cmk.utils.man_pages as man_pages
 import cmk.utils.password_store
+import cmk.utils.piggyback as piggyback
 import cmk.utils.tty as tty
 from cmk.utils.agentdatatype import AgentRawData
 from cmk.utils.auto_queue import AutoQueue
@@ -897,17 +898,25 @@ class AutomationRenameHosts(Automation):
                 if self._rename_host_file(piggybase + piggydir, oldname, newname):
                     actions.append("piggyback-pig")
 
+        # The piggyback index still refers to the old names of the files
+        if "piggyback-load" in actions or "piggyback-pig" in actions:
+            piggyback.rename_host_in_piggyback_index(HostName(oldname), HostName(newname))
+
         # Logwatch
         if self._rename_host_dir(logwatch_dir, oldname, newname):
             actions.append("logwatch")
 
         # SNMP walks
         if self._rename_host_file(snmpwalks_dir, oldname, newname):
+            # The OID index of the stored walk stays valid, as renaming keeps the walk untouched
+            if not self._rename_host_file(snmpwalks_dir, f".{oldname}.idx", f".{newname}.idx"):
+                Path(snmpwalks_dir, f".{newname}.idx").unlink(missing_ok=True)
             actions.append("snmpwalk")
 
         # HW/SW-Inventory
         if self._rename_host_file(var_dir + "/inventory", oldname, newname):
             self._rename_host_file(var_dir + "/inventory", oldname + ".gz", newname + ".gz")
+            self._rename_host_file(var_dir + "/inventory", oldname + ".pkl", newname + ".pkl")
             actions.append("inv")
 
         if self._rename_host_dir(var_dir + "/inventory_archive", oldname, newname):
@@ -1374,6 +1383,7 @@ class AutomationDeleteHosts(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.pkl",
             f"{var_dir}/agent_deployment/{hostname}",
         ]
 
@@ -1415,6 +1425,7 @@ class AutomationDeleteHostsKnownRemote(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.pkl",
         ]
 
     def _delete_host_files(self, hostname: HostName) -> None:
@@ -67,6 +67,7 @@ import cmk.utils.translations
 import cmk.utils.version as cmk_version
 from cmk.utils.agent_registration import connection_mode_from_host_config, HostAgentConnectionMode
 from cmk.utils.caching import config_cache as _config_cache
+from cmk.utils.caching import LRUCache
 from cmk.utils.check_utils import (
     maincheckify,
     ParametersTypeAlias,
@@ -1429,15 +1430,17 @@ def get_final_service_description(hostname: HostName, description: ServiceName)
     )
 
     # Sanitize: remove illegal characters from a service description
-    cache = _config_cache.get("final_service_description")
+    cache: LRUCache[str, ServiceName] = _config_cache.get_lru(
+        "final_service_description", maxsize=100000
+    )
     with contextlib.suppress(KeyError):
         return cache[description]
 
     illegal_chars = cmc_illegal_chars if is_cmc() else nagios_illegal_chars
 
-    return cache.setdefault(
-        description, "".join(c for c in description if c not in illegal_chars).rstrip("\\")
-    )
+    final_description = "".join(c for c in description if c not in illegal_chars).rstrip("\\")
+    cache[description] = final_description
+    return final_description
 
 
 # TODO: Make this use the generic "rulesets" functions
@@ -5,6 +5,7 @@
 
 import abc
 import dataclasses
+import hashlib
 import os
 import shutil
 import socket
@@ -18,7 +19,9 @@ import cmk.utils.config_warnings as config_warnings
 import cmk.utils.debug
 import cmk.utils.password_store
 import cmk.utils.paths
-from cmk.utils.config_path import VersionedConfigPath
+import cmk.utils.store as store
+import cmk.utils.version as cmk_version
+from cmk.utils.config_path import ConfigPath, VersionedConfigPath
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.labels import Labels
@@ -550,5 +553,140 @@ def _get_host_file_path(
     return root_path / "notify" / "labels"
 
 
+# .
+#   .--Fingerprints--------------------------------------------------------.
+#   |        _____ _                                  _       _            |
+#   |       |  ___(_)_ __   __ _  ___ _ __ _ __  _ __(_)_ __ | |_ ___      |
+#   |       | |_  | | '_ \ / _` |/ _ \ '__| '_ \| '__| | '_ \| __/ __|     |
+#   |       |  _| | | | | | (_| |  __/ |  | |_) | |  | | | | | |_\__ \     |
+#   |       |_|   |_|_| |_|\__, |\___|_|  | .__/|_|  |_|_| |_|\__|___/     |
+#   |                       |___/          |_|                             |
+#   +----------------------------------------------------------------------+
+#   | Detect the hosts whose configuration did not change since the last   |
+#   | configuration creation.                                              |
+#   '----------------------------------------------------------------------'
+
+
+def host_config_fingerprints(
+    config_cache: ConfigCache, hostnames: Iterable[HostName]
+) -> dict[HostName, str]:
+    """Fingerprint the inputs the configuration of each host is created from
+
+    As long as the fingerprint of a host does not change, the core configuration created for it
+    does not change either. The fingerprint covers all configuration files except the host
+    definition files (hosts.mk) of the folders. Of these, only the settings of the host itself
+    and of its clusters or nodes are taken into account, together with their autochecks and
+    discovered host labels. The folder wide meta data (e.g. the time of the last change) does
+    not change the configuration, so changing one host does not invalidate the other hosts of
+    its folder. The effective attributes of the host finally cover the resolved IP addresses.
+    """
+    global_digest = _global_config_digest()
+    file_digests: dict[Path, bytes] = {}
+
+    def file_digest(path: Path) -> bytes:
+        if (digest := file_digests.get(path)) is None:
+            try:
+                digest = hashlib.sha256(path.read_bytes()).digest()
+            except FileNotFoundError:
+                digest = b""
+            file_digests[path] = digest
+        return digest
+
+    fingerprints = {}
+    for hostname in hostnames:
+        fingerprint = hashlib.sha256(global_digest)
+        fingerprint.update(
+            repr(sorted(config_cache.get_host_attributes(hostname).items())).encode()
+        )
+        for related in sorted(
+            {
+                hostname,
+                *config_cache.clusters_of(hostname),
+                *(config_cache.nodes_of(hostname) or ()),
+            }
+        ):
+            fingerprint.update(b"\0%s\0" % related.encode())
+            fingerprint.update(_host_settings_digest(config_cache, related))
+            fingerprint.update(file_digest(Path(cmk.utils.paths.autochecks_dir, f"{related}.mk")))
+            fingerprint.update(
+                file_digest(cmk.utils.paths.discovered_host_labels_dir / f"{related}.mk")
+            )
+        fingerprints[hostname] = fingerprint.hexdigest()
+    return fingerprints
+
+
+def _host_settings_digest(config_cache: ConfigCache, hostname: HostName) -> bytes:
+    """The settings of a host made in the hosts.mk of its folder"""
+    settings = (
+        config.host_paths.get(hostname),
+        config.host_tags.get(hostname),
+        config.host_labels.get(hostname),
+        config_cache.nodes_of(hostname),
+        config.ipaddresses.get(hostname),
+        config.ipv6addresses.get(hostname),
+        config.explicit_snmp_communities.get(hostname),
+        config.management_protocol.get(hostname),
+        config.management_snmp_credentials.get(hostname),
+        config.management_ipmi_credentials.get(hostname),
+        sorted(
+            (varname, values[hostname])
+            for varname, values in config.explicit_host_conf.items()
+            if hostname in values
+        ),
+        config_cache.contactgroups(hostname),
+        config_cache.parents(hostname),
+        sorted(
+            (key, value)
+            for key, value in config.host_attributes.get(hostname, {}).items()
+            if key != "meta_data"
+        ),
+    )
+    return hashlib.sha256(repr(settings).encode()).digest()
+
+
+def _global_config_digest() -> bytes:
+    digest = hashlib.sha256(cmk_version.__version__.encode())
+    for path in [
+        *(p for p in config.get_config_file_paths(with_conf_d=True) if p.name != "hosts.mk"),
+        cmk.utils.password_store.password_store_path(),
+        cmk.utils.paths.make_experimental_config_file(),
+    ]:
+        if path.exists():
+            digest.update(b"\0%s\0%s" % (str(path).encode(), path.read_bytes()))
+
+    # The rules of the folders, which do not depend on a single host
+    digest.update(
+        repr(
+            (config.extra_service_conf, config.service_contactgroups, config.folder_attributes)
+        ).encode()
+    )
+
+    # Only look at the modification times of the local plugins. They change with every update.
+    for plugin_dir in [
+        Path(cmk.utils.paths.local_checks_dir),
+        Path(cmk.utils.paths.local_agent_based_plugins_dir),
+    ]:
+        for path in sorted(plugin_dir.rglob("*")):
+            digest.update(b"\0%s\0%d" % (str(path).encode(), path.stat().st_mtime_ns))
+
+    return digest.digest()
+
+
+class HostConfigFingerprintStore:
+    """Caring about persistence of the host fingerprints a configuration was created from"""
+
+    @staticmethod
+    def fingerprints_file_path(config_path: ConfigPath) -> Path:
+        return Path(config_path) / "host_fingerprints"
+
+    def write(self, config_path: ConfigPath, fingerprints: Mapping[HostName, str]) -> None:
+        store.save_object_to_pickle_file(self.fingerprints_file_path(config_path), fingerprints)
+
+    def read(self, config_path: ConfigPath) -> Mapping[HostName, str]:
+        return store.load_object_from_pickle_file(
+            self.fingerprints_file_path(config_path), default={}
+        )
+
+
 def get_labels_from_attributes(key_value_pairs: list[tuple[str, str]]) -> Labels:
     return {key[8:]: value for key, value in key_value_pairs if key.startswith("__LABEL_")}
@@ -5,15 +5,18 @@
 """Code for support of Nagios (and compatible) cores"""
 
 import base64
+import multiprocessing
 import os
 import py_compile
+import re
 import socket
 import sys
 from collections import Counter
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
+from functools import partial
 from io import StringIO
 from pathlib import Path
-from typing import Any, cast, IO, Literal
+from typing import Any, cast, IO, Literal, NamedTuple
 
 import cmk.utils.config_path
 import cmk.utils.config_warnings as config_warnings
@@ -22,7 +25,7 @@ import cmk.utils.paths
 import cmk.utils.store as store
 import cmk.utils.tty as tty
 from cmk.utils.check_utils import section_name_of
-from cmk.utils.config_path import VersionedConfigPath
+from cmk.utils.config_path import ConfigPath, LATEST_CONFIG, VersionedConfigPath
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.labels import Labels
@@ -96,6 +99,7 @@ class NagiosCore(core_config.MonitoringCore):
             config_path,
             hostnames=None,
             licensing_handler=licensing_handler,
+            incremental=config.incremental_config_creation,
         )
 
         store.save_text_to_file(cmk.utils.paths.nagios_objects_file, config_buffer.getvalue())
@@ -149,7 +153,13 @@ def create_config(
     config_path: VersionedConfigPath,
     hostnames: list[HostName] | None,
     licensing_handler: LicensingHandler,
+    *,
+    incremental: bool = False,
 ) -> None:
+    """Create the object configuration of the Nagios core
+
+    In incremental mode the object definitions of all hosts whose fingerprint is unchanged are
+    taken over from the latest configuration."""
     if config.host_notification_periods:
         config_warnings.warn(
             "host_notification_periods is not longer supported. Please use extra_host_conf['notification_period'] instead."
@@ -181,11 +191,15 @@ def create_config(
     stored_passwords = cmk.utils.password_store.load()
 
     licensing_counter = Counter("services")
-    all_host_labels: dict[HostName, CollectedHostLabels] = {}
-    for hostname in sorted(hostnames):
-        all_host_labels[hostname] = _create_nagios_config_host(
-            cfg, config_cache, hostname, stored_passwords, licensing_counter
-        )
+    all_host_labels = _create_nagios_config_hosts(
+        cfg,
+        config_cache,
+        config_path,
+        sorted(hostnames),
+        stored_passwords,
+        licensing_counter,
+        incremental,
+    )
 
     _validate_licensing(licensing_handler, licensing_counter)
 
@@ -203,6 +217,199 @@ def create_config(
         cfg.write(config.extra_nagios_conf)
 
 
+def _num_config_workers(num_hosts: int) -> int:
+    # Forking only pays off for a reasonable amount of hosts per worker
+    return max(1, min(config.nagios_config_workers, num_hosts // 100))
+
+
+def _chunks(hostnames: Sequence[HostName], num_workers: int) -> list[Sequence[HostName]]:
+    # Use several chunks per worker to even out the differences in the work per host
+    size = max(1, -(-len(hostnames) // (num_workers * 4)))
+    return [hostnames[idx : idx + size] for idx in range(0, len(hostnames), size)]
+
+
+class _HostConfigFragment(NamedTuple):
+    """Object definitions of a single host, created independently of the other hosts"""
+
+    objects: str
+    host_labels: CollectedHostLabels
+    hostgroups_to_define: set[HostgroupName]
+    servicegroups_to_define: set[ServicegroupName]
+    contactgroups_to_define: set[ContactgroupName]
+    checknames_to_define: set[CheckPluginName]
+    active_checks_to_define: set[CheckPluginNameStr]
+    custom_commands_to_define: set[CoreCommandName]
+    hostcheck_commands_to_define: list[tuple[CoreCommand, str]]
+    num_services: int
+    warnings: config_warnings.ConfigurationWarnings
+
+    def merge_into(self, cfg: NagiosConfig, licensing_counter: Counter) -> CollectedHostLabels:
+        # The custom host check commands are numbered consecutively. Shift the numbers of
+        # this fragment behind the ones already defined.
+        offset = len(cfg.hostcheck_commands_to_define)
+        cfg.write(
+            _HOSTCHECK_COMMAND_REF.sub(
+                lambda m: f"{m.group(1)}check-mk-host-custom-{int(m.group(2)) + offset}",
+                self.objects,
+            )
+            if offset and self.hostcheck_commands_to_define
+            else self.objects
+        )
+        cfg.hostcheck_commands_to_define.extend(
+            (f"check-mk-host-custom-{offset + number}", command_line)
+            for number, (_command, command_line) in enumerate(
+                self.hostcheck_commands_to_define, start=1
+            )
+        )
+        cfg.hostgroups_to_define.update(self.hostgroups_to_define)
+        cfg.servicegroups_to_define.update(self.servicegroups_to_define)
+        cfg.contactgroups_to_define.update(self.contactgroups_to_define)
+        cfg.checknames_to_define.update(self.checknames_to_define)
+        cfg.active_checks_to_define.update(self.active_checks_to_define)
+        cfg.custom_commands_to_define.update(self.custom_commands_to_define)
+        licensing_counter["services"] += self.num_services
+        config_warnings.g_configuration_warnings.extend(self.warnings)
+        return self.host_labels
+
+
+_HOSTCHECK_COMMAND_REF = re.compile(r"^(  check_command +)check-mk-host-custom-(\d+)$", re.M)
+
+
+class HostObjectsStore:
+    """Caring about persistence of the object definitions of the hosts
+
+    They are reused by the next configuration creation for all hosts whose fingerprint did not
+    change in the meantime."""
+
+    @staticmethod
+    def objects_file_path(config_path: ConfigPath) -> Path:
+        return Path(config_path) / "host_objects"
+
+    def write(
+        self, config_path: ConfigPath, fragments: Mapping[HostName, _HostConfigFragment]
+    ) -> None:
+        store.save_object_to_pickle_file(self.objects_file_path(config_path), fragments)
+
+    def read(self, config_path: ConfigPath) -> Mapping[HostName, _HostConfigFragment]:
+        try:
+            return store.load_object_from_pickle_file(
+                self.objects_file_path(config_path), default={}
+            )
+        except Exception:
+            if cmk.utils.debug.enabled():
+                raise
+            # E.g. written by an older version. Simply create all objects from scratch.
+            return {}
+
+
+def _create_nagios_config_hosts(
+    cfg: NagiosConfig,
+    config_cache: ConfigCache,
+    config_path: VersionedConfigPath,
+    hostnames: Sequence[HostName],
+    stored_passwords: Mapping[str, str],
+    licensing_counter: Counter,
+    incremental: bool,
+) -> dict[HostName, CollectedHostLabels]:
+    if not incremental and _num_config_workers(len(hostnames)) == 1:
+        return {
+            hostname: _create_nagios_config_host(
+                cfg, config_cache, hostname, stored_passwords, licensing_counter
+            )
+            for hostname in hostnames
+        }
+
+    fragments: dict[HostName, _HostConfigFragment] = {}
+    if incremental:
+        # The previous configuration is still the latest one during the creation
+        fingerprints = core_config.host_config_fingerprints(config_cache, hostnames)
+        previous_fingerprints = core_config.HostConfigFingerprintStore().read(LATEST_CONFIG)
+        if unchanged := {
+            hostname
+            for hostname in hostnames
+            if previous_fingerprints.get(hostname) == fingerprints[hostname]
+        }:
+            fragments.update(
+                (hostname, fragment)
+                for hostname, fragment in HostObjectsStore().read(LATEST_CONFIG).items()
+                if hostname in unchanged
+            )
+        console.verbose(
+            "Reusing the object definitions of %d of %d hosts\n", len(fragments), len(hostnames)
+        )
+
+    to_create = [hostname for hostname in hostnames if hostname not in fragments]
+    if (num_workers := _num_config_workers(len(to_create))) > 1:
+        fragments.update(
+            _create_nagios_config_host_fragments_in_workers(
+                to_create, stored_passwords, num_workers
+            )
+        )
+    else:
+        fragments.update(_create_nagios_config_host_fragments(to_create, stored_passwords))
+
+    if incremental:
+        HostObjectsStore().write(config_path, fragments)
+        core_config.HostConfigFingerprintStore().write(config_path, fingerprints)
+
+    return {
+        hostname: fragments[hostname].merge_into(cfg, licensing_counter) for hostname in hostnames
+    }
+
+
+def _create_nagios_config_host_fragments_in_workers(
+    hostnames: Sequence[HostName], stored_passwords: Mapping[str, str], num_workers: int
+) -> list[tuple[HostName, _HostConfigFragment]]:
+    """Create the object definitions of the hosts in forked worker processes
+
+    The workers share the configuration (and the already populated config cache) of this
+    process. The fragments are returned in the order of the given hosts."""
+    with multiprocessing.get_context("fork").Pool(num_workers) as pool:
+        return [
+            item
+            for fragments in pool.map(
+                partial(_create_nagios_config_host_fragments, stored_passwords=stored_passwords),
+                _chunks(hostnames, num_workers),
+            )
+            for item in fragments
+        ]
+
+
+def _create_nagios_config_host_fragments(
+    hostnames: Sequence[HostName], stored_passwords: Mapping[str, str]
+) -> list[tuple[HostName, _HostConfigFragment]]:
+    config_cache = config.get_config_cache()
+    return [
+        (hostname, _create_nagios_config_host_fragment(config_cache, hostname, stored_passwords))
+        for hostname in hostnames
+    ]
+
+
+def _create_nagios_config_host_fragment(
+    config_cache: ConfigCache, hostname: HostName, stored_passwords: Mapping[str, str]
+) -> _HostConfigFragment:
+    num_warnings = len(config_warnings.g_configuration_warnings)
+    buf = StringIO()
+    cfg = NagiosConfig(buf, [hostname])
+    licensing_counter = Counter("services")
+    host_labels = _create_nagios_config_host(
+        cfg, config_cache, hostname, stored_passwords, licensing_counter
+    )
+    return _HostConfigFragment(
+        objects=buf.getvalue(),
+        host_labels=host_labels,
+        hostgroups_to_define=cfg.hostgroups_to_define,
+        servicegroups_to_define=cfg.servicegroups_to_define,
+        contactgroups_to_define=cfg.contactgroups_to_define,
+        checknames_to_define=cfg.checknames_to_define,
+        active_checks_to_define=cfg.active_checks_to_define,
+        custom_commands_to_define=cfg.custom_commands_to_define,
+        hostcheck_commands_to_define=cfg.hostcheck_commands_to_define,
+        num_services=licensing_counter["services"],
+        warnings=config_warnings.g_configuration_warnings[num_warnings:],
+    )
+
+
 def _output_conf_header(cfg: NagiosConfig) -> None:
     cfg.write(
         """#
@@ -1066,11 +1273,11 @@ class HostCheckStore:
     """Caring about persistence of the precompiled host check files"""
 
     @staticmethod
-    def host_check_file_path(config_path: VersionedConfigPath, hostname: HostName) -> Path:
+    def host_check_file_path(config_path: ConfigPath, hostname: HostName) -> Path:
         return Path(config_path) / "host_checks" / hostname
 
     @staticmethod
-    def host_check_source_file_path(config_path: VersionedConfigPath, hostname: HostName) -> Path:
+    def host_check_source_file_path(config_path: ConfigPath, hostname: HostName) -> Path:
         # TODO: Use append_suffix(".py") once we are on Python 3.10
         path = HostCheckStore.host_check_file_path(config_path, hostname)
         return path.with_suffix(path.suffix + ".py")
@@ -1106,8 +1313,76 @@ def _precompile_hostchecks(config_path: VersionedConfigPath) -> None:
 
     console.verbose("Precompiling host checks...\n")
 
+    hostnames = sorted(config_cache.all_active_hosts())
+    if config.incremental_config_creation and not config.delay_precompile:
+        hostnames = _take_over_unchanged_hostchecks(config_path, hostnames)
+
+    if (num_workers := _num_config_workers(len(hostnames))) > 1:
+        with multiprocessing.get_context("fork").Pool(num_workers) as pool:
+            for failed in pool.imap(
+                partial(_precompile_hostchecks_of, config_path=config_path),
+                _chunks(hostnames, num_workers),
+            ):
+                if failed is not None:
+                    hostname, error = failed
+                    console.error(f"Error precompiling checks for host {hostname}: {error}\n")
+                    sys.exit(5)
+        return
+
+    if (failed := _precompile_hostchecks_of(hostnames, config_path)) is not None:
+        hostname, error = failed
+        console.error(f"Error precompiling checks for host {hostname}: {error}\n")
+        sys.exit(5)
+
+
+def _take_over_unchanged_hostchecks(
+    config_path: VersionedConfigPath, hostnames: Sequence[HostName]
+) -> list[HostName]:
+    """Take over the host checks of the latest configuration for the hosts with unchanged fingerprint
+
+    Returns the hosts whose host check still needs to be created. The delayed host checks refer
+    to their config path and can not be taken over."""
+    fingerprint_store = core_config.HostConfigFingerprintStore()
+    fingerprints = fingerprint_store.read(config_path)
+    previous_fingerprints = fingerprint_store.read(LATEST_CONFIG)
+
+    host_check_store = HostCheckStore()
+    to_create = []
+    for hostname in hostnames:
+        if (fingerprint := fingerprints.get(hostname)) is None or previous_fingerprints.get(
+            hostname
+        ) != fingerprint:
+            to_create.append(hostname)
+            continue
+
+        try:
+            host_check = HostCheckStore.host_check_source_file_path(
+                LATEST_CONFIG, hostname
+            ).read_text()
+        except FileNotFoundError:
+            # No Checkmk checks or not created by the latest configuration
+            to_create.append(hostname)
+            continue
+
+        host_check_store.write(config_path, hostname, host_check)
+
+    console.verbose(
+        "Took over the host checks of %d of %d hosts\n",
+        len(hostnames) - len(to_create),
+        len(hostnames),
+    )
+    return to_create
+
+
+def _precompile_hostchecks_of(
+    hostnames: Sequence[HostName], config_path: VersionedConfigPath
+) -> tuple[HostName, str] | None:
+    """Precompile the host checks of the given hosts
+
+    Stops at the first failing host and returns it together with the error."""
+    config_cache = config.get_config_cache()
     host_check_store = HostCheckStore()
-    for hostname in config_cache.all_active_hosts():
+    for hostname in hostnames:
         try:
             console.verbose(
                 "%s%s%-16s%s:",
@@ -1130,8 +1405,8 @@ def _precompile_hostchecks(config_path: VersionedConfigPath) -> None:
         except Exception as e:
             if cmk.utils.debug.enabled():
                 raise
-            console.error(f"Error precompiling checks for host {hostname}: {e}\n")
-            sys.exit(5)
+            return hostname, str(e)
+    return None
 
 
 def _dump_precompiled_hostcheck(  # pylint: disable=too-many-branches
@@ -47,6 +47,8 @@ tcp_connect_timeout = 5.0
 tcp_connect_timeouts: list[RuleSpec[object]] = []
 use_dns_cache = True  # prevent DNS by using own cache file
 delay_precompile = False  # delay Python compilation to Nagios execution
+nagios_config_workers = 1  # number of processes creating the Nagios configuration
+incremental_config_creation = False  # reuse the config of hosts with unchanged fingerprint
 restart_locking: Literal["abort", "wait"] | None = "abort"
 check_submission: Literal["file", "pipe"] = "file"
 default_host_group = "check_mk"
@@ -301,6 +303,6 @@ aggr_summary_hostname = "%s-s"
 
 status_data_inventory: list[RuleSpec[object]] = []
 logwatch_rules: list[RuleSpec[object]] = []
-config_storage_format: Literal["standard", "raw", "pickle"] = "pickle"
+config_storage_format: Literal["standard", "raw", "pickle", "indexed"] = "pickle"
 
 automatic_host_removal: list[RuleSpec[object]] = []
@@ -41,6 +41,7 @@ from cmk.utils.everythingtype import EVERYTHING
 from cmk.utils.exceptions import MKBailOut, MKGeneralException, MKTimeout, OnError
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.log import console, section
+from cmk.utils.prediction import precompute_predictions
 from cmk.utils.resulttype import Result
 from cmk.utils.sectionname import SectionMap, SectionName
 from cmk.utils.structured_data import (
@@ -881,6 +882,60 @@ modes.register(
     )
 )
 
+
+def mode_rebuild_piggyback_index() -> None:
+    piggyback.rebuild_piggyback_index()
+
+
+modes.register(
+    Mode(
+        long_option="rebuild-piggyback-index",
+        handler_function=mode_rebuild_piggyback_index,
+        short_help="Recreate the index of the piggyback files",
+        long_help=[
+            "The piggyback files are looked up using an index which is updated whenever "
+            "piggyback data is stored or cleaned up. Use this mode to recreate the index "
+            "in case the piggyback directories have been modified manually."
+        ],
+        needs_config=False,
+    )
+)
+
+# .
+#   .--predictions---------------------------------------------------------.
+#   |                             _ _      _   _                           |
+#   |          _ __  _ __ ___  __| (_) ___| |_(_) ___  _ __  ___           |
+#   |         | '_ \| '__/ _ \/ _` | |/ __| __| |/ _ \| '_ \/ __|          |
+#   |         | |_) | | |  __/ (_| | | (__| |_| | (_) | | | \__ \          |
+#   |         | .__/|_|  \___|\__,_|_|\___|\__|_|\___/|_| |_|___/          |
+#   |         |_|                                                          |
+#   '----------------------------------------------------------------------'
+
+
+# The cron job runs the mode every 5 minutes
+_PRECOMPUTE_PREDICTIONS_INTERVAL: Final = 300
+
+
+def mode_precompute_predictions() -> None:
+    precompute_predictions(int(time.time()), _PRECOMPUTE_PREDICTIONS_INTERVAL)
+
+
+modes.register(
+    Mode(
+        long_option="precompute-predictions",
+        handler_function=mode_precompute_predictions,
+        short_help="Compute the predictions needed by predictive levels in advance",
+        long_help=[
+            "Computes the predictions which the checks with predictive levels are going to need "
+            "soon, so that they do not have to compute them themselves. The predictions of the "
+            "next day are computed during the hours before midnight, spread over the services. "
+            "This mode is executed by a cron job every 5 minutes."
+        ],
+        needs_config=False,
+        needs_checks=False,
+    )
+)
+
 # .
 #   .--scan-parents--------------------------------------------------------.
 #   |                                                         _            |
@@ -9,6 +9,7 @@ import ast
 import os
 import pickle
 import time
+from collections.abc import Mapping
 from pathlib import Path
 from typing import TypedDict
 
@@ -23,9 +24,9 @@ from cmk.utils.redis import get_redis_client
 
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.data_fetcher import BIStructureFetcher, get_cache_dir, SiteProgramStart
-from cmk.bi.lib import SitesCallback
+from cmk.bi.lib import BIHostData, SitesCallback
 from cmk.bi.packs import BIAggregationPacks
-from cmk.bi.searcher import BISearcher
+from cmk.bi.searcher import BISearchDependencies, BISearcher
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule, FrozenBIInfo
 from cmk.bi.type_defs import frozen_aggregations_dir
 
@@ -36,6 +37,11 @@ class ConfigStatus(TypedDict):
     online_sites: set[SiteProgramStart]
 
 
+class CompilationDependencies(TypedDict):
+    program_starts: set[SiteProgramStart] | None
+    aggregations: dict[str, BISearchDependencies]
+
+
 class BICompiler:
     def __init__(self, bi_configuration_file: str, sites_callback: SitesCallback) -> None:
         self._sites_callback = sites_callback
@@ -47,6 +53,7 @@ class BICompiler:
         self._path_compilation_timestamp = Path(get_cache_dir(), "last_compilation")
         self._path_compiled_aggregations = Path(get_cache_dir(), "compiled_aggregations")
         self._path_compiled_aggregations.mkdir(parents=True, exist_ok=True)
+        self._path_compilation_dependencies = Path(get_cache_dir(), "compilation_dependencies")
 
         self._redis_client: Redis[str] | None = None
         self._setup()
@@ -216,18 +223,44 @@ class BICompiler:
                 return
 
             self.prepare_for_compilation(current_configstatus["online_sites"])
+            previous_dependencies = self._load_compilation_dependencies()
+            changed_hosts = self._get_changed_hosts(current_configstatus, previous_dependencies)
 
             # Compile the raw tree
             all_aggregations_by_id: dict[str, BIAggregation] = {
                 x.id: x for x in self._bi_packs.get_all_aggregations()
             }
+            dependencies = previous_dependencies["aggregations"]
+            compiled_aggr_ids = set()
             for aggregation in all_aggregations_by_id.values():
+                if (
+                    changed_hosts is not None
+                    and (
+                        compiled_aggregation := self._load_unaffected_aggregation(
+                            aggregation.id, dependencies, changed_hosts
+                        )
+                    )
+                    is not None
+                ):
+                    self._compiled_aggregations[aggregation.id] = compiled_aggregation
+                    continue
+
                 start = time.time()
-                self._compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
+                with self.bi_searcher.record_dependencies() as aggr_dependencies:
+                    self._compiled_aggregations[aggregation.id] = aggregation.compile(
+                        self.bi_searcher
+                    )
+                dependencies[aggregation.id] = aggr_dependencies
+                compiled_aggr_ids.add(aggregation.id)
                 self._logger.debug(f"Compilation of {aggregation.id} took {time.time() - start:f}")
             self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
+            self._logger.debug(
+                "Compiled %d of %d aggregations"
+                % (len(compiled_aggr_ids), len(all_aggregations_by_id))
+            )
 
-            for aggr_id, compiled_aggr in self._compiled_aggregations.items():
+            for aggr_id in compiled_aggr_ids:
+                compiled_aggr = self._compiled_aggregations[aggr_id]
                 start = time.time()
                 result = compiled_aggr.serialize()
                 self._logger.debug(
@@ -236,6 +269,17 @@ class BICompiler:
                 )
                 self._save_data(self._path_compiled_aggregations.joinpath(aggr_id), result)
 
+            self._save_compilation_dependencies(
+                {
+                    "program_starts": current_configstatus["online_sites"],
+                    "aggregations": {
+                        aggr_id: aggr_dependencies
+                        for aggr_id, aggr_dependencies in dependencies.items()
+                        if aggr_id in all_aggregations_by_id
+                    },
+                }
+            )
+
             self._compiled_aggregations = self._manage_frozen_branches(self._compiled_aggregations)
             self._generate_part_of_aggregation_lookup(self._compiled_aggregations)
 
@@ -246,6 +290,59 @@ class BICompiler:
             str(self._path_compilation_timestamp), str(current_configstatus["configfile_timestamp"])
         )
 
+    def _get_changed_hosts(
+        self,
+        current_configstatus: ConfigStatus,
+        previous_dependencies: CompilationDependencies,
+    ) -> dict[str, BIHostData | None] | None:
+        """The hosts changed since the last compilation, None if everything has to be compiled
+
+        Changes of the BI configuration may affect all aggregations. Changes of the monitoring
+        configuration only affect the aggregations which depend on the changed hosts.
+        """
+        if current_configstatus["configfile_timestamp"] > self._get_compilation_timestamp():
+            return None
+
+        if (previous_program_starts := previous_dependencies["program_starts"]) is None or (
+            changed_host_names := self._bi_structure_fetcher.get_changed_hosts(
+                previous_program_starts, current_configstatus["online_sites"]
+            )
+        ) is None:
+            return None
+
+        hosts = self._bi_structure_fetcher.hosts
+        return {host_name: hosts.get(host_name) for host_name in changed_host_names}
+
+    def _load_unaffected_aggregation(
+        self,
+        aggr_id: str,
+        dependencies: Mapping[str, BISearchDependencies],
+        changed_hosts: Mapping[str, BIHostData | None],
+    ) -> BICompiledAggregation | None:
+        if (aggr_dependencies := dependencies.get(aggr_id)) is None or (
+            aggr_dependencies.affected_by(changed_hosts)
+        ):
+            return None
+
+        path = self._path_compiled_aggregations.joinpath(aggr_id)
+        if not (schema := self._load_data(path)):
+            return None
+
+        self._logger.debug("Aggregation %s is not affected by the changed hosts" % aggr_id)
+        return BIAggregation.create_trees_from_schema(schema)
+
+    def _load_compilation_dependencies(self) -> CompilationDependencies:
+        try:
+            return pickle.loads(self._path_compilation_dependencies.read_bytes())
+        except FileNotFoundError:
+            pass
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            self._logger.warning("Can not load compilation dependencies %s" % str(e))
+        return {"program_starts": None, "aggregations": {}}
+
+    def _save_compilation_dependencies(self, dependencies: CompilationDependencies) -> None:
+        store.save_bytes_to_file(self._path_compilation_dependencies, pickle.dumps(dependencies))
+
     def _cleanup_vanished_aggregations(self) -> None:
         valid_aggregations = list(self._compiled_aggregations.keys())
         for path_object in self._path_compiled_aggregations.iterdir():
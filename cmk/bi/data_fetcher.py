@@ -172,6 +172,47 @@ class BIStructureFetcher:
             )
             self._marshal_save_data(path, hosts)
 
+    def get_changed_hosts(
+        self,
+        previous_program_starts: set[SiteProgramStart],
+        program_starts: set[SiteProgramStart],
+    ) -> set[HostName] | None:
+        """Determine the hosts whose structure data differs between the program starts
+
+        The core does not tell us which hosts have been changed by a reload, so we compare the
+        cached structure data of both program starts of a site. Hosts of sites which are only
+        part of one of the program starts are changed, too. Returns None if the structure data
+        of a program start is not cached anymore.
+        """
+        previous_timestamps = dict(previous_program_starts)
+        timestamps = dict(program_starts)
+        changed_hosts: set[HostName] = set()
+        for site_id in previous_timestamps.keys() | timestamps.keys():
+            if previous_timestamps.get(site_id) == timestamps.get(site_id):
+                continue
+            previous_hosts = self._load_site_data(site_id, previous_timestamps.get(site_id))
+            hosts = self._load_site_data(site_id, timestamps.get(site_id))
+            if previous_hosts is None or hosts is None:
+                return None
+            changed_hosts.update(
+                host_name
+                for host_name in previous_hosts.keys() | hosts.keys()
+                if previous_hosts.get(host_name) != hosts.get(host_name)
+            )
+        return changed_hosts
+
+    def _load_site_data(self, site_id: SiteId, timestamp: int | None) -> dict | None:
+        if timestamp is None:
+            return {}
+        try:
+            return self._marshal_load_data(
+                self._path_site_structure_data.joinpath(
+                    self._site_data_filename(site_id, timestamp)
+                )
+            )
+        except (FileNotFoundError, EOFError, ValueError, TypeError):
+            return None
+
     def _read_cached_data(self, required_program_starts: set[SiteProgramStart]) -> None:
         required_sites = {x[0] for x in required_program_starts}
         for path_object, (site_id, _timestamp) in self._get_site_data_files():
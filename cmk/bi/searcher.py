@@ -3,7 +3,8 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-from collections.abc import Iterable, Mapping
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
 from typing import Any
 
 from cmk.utils.regex import regex
@@ -23,6 +24,68 @@ from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSe
 
 # Search data used by bi_searcher
 
+
+class BISearchDependencies:
+    """The structure data the compilation of an aggregation depends on
+
+    These are the hosts which have been looked up or found by the searches, and the searches
+    themselves. A changed host may only change the compiled aggregation if it is one of the
+    hosts, or if one of the searches finds it now.
+    """
+
+    def __init__(self) -> None:
+        self.host_names: set[str] = set()
+        # The conditions of the host searches by their repr, to get rid of duplicates
+        self.host_conditions: dict[str, dict] = {}
+        self.host_name_patterns: set[str] = set()
+
+    def add_host_search(self, conditions: dict, matched_hosts: Iterable[BIHostData]) -> None:
+        self.host_conditions.setdefault(repr(conditions), conditions)
+        self.host_names.update(host.name for host in matched_hosts)
+
+    def add_host_name_search(self, pattern: str, matched_hosts: Iterable[BIHostData]) -> None:
+        self.host_name_patterns.add(pattern)
+        self.host_names.update(host.name for host in matched_hosts)
+
+    def affected_by(self, changed_hosts: Mapping[str, BIHostData | None]) -> bool:
+        """Whether the changed hosts may change the compiled aggregation
+
+        The changed hosts are given with their current data, removed hosts with None.
+        """
+        if not self.host_names.isdisjoint(changed_hosts):
+            return True
+
+        searcher = BISearcher()
+        searcher.set_hosts({name: host for name, host in changed_hosts.items() if host is not None})
+        return any(
+            searcher.search_hosts(conditions) for conditions in self.host_conditions.values()
+        ) or any(
+            searcher.get_host_name_matches(list(searcher.hosts.values()), pattern)[0]
+            for pattern in self.host_name_patterns
+        )
+
+
+class _RecordingHosts(dict[str, BIHostData]):
+    """The hosts of a searcher, recording the names of the hosts which have been looked up"""
+
+    def __init__(self, hosts: Mapping[str, BIHostData], host_names: set[str]) -> None:
+        super().__init__(hosts)
+        self._host_names = host_names
+
+    def __getitem__(self, key: str) -> BIHostData:
+        self._host_names.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key: object) -> bool:
+        if isinstance(key, str):
+            self._host_names.add(key)
+        return super().__contains__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._host_names.add(key)
+        return super().get(key, default)
+
+
 #   .--BISearcher----------------------------------------------------------.
 #   |         ____ ___ ____                      _                         |
 #   |        | __ )_ _/ ___|  ___  __ _ _ __ ___| |__   ___ _ __           |
@@ -34,6 +97,10 @@ from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSe
 
 
 class BISearcher(ABCBISearcher):
+    def __init__(self) -> None:
+        super().__init__()
+        self._dependencies: BISearchDependencies | None = None
+
     def set_hosts(self, hosts: dict[str, BIHostData]) -> None:
         self.cleanup()
         # The key may be a pattern / regex, so `str` is the correct type for the key.
@@ -46,6 +113,19 @@ class BISearcher(ABCBISearcher):
         self._host_regex_match_cache.clear()
         self._host_regex_miss_cache.clear()
 
+    @contextmanager
+    def record_dependencies(self) -> Iterator[BISearchDependencies]:
+        """Record the structure data used while compiling an aggregation"""
+        dependencies = BISearchDependencies()
+        hosts = self.hosts
+        self.hosts = _RecordingHosts(hosts, dependencies.host_names)
+        self._dependencies = dependencies
+        try:
+            yield dependencies
+        finally:
+            self.hosts = hosts
+            self._dependencies = None
+
     def search_hosts(self, conditions: dict) -> list[BIHostSearchMatch]:
         hosts, matched_re_groups = self.filter_host_choice(
             list(self.hosts.values()), conditions["host_choice"]
@@ -53,7 +133,10 @@ class BISearcher(ABCBISearcher):
         matched_hosts = self.filter_host_folder(hosts, conditions["host_folder"])
         matched_hosts = self.filter_host_tags(matched_hosts, conditions["host_tags"])
         matched_hosts = self.filter_host_labels(matched_hosts, conditions["host_labels"])
-        return [BIHostSearchMatch(x, matched_re_groups[x.name]) for x in matched_hosts]
+        search_matches = [BIHostSearchMatch(x, matched_re_groups[x.name]) for x in matched_hosts]
+        if self._dependencies is not None:
+            self._dependencies.add_host_search(conditions, (x.host for x in search_matches))
+        return search_matches
 
     def filter_host_choice(
         self,
@@ -78,6 +161,16 @@ class BISearcher(ABCBISearcher):
         self,
         hosts: list[BIHostData],
         pattern: str,
+    ) -> tuple[list[BIHostData], dict]:
+        matched_hosts, matched_re_groups = self._get_host_name_matches(hosts, pattern)
+        if self._dependencies is not None:
+            self._dependencies.add_host_name_search(pattern, matched_hosts)
+        return matched_hosts, matched_re_groups
+
+    def _get_host_name_matches(
+        self,
+        hosts: list[BIHostData],
+        pattern: str,
     ) -> tuple[list[BIHostData], dict]:
         if pattern == "(.*)":
             return hosts, self._host_match_groups(hosts)
@@ -9,7 +9,7 @@ import abc
 import logging
 import time
 from collections.abc import Iterator, Mapping, MutableMapping, Sequence
-from typing import final, Final, NamedTuple
+from typing import cast, final, Final, NamedTuple
 
 import cmk.utils.agent_simulator as agent_simulator
 import cmk.utils.debug
@@ -598,6 +598,14 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
         raw_data: AgentRawData,
     ) -> tuple[ImmutableSection, Mapping[PiggybackMarker, ImmutableSection]]:
         """Split agent output in chunks, splits lines by whitespaces."""
+        if (sections := _split_host_sections(raw_data)) is not None:
+            return sections, {}
+        return self._parse_host_section_by_states(raw_data)
+
+    def _parse_host_section_by_states(
+        self,
+        raw_data: AgentRawData,
+    ) -> tuple[ImmutableSection, Mapping[PiggybackMarker, ImmutableSection]]:
         parser: ParserState = NOOPParser(
             self.hostname,
             [],
@@ -610,3 +618,69 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
             parser = parser(line.rstrip(b"\r"))
 
         return parser.sections, parser.piggyback_sections
+
+
+def _split_host_sections(raw_data: AgentRawData) -> MutableSection | None:
+    """Fast path of the parser for agent output without piggybacked data
+
+    The markers are located on the whole agent output at once and the section contents are
+    sliced out between them. This gives the same result as feeding the lines one by one through
+    the states of the parser, which is needed for piggybacked data and unparsable section headers.
+    None is returned in these cases.
+    """
+    if raw_data.find(b"<<<<") != -1:
+        return None
+
+    sections: MutableSection = []
+    headers: dict[bytes, SectionMarker] = {}
+    header: SectionMarker | None = None
+    content_start = 0
+    for line_start, line_end in _marker_lines(raw_data):
+        if header is not None:
+            sections[-1].section.extend(_split_lines(raw_data[content_start:line_start], header))
+        content_start = line_end + 1
+
+        line = raw_data[line_start:line_end].rstrip(b"\r")
+        if SectionMarker.is_footer(line):
+            header = None
+            continue
+
+        if (header := headers.get(line)) is None:
+            try:
+                header = headers[line] = SectionMarker.from_headerline(line)
+            except Exception:
+                return None
+        if not sections or sections[-1].header != header:
+            sections.append(SectionWithHeader(header, []))
+
+    if header is not None:
+        sections[-1].section.extend(_split_lines(raw_data[content_start:], header))
+    return sections
+
+
+def _marker_lines(raw_data: bytes) -> Iterator[tuple[int, int]]:
+    """Yield the start and end of all lines looking like a marker, see `ParserState.__call__`"""
+    if raw_data.startswith(b"<<<"):
+        line_start = 0
+    elif (line_start := raw_data.find(b"\n<<<") + 1) == 0:
+        return
+
+    while True:
+        if (line_end := raw_data.find(b"\n", line_start)) == -1:
+            line_end = len(raw_data)
+        if raw_data[line_start:line_end].rstrip(b"\r").endswith(b">>>"):
+            yield line_start, line_end
+        if (line_start := raw_data.find(b"\n<<<", line_end) + 1) == 0:
+            return
+
+
+def _split_lines(content: bytes, header: SectionMarker) -> list[AgentRawData]:
+    # Empty lines are skipped, see `ParserState.__call__`
+    if header.nostrip:
+        lines = [
+            stripped for line in content.split(b"\n") if (stripped := line.rstrip(b"\r")).strip()
+        ]
+    else:
+        lines = [stripped for line in content.split(b"\n") if (stripped := line.strip())]
+    # Spare the calls of the NewType for every line
+    return cast(list[AgentRawData], lines)
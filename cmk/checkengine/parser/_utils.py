@@ -6,7 +6,7 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from collections.abc import Iterable, Mapping
+from collections.abc import Iterable, Mapping, Sequence
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.log import console
@@ -22,7 +22,7 @@ __all__ = ["group_by_host"]
 def group_by_host(
     host_sections: Iterable[tuple[HostKey, HostSections]]
 ) -> Mapping[HostKey, HostSections]:
-    out_sections: dict[HostKey, MutableSectionMap[list]] = defaultdict(dict)
+    out_sections: dict[HostKey, MutableSectionMap[Sequence]] = defaultdict(dict)
     out_cache_info: dict[HostKey, MutableSectionMap[tuple[int, int]]] = defaultdict(dict)
     out_piggybacked_raw_data: dict[HostKey, dict[HostName, list[bytes]]] = defaultdict(dict)
     host_keys: list[HostKey] = []
@@ -33,8 +33,13 @@ def group_by_host(
         console.vverbose(
             "  -> Add sections: %s\n" % sorted([str(s) for s in host_section.sections.keys()])
         )
+        sections = out_sections[host_key]
         for section_name, section_content in host_section.sections.items():
-            out_sections[host_key].setdefault(section_name, []).extend(section_content)
+            # Only concatenate if needed. The content may be decoded lazily, see SectionStore.
+            if section_name in sections:
+                sections[section_name] = [*sections[section_name], *section_content]
+            else:
+                sections[section_name] = section_content
         for hostname, raw_lines in host_section.piggybacked_raw_data.items():
             out_piggybacked_raw_data[host_key].setdefault(hostname, []).extend(raw_lines)
         # TODO: It should be supported that different sources produce equal sections.
@@ -105,6 +105,11 @@ class Replication(ReplicationBase, total=False):
     takeover: int
 
 
+class ProcessingPipeline(TypedDict):
+    threads: int
+    max_queued_messages: int
+
+
 class ContactGroups(TypedDict):
     groups: Iterable[str]
     notify: bool
@@ -161,6 +166,7 @@ class Rule(TypedDict, total=False):
     comment: str
     contact_groups: ContactGroups
     count: Count
+    delay: int
     description: str
     docu_url: str
     disabled: bool
@@ -332,9 +338,11 @@ class ConfigFromWATO(TypedDict):
     log_level: LogConfig  # TODO: Mutable???
     log_messages: bool
     log_rulehits: bool
+    processing_pipeline: ProcessingPipeline | None
     remote_status: tuple[int, bool, Sequence[str] | None] | None
     replication: Replication | None
     retention_interval: int
+    retention_journal: bool
     rule_optimizer: bool
     rule_packs: Sequence[ECRulePack]
     rules: Collection[Rule]
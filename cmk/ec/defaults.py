@@ -46,6 +46,7 @@ def default_config() -> ConfigFromWATO:
         "log_rulehits": False,
         "log_messages": False,
         "retention_interval": 60,
+        "retention_journal": False,
         "housekeeping_interval": 60,
         "statistics_interval": 5,
         "history_lifetime": 365,  # days
@@ -54,6 +55,7 @@ def default_config() -> ConfigFromWATO:
         "remote_status": None,
         "socket_queue_len": 10,
         "eventsocket_queue_len": 10,
+        "processing_pipeline": None,
         "hostname_translation": TranslationOptions(),
         "archive_orphans": False,
         "archive_mode": "file",
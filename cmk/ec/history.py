@@ -4,16 +4,20 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import contextlib
+import math
 import os
 import shlex
 import subprocess
 import threading
 import time
+from array import array
 from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
 from logging import Logger
 from pathlib import Path
-from typing import Any, assert_never, Literal
+from typing import Any, assert_never, Final, Literal
 
+from cmk.utils import store
 from cmk.utils.log import VERBOSE
 from cmk.utils.render import date_and_time
 
@@ -324,6 +328,7 @@ def _flush_files(history: History) -> None:
 
 def _housekeeping_files(history: History) -> None:
     _expire_logfiles(history._settings, history._config, history._logger, history._lock, False)
+    _index_logfiles(history)
 
 
 def _add_files(history: History, event: Event, what: HistoryWhat, who: str, addinfo: str) -> None:
@@ -444,6 +449,7 @@ def _expire_logfiles(
                         "Deleting log file %s (age %s)", path, date_and_time(path.stat().st_mtime)
                     )
                     path.unlink()
+                    _get_index_path(path).unlink(missing_ok=True)
         except Exception as e:
             if settings.options.debug:
                 raise
@@ -548,12 +554,23 @@ def _get_files(history: History, logger: Logger, query: QueryGET) -> Iterable[An
         if not _intersects(time_range, _get_logfile_timespan(path)):
             logger.debug("skipping history file %s because of time filters", path)
             continue
-        tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
-        cmd = " | ".join([tac] + grep_pipeline)
-        logger.debug("preprocessing history file with command [%s]", cmd)
-        new_entries = parse_history_file(
-            history._history_columns, path, query.filter_row, cmd, limit, logger
-        )
+        # Files which are not written to anymore have an index. It gives us the lines
+        # which can match host, rule and event ID filters or the time range. Other filters
+        # (e.g. on the text) have to be handled by scanning the whole file.
+        if (index := _load_index(path, logger)) is not None and (
+            lines := index.candidate_lines(time_range, filters)
+        ) is not None:
+            logger.debug("reading %d lines of history file %s using its index", len(lines), path)
+            new_entries = parse_indexed_history_file(
+                history._history_columns, path, index, lines, query.filter_row, limit, logger
+            )
+        else:
+            tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
+            cmd = " | ".join([tac] + grep_pipeline)
+            logger.debug("preprocessing history file with command [%s]", cmd)
+            new_entries = parse_history_file(
+                history._history_columns, path, query.filter_row, cmd, limit, logger
+            )
         history_entries += new_entries
         if limit is not None:
             limit -= len(new_entries)
@@ -706,6 +723,163 @@ def _get_logfile_timespan(path: Path) -> tuple[float | None, float | None]:
     return first_entry, last_entry
 
 
+# Columns for which the index of a history file knows the lines containing a value
+_INDEXED_COLUMNS: Final = ("event_id", "event_host", "event_rule_id")
+
+# Number of lines for which the index of a history file records a common time range
+_INDEX_BLOCK_SIZE: Final = 1024
+
+
+@dataclass(frozen=True)
+class HistoryFileIndex:
+    """Index of a history file which is not written to anymore
+
+    Lines are numbered from 0 here. The postings are the lines per (lower case) value of
+    the indexed columns, the time ranges are the ones of blocks of _INDEX_BLOCK_SIZE lines.
+    """
+
+    size: int
+    offsets: array  # array[int], the position of each line in the file
+    time_ranges: Sequence[tuple[float, float]]
+    postings: dict[str, dict[str, array]]  # dict[str, dict[str, array[int]]]
+
+    def candidate_lines(
+        self,
+        time_range: tuple[float | None, float | None],
+        filters: Iterable[tuple[str, OperatorName, Callable[[Any], bool], Any]],
+    ) -> Sequence[int] | None:
+        """Return the lines which can match the filters, the younger ones first
+
+        The result is None if the index can't rule out any lines. The lines still need to
+        be filtered, e.g. "=" matches case sensitive, but the index is case insensitive.
+        """
+        lines: set[int] | None = None
+        for column_name, operator_name, _predicate, argument in filters:
+            if column_name not in self.postings or operator_name not in ("=", "=~", "in"):
+                continue
+            postings = self.postings[column_name]
+            matching = set().union(
+                *(
+                    postings.get(str(value).lower(), ())
+                    for value in (argument if operator_name == "in" else [argument])
+                )
+            )
+            lines = matching if lines is None else lines & matching
+
+        blocks = {
+            num
+            for num, block_range in enumerate(self.time_ranges)
+            if _intersects(time_range, block_range)
+        }
+        if lines is None:
+            if len(blocks) == len(self.time_ranges):
+                return None
+            lines = {
+                line
+                for num in blocks
+                for line in range(
+                    num * _INDEX_BLOCK_SIZE, min((num + 1) * _INDEX_BLOCK_SIZE, len(self.offsets))
+                )
+            }
+        elif len(blocks) < len(self.time_ranges):
+            lines = {line for line in lines if line // _INDEX_BLOCK_SIZE in blocks}
+
+        return sorted(lines, reverse=True)
+
+
+def build_history_file_index(
+    history_columns: Sequence[tuple[str, Any]], path: Path
+) -> HistoryFileIndex:
+    column_names = [column_name for column_name, _default in history_columns]
+    # The files don't contain the history_line column
+    positions = {
+        column_name: column_names.index(column_name) - 1 for column_name in _INDEXED_COLUMNS
+    }
+    offsets = array("Q")
+    time_ranges: list[tuple[float, float]] = []
+    postings: dict[str, dict[str, array]] = {column_name: {} for column_name in _INDEXED_COLUMNS}
+    size = 0
+    with path.open(mode="rb") as f:
+        for num, line in enumerate(f):
+            offsets.append(size)
+            size += len(line)
+            if num % _INDEX_BLOCK_SIZE == 0:
+                time_ranges.append((math.inf, -math.inf))
+            try:
+                parts = line.decode("utf-8").rstrip("\n").split("\t")
+                entry_time = float(parts[0])
+                values = {column_name: parts[pos] for column_name, pos in positions.items()}
+            except (UnicodeDecodeError, ValueError, IndexError):
+                continue  # Invalid lines are reported when they are scanned
+
+            first, last = time_ranges[-1]
+            time_ranges[-1] = (min(first, entry_time), max(last, entry_time))
+            for column_name, value in values.items():
+                postings[column_name].setdefault(value.lower(), array("I")).append(num)
+
+    return HistoryFileIndex(size, offsets, time_ranges, postings)
+
+
+def parse_indexed_history_file(
+    history_columns: Sequence[tuple[str, Any]],
+    path: Path,
+    index: HistoryFileIndex,
+    lines: Iterable[int],
+    filter_row: Callable[[Sequence[Any]], bool],
+    limit: int | None,
+    logger: Logger,
+) -> list[Any]:
+    """Like parse_history_file, but only for the given lines"""
+    entries: list[Any] = []
+    with path.open(mode="rb") as f:
+        for num in lines:
+            if limit is not None and len(entries) > limit:
+                break
+            f.seek(index.offsets[num])
+            line = f.readline()
+            try:
+                parts: list[Any] = [num + 1] + line.decode("utf-8").rstrip("\n").split("\t")
+                convert_history_line(history_columns, parts)
+                if filter_row(parts):
+                    entries.append(parts)
+            except Exception:
+                logger.exception(f"Invalid line '{line!r}' in history file {path}")
+
+    return entries
+
+
+def _index_logfiles(history: History) -> None:
+    """Create the missing indexes of the history files which are not written to anymore"""
+    paths = sorted(history._settings.paths.history_dir.value.glob("*.log"))
+    for path in paths[:-1]:  # The youngest one may still be written to
+        index_path = _get_index_path(path)
+        try:
+            if index_path.exists() and index_path.stat().st_mtime >= path.stat().st_mtime:
+                continue
+            history._logger.log(VERBOSE, "Indexing history file %s", path)
+            store.save_object_to_pickle_file(
+                index_path, build_history_file_index(history._history_columns, path)
+            )
+        except Exception as e:
+            if history._settings.options.debug:
+                raise
+            history._logger.warning(f"Error indexing history file {path}: {e}")
+
+
+def _load_index(path: Path, logger: Logger) -> HistoryFileIndex | None:
+    try:
+        index = store.load_object_from_pickle_file(_get_index_path(path), default=None)
+        if isinstance(index, HistoryFileIndex) and index.size == path.stat().st_size:
+            return index
+    except Exception as e:
+        logger.warning(f"Error loading index of history file {path}: {e}")
+    return None
+
+
+def _get_index_path(path: Path) -> Path:
+    return path.with_suffix(".idx")
+
+
 def scrub_string(s: str) -> str:
     """Rip out/replace any characters which have a special meaning in the UTF-8
     encoded history files, see e.g. quote_tab. In theory this shouldn't be
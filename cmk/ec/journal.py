@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Append-only persistence of the changes to the event status
+
+The event status is regularly written to the status file as a whole. With many open
+events this means rewriting (and fsyncing) megabytes in every retention interval,
+although only a few events have changed.
+
+In journal mode, the status file is only written from time to time as a snapshot. In
+between, only the new, changed and deleted events are appended to a journal file.
+Loading the status replays the journal on top of the snapshot.
+
+Every snapshot gets a new generation number. The journal starts with the generation of
+the snapshot it belongs to, so a journal that is left over from an older snapshot is
+never replayed.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+from collections.abc import Iterable, Mapping, MutableMapping
+from logging import Logger
+from pathlib import Path
+from typing import Any, Final
+
+from .event import Event
+
+# Never compact the journal while it is smaller than this
+_MIN_COMPACTION_SIZE: Final = 1024 * 1024
+
+
+class EventStatusJournal:
+    def __init__(self, path: Path, logger: Logger) -> None:
+        self.path: Final = path
+        self._logger: Final = logger
+        self._active = False
+        self._snapshot_size = 0
+        self._size = 0
+        # Hashes of what has been written last for the events and the other status fields.
+        # This way we only need to keep a number per event in memory to detect the changes.
+        self._event_hashes: dict[int, int] = {}
+        self._status_hash = 0
+
+    def is_active(self) -> bool:
+        """Whether there is a journal for the current snapshot which can be appended to"""
+        return self._active
+
+    def needs_compaction(self) -> bool:
+        """Whether the journal has grown larger than a new snapshot would be"""
+        return self._size > max(self._snapshot_size, _MIN_COMPACTION_SIZE)
+
+    def start(
+        self,
+        generation: int,
+        snapshot_size: int,
+        events: Iterable[Event],
+        status: Mapping[str, Any],
+    ) -> None:
+        """Start a new, empty journal for a snapshot that has just been written"""
+        header = _record("generation", generation)
+        path_new = self.path.parent / (self.path.name + ".new")
+        with path_new.open(mode="wb") as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        path_new.rename(self.path)
+
+        self._active = True
+        self._snapshot_size = snapshot_size
+        self._size = len(header)
+        self._event_hashes = {event["id"]: hash(repr(event)) for event in events}
+        self._status_hash = hash(repr(status))
+
+    def stop(self) -> None:
+        """Remove the journal, e.g. when journal mode has been switched off"""
+        self._active = False
+        self._event_hashes = {}
+        self.path.unlink(missing_ok=True)
+
+    def append(self, events: Iterable[Event], status: Mapping[str, Any]) -> int:
+        """Append the changes since the last call and return the number of written records"""
+        records = []
+        seen = set()
+        for event in events:
+            seen.add(event_id := event["id"])
+            text = repr(event)
+            if self._event_hashes.get(event_id) != (event_hash := hash(text)):
+                records.append(b"('event', %s)\n" % text.encode("utf-8"))
+                self._event_hashes[event_id] = event_hash
+
+        for event_id in [event_id for event_id in self._event_hashes if event_id not in seen]:
+            records.append(_record("delete", event_id))
+            del self._event_hashes[event_id]
+
+        if self._status_hash != (status_hash := hash(text := repr(status))):
+            records.append(b"('status', %s)\n" % text.encode("utf-8"))
+            self._status_hash = status_hash
+
+        if not records:
+            return 0
+
+        data = b"".join(records)
+        try:
+            with self.path.open(mode="ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            # We don't know what made it to the disk, the next save has to write a snapshot
+            self._active = False
+            raise
+        self._size += len(data)
+        return len(records)
+
+    def replay(
+        self,
+        generation: int,
+        events: MutableMapping[int, Event],
+        status: MutableMapping[str, Any],
+    ) -> int:
+        """Apply the journal of the given snapshot generation and return the number of records"""
+        try:
+            lines = self.path.read_bytes().splitlines()
+        except FileNotFoundError:
+            return 0
+
+        if not lines or _parse(lines[0]) != ("generation", generation):
+            self._logger.info("Ignoring %s, it does not belong to the loaded status", self.path)
+            return 0
+
+        num_records = 0
+        for line in lines[1:]:
+            try:
+                what, value = _parse(line)
+            except (SyntaxError, ValueError):
+                # The last write was interrupted. Everything before has been fsynced.
+                self._logger.warning("Ignoring incomplete record in %s", self.path)
+                break
+
+            if what == "event":
+                events[value["id"]] = value
+            elif what == "delete":
+                events.pop(value, None)
+            elif what == "status":
+                status.update(value)
+            num_records += 1
+
+        return num_records
+
+
+def _record(what: str, value: object) -> bytes:
+    return (repr((what, value)) + "\n").encode("utf-8")
+
+
+def _parse(line: bytes) -> Any:
+    return ast.literal_eval(line.decode("utf-8"))
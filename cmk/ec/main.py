@@ -52,7 +52,7 @@ from cmk.utils.timeperiod import TimeperiodName
 from cmk.utils.translations import translate_hostname
 
 from .actions import do_event_action, do_event_actions, do_notify, event_has_opened
-from .config import Config, ConfigFromWATO, Count, ECRulePack, MatchGroups, Rule
+from .config import Config, ConfigFromWATO, Count, ECRulePack, MatchGroups, ProcessingPipeline, Rule
 from .core_queries import HostInfo, query_hosts_scheduled_downtime_depth, query_timeperiods_in
 from .crash_reporting import CrashReportStore, ECCrashReport
 from .event import create_event_from_line, Event
@@ -67,7 +67,10 @@ from .history import (
     scrub_string,
 )
 from .host_config import HostConfig
+from .journal import EventStatusJournal
 from .perfcounters import Perfcounters
+from .pipeline import EventPipeline
+from .prefilter import RulePrefilter
 from .query import filter_operator_in, MKClientError, Query, QueryCOMMAND, QueryGET, QueryREPLICATE
 from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
 from .rule_packs import load_config as load_config_using
@@ -436,6 +439,8 @@ class EventServer(ECServerThread):
         self._hash_stats: list[list[int]] = []  # facility/priority
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
+        self._prefilter: RulePrefilter | None = None
+        self._prefilter_stats = [0, 0]  # tried/skipped rules with required strings
 
         self.host_config = HostConfig(self._logger)
         self._perfcounters = perfcounters
@@ -450,6 +455,9 @@ class EventServer(ECServerThread):
             omd_site_id=omd_site(),
             is_active_time_period=self._time_period.active,
         )
+        self._pipeline: EventPipeline | None = None
+        self._pipeline_settings: ProcessingPipeline | None = None
+        self._queue_drops = 0
 
         # HACK for testing: The real fix would involve breaking up these huge
         # class monsters.
@@ -471,6 +479,7 @@ class EventServer(ECServerThread):
             itertools.chain(
                 cls._general_columns(),
                 Perfcounters.status_columns(),
+                cls._queue_columns(),
                 cls._replication_columns(),
                 cls._event_limit_columns(),
             )
@@ -484,6 +493,13 @@ class EventServer(ECServerThread):
             ("status_virtual_memory_size", 0),
         ]
 
+    @classmethod
+    def _queue_columns(cls) -> Columns:
+        return [
+            ("status_queue_length", 0),
+            ("status_queue_drops", 0),
+        ]
+
     @classmethod
     def _replication_columns(cls) -> Columns:
         return [
@@ -507,6 +523,7 @@ class EventServer(ECServerThread):
         row: list[object] = []
         row += self._add_general_status()
         row += self._perfcounters.get_status()
+        row += self._add_queue_status()
         row += self._add_replication_status()
         row += self._add_event_limit_status()
         return [row]
@@ -522,6 +539,13 @@ class EventServer(ECServerThread):
         parts = Path("/proc/self/stat").read_text().split()
         return int(parts[22])  # in Bytes
 
+    def _add_queue_status(self) -> list[object]:
+        pipeline = self._pipeline
+        return [
+            0 if pipeline is None else pipeline.queue_length(),
+            self._queue_drops,
+        ]
+
     def _add_replication_status(self) -> list[object]:
         if is_replication_slave(self._config):
             return [
@@ -696,7 +720,12 @@ class EventServer(ECServerThread):
         return os.open(str(self.settings.paths.event_pipe.value), os.O_RDWR | os.O_NONBLOCK)
 
     def handle_snmptrap(self, trap: Iterable[tuple[str, str]], ipaddress_: str) -> None:
-        self.process_event(create_event_from_trap(trap, ipaddress_))
+        event = create_event_from_trap(trap, ipaddress_)
+        if self._pipeline is None:
+            self.process_event(event)
+        else:
+            # Like UDP syslog messages, traps are lost anyway when we are too slow
+            self._enqueue_event(self._pipeline, lambda: event, block=False)
 
     def serve(self) -> None:  # pylint: disable=too-many-branches
         pipe_fragment = b""
@@ -709,6 +738,7 @@ class EventServer(ECServerThread):
         client_sockets: dict[FileDescr, tuple[socket.socket, tuple[str, int] | None, bytes]] = {}
         select_timeout = 1
         while not self._terminate_event.is_set():
+            self._update_pipeline()
             try:
                 readable: list[FileDescr | socket.socket] = select.select(
                     listen_list + list(client_sockets.keys()), [], [], select_timeout
@@ -830,7 +860,9 @@ class EventServer(ECServerThread):
                     raise ValueError(
                         f"Invalid remote address '{address!r}' for syslog socket (UDP)"
                     )
-                self.process_raw_lines(message, (unmap_ipv4_address(address[0]), address[1]))
+                self.process_raw_lines(
+                    message, (unmap_ipv4_address(address[0]), address[1]), block=False
+                )
 
             # Read events from builtin snmptrap server
             if self._snmptrap is not None and self._snmptrap in readable:
@@ -844,13 +876,15 @@ class EventServer(ECServerThread):
                         and isinstance(address[1], int)
                     ):
                         raise ValueError(f"Invalid remote address '{address!r}' for SNMP trap")
-                    self.process_raw_data(
-                        partial(
-                            self._snmp_trap_engine.process_snmptrap,
-                            message,
-                            (unmap_ipv4_address(address[0]), address[1]),
-                        )
+                    handle_trap = partial(
+                        self._snmp_trap_engine.process_snmptrap,
+                        message,
+                        (unmap_ipv4_address(address[0]), address[1]),
                     )
+                    if self._pipeline is None:
+                        self.process_raw_data(handle_trap)
+                    else:
+                        handle_trap()  # handle_snmptrap() queues the event
                 except Exception:
                     self._logger.exception(
                         "exception while handling an SNMP trap, skipping this one"
@@ -865,6 +899,33 @@ class EventServer(ECServerThread):
             else:
                 select_timeout = 1  # restore default select timeout
 
+        self._stop_pipeline()
+
+    def _update_pipeline(self) -> None:
+        """(Re)start the processing pipeline when its configuration has been changed"""
+        if (pipeline_settings := self._config["processing_pipeline"]) == self._pipeline_settings:
+            return
+        self._stop_pipeline()
+        if pipeline_settings is not None:
+            self._logger.info(
+                "Processing messages with %d threads (queue length %d)",
+                pipeline_settings["threads"],
+                pipeline_settings["max_queued_messages"],
+            )
+            self._pipeline = EventPipeline(
+                self._logger,
+                pipeline_settings["threads"],
+                pipeline_settings["max_queued_messages"],
+            )
+            self._pipeline.start()
+        self._pipeline_settings = pipeline_settings
+
+    def _stop_pipeline(self) -> None:
+        if self._pipeline is not None:
+            self._pipeline.stop()
+            self._pipeline = None
+        self._pipeline_settings = None
+
     def process_raw_data(self, handler: Callable[[], None]) -> None:
         """
         Processes incoming data, just a wrapper between the real data and the
@@ -880,10 +941,28 @@ class EventServer(ECServerThread):
         elapsed = time.time() - before
         self._perfcounters.count_time("processing", elapsed)
 
-    def process_raw_lines(self, data: bytes, address: tuple[str, int] | None) -> None:
-        """Takes several lines of messages, handles encoding and processes them separated."""
+    def process_raw_lines(
+        self, data: bytes, address: tuple[str, int] | None, *, block: bool = True
+    ) -> None:
+        """Takes several lines of messages, handles encoding and processes them separated.
+
+        With a processing pipeline, the lines are only queued. In case the queue is full, we
+        either wait (block) or drop the lines."""
         for line_bytes in data.splitlines():
             if line := scrub_string(line_bytes.rstrip().decode("utf-8")):
+                if self._pipeline is not None:
+                    self._enqueue_event(
+                        self._pipeline,
+                        partial(
+                            create_event_from_line,
+                            line,
+                            address,
+                            self._logger,
+                            verbose=self._config["debug_rules"],
+                        ),
+                        block=block,
+                    )
+                    continue
                 try:
 
                     def handler(line: str = line) -> None:
@@ -893,6 +972,35 @@ class EventServer(ECServerThread):
                 except Exception:
                     self._logger.exception("Exception handling a log line (skipping this one)")
 
+    def _enqueue_event(
+        self, pipeline: EventPipeline, create_event: Callable[[], Event], *, block: bool
+    ) -> None:
+        """Like process_raw_data(), but the event is created and processed by the pipeline"""
+        self._perfcounters.count("messages")
+        # In replication slave mode (when not took over), ignore all events
+        if is_replication_slave(self._config) and self._slave_status["mode"] == "sync":
+            if self.settings.options.debug:
+                self._logger.info("Replication: we are in slave mode, ignoring event")
+            return
+        if not pipeline.submit(partial(self._classify_queued_event, create_event), block=block):
+            self._queue_drops += 1
+
+    def _classify_queued_event(
+        self, create_event: Callable[[], Event]
+    ) -> tuple[str | None, Callable[[], None]]:
+        before = time.time()
+        event = create_event()
+        rule_match = self.classify_event(event)
+        elapsed = time.time() - before
+
+        def apply() -> None:
+            before = time.time()
+            self.apply_rule_match(event, rule_match)
+            self._perfcounters.count_time("processing", elapsed + time.time() - before)
+
+        # Counting, cancelling etc. needs the events of a rule in the order of their arrival
+        return None if rule_match is None else rule_match[0]["id"], apply
+
     def do_housekeeping(self) -> None:
         with self._event_status.lock, self._lock_configuration:
             self.hk_handle_event_timeouts()
@@ -1099,9 +1207,8 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
-                for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                for event in self._event_status.events_of_rule(rule["id"]):
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expected_count:  # no -> trigger alarm
@@ -1154,10 +1261,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1239,6 +1344,7 @@ class EventServer(ECServerThread):
         self._rule_by_id = {}
         # Speedup-Hash for rule execution
         self._rule_hash: dict[int, dict[int, Any]] = {}
+        self._prefilter = None
         count_disabled = 0
         count_rules = 0
         count_unspecific = 0
@@ -1288,11 +1394,13 @@ class EventServer(ECServerThread):
             "Compiled %d active rules (ignoring %d disabled rules)", count_rules, count_disabled
         )
         if self._config["rule_optimizer"]:
+            self._prefilter = RulePrefilter(self._rules)
             self._logger.info(
-                "Rule hash: %d rules - %d hashed, %d unspecific",
+                "Rule hash: %d rules - %d hashed, %d unspecific, %d with prefilter",
                 len(self._rules),
                 len(self._rules) - count_unspecific,
                 count_unspecific,
+                self._prefilter.num_filtered_rules,
             )
             for facility in list(range(23)) + [31]:
                 if facility in self._rule_hash:
@@ -1356,13 +1464,30 @@ class EventServer(ECServerThread):
                 count,
                 (100.0 * count / float(total_count)),
             )
+        tried, skipped = self._prefilter_stats
+        if tried:
+            self._logger.info(
+                "Message prefilter: skipped %d of %d rules (%.2f%%)",
+                skipped,
+                tried,
+                100.0 * skipped / tried,
+            )
 
     def process_line(self, line: str, address: tuple[str, int] | None) -> None:
         self.process_event(
             create_event_from_line(line, address, self._logger, verbose=self._config["debug_rules"])
         )
 
-    def process_event(self, event: Event) -> None:  # pylint: disable=too-many-branches
+    def process_event(self, event: Event) -> None:
+        self.apply_rule_match(event, self.classify_event(event))
+
+    def classify_event(self, event: Event) -> tuple[Rule, MatchSuccess] | None:
+        """Find the rule which is responsible for the event
+
+        This is the first matching rule which does not just skip the rest of its rule pack.
+        The open events are not touched here, so this can be done for several events in
+        parallel, see apply_rule_match() for the rest.
+        """
         self.do_translate_hostname(event)
 
         # Log all incoming messages into a syslog-like text file if that is enabled
@@ -1375,6 +1500,8 @@ class EventServer(ECServerThread):
             rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
         else:
             rule_candidates = self._rules
+        prefilter = self._prefilter
+        possible_rules = None if prefilter is None else prefilter.possible_rules(event["text"])
 
         skip_pack = None
         for rule in rule_candidates:
@@ -1382,6 +1509,13 @@ class EventServer(ECServerThread):
                 continue  # still in the rule pack that we want to skip
             skip_pack = None  # new pack, reset skipping
 
+            if prefilter is not None and possible_rules is not None:
+                if prefilter.filters(rule):
+                    self._prefilter_stats[0] += 1
+                    if rule["id"] not in possible_rules:
+                        self._prefilter_stats[1] += 1
+                        continue  # the text can't match
+
             try:
                 result = self.event_rule_matches(rule, event)
             except Exception as e:
@@ -1406,118 +1540,126 @@ class EventServer(ECServerThread):
                         event["text"],
                     )
 
-                if rule.get("drop"):
-                    if rule["drop"] == "skip_pack":
-                        skip_pack = rule["pack"]
-                        if self._config["debug_rules"]:
-                            self._logger.info("  skipping this rule pack (%s)", skip_pack)
-                        continue
-                    self._perfcounters.count("drops")
-                    return
+                if rule.get("drop") == "skip_pack":
+                    skip_pack = rule["pack"]
+                    if self._config["debug_rules"]:
+                        self._logger.info("  skipping this rule pack (%s)", skip_pack)
+                    continue
 
-                if result.cancelling:
-                    self._event_status.cancel_events(
-                        self, self._event_columns, event, result.match_groups, rule
-                    )
-                    return
+                return rule, result
 
-                # Remember the rule id that this event originated from
-                event["rule_id"] = rule["id"]
+        return None
 
-                # Attach optional contact group information for visibility
-                # and eventually for notifications
-                self._add_rule_contact_groups_to_event(rule, event)
+    def apply_rule_match(  # pylint: disable=too-many-branches
+        self, event: Event, rule_match: tuple[Rule, MatchSuccess] | None
+    ) -> None:
+        """Create, count or cancel events according to the result of classify_event()"""
+        if rule_match is None:
+            if self._config["archive_orphans"]:
+                self._event_status.archive_event(event)
+            return
 
-                # Store groups from matching this event. In order to make
-                # persistence easier, we do not save them as list but join
-                # them on ASCII-1.
-                match_groups_message = result.match_groups.get("match_groups_message", ())
-                assert match_groups_message is not False
-                event["match_groups"] = match_groups_message
+        rule, result = rule_match
+        if rule.get("drop"):
+            self._perfcounters.count("drops")
+            return
 
-                match_groups_syslog_application = result.match_groups.get(
-                    "match_groups_syslog_application", ()
-                )
-                assert match_groups_syslog_application is not False
-                event["match_groups_syslog_application"] = match_groups_syslog_application
-
-                self.rewrite_event(rule, event, result.match_groups)
-
-                # Lookup the monitoring core hosts and add the core host
-                # name to the event when one can be matched.
-                #
-                # Needs to be done AFTER event rewriting, because the rewriting
-                # may change the "host" field.
-                #
-                # For the moment we have no rule/condition matching on this
-                # field. So we only add the core host info for matched events.
-                self._add_core_host_to_new_event(event)
-
-                if "count" in rule:
-                    count = rule["count"]
-                    # Check if a matching event already exists that we need to
-                    # count up. If the count reaches the limit, the event will
-                    # be opened and its rule actions performed.
-                    existing_event = self._event_status.count_event(self, event, rule, count)
-                    if existing_event:
-                        if "delay" in rule:
-                            if self._config["debug_rules"]:
-                                self._logger.info(
-                                    "Event opening will be delayed for %d seconds", rule["delay"]
-                                )
-                            existing_event["delay_until"] = time.time() + rule["delay"]
-                            existing_event["phase"] = "delayed"
-                        else:
-                            event_has_opened(
-                                self._history,
-                                self.settings,
-                                self._config,
-                                self._logger,
-                                self.host_config,
-                                self._event_columns,
-                                rule,
-                                existing_event,
-                            )
+        if result.cancelling:
+            self._event_status.cancel_events(
+                self, self._event_columns, event, result.match_groups, rule
+            )
+            return
 
-                        self._history.add(existing_event, "COUNTREACHED")
+        # Remember the rule id that this event originated from
+        event["rule_id"] = rule["id"]
 
-                        if "delay" not in rule and rule.get("autodelete"):
-                            existing_event["phase"] = "closed"
-                            with self._event_status.lock:
-                                self._event_status.remove_event(existing_event, "AUTODELETE")
-                elif "expect" in rule:
-                    self._event_status.count_expected_event(self, event)
-                else:
-                    if "delay" in rule:
-                        if self._config["debug_rules"]:
-                            self._logger.info(
-                                "Event opening will be delayed for %d seconds", rule["delay"]
-                            )
-                        event["delay_until"] = time.time() + rule["delay"]
-                        event["phase"] = "delayed"
-                    else:
-                        event["phase"] = "open"
+        # Attach optional contact group information for visibility
+        # and eventually for notifications
+        self._add_rule_contact_groups_to_event(rule, event)
 
-                    if self.new_event_respecting_limits(event) and event["phase"] == "open":
-                        event_has_opened(
-                            self._history,
-                            self.settings,
-                            self._config,
-                            self._logger,
-                            self.host_config,
-                            self._event_columns,
-                            rule,
-                            event,
+        # Store groups from matching this event. In order to make
+        # persistence easier, we do not save them as list but join
+        # them on ASCII-1.
+        match_groups_message = result.match_groups.get("match_groups_message", ())
+        assert match_groups_message is not False
+        event["match_groups"] = match_groups_message
+
+        match_groups_syslog_application = result.match_groups.get(
+            "match_groups_syslog_application", ()
+        )
+        assert match_groups_syslog_application is not False
+        event["match_groups_syslog_application"] = match_groups_syslog_application
+
+        self.rewrite_event(rule, event, result.match_groups)
+
+        # Lookup the monitoring core hosts and add the core host
+        # name to the event when one can be matched.
+        #
+        # Needs to be done AFTER event rewriting, because the rewriting
+        # may change the "host" field.
+        #
+        # For the moment we have no rule/condition matching on this
+        # field. So we only add the core host info for matched events.
+        self._add_core_host_to_new_event(event)
+
+        if "count" in rule:
+            count = rule["count"]
+            # Check if a matching event already exists that we need to
+            # count up. If the count reaches the limit, the event will
+            # be opened and its rule actions performed.
+            existing_event = self._event_status.count_event(self, event, rule, count)
+            if existing_event:
+                if "delay" in rule:
+                    if self._config["debug_rules"]:
+                        self._logger.info(
+                            "Event opening will be delayed for %d seconds", rule["delay"]
                         )
-                        if rule.get("autodelete"):
-                            event["phase"] = "closed"
-                            with self._event_status.lock:
-                                self._event_status.remove_event(event, "AUTODELETE")
-                return
+                    existing_event["delay_until"] = time.time() + rule["delay"]
+                    existing_event["phase"] = "delayed"
+                else:
+                    event_has_opened(
+                        self._history,
+                        self.settings,
+                        self._config,
+                        self._logger,
+                        self.host_config,
+                        self._event_columns,
+                        rule,
+                        existing_event,
+                    )
 
-        # End of loop over rules.
-        if self._config["archive_orphans"]:
-            self._event_status.archive_event(event)
+                self._history.add(existing_event, "COUNTREACHED")
+
+                if "delay" not in rule and rule.get("autodelete"):
+                    existing_event["phase"] = "closed"
+                    with self._event_status.lock:
+                        self._event_status.remove_event(existing_event, "AUTODELETE")
+        elif "expect" in rule:
+            self._event_status.count_expected_event(self, event)
+        else:
+            if "delay" in rule:
+                if self._config["debug_rules"]:
+                    self._logger.info("Event opening will be delayed for %d seconds", rule["delay"])
+                event["delay_until"] = time.time() + rule["delay"]
+                event["phase"] = "delayed"
+            else:
+                event["phase"] = "open"
+
+            if self.new_event_respecting_limits(event) and event["phase"] == "open":
+                event_has_opened(
+                    self._history,
+                    self.settings,
+                    self._config,
+                    self._logger,
+                    self.host_config,
+                    self._event_columns,
+                    rule,
+                    event,
+                )
+                if rule.get("autodelete"):
+                    event["phase"] = "closed"
+                    with self._event_status.lock:
+                        self._event_status.remove_event(event, "AUTODELETE")
 
     def _add_rule_contact_groups_to_event(self, rule: Rule, event: Event) -> None:
         if rule.get("contact_groups") is None:
@@ -2718,6 +2860,10 @@ class EventStatus:
         self.lock = threading.Lock()
         self._history = history
         self._logger = logger
+        self._journal = EventStatusJournal(
+            settings.paths.status_journal_file.value, logger.getChild("journal")
+        )
+        self._journal_generation = 0
         self.flush()
 
     def reload_configuration(self, config: Config) -> None:
@@ -2725,7 +2871,11 @@ class EventStatus:
 
     def flush(self) -> None:
         # TODO: Improve types!
-        self._events: list[Event] = []
+        # All open events by their ID. The insertion order is kept, so the oldest event comes first.
+        self._events: dict[int, Event] = {}
+        # The same events by rule ID and by host, each of them again ordered from oldest to newest.
+        self._events_by_rule: dict[str | None, dict[int, Event]] = {}
+        self._events_by_host: dict[tuple[HostName, HostName | None], dict[int, Event]] = {}
         self._next_event_id = 1
         self._rule_stats: dict[str, int] = {}
         # needed for expecting rules
@@ -2739,13 +2889,13 @@ class EventStatus:
 
     def events(self) -> list[Event]:
         # TODO: Improve type!
-        return self._events
+        return list(self._events.values())
+
+    def events_of_rule(self, rule_id: str | None) -> list[Event]:
+        return list(self._events_by_rule.get(rule_id, {}).values())
 
     def event(self, eid: int) -> Event | None:
-        for event in self._events:
-            if event["id"] == eid:
-                return event
-        return None
+        return self._events.get(eid)
 
     def interval_start(self, rule_id: str, interval: int) -> int:
         """
@@ -2794,30 +2944,63 @@ class EventStatus:
     def pack_status(self) -> PackedEventStatus:
         return {
             "next_event_id": self._next_event_id,
-            "events": self._events,
+            "events": self.events(),
             "rule_stats": self._rule_stats,
             "interval_starts": self._interval_starts,
         }
 
     def unpack_status(self, status: PackedEventStatus) -> None:
         self._next_event_id = status["next_event_id"]
-        self._events = status["events"]
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
+        self._set_events(status["events"])
 
     def save_status(self) -> None:
         now = time.time()
-        status = self.pack_status()
+        path = self.settings.paths.status_file.value
+        if (
+            self._config["retention_journal"]
+            and self._journal.is_active()
+            and not self._journal.needs_compaction()
+        ):
+            path = self._journal.path
+            num_records = self._journal.append(self._events.values(), self._journaled_status())
+            self._logger.log(VERBOSE, "Appended %d changes to %s.", num_records, path)
+        else:
+            # A new generation makes sure that no older journal is replayed on this snapshot
+            self._journal_generation += 1
+            snapshot_size = self._save_snapshot()
+            if self._config["retention_journal"]:
+                self._journal.start(
+                    self._journal_generation,
+                    snapshot_size,
+                    self._events.values(),
+                    self._journaled_status(),
+                )
+            else:
+                self._journal.stop()
+        elapsed = time.time() - now
+        self._logger.log(VERBOSE, "Saved event state to %s in %.3fms.", path, elapsed * 1000)
+
+    def _save_snapshot(self) -> int:
+        status = {**self.pack_status(), "journal_generation": self._journal_generation}
         path = self.settings.paths.status_file.value
         path_new = path.parent / (path.name + ".new")
         # Believe it or not: cPickle is more than two times slower than repr()
+        data = (repr(status) + "\n").encode("utf-8")
         with path_new.open(mode="wb") as f:
-            f.write((repr(status) + "\n").encode("utf-8"))
+            f.write(data)
             f.flush()
             os.fsync(f.fileno())
         path_new.rename(path)
-        elapsed = time.time() - now
-        self._logger.log(VERBOSE, "Saved event state to %s in %.3fms.", path, elapsed * 1000)
+        return len(data)
+
+    def _journaled_status(self) -> dict[str, object]:
+        return {
+            "next_event_id": self._next_event_id,
+            "rule_stats": self._rule_stats,
+            "interval_starts": self._interval_starts,
+        }
 
     def reset_counters(self, rule_id: str | None) -> None:
         if rule_id:
@@ -2829,11 +3012,20 @@ class EventStatus:
 
     def load_status(self, event_server: EventServer) -> None:
         path = self.settings.paths.status_file.value
+        events: list[Event] = []
         if path.exists():
             try:
                 status = ast.literal_eval(path.read_text(encoding="utf-8"))
+                self._journal_generation = status.get("journal_generation", 0)
+                events_by_id = {event["id"]: event for event in status["events"]}
+                if num_records := self._journal.replay(
+                    self._journal_generation, events_by_id, status
+                ):
+                    self._logger.info(
+                        "Replayed %d changes from %s.", num_records, self._journal.path
+                    )
                 self._next_event_id = status["next_event_id"]
-                self._events = status["events"]
+                events = list(events_by_id.values())
                 self._rule_stats = status["rule_stats"]
                 self._interval_starts = status.get("interval_starts", {})
                 self._logger.info("Loaded event state from %s.", path)
@@ -2842,7 +3034,7 @@ class EventStatus:
                 raise
 
         # Add new columns and fix broken events
-        for event in self._events:
+        for event in events:
             event.setdefault("ipaddress", "")
             event.setdefault("host", HostName(""))
             event.setdefault("application", "")
@@ -2853,6 +3045,14 @@ class EventStatus:
                 event["host_in_downtime"] = False
 
         # core_host is needed to initialize the status
+        self._set_events(events)
+
+    def _set_events(self, events: Iterable[Event]) -> None:
+        self._events = {}
+        self._events_by_rule = {}
+        self._events_by_host = {}
+        for event in events:
+            self._add_to_indexes(event)
         self._initialize_event_limit_status()
 
     def _initialize_event_limit_status(self) -> None:
@@ -2865,7 +3065,7 @@ class EventStatus:
 
         self.num_existing_events_by_host: dict[tuple[str, HostName | None], int] = {}
         self.num_existing_events_by_rule: dict[Any, int] = {}
-        for event in self._events:
+        for event in self._events.values():
             self._count_event_add(event)
 
     def _count_event_add(self, event: Event) -> None:
@@ -2883,60 +3083,78 @@ class EventStatus:
     def _count_event_remove(self, event: Event) -> None:
         host_key = (event["host"], event["core_host"])
 
-        self.num_existing_events -= 1
         self.num_existing_events_by_host[host_key] -= 1
         self.num_existing_events_by_rule[event["rule_id"]] -= 1
 
+    def _add_to_indexes(self, event: Event) -> None:
+        self._events[event["id"]] = event
+        self._events_by_rule.setdefault(event["rule_id"], {})[event["id"]] = event
+        self._events_by_host.setdefault((event["host"], event["core_host"]), {})[
+            event["id"]
+        ] = event
+
+    def _remove_from_indexes(self, event: Event) -> None:
+        del self._events[event["id"]]
+
+        events_of_rule = self._events_by_rule[event["rule_id"]]
+        del events_of_rule[event["id"]]
+        if not events_of_rule:
+            del self._events_by_rule[event["rule_id"]]
+
+        self._remove_from_host_index(event, (event["host"], event["core_host"]))
+
+    def _remove_from_host_index(
+        self, event: Event, host_key: tuple[HostName, HostName | None]
+    ) -> None:
+        events_of_host = self._events_by_host[host_key]
+        del events_of_host[event["id"]]
+        if not events_of_host:
+            del self._events_by_host[host_key]
+
     def new_event(self, event: Event) -> None:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
         self._next_event_id += 1
-        self._events.append(event)
+        self._add_to_indexes(event)
         self.num_existing_events += 1
         self._count_event_add(event)
         self._history.add(event, "NEW")
 
     def archive_event(self, event: Event) -> None:
         self._perfcounters.count("events")
-        event["id"] = self._next_event_id
-        self._next_event_id += 1
+        with self.lock:
+            event["id"] = self._next_event_id
+            self._next_event_id += 1
         event["phase"] = "closed"
         self._history.add(event, "ARCHIVED")
 
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
-        try:
-            self._events.remove(event)
-            self._history.add(event, delete_reason, user)
-            self._count_event_remove(event)
-        except ValueError:
-            self._logger.exception("Cannot remove event %d: not present", event["id"])
+        if self._events.get(event["id"]) is not event:
+            self._logger.error("Cannot remove event %d: not present", event["id"])
+            return
+        self._remove_from_indexes(event)
+        self.num_existing_events -= 1
+        self._history.add(event, delete_reason, user)
+        self._count_event_remove(event)
 
     # protected by self.lock
     def remove_oldest_event(self, ty: LimitKind, event: Event) -> None:
         if ty == "overall":
             self._logger.log(VERBOSE, "  Removing oldest event")
-            oldest_event = self._events[0]
-            self.remove_event(oldest_event, "AUTODELETE")
+            self._remove_oldest_event_of(self._events)
         elif ty == "by_rule" and event["rule_id"] is not None:
             self._logger.log(VERBOSE, '  Removing oldest event of rule "%s"', event["rule_id"])
-            self._remove_oldest_event_of_rule(event["rule_id"])
+            self._remove_oldest_event_of(self._events_by_rule.get(event["rule_id"], {}))
         elif ty == "by_host" and event["host"] is not None:
             self._logger.log(VERBOSE, '  Removing oldest event of host "%s"', event["host"])
-            self._remove_oldest_event_of_host(event["host"])
-
-    # protected by self.lock
-    def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+            self._remove_oldest_event_of(
+                self._events_by_host.get((event["host"], event["core_host"]), {})
+            )
 
     # protected by self.lock
-    def _remove_oldest_event_of_host(self, hostname: str) -> None:
-        for event in self._events:
-            if event["host"] == hostname:
-                self.remove_event(event, "AUTODELETE")
-                return
+    def _remove_oldest_event_of(self, events: Mapping[int, Event]) -> None:
+        if oldest_event := next(iter(events.values()), None):
+            self.remove_event(oldest_event, "AUTODELETE")
 
     # protected by self.lock
     def get_num_existing_events_by(self, ty: LimitKind, event: Event) -> int:
@@ -2962,10 +3180,8 @@ class EventStatus:
         """
         with self.lock:
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            for event in self.events_of_rule(rule["id"]):
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -3122,12 +3338,14 @@ class EventStatus:
             self._rule_stats.setdefault(rule_id, 0)
             self._rule_stats[rule_id] += 1
 
+    # protected by self.lock
     def count_event_up(self, found: Event, event: Event) -> None:
         """
         Update event with new information from new occurrence,
         but preserve certain attributes from the original (first)
         event.
         """
+        host_key = (found["host"], found["core_host"])
         preserve: Event = {
             "count": found.get("count", 1) + 1,
             "first": found["first"],
@@ -3142,11 +3360,23 @@ class EventStatus:
         found.update(event)
         found.update(preserve)
 
+        # The new occurrence may come from another host (if the rule does not count
+        # separately per host), so the event has to move to the new host.
+        new_host_key = (found["host"], found["core_host"])
+        if new_host_key != host_key and self._events.get(found["id"]) is found:
+            self._remove_from_host_index(found, host_key)
+            self._events_by_host.setdefault(new_host_key, {})[found["id"]] = found
+            self.num_existing_events_by_host[host_key] -= 1
+            self.num_existing_events_by_host[new_host_key] = (
+                self.num_existing_events_by_host.get(new_host_key, 0) + 1
+            )
+
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
-                self.count_event_up(ev, event)
-                return
+        with self.lock:
+            for ev in self.events_of_rule(event["rule_id"]):
+                if ev["phase"] == "counting":
+                    self.count_event_up(ev, event)
+                    return
 
         # None found, create one
         event["count"] = 1
@@ -3154,7 +3384,7 @@ class EventStatus:
         event_server.new_event_respecting_limits(event)
 
     def count_event(
-        self, event_server: EventServer, event: Event, rule: str, count: Count
+        self, event_server: EventServer, event: Event, rule: Rule, count: Count
     ) -> Event | None:
         """
         Find previous occurrence of this event and account for
@@ -3163,8 +3393,11 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
+        # The lock protects the counters of the events of other rules, which may be processed
+        # in parallel. The events of this rule are only touched by one thread at a time.
+        found: Event | None = None
+        with self.lock:
+            for ev in self.events_of_rule(event["rule_id"]):
                 if ev["phase"] == "ack" and not count["count_ack"]:
                     continue  # skip acknowledged events
 
@@ -3188,7 +3421,8 @@ class EventStatus:
                 found = ev
                 self.count_event_up(found, event)
                 break
-        else:
+
+        if found is None:
             event["count"] = 1
             event["phase"] = "counting"
             event_server.new_event_respecting_limits(event)
@@ -3201,7 +3435,7 @@ class EventStatus:
         return None  # do not do event action
 
     def delete_events_by(self, predicate: Callable[[Event], bool], user: str) -> None:
-        for event in self._events[:]:
+        for event in self.events():
             if predicate(event):
                 event["phase"] = "closed"
                 if user:
@@ -3209,7 +3443,7 @@ class EventStatus:
                 self.remove_event(event, "DELETE", user)
 
     def get_events(self) -> list[Any]:
-        return self._events
+        return self.events()
 
     def get_rule_stats(self) -> Iterable[Any]:
         return sorted(self._rule_stats.items(), key=lambda x: x[0])
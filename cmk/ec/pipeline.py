@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Processing of the incoming messages in a pool of threads
+
+Without a pipeline, the event server processes every message before it reads the next
+one from its sockets. During a burst of messages the socket buffers overflow and the
+kernel silently drops messages.
+
+With a pipeline, the event server only puts the messages into a bounded queue. A pool of
+worker threads takes them from there and processes them in two steps:
+
+ * classify: create the event and find the rule it matches. This can happen in any order.
+ * apply: everything which changes the event status, e.g. counting or cancelling events.
+   This happens in the order the messages have been received for all messages with the
+   same ordering key (the ID of the matched rule), but concurrently for different keys.
+"""
+
+from __future__ import annotations
+
+import bisect
+import queue
+import threading
+from collections.abc import Callable, Hashable
+from functools import partial
+from logging import Logger
+from typing import Final
+
+# Classifies a message, returns the ordering key and the function for applying the result
+Task = Callable[[], tuple[Hashable, Callable[[], None]]]
+
+
+class EventPipeline:
+    def __init__(self, logger: Logger, num_threads: int, max_queued_messages: int) -> None:
+        self._logger: Final = logger
+        self._queue: queue.Queue[tuple[int, Task] | None] = queue.Queue(max_queued_messages)
+        self._threads: Final = [
+            threading.Thread(target=self._work, name=f"EventWorker-{num}", daemon=True)
+            for num in range(num_threads)
+        ]
+        self._next_number = 0
+        self._condition: Final = threading.Condition()
+        # All messages with a lower number than this one have been classified
+        self._classified_below = 0
+        self._classified_above: set[int] = set()
+        # The numbers of the classified messages which still need to be applied, per key
+        self._unapplied: dict[Hashable, list[int]] = {}
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Process the messages which are still queued and terminate the threads"""
+        for _thread in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def queue_length(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, task: Task, *, block: bool = True) -> bool:
+        """Queue a message, returns False if it has been dropped because the queue is full
+
+        Messages must always be submitted by the same thread.
+        """
+        try:
+            self._queue.put((self._next_number, task), block=block)
+        except queue.Full:
+            return False
+        self._next_number += 1
+        return True
+
+    def _work(self) -> None:
+        while (item := self._queue.get()) is not None:
+            number, task = item
+            try:
+                key, apply = task()
+            except Exception:
+                self._logger.exception("Exception handling a message (skipping this one)")
+                with self._condition:
+                    self._classified(number)
+                continue
+
+            with self._condition:
+                self._classified(number)
+                bisect.insort(self._unapplied.setdefault(key, []), number)
+                self._condition.wait_for(partial(self._may_apply, number, key))
+            try:
+                apply()
+            except Exception:
+                self._logger.exception("Exception handling a message (skipping this one)")
+            finally:
+                self._applied(key)
+
+    # protected by self._condition
+    def _classified(self, number: int) -> None:
+        self._classified_above.add(number)
+        while self._classified_below in self._classified_above:
+            self._classified_above.remove(self._classified_below)
+            self._classified_below += 1
+        self._condition.notify_all()
+
+    # protected by self._condition
+    def _may_apply(self, number: int, key: Hashable) -> bool:
+        # We only know that no earlier message has the same key when all of them are classified
+        return self._classified_below > number and self._unapplied[key][0] == number
+
+    def _applied(self, key: Hashable) -> None:
+        with self._condition:
+            unapplied = self._unapplied[key]
+            del unapplied[0]
+            if not unapplied:
+                del self._unapplied[key]
+            self._condition.notify_all()
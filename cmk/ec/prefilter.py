@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Skip rules whose text pattern can't match a message, without evaluating the pattern
+
+Most text patterns of rules contain a literal string which has to occur in every message
+they match, e.g. "link (up|down)" can only match messages containing "link ". We collect
+these strings of all rules in one automaton (Aho-Corasick), which finds all of them with
+one pass over the message text. Only the rules whose strings have been found (plus the
+rules we know nothing about) need to be tried.
+
+The matching is case insensitive, so the strings and the message texts are normalized.
+Only ASCII strings are used, the few non-ASCII characters matching ASCII letters in case
+insensitive regexes are translated.
+"""
+
+from __future__ import annotations
+
+import re._constants as sre_constants  # type: ignore[import]
+import re._parser as sre_parse  # type: ignore[import]
+from collections import deque
+from collections.abc import Iterable, Sequence
+from typing import Any, Final
+
+from .config import Rule, TextPattern
+
+# See https://docs.python.org/3/library/re.html#re.IGNORECASE
+_TRANSLATE_CASE_EQUIVALENTS: Final = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})
+
+_REPEATS: Final = {
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    sre_constants.POSSESSIVE_REPEAT,
+}
+
+
+def normalize_text(text: str) -> str:
+    return text.translate(_TRANSLATE_CASE_EQUIVALENTS).lower()
+
+
+def required_literals(pattern: TextPattern) -> frozenset[str] | None:
+    """Return strings of which at least one occurs in every text matching the pattern
+
+    None means that we don't know such strings.
+
+    >>> import re
+    >>> sorted(required_literals(re.compile("link (up|DOWN)", re.IGNORECASE)))
+    ['link ']
+    >>> sorted(required_literals(re.compile("[0-9]+ (errors?|warnings?)", re.IGNORECASE)))
+    ['error', 'warning']
+    >>> required_literals(re.compile("^[0-9]+$", re.IGNORECASE)) is None
+    True
+    >>> sorted(required_literals("disk full"))
+    ['disk full']
+    """
+    if isinstance(pattern, str):
+        literals = frozenset({normalize_text(pattern)})
+    else:
+        try:
+            literals_or_none = _required_literals_of(
+                sre_parse.parse(pattern.pattern, pattern.flags)
+            )
+        except Exception:
+            return None  # Be careful, we are using internals of the re module here
+        if literals_or_none is None:
+            return None
+        literals = literals_or_none
+    if not all(literal and literal.isascii() for literal in literals):
+        return None
+    return literals
+
+
+def _required_literals_of(items: Iterable[tuple[Any, Any]]) -> frozenset[str] | None:
+    """Find the most selective required strings of a sequence of regex items"""
+    candidates: list[frozenset[str]] = []
+    run: list[str] = []
+    for op, av in items:
+        if op is sre_constants.LITERAL and (char := chr(av)).isascii():
+            run.append(normalize_text(char))
+            continue
+
+        if run:
+            candidates.append(frozenset({"".join(run)}))
+            run = []
+
+        if op is sre_constants.SUBPATTERN:
+            sub_literals = _required_literals_of(av[-1])
+        elif op is sre_constants.ATOMIC_GROUP:
+            # Unlike a (capturing) group, an atomic group is just its sub pattern
+            sub_literals = _required_literals_of(av)
+        elif op in _REPEATS and av[0] >= 1:
+            sub_literals = _required_literals_of(av[2])
+        elif op is sre_constants.BRANCH:
+            sub_literals = _required_literals_of_branches(av[1])
+        else:
+            sub_literals = None
+        if sub_literals is not None:
+            candidates.append(sub_literals)
+
+    if run:
+        candidates.append(frozenset({"".join(run)}))
+
+    if not candidates:
+        return None
+    return max(
+        candidates,
+        key=lambda literals: (min(len(literal) for literal in literals), -len(literals)),
+    )
+
+
+def _required_literals_of_branches(
+    branches: Iterable[Iterable[tuple[Any, Any]]]
+) -> frozenset[str] | None:
+    """Every alternative needs to have required strings"""
+    literals: frozenset[str] = frozenset()
+    for branch in branches:
+        if (branch_literals := _required_literals_of(branch)) is None:
+            return None
+        literals |= branch_literals
+    return literals
+
+
+def _required_literals_of_rule(rule: Rule) -> frozenset[str] | None:
+    if rule.get("disabled") or rule.get("invert_matching") or "match" not in rule:
+        return None
+    # A rule can match the text via its normal or its cancelling pattern
+    literals: set[str] = set()
+    for pattern in [rule["match"]] + ([rule["match_ok"]] if "match_ok" in rule else []):
+        if (pattern_literals := required_literals(pattern)) is None:
+            return None
+        literals |= pattern_literals
+    return frozenset(literals)
+
+
+class RulePrefilter:
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        literal_numbers: dict[str, int] = {}
+        self._rules_of_literal: list[set[str]] = []
+        self._filtered_rules: set[str] = set()
+        for rule in rules:
+            if (literals := _required_literals_of_rule(rule)) is None:
+                continue
+            self._filtered_rules.add(rule["id"])
+            for literal in literals:
+                if (number := literal_numbers.get(literal)) is None:
+                    number = literal_numbers[literal] = len(self._rules_of_literal)
+                    self._rules_of_literal.append(set())
+                self._rules_of_literal[number].add(rule["id"])
+        self._automaton: Final = _Automaton(list(literal_numbers))
+
+    @property
+    def num_filtered_rules(self) -> int:
+        return len(self._filtered_rules)
+
+    def possible_rules(self, text: str) -> set[str]:
+        """The IDs of the filtered rules whose required strings occur in the text"""
+        possible: set[str] = set()
+        for number in self._automaton.find(normalize_text(text)):
+            possible |= self._rules_of_literal[number]
+        return possible
+
+    def filters(self, rule: Rule) -> bool:
+        """Whether we know strings required for the rule to match"""
+        return rule["id"] in self._filtered_rules
+
+
+class _Automaton:
+    """Aho-Corasick automaton for finding all of the given keywords in one pass"""
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        outputs: list[set[int]] = [set()]
+        for number, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                if (next_state := self._goto[state].get(char)) is None:
+                    next_state = self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(number)
+
+        # Breadth first, so the failure states of all shorter prefixes are already known
+        todo = deque(self._goto[0].values())
+        while todo:
+            state = todo.popleft()
+            for char, next_state in self._goto[state].items():
+                todo.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+        self._output: Final = [frozenset(output) for output in outputs]
+
+    def find(self, text: str) -> set[int]:
+        goto, fail, output = self._goto, self._fail, self._output
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
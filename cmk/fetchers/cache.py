@@ -4,9 +4,12 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import logging
-from collections.abc import Callable
+import marshal
+import pickle
+import struct
+from collections.abc import Callable, Iterator, Sequence
 from pathlib import Path
-from typing import Final, Generic, TypeVar
+from typing import Any, cast, Final, Generic, overload, TypeVar
 
 import cmk.utils.store as _store
 from cmk.utils.sectionname import MutableSectionMap, SectionMap, SectionName
@@ -15,6 +18,77 @@ __all__ = ["SectionStore"]
 
 _T = TypeVar("_T")
 
+# The persisted sections are stored in a binary format:
+#
+#   header | index | content of the 1st section | content of the 2nd section | ...
+#
+# The header consists of the magic, the version of the format and the length of the index.
+# The index is a marshalled list of (name, created at, valid until, codec, length) of the
+# sections. The content of each section is encoded on its own, so that only the content of
+# the sections actually used needs to be decoded.
+_MAGIC: Final = b"CMKSEC"
+_VERSION: Final = 1
+_HEADER: Final = struct.Struct("!6sBI")
+
+_CODEC_MARSHAL: Final = 0
+_CODEC_PICKLE: Final = 1
+
+
+def _encode(content: Any) -> tuple[int, bytes]:
+    try:
+        return _CODEC_MARSHAL, marshal.dumps(content)
+    except ValueError:
+        # Contains types not supported by marshal
+        return _CODEC_PICKLE, pickle.dumps(content)
+
+
+class _LazySection(Sequence):
+    """The content of a persisted section, which is decoded on first access"""
+
+    __slots__ = ("_codec", "_raw", "_content")
+
+    def __init__(self, codec: int, raw: bytes | memoryview) -> None:
+        self._codec: Final = codec
+        self._raw: Final = raw
+        self._content: Sequence | None = None
+
+    @property
+    def encoded(self) -> tuple[int, bytes | memoryview]:
+        return self._codec, self._raw
+
+    @property
+    def content(self) -> Sequence:
+        if self._content is None:
+            self._content = (
+                marshal.loads(self._raw)
+                if self._codec == _CODEC_MARSHAL
+                else pickle.loads(self._raw)  # nosec B301 # BNS:c3c5e9
+            )
+        return self._content
+
+    @overload
+    def __getitem__(self, index: int) -> Any:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence:
+        ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        return self.content[index]
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.content)
+
+    def __eq__(self, other: object) -> bool:
+        return self.content == (other.content if isinstance(other, _LazySection) else other)
+
+    def __repr__(self) -> str:
+        return repr(self.content)
+
 
 class SectionStore(Generic[_T]):
     def __init__(
@@ -37,15 +111,52 @@ class SectionStore(Generic[_T]):
             return
 
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        _store.save_object_to_pickle_file(
-            self.path,
-            {str(k): v for k, v in sections.items()},
-        )
+        _store.save_bytes_to_file(self.path, self._serialize(sections))
         self._logger.debug("Stored persisted sections: %s", ", ".join(str(s) for s in sections))
 
     def load(self) -> MutableSectionMap[tuple[int, int, _T]]:
-        raw_sections_data = _store.load_object_from_pickle_file(self.path, default={})
-        return {SectionName(k): v for k, v in raw_sections_data.items()}
+        """Load the persisted sections
+
+        The content of the sections is only decoded when it is accessed."""
+        raw = _store.load_bytes_from_file(self.path)
+        if not raw:
+            return {}
+
+        if not raw.startswith(_MAGIC):
+            # Pickled by previous versions. Converted with the next update of the sections.
+            raw_sections_data = pickle.loads(raw)  # nosec B301 # BNS:c3c5e9
+            return {SectionName(k): v for k, v in raw_sections_data.items() if len(v) == 3}
+
+        _magic, version, index_length = _HEADER.unpack_from(raw)
+        if version != _VERSION:
+            self._logger.debug("Ignoring persisted sections of unknown version %d", version)
+            return {}
+
+        view = memoryview(raw)
+        offset = _HEADER.size + index_length
+        sections: MutableSectionMap[tuple[int, int, _T]] = {}
+        for name, created_at, valid_until, codec, length in marshal.loads(
+            view[_HEADER.size : offset]
+        ):
+            sections[SectionName(name)] = (
+                created_at,
+                valid_until,
+                cast(_T, _LazySection(codec, view[offset : offset + length])),
+            )
+            offset += length
+        return sections
+
+    @staticmethod
+    def _serialize(sections: SectionMap[tuple[int, int, _T]]) -> bytes:
+        index = []
+        contents = []
+        for name, (created_at, valid_until, content) in sections.items():
+            # Sections which have not been accessed are written back without decoding them
+            codec, raw = content.encoded if isinstance(content, _LazySection) else _encode(content)
+            index.append((str(name), created_at, valid_until, codec, len(raw)))
+            contents.append(raw)
+        raw_index = marshal.dumps(index)
+        return b"".join((_HEADER.pack(_MAGIC, _VERSION, len(raw_index)), raw_index, *contents))
 
     def update(
         self,
@@ -4,10 +4,13 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 """Abstract classes and types."""
 
+import bisect
 import logging
-from collections.abc import Sequence
+import mmap
+import os
+from collections.abc import Iterable, Sequence
 from pathlib import Path
-from typing import Final
+from typing import Final, NamedTuple
 
 import cmk.utils.agent_simulator as agent_simulator
 import cmk.utils.paths
@@ -15,6 +18,7 @@ from cmk.utils.agentdatatype import AgentRawData
 from cmk.utils.exceptions import MKGeneralException, MKSNMPError
 from cmk.utils.log import console
 from cmk.utils.sectionname import SectionName
+from cmk.utils.store import ObjectStore, PickleSerializer
 
 from cmk.snmplib import OID, SNMPBackend, SNMPContextName, SNMPHostConfig, SNMPRawValue, SNMPRowInfo
 
@@ -23,6 +27,92 @@ from ._utils import strip_snmp_value
 __all__ = ["StoredWalkSNMPBackend"]
 
 
+class _WalkIndex(NamedTuple):
+    """Sorted OIDs of a stored walk and the byte ranges of their records
+
+    The index is persisted next to the walk it describes and is only valid
+    as long as the walk file has not been modified.
+    """
+
+    mtime_ns: int
+    size: int
+    oids: Sequence[tuple[int, ...]]
+    starts: Sequence[int]
+    ends: Sequence[int]
+
+    @staticmethod
+    def path_for(walk_path: Path) -> Path:
+        return walk_path.with_name(f".{walk_path.name}.idx")
+
+    def is_valid_for(self, stat: os.stat_result) -> bool:
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+    def lookup(self, prefix: tuple[int, ...]) -> tuple[int, int]:
+        """Return the range of all OIDs that are equal to or below `prefix`"""
+        begin = bisect.bisect_left(self.oids, prefix)
+        if not prefix:
+            return begin, len(self.oids)
+        # Every OID below `prefix` sorts before its next sibling.
+        return begin, bisect.bisect_left(self.oids, (*prefix[:-1], prefix[-1] + 1), lo=begin)
+
+    @classmethod
+    def load_or_create(
+        cls, walk_path: Path, stat: os.stat_result, logger: logging.Logger
+    ) -> "_WalkIndex":
+        store = ObjectStore(
+            cls.path_for(walk_path), serializer=PickleSerializer[_WalkIndex | None]()
+        )
+        try:
+            index = store.read_obj(default=None)
+        except Exception as e:
+            logger.debug("Ignoring unreadable index %s: %s", store.path, e)
+            index = None
+        if isinstance(index, _WalkIndex) and index.is_valid_for(stat):
+            return index
+
+        index = _WalkIndex.parse(walk_path)
+        try:
+            store.write_obj(index)
+        except MKGeneralException as e:
+            # We can do without a persisted index (e.g. read only walk directories).
+            logger.debug("Cannot write index %s: %s", store.path, e)
+        return index
+
+    @classmethod
+    def parse(cls, walk_path: Path) -> "_WalkIndex":
+        console.vverbose(f"  Indexing {walk_path}\n")
+        try:
+            stat = walk_path.stat()
+            with walk_path.open("rb") as f:
+                entries = cls._parse_entries(f)
+        except OSError:
+            raise MKSNMPError("No snmpwalk file %s" % walk_path)
+
+        # Walks are usually written in order. Anyway, do not rely on that.
+        entries.sort(key=lambda e: e[0])
+        return _WalkIndex(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            oids=[e[0] for e in entries],
+            starts=[e[1] for e in entries],
+            ends=[e[2] for e in entries],
+        )
+
+    @staticmethod
+    def _parse_entries(lines: Iterable[bytes]) -> list[tuple[tuple[int, ...], int, int]]:
+        oids = []
+        starts = []
+        offset = 0
+        for line in lines:
+            # Sometimes there are newlines in the data of snmpwalks.
+            # They belong to the record of the last OID.
+            if line.startswith(b"."):
+                oids.append(StoredWalkSNMPBackend._to_bin_string(line.split(None, 1)[0].decode()))
+                starts.append(offset)
+            offset += len(line)
+        return list(zip(oids, starts, [*starts[1:], offset]))
+
+
 class StoredWalkSNMPBackend(SNMPBackend):
     def __init__(
         self, snmp_config: SNMPHostConfig, logger: logging.Logger, path: Path | None = None
@@ -33,6 +123,7 @@ class StoredWalkSNMPBackend(SNMPBackend):
         )
         if not self.path.exists():
             raise MKSNMPError(f"No snmpwalk file {self.path}")
+        self._index: _WalkIndex | None = None
 
     def get(self, oid: OID, context_name: SNMPContextName | None = None) -> SNMPRawValue | None:
         walk = self.walk(oid)
@@ -62,35 +153,52 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         console.vverbose(f"  Loading {oid}")
-        lines = self.read_walk_data()
-
-        begin = 0
-        end = len(lines)
-        hit = None
-        while end - begin > 0:
-            current = (begin + end) // 2
-            parts = lines[current].split(None, 1)
-            comp = parts[0]
-            hit = StoredWalkSNMPBackend._compare_oids(oid_prefix, comp)
-            if hit == 0:
-                break
-            if hit == 1:  # we are too low
-                begin = current + 1
-            else:
-                end = current
-
-        if hit != 0:
-            return []  # not found
-
-        rowinfo = StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current, -1)
-        rowinfo.reverse()
-        rowinfo += StoredWalkSNMPBackend._collect_until(oid, oid_prefix, lines, current + 1, 1)
+        index = self._load_index()
+        prefix = StoredWalkSNMPBackend._to_bin_string(oid_prefix)
+        begin, end = index.lookup(prefix)
+        if dot_star and begin < end and index.oids[begin] == prefix:
+            begin += 1  # the OID itself is not part of its ".*" subtree
 
+        rowinfo = self._read_rows(index, begin, end)
         if dot_star:
-            return [rowinfo[0]]
+            return rowinfo[:1]
 
         return rowinfo
 
+    def _load_index(self) -> _WalkIndex:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            raise MKSNMPError("No snmpwalk file %s" % self.path)
+
+        if self._index is None or not self._index.is_valid_for(stat):
+            self._index = _WalkIndex.load_or_create(self.path, stat, self._logger)
+        return self._index
+
+    def _read_rows(self, index: _WalkIndex, begin: int, end: int) -> SNMPRowInfo:
+        if begin >= end:
+            return []
+        try:
+            with self.path.open("rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                records = [
+                    mapped[start:stop]
+                    for start, stop in zip(index.starts[begin:end], index.ends[begin:end])
+                ]
+        except (OSError, ValueError):
+            raise MKSNMPError("No snmpwalk file %s" % self.path)
+
+        rows = []
+        for record in records:
+            parts = record.split(None, 1)
+            if len(parts) > 1:
+                value = agent_simulator.process(AgentRawData(parts[1])).decode()
+            else:
+                value = ""
+            rows.append((parts[0].decode(), strip_snmp_value(value)))
+        return rows
+
     @staticmethod
     def read_walk_from_path(path: Path) -> Sequence[str]:
         console.vverbose(f"  Opening {path}\n")
@@ -127,38 +235,3 @@ class StoredWalkSNMPBackend(SNMPBackend):
             return tuple(map(int, oid.strip(".").split(".")))
         except Exception:
             raise MKGeneralException("Invalid OID %s" % oid)
-
-    @staticmethod
-    def _collect_until(
-        oid: OID, oid_prefix: OID, lines: Sequence[str], index: int, direction: int
-    ) -> SNMPRowInfo:
-        rows = []
-        # Handle case, where we run after the end of the lines list
-        if index >= len(lines):
-            if direction > 0:
-                return []
-            index -= 1
-        while True:
-            line = lines[index]
-            parts = line.split(None, 1)
-            o = parts[0]
-            if o.startswith("."):
-                o = o[1:]
-            if o == oid or o.startswith(oid_prefix + "."):
-                if len(parts) > 1:
-                    # FIXME: This encoding ping-pong is horrible...
-                    value = agent_simulator.process(
-                        AgentRawData(
-                            parts[1].encode(),
-                        ),
-                    ).decode()
-                else:
-                    value = ""
-                # Fix for missing starting oids
-                rows.append(("." + o, strip_snmp_value(value)))
-                index += direction
-                if index < 0 or index >= len(lines):
-                    break
-            else:
-                break
-        return rows
@@ -26,8 +26,10 @@ import cmk.utils.store as store
 from cmk.utils.exceptions import MKException, MKGeneralException
 from cmk.utils.hostaddress import HostName
 from cmk.utils.structured_data import (
+    ArchivedTreeLoader,
     ImmutableDeltaTree,
     ImmutableTree,
+    list_archived_tree_files,
     load_tree,
     parse_visible_raw_path,
     SDFilterChoice,
@@ -304,7 +306,12 @@ def _get_history(
     except FilterInventoryHistoryPathsError:
         return [], []
 
-    cached_tree_loader = _CachedTreeLoader()
+    try:
+        cached_tree_loader = _CachedTreeLoader(
+            ArchivedTreeLoader(Path(cmk.utils.paths.inventory_archive_dir, hostname))
+        )
+    except FileNotFoundError:
+        return [], []
     corrupted_history_files: set[Path] = set()
     history: list[HistoryEntry] = []
     filters = (
@@ -352,10 +359,10 @@ def _get_inventory_history_paths(hostname: HostName) -> Sequence[InventoryHistor
     try:
         archived_tree_paths = [
             InventoryHistoryPath(
-                path=filepath,
-                timestamp=int(filepath.name),
+                path=archived_tree_file.path,
+                timestamp=archived_tree_file.timestamp,
             )
-            for filepath in sorted(inventory_archive_dir.iterdir())
+            for archived_tree_file in list_archived_tree_files(inventory_archive_dir)
         ]
     except FileNotFoundError:
         return []
@@ -388,6 +395,8 @@ def _get_pairs(
 
 @dataclass(frozen=True)
 class _CachedTreeLoader:
+    # Materializes the archived trees, which may be stored as deltas
+    _archived_tree_loader: ArchivedTreeLoader
     _lookup: dict[Path, ImmutableTree] = field(default_factory=dict)
 
     def get_tree(self, filepath: Path) -> ImmutableTree:
@@ -401,8 +410,12 @@ class _CachedTreeLoader:
 
     def _load_tree_from_file(self, filepath: Path) -> ImmutableTree:
         try:
-            tree = load_tree(filepath)
-        except FileNotFoundError:
+            tree = (
+                self._archived_tree_loader.load(filepath)
+                if filepath.parent == self._archived_tree_loader.archive_host_dir
+                else load_tree(filepath)
+            )
+        except (FileNotFoundError, ValueError):
             raise LoadStructuredDataError()
 
         if not tree:
@@ -769,10 +782,8 @@ class InventoryHousekeeping:
         except OSError:
             pass
 
-        for filename in [
-            x for x in (self._inventory_archive_path / hostname).iterdir() if not x.is_dir()
-        ]:
-            timestamps.add(filename.name)
+        for archived_tree_file in list_archived_tree_files(self._inventory_archive_path / hostname):
+            timestamps.add(str(archived_tree_file.timestamp))
         return timestamps
 
 
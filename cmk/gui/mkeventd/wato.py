@@ -224,6 +224,7 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleRemoteStatus)
     config_var_registry.register(ConfigVariableEventConsoleReplication)
     config_var_registry.register(ConfigVariableEventConsoleRetentionInterval)
+    config_var_registry.register(ConfigVariableEventConsoleRetentionJournal)
     config_var_registry.register(ConfigVariableEventConsoleHousekeepingInterval)
     config_var_registry.register(ConfigVariableEventConsoleStatisticsInterval)
     config_var_registry.register(ConfigVariableEventConsoleLogMessages)
@@ -236,6 +237,7 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleHistoryLifetime)
     config_var_registry.register(ConfigVariableEventConsoleSocketQueueLength)
     config_var_registry.register(ConfigVariableEventConsoleEventSocketQueueLength)
+    config_var_registry.register(ConfigVariableEventConsoleProcessingPipeline)
     config_var_registry.register(ConfigVariableEventConsoleTranslateSNMPTraps)
     config_var_registry.register(ConfigVariableEventConsoleSNMPCredentials)
     config_var_registry.register(ConfigVariableEventConsoleDebugRules)
@@ -3949,6 +3951,30 @@ class ConfigVariableEventConsoleRetentionInterval(ConfigVariable):
         )
 
 
+class ConfigVariableEventConsoleRetentionJournal(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "retention_journal"
+
+    def valuespec(self) -> ValueSpec:
+        return Checkbox(
+            title=_("State retention journal"),
+            label=_("only save changed events in the state retention interval"),
+            help=_(
+                "Normally the event daemon writes its complete state to disk in every "
+                "state retention interval. With many open events this may take a while. "
+                "If you enable this option, only the new, changed and deleted events are "
+                "appended to a journal file. The complete state is only written once the "
+                "journal has grown larger than the complete state."
+            ),
+        )
+
+
 class ConfigVariableEventConsoleHousekeepingInterval(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupEventConsoleGeneric
@@ -4441,6 +4467,59 @@ class ConfigVariableEventConsoleEventSocketQueueLength(ConfigVariable):
         )
 
 
+class ConfigVariableEventConsoleProcessingPipeline(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainEventConsole
+
+    def ident(self) -> str:
+        return "processing_pipeline"
+
+    def valuespec(self) -> ValueSpec:
+        return Optional(
+            valuespec=Dictionary(
+                elements=[
+                    (
+                        "threads",
+                        Integer(
+                            title=_("Number of processing threads"),
+                            minvalue=1,
+                            default_value=4,
+                            unit=_("threads"),
+                        ),
+                    ),
+                    (
+                        "max_queued_messages",
+                        Integer(
+                            title=_("Max. number of queued messages"),
+                            help=_(
+                                "Messages received via UDP syslog or as SNMP traps are dropped "
+                                "when the queue is full. Messages from other sources wait "
+                                "until there is space in the queue again."
+                            ),
+                            minvalue=1,
+                            default_value=100000,
+                            unit=_("messages"),
+                        ),
+                    ),
+                ],
+                optional_keys=[],
+            ),
+            title=_("Process messages in parallel"),
+            label=_("Process messages in a pool of threads"),
+            help=_(
+                "Normally the Event Console processes each incoming message before it reads "
+                "the next one. During a burst of messages the buffers of the operating system "
+                "may overflow and messages get lost. If you enable this option, the incoming "
+                "messages are put into a queue and processed by a pool of threads. Messages "
+                "which are handled by the same rule are still processed in the order they "
+                "have been received."
+            ),
+        )
+
+
 class ConfigVariableEventConsoleTranslateSNMPTraps(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupEventConsoleSNMP
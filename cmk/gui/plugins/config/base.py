@@ -539,6 +539,7 @@ class CREConfig:
     )
 
     wato_activate_changes_comment_mode: ActivateChangesCommentMode = "disabled"
+    wato_activate_changes_concurrency: int | None = None
 
     # .
     #   .--Login with GET--------------------------------------------------------------------.
@@ -599,4 +600,4 @@ class CREConfig:
     bi_use_legacy_compilation: bool = False
 
     # new in 2.1
-    config_storage_format: Literal["standard", "raw", "pickle"] = "pickle"
+    config_storage_format: Literal["standard", "raw", "pickle", "indexed"] = "pickle"
@@ -2002,6 +2002,38 @@ class ConfigVariableWATOActivateChangesCommentMode(ConfigVariable):
         )
 
 
+@config_variable_registry.register
+class ConfigVariableWATOActivateChangesConcurrency(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupWATO
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainGUI
+
+    def ident(self) -> str:
+        return "wato_activate_changes_concurrency"
+
+    def valuespec(self) -> ValueSpec:
+        return Optional(
+            valuespec=Integer(
+                label=_("Maximum number of sites"),
+                default_value=20,
+                minvalue=1,
+            ),
+            title=_("Concurrent activation of changes on sites"),
+            label=_("Limit the number of sites handled at the same time"),
+            help=_(
+                "The synchronization and activation of the changes is done for all affected "
+                "sites in parallel. Each step of a site, e.g. fetching the state of the remote "
+                "site, transferring the files and activating the changes, is started as soon as "
+                "the previous step has finished, independent of the other sites. By default one "
+                "worker is used per site. In large distributed setups you can limit the number "
+                "of workers to reduce the load on the central site."
+            ),
+            none_label=_("One worker per site"),
+        )
+
+
 @config_variable_registry.register
 class ConfigVariableWATOActivationMethod(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
@@ -2785,6 +2817,62 @@ class ConfigVariableDelayPrecompile(ConfigVariable):
         )
 
 
+@config_variable_registry.register
+class ConfigVariableNagiosConfigWorkers(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "nagios_config_workers"
+
+    def valuespec(self) -> ValueSpec:
+        return Integer(
+            title=_("Parallel creation of the Nagios configuration"),
+            label=_("Number of processes"),
+            help=_(
+                "When activating the configuration with the Nagios core, the object definitions "
+                "of the hosts and their services as well as the precompiled host checks can be "
+                "created by several processes in parallel. This can considerably reduce the "
+                "time needed for the activation of large configurations. Each process needs "
+                "about as much memory as a single activation. With the default of one process "
+                "the configuration is created sequentially. This option has no effect with the "
+                "Checkmk Micro Core."
+            ),
+            minvalue=1,
+            maxvalue=64,
+        )
+
+
+@config_variable_registry.register
+class ConfigVariableIncrementalConfigCreation(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "incremental_config_creation"
+
+    def valuespec(self) -> ValueSpec:
+        return Checkbox(
+            title=_("Incremental creation of the Nagios configuration"),
+            label=_("reuse the configuration of unchanged hosts"),
+            help=_(
+                "If you enable this option, Checkmk computes a fingerprint of the inputs the "
+                "configuration of each host is created from: the global configuration, the host "
+                "definitions of its folder, its attributes, autochecks and discovered host labels. "
+                "During the activation the object definitions and precompiled host checks of all "
+                "hosts with an unchanged fingerprint are taken over from the previous "
+                "configuration. This reduces the time needed to activate changes of a few hosts on "
+                "large sites. Changes of rules and global settings still affect all hosts."
+            ),
+        )
+
+
 @config_variable_registry.register
 class ConfigVariableClusterMaxCachefileAge(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
@@ -28,12 +28,13 @@ import shutil
 import subprocess
 import time
 import traceback
+import uuid
 from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, Sequence
 from dataclasses import asdict, dataclass
 from itertools import filterfalse
 from multiprocessing.pool import AsyncResult, ThreadPool
 from pathlib import Path
-from typing import Any, NamedTuple, TypedDict
+from typing import Any, Final, NamedTuple, TypedDict
 
 from setproctitle import setthreadtitle
 
@@ -132,6 +133,20 @@ STATE_WARNING = "warning"  # e.g. in case of core config warnings
 ACTIVATION_TIME_RESTART = "restart"
 ACTIVATION_TIME_SYNC = "sync"
 ACTIVATION_TIME_PROFILE_SYNC = "profile-sync"
+# The single steps of the sync
+ACTIVATION_TIME_COLLECT_FILE_INFOS = "collect-file-infos"
+ACTIVATION_TIME_FETCH_SYNC_STATE = "fetch-sync-state"
+ACTIVATION_TIME_CALC_SYNC_DELTA = "calc-sync-delta"
+ACTIVATION_TIME_TRANSFER = "transfer"
+
+# Features of the config sync the remote site announces to the central site
+SYNC_CAPABILITY_GZIP = "gzip"  # The sync archive may be compressed
+SYNC_CAPABILITY_CHUNKS = "chunks"  # The sync archive may be uploaded in parts
+_SYNC_CAPABILITIES: Final = [SYNC_CAPABILITY_GZIP, SYNC_CAPABILITY_CHUNKS]
+
+# Larger sync archives are uploaded in parts, so an interrupted upload can be continued
+_SYNC_ARCHIVE_CHUNK_SIZE: Final = 1024 * 1024
+_SYNC_ARCHIVE_UPLOAD_ATTEMPTS: Final = 3
 
 ACTIVATION_TMP_BASE_DIR = str(cmk.utils.paths.tmp_dir / "wato/activation")
 ACTIVATION_PERISTED_DIR = cmk.utils.paths.var_dir + "/wato/activation"
@@ -611,7 +626,7 @@ def _set_sync_state(
 
 def _get_config_sync_state(
     site_id: SiteId, replication_paths: Sequence[ReplicationPath]
-) -> tuple[ConfigSyncFileInfos, int]:
+) -> tuple[ConfigSyncFileInfos, int, Sequence[str]]:
     """Get the config file states from the remote sites
 
     Calls the automation call "get-config-sync-state" on the remote site,
@@ -624,7 +639,9 @@ def _get_config_sync_state(
     )
 
     assert isinstance(response, tuple)
-    return {k: ConfigSyncFileInfo(*v) for k, v in response[0].items()}, response[1]
+    # Older remote sites don't tell us about their capabilities
+    capabilities = response[2] if len(response) > 2 else []
+    return {k: ConfigSyncFileInfo(*v) for k, v in response[0].items()}, response[1], capabilities
 
 
 def _synchronize_files(
@@ -633,36 +650,96 @@ def _synchronize_files(
     files_to_delete: list[str],
     remote_config_generation: int,
     site_config_dir: Path,
+    remote_sync_capabilities: Sequence[str] = (),
 ) -> None:
     """Pack the files in a simple tar archive and send it to the remote site
 
     We build a simple tar archive containing all files to be synchronized.  The list of file to
     be deleted and the current config generation is handed over using dedicated HTTP parameters.
-    """
 
-    sync_archive = _get_sync_archive(files_to_sync, site_config_dir)
+    In case the remote site supports it, the archive is compressed and large archives are uploaded
+    in parts before the sync is triggered.
+    """
+    compress = SYNC_CAPABILITY_GZIP in remote_sync_capabilities
+    sync_archive = _get_sync_archive(files_to_sync, site_config_dir, compress=compress)
 
     site = get_site_config(site_id)
+    request_vars = [
+        ("site_id", site_id),
+        ("to_delete", repr(files_to_delete)),
+        ("config_generation", "%d" % remote_config_generation),
+    ]
+    if compress:
+        request_vars.append(("compression", SYNC_CAPABILITY_GZIP))
+
+    files: dict[str, io.BytesIO] | None = {"sync_archive": io.BytesIO(sync_archive)}
+    if (
+        SYNC_CAPABILITY_CHUNKS in remote_sync_capabilities
+        and len(sync_archive) > _SYNC_ARCHIVE_CHUNK_SIZE
+    ):
+        request_vars.append(("transfer_id", _upload_sync_archive(site, site_id, sync_archive)))
+        files = None
+
     response = cmk.gui.watolib.automations.do_remote_automation(
         site,
         "receive-config-sync",
-        [
-            ("site_id", site_id),
-            ("to_delete", repr(files_to_delete)),
-            ("config_generation", "%d" % remote_config_generation),
-        ],
-        files={"sync_archive": io.BytesIO(sync_archive)},
+        request_vars,
+        files=files,
     )
 
     if response is not True:
         raise MKGeneralException(_("Failed to synchronize with site: %s") % response)
 
 
+def _upload_sync_archive(site: SiteConfiguration, site_id: SiteId, sync_archive: bytes) -> str:
+    """Upload the sync archive in parts and return the ID to refer to it
+
+    The remote site always answers with the number of bytes it has received so far. In case a
+    request fails, e.g. because of a dropped connection, we simply continue from there.
+    """
+    transfer_id = str(uuid.uuid4())
+    offset = 0
+    failed_attempts = 0
+    while offset < len(sync_archive):
+        try:
+            response = cmk.gui.watolib.automations.do_remote_automation(
+                site,
+                "receive-config-sync-chunk",
+                [
+                    ("site_id", site_id),
+                    ("transfer_id", transfer_id),
+                    ("offset", "%d" % offset),
+                ],
+                files={
+                    "chunk": io.BytesIO(sync_archive[offset : offset + _SYNC_ARCHIVE_CHUNK_SIZE])
+                },
+            )
+        except Exception:
+            failed_attempts += 1
+            if failed_attempts >= _SYNC_ARCHIVE_UPLOAD_ATTEMPTS:
+                raise
+            logger.debug("Failed to upload part of the sync archive, retrying", exc_info=True)
+            continue
+
+        if not isinstance(response, int) or response > len(sync_archive):
+            raise MKGeneralException(_("Failed to upload sync archive: %s") % response)
+        if response <= offset:
+            # The remote site lost data we already sent (or did not accept the part)
+            failed_attempts += 1
+            if failed_attempts >= _SYNC_ARCHIVE_UPLOAD_ATTEMPTS:
+                raise MKGeneralException(_("Failed to upload sync archive: No progress"))
+        else:
+            failed_attempts = 0
+        offset = response
+    return transfer_id
+
+
 @dataclass(frozen=True)
 class SyncState:
     central_file_infos: ConfigSyncFileInfos
     remote_file_infos: ConfigSyncFileInfos
     remote_config_generation: int
+    remote_sync_capabilities: Sequence[str] = ()
 
 
 def fetch_sync_state(
@@ -680,16 +757,19 @@ def fetch_sync_state(
         _set_sync_state(site_activation_state, _("Fetching sync state"))
         site_logger.debug(site_activation_state, "Starting config sync")
 
-        remote_file_infos, remote_config_generation = _get_config_sync_state(
+        fetch_start = time.time()
+        remote_file_infos, remote_config_generation, capabilities = _get_config_sync_state(
             site_id, replication_paths
         )
         site_logger.debug("Received %d file infos from remote", len(remote_file_infos))
+        update_activation_time(site_id, ACTIVATION_TIME_FETCH_SYNC_STATE, time.time() - fetch_start)
 
         return (
             SyncState(
                 central_file_infos=central_file_infos,
                 remote_file_infos=remote_file_infos,
                 remote_config_generation=remote_config_generation,
+                remote_sync_capabilities=capabilities,
             ),
             site_activation_state,
             sync_start,
@@ -712,7 +792,9 @@ def calc_sync_delta(
     try:
         _set_sync_state(site_activation_state, _("Computing differences"))
 
+        calc_start = time.time()
         sync_delta = get_file_names_to_sync(site_id, site_logger, sync_state, file_filter_func)
+        update_activation_time(site_id, ACTIVATION_TIME_CALC_SYNC_DELTA, time.time() - calc_start)
 
         site_logger.debug("New files to be synchronized: %r", sync_delta.to_sync_new)
         site_logger.debug("Changed files to be synchronized: %r", sync_delta.to_sync_changed)
@@ -732,6 +814,7 @@ def synchronize_files(
     site_config_dir: Path,
     site_activation_state: SiteActivationState,
     sync_start: float,
+    remote_sync_capabilities: Sequence[str] = (),
 ) -> SiteActivationState | None:
     site_id = site_activation_state["_site_id"]
     site_logger = logger.getChild(f"site[{site_id}]")
@@ -754,13 +837,16 @@ def synchronize_files(
                 len(sync_delta.to_delete),
             ),
         )
+        transfer_start = time.time()
         _synchronize_files(
             site_id,
             sync_delta.to_sync_new + sync_delta.to_sync_changed,
             sync_delta.to_delete,
             remote_config_generation,
             site_config_dir,
+            remote_sync_capabilities,
         )
+        update_activation_time(site_id, ACTIVATION_TIME_TRANSFER, time.time() - transfer_start)
         site_logger.debug("Finished config sync")
         return site_activation_state
     except Exception as e:
@@ -1991,6 +2077,7 @@ class ReplicationPathType(enum.StrEnum):
 
 def _get_config_sync_file_infos_per_inode(
     replication_paths: Sequence[ReplicationPath],
+    hash_cache: ConfigSyncFileHashCache | None = None,
 ) -> Mapping[int, ConfigSyncFileInfo]:
     inode_sync_states = {}
 
@@ -2002,11 +2089,11 @@ def _get_config_sync_file_infos_per_inode(
 
         if replication_path.ty == ReplicationPathType.FILE:
             inode_sync_states[os.stat(replication_path_full).st_ino] = _get_config_sync_file_info(
-                replication_path_full
+                replication_path_full, hash_cache
             )
         elif replication_path.ty == ReplicationPathType.DIR:
             _get_replication_dir_config_sync_file_infos_per_inode(
-                inode_sync_states, replication_path_full, replication_path.excludes
+                inode_sync_states, replication_path_full, replication_path.excludes, hash_cache
             )
         else:
             raise NotImplementedError()
@@ -2018,6 +2105,7 @@ def _get_replication_dir_config_sync_file_infos_per_inode(
     inode_sync_states: MutableMapping[int, ConfigSyncFileInfo],
     replication_path: str,
     replication_path_excludes: Sequence[str],
+    hash_cache: ConfigSyncFileHashCache | None,
 ) -> None:
     # Use os functionality instead of pathlib since it is faster
     for root, dir_names, file_names in os.walk(replication_path):
@@ -2037,7 +2125,9 @@ def _get_replication_dir_config_sync_file_infos_per_inode(
         for file_name in file_names:
             file_path = os.path.join(root, file_name)
             if os.path.exists(file_path):
-                inode_sync_states[os.stat(file_path).st_ino] = _get_config_sync_file_info(file_path)
+                inode_sync_states[os.stat(file_path).st_ino] = _get_config_sync_file_info(
+                    file_path, hash_cache
+                )
 
 
 def _prepare_for_activation_tasks(
@@ -2045,13 +2135,14 @@ def _prepare_for_activation_tasks(
     activation_id: ActivationId,
     site_snapshot_settings: Mapping[SiteId, SnapshotSettings],
     time_started: float,
-) -> tuple[Mapping[SiteId, ConfigSyncFileInfos], Mapping[SiteId, SiteActivationState]]:
+) -> tuple[Mapping[int, ConfigSyncFileInfo], Mapping[SiteId, SiteActivationState]]:
+    hash_cache = ConfigSyncFileHashCache.load()
     config_sync_file_infos_per_inode = _get_config_sync_file_infos_per_inode(
-        get_replication_paths()
+        get_replication_paths(), hash_cache
     )
-    central_file_infos_per_site = {}
+    hash_cache.save()
     site_activation_states_per_site = {}
-    for site_id, snapshot_settings in sorted(site_snapshot_settings.items(), key=lambda e: e[0]):
+    for site_id in sorted(site_snapshot_settings):
         site_activation_state = _initialize_site_activation_state(
             site_id, activation_id, activate_changes, time_started
         )
@@ -2062,17 +2153,36 @@ def _prepare_for_activation_tasks(
 
             log_audit("activate-changes", "Started activation of site %s" % site_id)
             site_activation_states_per_site[site_id] = site_activation_state
-
-            if activate_changes.is_sync_needed(site_id):
-                central_file_infos_per_site[site_id] = _get_site_central_file_infos(
-                    site_id, snapshot_settings, config_sync_file_infos_per_inode
-                )
         except Exception as e:
             _handle_activation_changes_exception(
                 logger.getChild(f"site[{site_id}]"), str(e), site_activation_state
             )
             _cleanup_activation(site_id, activation_id)
-    return central_file_infos_per_site, site_activation_states_per_site
+    return config_sync_file_infos_per_inode, site_activation_states_per_site
+
+
+def collect_central_file_infos(
+    snapshot_settings: SnapshotSettings,
+    config_sync_file_infos_per_inode: Mapping[int, ConfigSyncFileInfo],
+    site_activation_state: SiteActivationState,
+) -> tuple[ConfigSyncFileInfos, SiteActivationState] | None:
+    site_id = site_activation_state["_site_id"]
+    site_logger = logger.getChild(f"site[{site_id}]")
+
+    collect_start = time.time()
+    try:
+        _set_sync_state(site_activation_state, _("Collecting files"))
+        central_file_infos = _get_site_central_file_infos(
+            site_id, snapshot_settings, config_sync_file_infos_per_inode
+        )
+        update_activation_time(
+            site_id, ACTIVATION_TIME_COLLECT_FILE_INFOS, time.time() - collect_start
+        )
+        return central_file_infos, site_activation_state
+    except Exception as e:
+        update_activation_time(site_id, ACTIVATION_TIME_SYNC, time.time() - collect_start)
+        _handle_activation_changes_exception(site_logger, str(e), site_activation_state)
+        return None
 
 
 def _get_site_central_file_infos(
@@ -2098,6 +2208,7 @@ def _get_site_central_file_infos(
 
 
 class ActiveTasks(TypedDict):
+    collect_central_file_infos: MutableMapping[SiteId, AsyncResult]
     fetch_sync_state: MutableMapping[SiteId, AsyncResult]
     calc_sync_delta: MutableMapping[SiteId, AsyncResult]
     synchronize_files: MutableMapping[SiteId, AsyncResult]
@@ -2150,13 +2261,14 @@ def sync_and_activate(
             if _handle_distributed_sites_in_free(site_snapshot_settings, time_started):
                 return
 
-        (site_central_file_infos, site_activation_states) = _prepare_for_activation_tasks(
+        (config_sync_file_infos_per_inode, site_activation_states) = _prepare_for_activation_tasks(
             activate_changes, activation_id, site_snapshot_settings, time_started
         )
 
-        task_pool = ThreadPool(processes=len(site_snapshot_settings))
+        task_pool = ThreadPool(processes=_num_activation_threads(len(site_snapshot_settings)))
 
         active_tasks = ActiveTasks(
+            collect_central_file_infos={},
             fetch_sync_state={},
             calc_sync_delta={},
             synchronize_files={},
@@ -2166,15 +2278,15 @@ def sync_and_activate(
         for site_id, site_activation_state in site_activation_states.items():
             if activate_changes.is_sync_needed(site_id):
                 async_result = task_pool.apply_async(
-                    func=copy_request_context(fetch_sync_state),
+                    func=copy_request_context(collect_central_file_infos),
                     args=(
-                        site_snapshot_settings[site_id].snapshot_components,
+                        site_snapshot_settings[site_id],
+                        config_sync_file_infos_per_inode,
                         site_activation_state,
-                        site_central_file_infos[site_id],
                     ),
                     error_callback=_error_callback,
                 )
-                active_tasks["fetch_sync_state"][site_id] = async_result
+                active_tasks["collect_central_file_infos"][site_id] = async_result
             else:
                 async_result = task_pool.apply_async(
                     func=copy_request_context(activate_remote_changes),
@@ -2183,13 +2295,14 @@ def sync_and_activate(
                 )
                 active_tasks["activate_remote_changes"][site_id] = async_result
 
-        remote_config_generation_per_site: MutableMapping[SiteId, int] = {}
+        sync_state_per_site: MutableMapping[SiteId, SyncState] = {}
         # we want to mostly parallelize the activation steps, but if one site takes longer,
         # it should not hold up the other sites
         # -> monitor active tasks to handle results as soon as one finishes and start a task for
         # the next step
         while (
-            len(active_tasks["fetch_sync_state"]) > 0
+            len(active_tasks["collect_central_file_infos"]) > 0
+            or len(active_tasks["fetch_sync_state"]) > 0
             or len(active_tasks["calc_sync_delta"]) > 0
             or len(active_tasks["synchronize_files"]) > 0
             or len(active_tasks["activate_remote_changes"]) > 0
@@ -2200,7 +2313,7 @@ def sync_and_activate(
                 activate_changes,
                 file_filter_func,
                 prevent_activate,
-                remote_config_generation_per_site,
+                sync_state_per_site,
                 site_snapshot_settings,
                 task_pool,
             )
@@ -2226,20 +2339,41 @@ def _handle_active_tasks(
     activate_changes: ActivateChanges,
     file_filter_func: FileFilterFunc,
     prevent_activate: bool,
-    remote_config_generation_per_site: MutableMapping[SiteId, int],
+    sync_state_per_site: MutableMapping[SiteId, SyncState],
     site_snapshot_settings: Mapping[SiteId, SnapshotSettings],
     task_pool: ThreadPool,
 ) -> None:
+    # The sites are independent of each other, so a slow site must not hold up the next steps of
+    # the other sites
+    for site_id, async_result in list(active_tasks["collect_central_file_infos"].items()):
+        if not async_result.ready():
+            continue
+
+        active_tasks["collect_central_file_infos"].pop(site_id)
+        if (collect_result := async_result.get()) is None:
+            continue  # exception handling happens in thread
+
+        central_file_infos, activation_state = collect_result
+        active_tasks["fetch_sync_state"][site_id] = task_pool.apply_async(
+            func=copy_request_context(fetch_sync_state),
+            args=(
+                site_snapshot_settings[site_id].snapshot_components,
+                activation_state,
+                central_file_infos,
+            ),
+            error_callback=_error_callback,
+        )
+
     for site_id, async_result in list(active_tasks["fetch_sync_state"].items()):
         if not async_result.ready():
-            return
+            continue
 
         active_tasks["fetch_sync_state"].pop(site_id)
         if (fetch_sync_state_results := async_result.get()) is None:
-            return  # exception handling happens in thread
+            continue  # exception handling happens in thread
 
         sync_state, activation_state, sync_start_time = fetch_sync_state_results
-        remote_config_generation_per_site[site_id] = sync_state.remote_config_generation
+        sync_state_per_site[site_id] = sync_state
 
         active_tasks["calc_sync_delta"][site_id] = task_pool.apply_async(
             func=copy_request_context(calc_sync_delta),
@@ -2249,32 +2383,33 @@ def _handle_active_tasks(
 
     for site_id, async_result in list(active_tasks["calc_sync_delta"].items()):
         if not async_result.ready():
-            return
+            continue
 
         active_tasks["calc_sync_delta"].pop(site_id)
         if (calc_sync_delta_result := async_result.get()) is None:
-            return  # exception handling happens in thread
+            continue  # exception handling happens in thread
 
         sync_delta, activation_state, sync_start_time = calc_sync_delta_result
         active_tasks["synchronize_files"][site_id] = task_pool.apply_async(
             func=copy_request_context(synchronize_files),
             args=(
                 sync_delta,
-                remote_config_generation_per_site[site_id],
+                sync_state_per_site[site_id].remote_config_generation,
                 Path(site_snapshot_settings[site_id].work_dir),
                 activation_state,
                 sync_start_time,
+                sync_state_per_site[site_id].remote_sync_capabilities,
             ),
             error_callback=_error_callback,
         )
 
     for site_id, async_result in list(active_tasks["synchronize_files"].items()):
         if not async_result.ready():
-            return
+            continue
 
         active_tasks["synchronize_files"].pop(site_id)
         if (activation_state := async_result.get()) is None:
-            return  # exception handling happens in thread
+            continue  # exception handling happens in thread
 
         active_tasks["activate_remote_changes"][site_id] = task_pool.apply_async(
             func=copy_request_context(activate_remote_changes),
@@ -2284,11 +2419,18 @@ def _handle_active_tasks(
 
     for site_id, async_result in list(active_tasks["activate_remote_changes"].items()):
         if not async_result.ready():
-            return
+            continue
 
         active_tasks["activate_remote_changes"].pop(site_id)
 
 
+def _num_activation_threads(num_sites: int) -> int:
+    """The sites are handled by a pool of threads, by default one per site"""
+    if (max_threads := active_config.wato_activate_changes_concurrency) is None:
+        return max(1, num_sites)
+    return max(1, min(num_sites, max_threads))
+
+
 @job_registry.register
 class ActivateChangesSchedulerBackgroundJob(BackgroundJob):
     job_prefix = "activate-changes-scheduler"
@@ -2712,12 +2854,13 @@ def _filter_remote_files(remote_files: set[str]) -> set[str]:
     return remote_files_to_keep
 
 
-def _get_sync_archive(to_sync: list[str], base_dir: Path) -> bytes:
+def _get_sync_archive(to_sync: list[str], base_dir: Path, compress: bool = False) -> bytes:
     # Use native tar instead of python tarfile for performance reasons
     completed_process = subprocess.run(
         [
             "tar",
             "-c",
+            *(["-z"] if compress else []),
             "-C",
             str(base_dir),
             "-f",
@@ -2746,11 +2889,12 @@ def _get_sync_archive(to_sync: list[str], base_dir: Path) -> bytes:
     return completed_process.stdout
 
 
-def _unpack_sync_archive(sync_archive: bytes, base_dir: Path) -> None:
+def _unpack_sync_archive(sync_archive: bytes, base_dir: Path, compressed: bool = False) -> None:
     completed_process = subprocess.run(
         [
             "tar",
             "-x",
+            *(["-z"] if compressed else []),
             "-C",
             str(base_dir),
             "-f",
@@ -2786,7 +2930,9 @@ class ConfigSyncFileInfo(NamedTuple):
 #    ("file_infos", dict[str, ConfigSyncFileInfo]),
 #    ("config_generation", int),
 # ])
-GetConfigSyncStateResponse = tuple[dict[str, tuple[int, int, str | None, str | None]], int]
+GetConfigSyncStateResponse = tuple[
+    dict[str, tuple[int, int, str | None, str | None]], int, list[str]
+]
 
 ConfigSyncFileInfos = dict[str, ConfigSyncFileInfo]
 
@@ -2819,11 +2965,15 @@ class AutomationGetConfigSyncState(AutomationCommand):
 
     def execute(self, api_request: list[ReplicationPath]) -> GetConfigSyncStateResponse:
         with store.lock_checkmk_configuration():
-            file_infos = _get_config_sync_file_infos(api_request, base_dir=cmk.utils.paths.omd_root)
+            hash_cache = ConfigSyncFileHashCache.load()
+            file_infos = _get_config_sync_file_infos(
+                api_request, base_dir=cmk.utils.paths.omd_root, hash_cache=hash_cache
+            )
+            hash_cache.save()
             transport_file_infos = {
                 k: (v.st_mode, v.st_size, v.link_target, v.file_hash) for k, v in file_infos.items()
             }
-            return (transport_file_infos, _get_current_config_generation())
+            return (transport_file_infos, _get_current_config_generation(), _SYNC_CAPABILITIES)
 
 
 def _get_config_sync_paths(
@@ -2859,6 +3009,7 @@ def _get_config_sync_file_infos(
     replication_paths: list[ReplicationPath],
     base_dir: Path,
     config_sync_file_infos_per_inode: Mapping[int, ConfigSyncFileInfo] | None = None,
+    hash_cache: ConfigSyncFileHashCache | None = None,
 ) -> ConfigSyncFileInfos:
     """Scans the given replication paths for the information needed for the config sync
 
@@ -2878,7 +3029,9 @@ def _get_config_sync_file_infos(
             continue  # Only report back existing things
 
         if replication_path.ty == ReplicationPathType.FILE:
-            infos[replication_path.site_path] = _get_config_sync_file_info(replication_path_full)
+            infos[replication_path.site_path] = _get_config_sync_file_info(
+                replication_path_full, hash_cache
+            )
 
         elif replication_path.ty == ReplicationPathType.DIR:
             _get_replication_dir_config_sync_file_infos(
@@ -2887,6 +3040,7 @@ def _get_config_sync_file_infos(
                 base_dir,
                 replication_path_full,
                 replication_path.excludes,
+                hash_cache,
             )
         else:
             raise NotImplementedError()
@@ -2899,6 +3053,7 @@ def _get_replication_dir_config_sync_file_infos(
     base_dir: Path,
     replication_path: str,
     replication_path_excludes: Sequence[str],
+    hash_cache: ConfigSyncFileHashCache | None,
 ) -> None:
     # Use os functionality instead of pathlib since it is faster
     for root, dir_names, file_names in os.walk(replication_path):
@@ -2918,22 +3073,84 @@ def _get_replication_dir_config_sync_file_infos(
                 ):
                     infos[valid_site_path] = sync_file_info
                 else:
-                    infos[valid_site_path] = _get_config_sync_file_info(config_sync_path)
+                    infos[valid_site_path] = _get_config_sync_file_info(
+                        config_sync_path, hash_cache
+                    )
             except FileNotFoundError:  # e.g. broken symlinks
-                infos[valid_site_path] = _get_config_sync_file_info(config_sync_path)
+                infos[valid_site_path] = _get_config_sync_file_info(config_sync_path, hash_cache)
 
 
-def _get_config_sync_file_info(file_path: str) -> ConfigSyncFileInfo:
+def _get_config_sync_file_info(
+    file_path: str, hash_cache: ConfigSyncFileHashCache | None = None
+) -> ConfigSyncFileInfo:
     stat = os.lstat(file_path)
     is_symlink = os.path.islink(file_path)
+    if is_symlink:
+        file_hash = None
+    elif hash_cache is None:
+        file_hash = _create_config_sync_file_hash(file_path)
+    else:
+        file_hash = hash_cache.get_hash(file_path, stat)
     return ConfigSyncFileInfo(
         stat.st_mode,
         stat.st_size,
         os.readlink(str(file_path)) if is_symlink else None,
-        _create_config_sync_file_hash(file_path) if not is_symlink else None,
+        file_hash,
     )
 
 
+class ConfigSyncFileHashCache:
+    """Persisted hashes of the files to be synchronized
+
+    Hashing the content of all files is the most expensive part of computing the sync state. The
+    hashes are remembered per inode, size and modification time of the file, so only the files
+    which have been changed since the last sync are hashed again. The status change time is not
+    taken into account: Hard linking the files into the site specific snapshots and removing these
+    changes it on every activation.
+    """
+
+    # Files modified shortly before hashing them may be modified again within the same mtime
+    # granularity without us noticing, so their hashes are not remembered
+    _MIN_AGE = 2.0
+
+    def __init__(self, path: Path, hashes: dict[tuple[int, int, int], str]) -> None:
+        self._path = path
+        self._hashes = hashes
+        self._used_hashes: dict[tuple[int, int, int], str] = {}
+        self._hashed_before = time.time() - self._MIN_AGE
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> ConfigSyncFileHashCache:
+        path = _config_sync_file_hash_cache_path() if path is None else path
+        try:
+            hashes = store.load_object_from_pickle_file(path, default={})
+        except Exception:
+            logger.exception("Ignoring invalid file hash cache %s", path)
+            hashes = {}
+        return cls(path, hashes if isinstance(hashes, dict) else {})
+
+    def get_hash(self, file_path: str, stat: os.stat_result) -> str:
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if (file_hash := self._hashes.get(key)) is None:
+            file_hash = _create_config_sync_file_hash(file_path)
+            if stat.st_mtime > self._hashed_before:
+                return file_hash
+
+        self._used_hashes[key] = file_hash
+        return file_hash
+
+    def save(self) -> None:
+        """Persist the hashes which have been used, which drops the ones of vanished files"""
+        if self._used_hashes == self._hashes:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        store.save_object_to_pickle_file(self._path, self._used_hashes)
+
+
+def _config_sync_file_hash_cache_path() -> Path:
+    return wato_var_dir() / "config_sync_file_hashes.pkl"
+
+
 def _create_config_sync_file_hash(file_path: str) -> str:
     sha256 = hashlib.sha256()
     with open(file_path, "rb") as f:
@@ -2970,6 +3187,9 @@ class ReceiveConfigSyncRequest(NamedTuple):
     sync_archive: bytes
     to_delete: list[str]
     config_generation: int
+    compressed: bool = False
+    # The archive has been uploaded in parts before, see AutomationReceiveConfigSyncChunk
+    transfer_id: str | None = None
 
 
 @automation_command_registry.register
@@ -2988,11 +3208,16 @@ class AutomationReceiveConfigSync(AutomationCommand):
         site_id = SiteId(_request.get_ascii_input_mandatory("site_id"))
         verify_remote_site_config(site_id)
 
+        if (transfer_id := _request.get_ascii_input("transfer_id")) is not None:
+            _verify_transfer_id(transfer_id)
+
         return ReceiveConfigSyncRequest(
             site_id,
-            _request.uploaded_file("sync_archive")[2],
+            b"" if transfer_id else _request.uploaded_file("sync_archive")[2],
             ast.literal_eval(_request.get_str_input_mandatory("to_delete")),
             _request.get_integer_input_mandatory("config_generation"),
+            _request.get_ascii_input("compression") == SYNC_CAPABILITY_GZIP,
+            transfer_id,
         )
 
     def execute(self, api_request: ReceiveConfigSyncRequest) -> bool:
@@ -3006,8 +3231,16 @@ class AutomationReceiveConfigSync(AutomationCommand):
                     )
                 )
 
+            sync_archive = api_request.sync_archive
+            if api_request.transfer_id is not None:
+                upload_path = _sync_archive_upload_path(api_request.transfer_id)
+                sync_archive = upload_path.read_bytes()
+                upload_path.unlink()
+
             logger.debug("Updating configuration from sync snapshot")
-            self._update_config_on_remote_site(api_request.sync_archive, api_request.to_delete)
+            self._update_config_on_remote_site(
+                sync_archive, api_request.to_delete, api_request.compressed
+            )
 
             logger.debug("Executing post sync actions")
             _execute_post_config_sync_actions(api_request.site_id)
@@ -3015,7 +3248,9 @@ class AutomationReceiveConfigSync(AutomationCommand):
             logger.debug("Done")
             return True
 
-    def _update_config_on_remote_site(self, sync_archive: bytes, to_delete: list[str]) -> None:
+    def _update_config_on_remote_site(
+        self, sync_archive: bytes, to_delete: list[str], compressed: bool = False
+    ) -> None:
         """Use the given tar archive and list of files to be deleted to update the local files"""
         base_dir = cmk.utils.paths.omd_root
 
@@ -3030,7 +3265,90 @@ class AutomationReceiveConfigSync(AutomationCommand):
                 # errno.ENOTDIR - dir with files was replaced by e.g. symlink
                 pass
 
-        _unpack_sync_archive(sync_archive, base_dir)
+        _unpack_sync_archive(sync_archive, base_dir, compressed)
+
+
+class ReceiveConfigSyncChunkRequest(NamedTuple):
+    site_id: SiteId
+    transfer_id: str
+    offset: int
+    chunk: bytes
+
+
+@automation_command_registry.register
+class AutomationReceiveConfigSyncChunk(AutomationCommand):
+    """Called on remote site from a central site to upload a part of a large sync archive
+
+    The parts are appended to a file, which is used by the "receive-config-sync" automation
+    referring to the same transfer ID. The response is the number of bytes received so far,
+    which allows the central site to continue an interrupted upload.
+    """
+
+    def command_name(self) -> str:
+        return "receive-config-sync-chunk"
+
+    def get_request(self) -> ReceiveConfigSyncChunkRequest:
+        site_id = SiteId(_request.get_ascii_input_mandatory("site_id"))
+        verify_remote_site_config(site_id)
+
+        transfer_id = _request.get_ascii_input_mandatory("transfer_id")
+        _verify_transfer_id(transfer_id)
+
+        return ReceiveConfigSyncChunkRequest(
+            site_id,
+            transfer_id,
+            _request.get_integer_input_mandatory("offset"),
+            _request.uploaded_file("chunk")[2],
+        )
+
+    def execute(self, api_request: ReceiveConfigSyncChunkRequest) -> int:
+        upload_path = _sync_archive_upload_path(api_request.transfer_id)
+        if api_request.offset == 0:
+            _cleanup_sync_archive_uploads()
+            upload_path.parent.mkdir(parents=True, exist_ok=True)
+            upload_path.write_bytes(b"")
+
+        try:
+            size = upload_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+        # Parts we already have (e.g. the response got lost) or which would leave a gap are
+        # ignored, the central site continues with the size we report back
+        if api_request.offset == size:
+            with upload_path.open("ab") as f:
+                f.write(api_request.chunk)
+            size += len(api_request.chunk)
+        return size
+
+
+def _verify_transfer_id(transfer_id: str) -> None:
+    try:
+        valid = str(uuid.UUID(transfer_id)) == transfer_id
+    except ValueError:
+        valid = False
+    if not valid:
+        raise MKUserError("transfer_id", _("Invalid transfer ID"))
+
+
+def _sync_archive_upload_dir() -> Path:
+    return cmk.utils.paths.tmp_dir / "wato/sync_archive_uploads"
+
+
+def _sync_archive_upload_path(transfer_id: str) -> Path:
+    return _sync_archive_upload_dir() / transfer_id
+
+
+def _cleanup_sync_archive_uploads() -> None:
+    """Remove the parts of uploads which have never been completed"""
+    if not (upload_dir := _sync_archive_upload_dir()).exists():
+        return
+    for path in upload_dir.iterdir():
+        try:
+            if path.stat().st_mtime < time.time() - 86400:
+                path.unlink()
+        except FileNotFoundError:
+            pass
 
 
 @dataclass
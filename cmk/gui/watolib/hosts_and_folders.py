@@ -13,6 +13,7 @@ import shutil
 import subprocess
 import time
 import uuid
+from abc import ABC, abstractmethod
 from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
 from contextlib import contextmanager, suppress
 from enum import Enum
@@ -36,6 +37,7 @@ from cmk.utils.store.host_storage import (
     ABCHostsStorage,
     apply_hosts_file_to_object,
     ContactgroupName,
+    ExperimentalStorageLoader,
     FolderAttributesForBase,
     get_all_storage_readers,
     get_host_storage_loaders,
@@ -45,6 +47,7 @@ from cmk.utils.store.host_storage import (
     HostsData,
     HostsStorageData,
     HostsStorageFieldsGenerator,
+    IndexedHostsStorage,
     make_experimental_hosts_storage,
     StandardHostsStorage,
     StorageFormat,
@@ -164,10 +167,10 @@ class FolderMetaData:
     @property
     def num_hosts_recursively(self) -> int:
         if self._num_hosts_recursively is None:
-            if may_use_redis():
-                self._num_hosts_recursively = get_wato_redis_client(
+            if may_use_folder_metadata_cache():
+                self._num_hosts_recursively = get_folder_metadata_cache(
                     self.tree
-                ).num_hosts_recursively_lua(self._path)
+                ).num_hosts_recursively(self._path)
             else:
                 self._num_hosts_recursively = self.tree.folder(
                     self._path.rstrip("/")
@@ -279,17 +282,15 @@ class _MoveType(Enum):
     Folder = "folder"
 
 
-class _RedisHelper:
+class _FolderMetadataCache(ABC):
     """
-    This class
-    - communicates with redis
-    - handles the entire redis cache and checks its integrity
-    - computes the metadata out of Folder instances and stores it in redis
+    Base class of the caches for the metadata of all folders
+    - handles the entire cache and checks its integrity
+    - computes the metadata out of Folder instances and stores it
     - provides functions to compute the number of hosts and fetch the metadata for folders"""
 
     def __init__(self, tree: FolderTree) -> None:
         self.tree = tree
-        self._client = get_redis_client()
         self._folder_metadata: dict[str, FolderMetaData] = {}
 
         self._loaded_wato_folders: Mapping[PathWithoutSlash, Folder] | None = None
@@ -311,10 +312,9 @@ class _RedisHelper:
         return latest_timestamp, wato_folders
 
     @property
+    @abstractmethod
     def folder_paths(self) -> Sequence[PathWithSlash]:
-        if self._folder_paths is None:
-            self._folder_paths = tuple(self._client.smembers("wato:folder_list"))
-        return self._folder_paths
+        raise NotImplementedError()
 
     def recursive_subfolders_for_path(self, path: PathWithSlash) -> list[PathWithSlash]:
         return [x for x in self.folder_paths if x.startswith(path)]
@@ -357,6 +357,140 @@ class _RedisHelper:
 
         return [(key.rstrip("/"), value) for key, value in path_to_title.items()]
 
+    @abstractmethod
+    def folder_metadata(self, path: PathWithoutSlash) -> FolderMetaData | None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _fetch_all_metadata(self) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _create_cache_from_scratch(
+        self,
+        update_timestamp: str,
+        all_folders: Mapping[PathWithSlash, Folder],
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def num_hosts_recursively(self, path_with_slash: PathWithSlash) -> int:
+        """Returns the number of hosts in subfolder, excluding hosts not visible to the current user"""
+        raise NotImplementedError()
+
+    def _num_visible_hosts(
+        self, groups_and_num_hosts: Iterable[tuple[Collection[ContactgroupName], int]]
+    ) -> int:
+        if (
+            user.may("wato.see_all_folders")
+            or not active_config.wato_hide_folders_without_read_permissions
+        ):
+            return sum(num_hosts for _groups, num_hosts in groups_and_num_hosts)
+
+        assert user.id is not None
+        user_cgs = set(userdb.contactgroups_of_user(user.id))
+        return sum(
+            num_hosts for groups, num_hosts in groups_and_num_hosts if user_cgs.intersection(groups)
+        )
+
+    @abstractmethod
+    def folder_updated(self, filesystem_path: str) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def save_folder_info(self, folder: Folder) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _get_last_update(self) -> str:
+        raise NotImplementedError()
+
+    def _cache_integrity_ok(self) -> bool:
+        return self._get_latest_timestamps_from_disk()[-1] == self._get_last_update()
+
+    def _partial_data_update_possible(self, allowed_timestamps: list[str]) -> bool:
+        """Checks whether a partial update is possible at all
+        It is important that the in memory cache does not deviate from the data on disk.
+        The fasted way to accomplish this (with a sufficient reliability) is to compare
+        the latest changed timestamps from disk with
+         - the latest known timestamp of the cache itself
+         - the allowed timestamps, which reflect the file timestamps of the latest changed
+           host/folder/rule files
+
+        For example. Every time a .wato file is updated, the timestamp of the .wato file and its
+        folder updates. To check whether a partial update is possible
+        - Determine allowed_timestamps (.wato + folder)
+        - Get last_update from the cache
+        - Get the latest few timestamps from disk and removed the allowed_timestamps from them
+        - The remaining newest timestamp must be equal or older than the last update of the cache
+              If this condition is true, a partial update is possible since there were no
+              unobserved changes, again -> with a sufficient reliability.
+        """
+
+        remaining_timestamps = [
+            x for x in self._get_latest_timestamps_from_disk() if x not in allowed_timestamps
+        ]
+
+        if remaining_timestamps and remaining_timestamps[-1] > self._get_last_update():
+            return False
+
+        return True
+
+    def _get_allowed_folder_timestamps(self, folder: Folder) -> list[str]:
+        wato_info_path = folder.wato_info_path()
+        return sorted(
+            [
+                self._timestamp_to_fixed_precision_str(os.stat(wato_info_path).st_mtime),
+                self._timestamp_to_fixed_precision_str(
+                    os.stat(os.path.dirname(wato_info_path)).st_mtime
+                ),
+            ]
+        )
+
+    def _timestamp_to_fixed_precision_str(self, timestamp: float) -> str:
+        return "%.5f" % timestamp
+
+    def _get_latest_timestamps_from_disk(self) -> _WATOFolderScanTimestamps:
+        """Note: We are using the find command from the command line since it is considerable
+        faster than any python implementation. For example 9k files:
+        Path.glob             -> 1.12 seconds
+        os.walk               -> 0.34 seconds
+        find (+spawn process) -> 0.14 seconds
+        """
+        result = subprocess.run(  # nosec
+            f"find {cmk.utils.paths.check_mk_config_dir}/wato -type d -printf '%T@\n' -o -name .wato -printf '%T@\n' | sort -n | tail -6 | uniq",
+            shell=True,
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+        )
+        try:
+            return _WATOFolderScanTimestamps(
+                self._timestamp_to_fixed_precision_str(float(x))
+                for x in result.stdout.split("\n")
+                if x
+            )
+        except ValueError:
+            fixed_zero = self._timestamp_to_fixed_precision_str(0.0)
+            return _WATOFolderScanTimestamps([fixed_zero] * 3)
+
+
+class _RedisHelper(_FolderMetadataCache):
+    """
+    This class
+    - communicates with redis
+    - stores the metadata of the folders in redis"""
+
+    def __init__(self, tree: FolderTree) -> None:
+        self._client = get_redis_client()
+        super().__init__(tree)
+
+    @property
+    def folder_paths(self) -> Sequence[PathWithSlash]:
+        if self._folder_paths is None:
+            self._folder_paths = tuple(self._client.smembers("wato:folder_list"))
+        return self._folder_paths
+
     def folder_metadata(self, path: PathWithoutSlash) -> FolderMetaData | None:
         path_with_slash = f"{path}/"
         if path_with_slash not in self._folder_metadata:
@@ -499,8 +633,7 @@ class _RedisHelper:
     def _add_last_folder_update_to_pipeline(self, pipeline: Pipeline, timestamp: str) -> None:
         pipeline.set("wato:folder_list:last_update", timestamp)
 
-    def num_hosts_recursively_lua(self, path_with_slash: PathWithSlash) -> int:
-        """Returns the number of hosts in subfolder, excluding hosts not visible to the current user"""
+    def num_hosts_recursively(self, path_with_slash: PathWithSlash) -> int:
         recursive_hosts = self._client.register_script(
             """
             local cursor = 0;
@@ -525,70 +658,17 @@ class _RedisHelper:
         recursive_hosts(keys=keys, args=args, client=pipeline)
         results = pipeline.execute()
 
-        total_hosts = 0
         if not results:
-            return total_hosts
-
-        if (
-            user.may("wato.see_all_folders")
-            or not active_config.wato_hide_folders_without_read_permissions
-        ):
-            return sum(map(int, results[0][1::2]))
+            return 0
 
         def pairwise(iterable: Iterable[str]) -> Iterator[tuple[str, str]]:
             """s -> (s0,s1), (s2,s3), (s4, s5), ..."""
             a = iter(iterable)
             return zip(a, a)
 
-        assert user.id is not None
-        user_cgs = set(userdb.contactgroups_of_user(user.id))
-        for folder_cgs, num_hosts in pairwise(results[0]):
-            cgs = set(folder_cgs.split(","))
-            if user_cgs.intersection(cgs):
-                total_hosts += int(num_hosts)
-
-        return total_hosts
-
-    def _cache_integrity_ok(self) -> bool:
-        return self._get_latest_timestamps_from_disk()[-1] == self._get_last_update_from_redis()
-
-    def _partial_data_update_possible(self, allowed_timestamps: list[str]) -> bool:
-        """Checks whether a partial update is possible at all
-        It is important that the in memory cache does not deviate from the data on disk.
-        The fasted way to accomplish this (with a sufficient reliability) is to compare
-        the latest changed timestamps from disk with
-         - the latest known timestamp of the cache itself
-         - the allowed timestamps, which reflect the file timestamps of the latest changed
-           host/folder/rule files
-
-        For example. Every time a .wato file is updated, the timestamp of the .wato file and its
-        folder updates. To check whether a partial update is possible
-        - Determine allowed_timestamps (.wato + folder)
-        - Get last_update from redis
-        - Get the latest few timestamps from disk and removed the allowed_timestamps from them
-        - The remaining newest timestamp must be equal or older than the last update from redis
-              If this condition is true, a partial update is possible since there were no
-              unobserved changes, again -> with a sufficient reliability.
-        """
-
-        remaining_timestamps = [
-            x for x in self._get_latest_timestamps_from_disk() if x not in allowed_timestamps
-        ]
-
-        if remaining_timestamps and remaining_timestamps[-1] > self._get_last_update_from_redis():
-            return False
-
-        return True
-
-    def _get_allowed_folder_timestamps(self, folder: Folder) -> list[str]:
-        wato_info_path = folder.wato_info_path()
-        return sorted(
-            [
-                self._timestamp_to_fixed_precision_str(os.stat(wato_info_path).st_mtime),
-                self._timestamp_to_fixed_precision_str(
-                    os.stat(os.path.dirname(wato_info_path)).st_mtime
-                ),
-            ]
+        return self._num_visible_hosts(
+            (folder_cgs.split(","), int(num_hosts))
+            for folder_cgs, num_hosts in pairwise(results[0])
         )
 
     def folder_updated(self, filesystem_path: str) -> None:
@@ -625,34 +705,7 @@ class _RedisHelper:
         self._add_last_folder_update_to_pipeline(pipeline, allowed_timestamps[-1])
         pipeline.execute()
 
-    def _timestamp_to_fixed_precision_str(self, timestamp: float) -> str:
-        return "%.5f" % timestamp
-
-    def _get_latest_timestamps_from_disk(self) -> _WATOFolderScanTimestamps:
-        """Note: We are using the find command from the command line since it is considerable
-        faster than any python implementation. For example 9k files:
-        Path.glob             -> 1.12 seconds
-        os.walk               -> 0.34 seconds
-        find (+spawn process) -> 0.14 seconds
-        """
-        result = subprocess.run(  # nosec
-            f"find {cmk.utils.paths.check_mk_config_dir}/wato -type d -printf '%T@\n' -o -name .wato -printf '%T@\n' | sort -n | tail -6 | uniq",
-            shell=True,
-            capture_output=True,
-            check=True,
-            encoding="utf-8",
-        )
-        try:
-            return _WATOFolderScanTimestamps(
-                self._timestamp_to_fixed_precision_str(float(x))
-                for x in result.stdout.split("\n")
-                if x
-            )
-        except ValueError:
-            fixed_zero = self._timestamp_to_fixed_precision_str(0.0)
-            return _WATOFolderScanTimestamps([fixed_zero] * 3)
-
-    def _get_last_update_from_redis(self) -> str:
+    def _get_last_update(self) -> str:
         try:
             if (value := self._client.get("wato:folder_list:last_update")) is not None:
                 return value
@@ -661,6 +714,151 @@ class _RedisHelper:
         return self._timestamp_to_fixed_precision_str(0.0)
 
 
+# num_hosts, title, title_path_without_root, permitted_contact_groups
+_DiskFolderMetadata = tuple[int, str, str, Sequence[ContactgroupName]]
+
+
+class _DiskFolderMetadataIndex(TypedDict):
+    last_update: str
+    folders: dict[PathWithSlash, _DiskFolderMetadata]
+
+
+class _DiskFolderMetadataCache(_FolderMetadataCache):
+    """
+    This class
+    - is used instead of redis, in case the redis server is not available
+    - stores the metadata of the folders in a single file, which is read once per request"""
+
+    def __init__(self, tree: FolderTree) -> None:
+        self._index: _DiskFolderMetadataIndex | None = None
+        super().__init__(tree)
+
+    def _load_index(self, lock: bool = False) -> _DiskFolderMetadataIndex:
+        if self._index is None or lock:
+            self._index = index = store.load_object_from_pickle_file(
+                _folder_metadata_index_path(),
+                default=_DiskFolderMetadataIndex(
+                    last_update=self._timestamp_to_fixed_precision_str(0.0),
+                    folders={},
+                ),
+                lock=lock,
+            )
+            return index
+        return self._index
+
+    def _save_index(self, index: _DiskFolderMetadataIndex) -> None:
+        store.makedirs(_folder_metadata_index_path().parent)
+        store.save_object_to_pickle_file(_folder_metadata_index_path(), index)
+        self._index = index
+
+    @property
+    def folder_paths(self) -> Sequence[PathWithSlash]:
+        if self._folder_paths is None:
+            self._folder_paths = tuple(self._load_index()["folders"])
+        return self._folder_paths
+
+    def clear_cached_folders(self) -> None:
+        super().clear_cached_folders()
+        self._index = None
+        self._folder_metadata = {}
+
+    def folder_metadata(self, path: PathWithoutSlash) -> FolderMetaData | None:
+        path_with_slash = f"{path}/"
+        if path_with_slash not in self._folder_metadata:
+            if (entry := self._load_index()["folders"].get(path_with_slash)) is None:
+                return None
+            self._folder_metadata[path_with_slash] = self._to_folder_metadata(
+                path_with_slash, entry
+            )
+        return self._folder_metadata.get(path_with_slash)
+
+    def _to_folder_metadata(
+        self, path_with_slash: PathWithSlash, entry: _DiskFolderMetadata
+    ) -> FolderMetaData:
+        _num_hosts, title, title_path_without_root, permitted_groups = entry
+        return FolderMetaData(
+            self.tree,
+            path_with_slash,
+            title or path_with_slash,
+            title_path_without_root or path_with_slash,
+            list(permitted_groups),
+        )
+
+    def _fetch_all_metadata(self) -> None:
+        for path_with_slash, entry in self._load_index()["folders"].items():
+            self._folder_metadata[path_with_slash] = self._to_folder_metadata(
+                path_with_slash, entry
+            )
+
+    def _create_cache_from_scratch(
+        self,
+        update_timestamp: str,
+        all_folders: Mapping[PathWithSlash, Folder],
+    ) -> None:
+        logger.info("Creating wato folder metadata index")
+        folder_groups = _get_permitted_groups_of_all_folders(all_folders)
+        self._save_index(
+            _DiskFolderMetadataIndex(
+                last_update=update_timestamp,
+                folders={
+                    f"{folder_path}/": (
+                        folder.num_hosts(),
+                        folder.title(),
+                        "/".join(str(p) for p in folder.title_path_without_root()),
+                        sorted(folder_groups[folder_path].actual_groups),
+                    )
+                    for folder_path, folder in all_folders.items()
+                },
+            )
+        )
+
+    def num_hosts_recursively(self, path_with_slash: PathWithSlash) -> int:
+        folders = self._load_index()["folders"]
+        return self._num_visible_hosts(
+            (permitted_groups, num_hosts)
+            for folder_path, (num_hosts, _title, _title_path, permitted_groups) in folders.items()
+            if path_with_slash == "/" or folder_path.startswith(path_with_slash)
+        )
+
+    def folder_updated(self, filesystem_path: str) -> None:
+        try:
+            folder_timestamp = self._timestamp_to_fixed_precision_str(
+                os.stat(filesystem_path).st_mtime
+            )
+        except FileNotFoundError:
+            return
+
+        index = self._load_index(lock=True)
+        index["last_update"] = folder_timestamp
+        self._save_index(index)
+
+    def save_folder_info(
+        self,
+        folder: Folder,
+    ) -> None:
+        allowed_timestamps = self._get_allowed_folder_timestamps(folder)
+        if not self._partial_data_update_possible(allowed_timestamps):
+            # Something unexpected was modified in the meantime, rewrite cache
+            self._create_cache_from_scratch(*self._get_latest_timestamp_and_folders())
+
+        index = self._load_index(lock=True)
+        index["folders"][f"{folder.path()}/"] = (
+            folder.num_hosts(),
+            folder.title(),
+            "/".join(str(p) for p in folder.title_path_without_root()),
+            sorted(folder.groups()[0]),
+        )
+        index["last_update"] = allowed_timestamps[-1]
+        self._save_index(index)
+
+    def _get_last_update(self) -> str:
+        return self._load_index()["last_update"]
+
+
+def _folder_metadata_index_path() -> Path:
+    return cmk.utils.paths.tmp_dir / "wato" / "folder_metadata.pkl"
+
+
 def _get_fully_loaded_wato_folders(tree: FolderTree) -> Mapping[PathWithoutSlash, Folder]:
     wato_folders: dict[PathWithoutSlash, Folder] = {}
     Folder.load(tree=tree, name="", parent_folder=None).add_to_dictionary(wato_folders)
@@ -876,6 +1074,15 @@ def get_wato_redis_client(tree: FolderTree) -> _RedisHelper:
     return g.wato_redis_client
 
 
+def get_folder_metadata_cache(tree: FolderTree) -> _FolderMetadataCache:
+    """The cache of the folder metadata, kept in redis or - without redis server - in a file"""
+    if may_use_redis():
+        return get_wato_redis_client(tree)
+    if "wato_folder_metadata_index" not in g:
+        g.wato_folder_metadata_index = _DiskFolderMetadataCache(tree)
+    return g.wato_folder_metadata_index
+
+
 class WATOHosts(TypedDict):
     locked: bool
     host_attributes: Mapping[HostName, HostAttributes]
@@ -894,6 +1101,11 @@ def may_use_redis() -> bool:
     return redis_enabled() and _REDIS_ENABLED_LOCALLY and _redis_available()
 
 
+def may_use_folder_metadata_cache() -> bool:
+    # Sites with redis enabled, but without a reachable redis server, use the file instead
+    return may_use_redis() or (redis_enabled() and _REDIS_ENABLED_LOCALLY)
+
+
 @request_memoize()
 def _redis_available() -> bool:
     return redis_server_reachable(get_redis_client())
@@ -911,16 +1123,18 @@ def _disable_redis_locally() -> Iterator[None]:
 
 
 def _wato_folders_factory(tree: FolderTree) -> Mapping[PathWithoutSlash, Folder]:
-    if not may_use_redis():
+    if not may_use_folder_metadata_cache():
         return _get_fully_loaded_wato_folders(tree)
 
-    wato_redis_client = get_wato_redis_client(tree)
-    if wato_redis_client.loaded_wato_folders is not None:
+    folder_metadata_cache = get_folder_metadata_cache(tree)
+    if folder_metadata_cache.loaded_wato_folders is not None:
         # Folders were already completely loaded during cache generation -> use these
-        return wato_redis_client.loaded_wato_folders
+        return folder_metadata_cache.loaded_wato_folders
 
     # Provide a dict where the values are generated on demand
-    return WATOFoldersOnDemand(tree, {x.rstrip("/"): None for x in wato_redis_client.folder_paths})
+    return WATOFoldersOnDemand(
+        tree, {x.rstrip("/"): None for x in folder_metadata_cache.folder_paths}
+    )
 
 
 def _generate_domain_settings(
@@ -982,8 +1196,8 @@ class FolderTree:
 
     def invalidate_caches(self) -> None:
         self.root_folder().drop_caches()
-        if may_use_redis():
-            get_wato_redis_client(self).clear_cached_folders()
+        if may_use_folder_metadata_cache():
+            get_folder_metadata_cache(self).clear_cached_folders()
         g.pop("wato_folders", {})
         for cache_id in ["folder_choices", "folder_choices_full_title"]:
             g.pop(cache_id, None)
@@ -1298,9 +1512,9 @@ class Folder(FolderProtocol):
                 host.drop_caches()
 
             self._save_hosts_file()
-            if may_use_redis():
-                # Inform redis that the modified-timestamp of the folder has been updated.
-                get_wato_redis_client(self.tree).folder_updated(self.filesystem_path())
+            if may_use_folder_metadata_cache():
+                # Inform the cache that the modified-timestamp of the folder has been updated.
+                get_folder_metadata_cache(self.tree).folder_updated(self.filesystem_path())
 
         call_hook_hosts_changed(self)
 
@@ -1535,8 +1749,8 @@ class Folder(FolderProtocol):
         self.attributes = update_metadata(self.attributes)
         store.makedirs(os.path.dirname(self.wato_info_path()))
         self.wato_info_storage_manager().write(Path(self.wato_info_path()), self.serialize())
-        if may_use_redis():
-            get_wato_redis_client(self.tree).save_folder_info(self)
+        if may_use_folder_metadata_cache():
+            get_folder_metadata_cache(self.tree).save_folder_info(self)
 
     # .-----------------------------------------------------------------------.
     # | ELEMENT ACCESS                                                        |
@@ -1555,7 +1769,7 @@ class Folder(FolderProtocol):
         return self.path()
 
     def path(self) -> str:
-        if may_use_redis() and self._path is not None:
+        if may_use_folder_metadata_cache() and self._path is not None:
             return self._path
 
         if (parent := self.parent()) and not parent.is_root() and not self.is_root():
@@ -1582,8 +1796,26 @@ class Folder(FolderProtocol):
         return ObjectRef(ObjectRefType.Folder, self.path())
 
     def host_names(self) -> Sequence[HostName]:
+        if (host_names := self._host_names_from_index()) is not None:
+            return list(host_names)
         return list(self.hosts().keys())
 
+    def _host_names_from_index(self) -> Sequence[HostName] | None:
+        """Read only the names of the hosts, in case they are not loaded and stored indexed"""
+        if self._hosts is not None or not isinstance(
+            storage := make_experimental_hosts_storage(
+                get_storage_format(active_config.config_storage_format)
+            ),
+            IndexedHostsStorage,
+        ):
+            return None
+
+        path = Path(self.hosts_file_path_without_extension())
+        loader = ExperimentalStorageLoader(storage)
+        if not loader.file_exists(path) or not loader.file_valid(path):
+            return None
+        return storage.read_host_names(path)
+
     def load_host(self, host_name: HostName) -> Host:
         try:
             return self.hosts()[host_name]
@@ -1594,6 +1826,8 @@ class Folder(FolderProtocol):
         return self.hosts().get(host_name)
 
     def has_host(self, host_name: HostName) -> bool:
+        if (host_names := self._host_names_from_index()) is not None:
+            return host_name in host_names
         return host_name in self.hosts()
 
     def has_hosts(self) -> bool:
@@ -1626,8 +1860,8 @@ class Folder(FolderProtocol):
         return self._num_hosts
 
     def num_hosts_recursively(self) -> int:
-        if may_use_redis():
-            if folder_metadata := get_wato_redis_client(self.tree).folder_metadata(self.path()):
+        if may_use_folder_metadata_cache():
+            if folder_metadata := get_folder_metadata_cache(self.tree).folder_metadata(self.path()):
                 return folder_metadata.num_hosts_recursively
             return 0
 
@@ -1768,9 +2002,11 @@ class Folder(FolderProtocol):
     def _choices_for_moving(self, what: str) -> Choices:
         choices: Choices = []
 
-        if may_use_redis():
+        if may_use_folder_metadata_cache():
             return self._get_sorted_choices(
-                get_wato_redis_client(self.tree).choices_for_moving(self.path(), _MoveType(what))
+                get_folder_metadata_cache(self.tree).choices_for_moving(
+                    self.path(), _MoveType(what)
+                )
             )
 
         for folder_path, folder in folder_tree().all_folders().items():
@@ -1907,7 +2143,8 @@ class Folder(FolderProtocol):
         return permitted_groups, host_contact_groups, cgconf.get("use_for_services", False)
 
     def find_host_recursively(self, host_name: HostName) -> Host | None:
-        host: Host | None = self.host(host_name)
+        # Avoid loading the hosts of all the folders not containing the host
+        host: Host | None = self.host(host_name) if self.has_host(host_name) else None
         if host:
             return host
 
@@ -2711,8 +2948,9 @@ class FolderLookupCache:
     def build(self) -> None:
         store.acquire_lock(self._path())
         folder_lookup = {}
-        for host_name, host in self._folder_tree.root_folder().all_hosts_recursively().items():
-            folder_lookup[host_name] = host.folder().path()
+        for folder in self._folder_tree.root_folder().subfolders_recursively():
+            for host_name in folder.host_names():
+                folder_lookup[host_name] = folder.path()
         self._save(folder_lookup)
 
     def _save(self, folder_lookup: Mapping[HostName, str]) -> None:
@@ -50,9 +50,9 @@ from cmk.gui.watolib.hosts_and_folders import (
     Folder,
     folder_from_request,
     folder_tree,
-    get_wato_redis_client,
+    get_folder_metadata_cache,
     Host,
-    may_use_redis,
+    may_use_folder_metadata_cache,
 )
 from cmk.gui.watolib.objref import ObjectRef, ObjectRefType
 from cmk.gui.watolib.rulespecs import Rulespec, rulespec_group_registry, rulespec_registry
@@ -427,8 +427,8 @@ class RulesetCollection:
                 add_header=not active_config.wato_use_git,
             )
         finally:
-            if may_use_redis():
-                get_wato_redis_client(folder.tree).folder_updated(folder.filesystem_path())
+            if may_use_folder_metadata_cache():
+                get_folder_metadata_cache(folder.tree).folder_updated(folder.filesystem_path())
 
     def exists(self, name: RulesetName) -> bool:
         return name in self._rulesets
@@ -448,8 +448,8 @@ class RulesetCollection:
 
 class AllRulesets(RulesetCollection):
     def _load_rulesets_recursively(self, folder: Folder) -> None:
-        if may_use_redis():
-            self._load_rulesets_via_redis(folder)
+        if may_use_folder_metadata_cache():
+            self._load_rulesets_via_folder_metadata_cache(folder)
             return
 
         for subfolder in folder.subfolders():
@@ -457,13 +457,13 @@ class AllRulesets(RulesetCollection):
 
         self._load_folder_rulesets(folder)
 
-    def _load_rulesets_via_redis(self, folder: Folder) -> None:
+    def _load_rulesets_via_folder_metadata_cache(self, folder: Folder) -> None:
         tree = folder_tree()
         # Search relevant folders with rules.mk files
         # Note: The sort order of the folders does not matter here
         #       self._load_folder_rulesets ultimately puts each folder into a dict
         #       and groups/sorts them later on with a different mechanism
-        all_folders = get_wato_redis_client(tree).recursive_subfolders_for_path(
+        all_folders = get_folder_metadata_cache(tree).recursive_subfolders_for_path(
             f"{folder.path()}/".lstrip("/")
         )
 
@@ -504,8 +504,8 @@ class SingleRulesetRecursively(RulesetCollection):
     def _load_rulesets_recursively(self, folder: Folder, only_varname: RulesetName) -> None:
         # Copy/paste from AllRulesets
 
-        if may_use_redis():
-            self._load_rulesets_via_redis(folder, only_varname)
+        if may_use_folder_metadata_cache():
+            self._load_rulesets_via_folder_metadata_cache(folder, only_varname)
             return
 
         for subfolder in folder.subfolders():
@@ -513,7 +513,9 @@ class SingleRulesetRecursively(RulesetCollection):
 
         self._load_folder_rulesets(folder, only_varname)
 
-    def _load_rulesets_via_redis(self, folder: Folder, only_varname: RulesetName) -> None:
+    def _load_rulesets_via_folder_metadata_cache(
+        self, folder: Folder, only_varname: RulesetName
+    ) -> None:
         # Copy/paste from AllRulesets
 
         tree = folder_tree()
@@ -521,7 +523,7 @@ class SingleRulesetRecursively(RulesetCollection):
         # Note: The sort order of the folders does not matter here
         #       self._load_folder_rulesets ultimately puts each folder into a dict
         #       and groups/sorts them later on with a different mechanism
-        all_folders = get_wato_redis_client(tree).recursive_subfolders_for_path(
+        all_folders = get_folder_metadata_cache(tree).recursive_subfolders_for_path(
             f"{folder.path()}/".lstrip("/")
         )
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from collections.abc import Callable, Iterator, Sequence
+from logging import Logger
+from pathlib import Path
+
+import cmk.utils.paths
+from cmk.utils.structured_data import convert_tree_file, create_tree_pickle
+
+from cmk.update_config.registry import update_action_registry, UpdateAction
+from cmk.update_config.update_state import UpdateActionState
+
+
+class ConvertInventoryTrees(UpdateAction):
+    """
+    Create the pickles of the inventory trees and convert their archive to the compact tree format.
+
+    Trees in the former format can still be read, converting them once saves parsing
+    them again and again.
+    """
+
+    def __call__(self, logger: Logger, update_action_state: UpdateActionState) -> None:
+        num_converted = self.convert_tree_files(
+            [
+                Path(cmk.utils.paths.inventory_output_dir),
+                Path(cmk.utils.paths.status_data_dir),
+            ],
+            Path(cmk.utils.paths.inventory_archive_dir),
+        )
+        logger.debug("Converted %d inventory trees", num_converted)
+
+    @staticmethod
+    def convert_tree_files(tree_dirs: Sequence[Path], archive_dir: Path) -> int:
+        num_converted = 0
+        for convert, tree_file in _tree_files(tree_dirs, archive_dir):
+            try:
+                num_converted += convert(tree_file)
+            except (ValueError, SyntaxError, UnicodeDecodeError):
+                continue  # Leave unreadable trees untouched
+        return num_converted
+
+
+def _tree_files(
+    tree_dirs: Sequence[Path], archive_dir: Path
+) -> Iterator[tuple[Callable[[Path], bool], Path]]:
+    for tree_dir in tree_dirs:
+        if tree_dir.exists():
+            # The gzipped trees are read by Livestatus and keep their format
+            yield from (
+                (create_tree_pickle, p)
+                for p in tree_dir.iterdir()
+                if p.is_file() and not p.name.startswith(".") and p.suffix not in (".gz", ".pkl")
+            )
+    if archive_dir.exists():
+        yield from ((convert_tree_file, p) for p in archive_dir.glob("*/*") if p.is_file())
+
+
+update_action_registry.register(
+    ConvertInventoryTrees(
+        name="convert_inventory_trees",
+        title="Convert inventory trees",
+        sort_index=101,  # can run whenever
+    )
+)
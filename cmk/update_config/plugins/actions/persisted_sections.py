@@ -4,10 +4,13 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 import os
 from logging import Logger
+from pathlib import Path
 
 import cmk.utils.store as store
 from cmk.utils.paths import var_dir
 
+from cmk.fetchers.cache import SectionStore
+
 from cmk.update_config.registry import update_action_registry, UpdateAction
 from cmk.update_config.update_state import UpdateActionState
 
@@ -46,3 +49,29 @@ update_action_registry.register(
         sort_index=41,
     )
 )
+
+
+class ConvertPersistedSectionsToBinary(UpdateAction):
+    """Rewrite the pickled persisted sections in the binary format of the SectionStore
+
+    Unconverted files are still read, but only rewritten once their sections change."""
+
+    def __call__(self, logger: Logger, update_action_state: UpdateActionState) -> None:
+        for subdir in ("persisted", "persisted_sections"):
+            for path in Path(var_dir, subdir).rglob("*"):
+                if not path.is_file():
+                    continue
+                try:
+                    section_store = SectionStore[object](path, logger=logger)
+                    section_store.store(section_store.load())
+                except Exception as e:
+                    logger.warning(f"Skipping conversion of {path}: {e}")
+
+
+update_action_registry.register(
+    ConvertPersistedSectionsToBinary(
+        name="persisted_sections_binary",
+        title="Convert persisted sections to binary format",
+        sort_index=42,
+    )
+)
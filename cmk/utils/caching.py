@@ -7,14 +7,18 @@
 from __future__ import annotations
 
 import collections
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Iterator, MutableMapping
 from functools import lru_cache, wraps
-from typing import ParamSpec, TypeVar
+from typing import Any, Final, NamedTuple, ParamSpec, TypeVar
 
 import cmk.utils.misc
 
 P = ParamSpec("P")
 R = TypeVar("R")
+K = TypeVar("K")
+V = TypeVar("V")
+C = TypeVar("C", bound="DictCache | LRUCache")
 
 
 # Used as decorator wrapper for functools.lru_cache in order to bind the cache to an instance method
@@ -43,13 +47,30 @@ def instance_method_lru_cache(
 
 class CacheManager:
     def __init__(self) -> None:
-        self._caches: dict[str, DictCache] = collections.defaultdict(DictCache)
+        self._caches: dict[str, DictCache | LRUCache] = {}
 
     def __contains__(self, name: str) -> bool:
         return name in self._caches
 
     def get(self, name: str) -> DictCache:
-        return self._caches[name]
+        return self._get_or_create(name, DictCache, DictCache)
+
+    def get_lru(self, name: str, maxsize: int) -> LRUCache:
+        """Get a cache holding at most maxsize entries"""
+        return self._get_or_create(name, LRUCache, lambda: LRUCache(maxsize))
+
+    def get_ttl(self, name: str, maxsize: int, ttl: float) -> TTLCache:
+        """Get a cache holding at most maxsize entries for ttl seconds each"""
+        return self._get_or_create(name, TTLCache, lambda: TTLCache(maxsize, ttl))
+
+    def _get_or_create(self, name: str, cache_type: type[C], create: Callable[[], C]) -> C:
+        if (cache := self._caches.get(name)) is None:
+            cache = self._caches[name] = create()
+        if not isinstance(cache, cache_type):
+            raise TypeError(
+                f"Cache {name!r} is a {type(cache).__name__}, not a {cache_type.__name__}"
+            )
+        return cache
 
     def clear(self) -> None:
         self._caches.clear()
@@ -59,7 +80,20 @@ class CacheManager:
             cache.clear()
 
     def dump_sizes(self) -> dict[str, int]:
-        return {name: cmk.utils.misc.total_size(cache) for name, cache in self._caches.items()}
+        return {
+            name: cache.memory_size()
+            if isinstance(cache, LRUCache)
+            else cmk.utils.misc.total_size(cache)
+            for name, cache in self._caches.items()
+        }
+
+    def dump_stats(self) -> dict[str, CacheStats]:
+        """The usage statistics of the bounded caches"""
+        return {
+            name: cache.stats()
+            for name, cache in self._caches.items()
+            if isinstance(cache, LRUCache)
+        }
 
 
 class DictCache(dict):
@@ -86,6 +120,112 @@ class DictCache(dict):
         self.set_not_populated()
 
 
+class CacheStats(NamedTuple):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class LRUCache(MutableMapping[K, V]):
+    """A cache holding at most maxsize entries
+
+    Once the cache is full, the least recently used entry is evicted. Lookups are
+    counted as hits or misses, membership tests (`key in cache`) are not.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError(maxsize)
+        self.maxsize: Final = maxsize
+        self._data: collections.OrderedDict[K, V] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, key: K) -> V:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._evict(next(iter(self._data)))
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self, key: K) -> None:
+        del self[key]
+        self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(len(self), self.maxsize, self.hits, self.misses, self.evictions)
+
+    def memory_size(self) -> int:
+        return cmk.utils.misc.total_size(self._data)
+
+
+class TTLCache(LRUCache[K, V]):
+    """A LRU cache whose entries expire ttl seconds after they have been stored
+
+    Expired entries are evicted on lookup or once the cache is full."""
+
+    def __init__(
+        self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        super().__init__(maxsize)
+        self.ttl: Final = ttl
+        self._timer: Final = timer
+        self._expires: dict[K, float] = {}
+
+    def __getitem__(self, key: K) -> V:
+        if self._is_expired(key):
+            self._evict(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._expires[key] = self._timer() + self.ttl
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: K) -> None:
+        super().__delitem__(key)
+        del self._expires[key]
+
+    def __contains__(self, key: object) -> bool:
+        return super().__contains__(key) and not self._is_expired(key)
+
+    def _is_expired(self, key: Any) -> bool:
+        return (expires := self._expires.get(key)) is not None and expires <= self._timer()
+
+    def clear(self) -> None:
+        super().clear()
+        self._expires.clear()
+
+    def memory_size(self) -> int:
+        return super().memory_size() + cmk.utils.misc.total_size(self._expires)
+
+
 # This cache manager holds all caches that rely on the configuration
 # and have to be flushed once the configuration is reloaded in the
 # keepalive mode
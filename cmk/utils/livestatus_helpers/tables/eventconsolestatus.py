@@ -206,6 +206,20 @@ class Eventconsolestatus(Table):
     )
     """The number of message overflows, i.e. messages simply dropped due to an overflow of the Event Console"""
 
+    status_queue_drops = Column(
+        'status_queue_drops',
+        col_type='int',
+        description='The number of messages dropped because the processing queue was full',
+    )
+    """The number of messages dropped because the processing queue was full"""
+
+    status_queue_length = Column(
+        'status_queue_length',
+        col_type='int',
+        description='The number of messages waiting in the processing queue',
+    )
+    """The number of messages waiting in the processing queue"""
+
     status_replication_last_sync = Column(
         'status_replication_last_sync',
         col_type='time',
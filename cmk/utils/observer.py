@@ -11,7 +11,7 @@ from typing import Final
 
 import cmk.utils.misc
 import cmk.utils.render as render
-from cmk.utils.caching import config_cache, runtime_cache
+from cmk.utils.caching import CacheStats, config_cache, runtime_cache
 from cmk.utils.log import VERBOSE
 
 __all__ = [
@@ -125,12 +125,28 @@ class AbstractMemoryObserver(ABCResourceObserver):
             ("RUNTIME CACHE", runtime_cache),
         ]:
             self._dump("APPROXIMATE SIZES: %s" % title, module.dump_sizes(), None)
+            self._dump_stats("STATISTICS: %s" % title, module.dump_stats())
 
     def _dump(self, header: str, sizes: dict[str, int], limit: int | None) -> None:
         self._warning("=== %s ====" % header)
         for varname, size_bytes in sorted(sizes.items(), key=lambda x: x[1], reverse=True)[:limit]:
             self._warning("%10s %s" % (render.fmt_bytes(size_bytes), varname))
 
+    def _dump_stats(self, header: str, stats: dict[str, CacheStats]) -> None:
+        self._warning("=== %s ====" % header)
+        for name, cache_stats in sorted(stats.items()):
+            self._warning(
+                "%s: %d/%d entries, %d hits, %d misses, %d evictions"
+                % (
+                    name,
+                    cache_stats.size,
+                    cache_stats.maxsize,
+                    cache_stats.hits,
+                    cache_stats.misses,
+                    cache_stats.evictions,
+                )
+            )
+
 
 class FetcherMemoryObserver(AbstractMemoryObserver):
     """Controls usage of the memory by the Fetcher.
@@ -7,13 +7,15 @@ import errno
 import logging
 import os
 import tempfile
-from collections.abc import Container, Iterable, Iterator, Mapping, Sequence
+import time
+from collections.abc import Callable, Container, Iterable, Iterator, Mapping, Sequence
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Final, NamedTuple
 
 import cmk.utils
+import cmk.utils.debug
 import cmk.utils.paths
 import cmk.utils.store as store
 from cmk.utils.agentdatatype import AgentRawData
@@ -65,6 +67,9 @@ _PiggybackTimeSettingsMap = Mapping[tuple[str | None, str], int]
 # "source_hostname":
 # - Path(tmp/check_mk/piggyback/HOST/SOURCE).name
 # - Path(tmp/check_mk/piggyback_sources/SOURCE).name
+#
+# "piggyback_index":
+# - tmp/check_mk/piggyback/.index
 
 
 def get_piggyback_raw_data(
@@ -145,14 +150,18 @@ def get_source_and_piggyback_hosts(
 ) -> Iterator[tuple[HostName, HostName]]:
     """Generates all piggyback pig/piggybacked host pairs that have up-to-date data"""
 
-    for piggybacked_host_folder in _get_piggybacked_host_folders():
+    index = _load_index()
+    status_file_mtimes: dict[HostName, float | None] = {}
+    for piggybacked_hostname in index.files:
         for file_info in _get_piggyback_processed_file_infos(
-            HostName(piggybacked_host_folder.name),
+            piggybacked_hostname,
             time_settings,
+            index=index,
+            status_file_mtimes=status_file_mtimes,
         ):
             if not file_info.successfully_processed:
                 continue
-            yield HostName(file_info.source_hostname), HostName(piggybacked_host_folder.name)
+            yield HostName(file_info.source_hostname), piggybacked_hostname
 
 
 def has_piggyback_raw_data(
@@ -228,26 +237,65 @@ class _TimeSettingsMap:
 def _get_piggyback_processed_file_infos(
     piggybacked_hostname: HostName | HostAddress,
     time_settings: PiggybackTimeSettings,
+    *,
+    index: "_PiggybackIndex | None" = None,
+    status_file_mtimes: dict[HostName, float | None] | None = None,
 ) -> Sequence[PiggybackFileInfo]:
     """Gather a list of piggyback files to read for further processing.
 
+    The files and their modification times are taken from the piggyback index,
+    so no directory has to be listed. Only the status files of the sources are stat'ed.
+
     Please note that there may be multiple parallel calls executing the
     _get_piggyback_processed_file_infos(), store_piggyback_raw_data() or cleanup_piggyback_files()
     functions. Therefor all these functions needs to deal with suddenly vanishing or
     updated files/directories.
     """
-    source_hostnames = get_source_hostnames(piggybacked_hostname)
-    expanded_time_settings = _TimeSettingsMap(source_hostnames, piggybacked_hostname, time_settings)
-    return [
-        _get_piggyback_processed_file_info(
-            source_hostname,
-            piggybacked_hostname=piggybacked_hostname,
-            piggyback_file_path=_get_piggybacked_file_path(source_hostname, piggybacked_hostname),
-            settings=expanded_time_settings,
+    if index is None:
+        index = _load_index()
+    if status_file_mtimes is None:
+        status_file_mtimes = {}
+    file_mtimes = index.files.get(piggybacked_hostname, {})
+    expanded_time_settings = _TimeSettingsMap(file_mtimes, piggybacked_hostname, time_settings)
+    file_infos = []
+    for source_hostname, indexed_mtime in file_mtimes.items():
+        piggyback_file_path = _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
+        if source_hostname not in status_file_mtimes:
+            status_file_mtimes[source_hostname] = _get_status_file_mtime(source_hostname)
+        status_file_mtime = status_file_mtimes[source_hostname]
+        try:
+            file_mtime = _get_file_mtime(piggyback_file_path, indexed_mtime, status_file_mtime)
+        except FileNotFoundError:
+            file_infos.append(
+                PiggybackFileInfo(
+                    source_hostname, piggyback_file_path, False, "Piggyback file is missing", 0
+                )
+            )
+            continue
+        file_infos.append(
+            _get_piggyback_processed_file_info(
+                source_hostname,
+                piggybacked_hostname=piggybacked_hostname,
+                piggyback_file_path=piggyback_file_path,
+                file_mtime=file_mtime,
+                status_file_mtime=status_file_mtime,
+                settings=expanded_time_settings,
+            )
         )
-        for source_hostname in source_hostnames
-        if not source_hostname.startswith(".")
-    ]
+    return file_infos
+
+
+def _get_file_mtime(
+    piggyback_file_path: Path,
+    indexed_mtime: float | None,
+    status_file_mtime: float | None,
+) -> float:
+    if indexed_mtime is not None:
+        return indexed_mtime
+    if status_file_mtime is not None:
+        return status_file_mtime
+    # The status file has vanished before the index has been updated
+    return _get_mtime(piggyback_file_path)
 
 
 def _get_piggyback_processed_file_info(
@@ -255,14 +303,11 @@ def _get_piggyback_processed_file_info(
     *,
     piggybacked_hostname: HostName | HostAddress,
     piggyback_file_path: Path,
+    file_mtime: float,
+    status_file_mtime: float | None,
     settings: _TimeSettingsMap,
 ) -> PiggybackFileInfo:
-    try:
-        file_age = cmk.utils.cachefile_age(piggyback_file_path)
-    except FileNotFoundError:
-        return PiggybackFileInfo(
-            source_hostname, piggyback_file_path, False, "Piggyback file is missing", 0
-        )
+    file_age = time.time() - file_mtime
 
     if (outdated := file_age - settings.max_cache_age(source_hostname, piggybacked_hostname)) > 0:
         return PiggybackFileInfo(
@@ -276,8 +321,7 @@ def _get_piggyback_processed_file_info(
     validity_period = settings.validity_period(source_hostname, piggybacked_hostname)
     validity_state = settings.validity_state(source_hostname, piggybacked_hostname)
 
-    status_file_path = _get_source_status_file_path(source_hostname)
-    if not status_file_path.exists():
+    if status_file_mtime is None:
         valid_msg = _validity_period_message(file_age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
@@ -287,7 +331,7 @@ def _get_piggyback_processed_file_info(
             validity_state if valid_msg else 0,
         )
 
-    if _is_piggyback_file_outdated(status_file_path, piggyback_file_path):
+    if status_file_mtime > file_mtime:
         valid_msg = _validity_period_message(file_age, validity_period)
         return PiggybackFileInfo(
             source_hostname,
@@ -315,20 +359,6 @@ def _validity_period_message(
     return f" (still valid, {Age(time_left)} left)"
 
 
-def _is_piggyback_file_outdated(
-    status_file_path: Path,
-    piggyback_file_path: Path,
-) -> bool:
-    try:
-        # TODO use Path.stat() but be aware of:
-        # On POSIX platforms Python reads atime and mtime at nanosecond resolution
-        # but only writes them at microsecond resolution.
-        # (We're using os.utime() in _store_status_file_of())
-        return os.stat(str(status_file_path))[8] > os.stat(str(piggyback_file_path))[8]
-    except FileNotFoundError:
-        return True
-
-
 def _remove_piggyback_file(piggyback_file_path: Path) -> bool:
     try:
         piggyback_file_path.unlink()
@@ -340,8 +370,10 @@ def _remove_piggyback_file(piggyback_file_path: Path) -> bool:
 def remove_source_status_file(source_hostname: HostName) -> bool:
     """Remove the source_status_file of this piggyback host which will
     mark the piggyback data from this source as outdated."""
-    source_status_path = _get_source_status_file_path(source_hostname)
-    return _remove_piggyback_file(source_status_path)
+    if _load_index().has_latest_files_of(source_hostname):
+        # The files need their own modification times as soon as the status file is gone
+        _update_index(lambda index: index.freeze(source_hostname))
+    return _remove_piggyback_file(_get_source_status_file_path(source_hostname))
 
 
 def store_piggyback_raw_data(
@@ -369,6 +401,14 @@ def store_piggyback_raw_data(
     if piggybacked_raw_data:
         logger.log(VERBOSE, "Received piggyback data for %d hosts", len(piggybacked_raw_data))
 
+        # Usually a source sends data for the same hosts every time. The index is only updated
+        # if this changes, and before the status file is updated: The files not updated this
+        # time must not take the new modification time of the status file.
+        if not _load_index().are_latest_files_of(source_hostname, piggybacked_raw_data):
+            _update_index(
+                lambda index: index.set_latest_files(source_hostname, piggybacked_raw_data)
+            )
+
         status_file_path = _get_source_status_file_path(source_hostname)
         _store_status_file_of(status_file_path, piggyback_file_paths)
     else:
@@ -380,6 +420,7 @@ def _store_status_file_of(
     status_file_path: Path,
     piggyback_file_paths: Iterable[Path],
 ) -> None:
+    """Create the status file and set the mtime of the piggyback files to its mtime"""
     store.makedirs(status_file_path.parent)
 
     # Cannot use store.save_bytes_to_file like:
@@ -422,15 +463,15 @@ def _store_status_file_of(
 def get_source_hostnames(
     piggybacked_hostname: HostName | HostAddress | None = None,
 ) -> Sequence[HostName]:
+    index = _load_index()
     if piggybacked_hostname is None:
         return [
-            HostName(source_host.name)
-            for piggybacked_host_folder in _get_piggybacked_host_folders()
-            for source_host in _files_in(piggybacked_host_folder)
+            source_hostname
+            for file_mtimes in index.files.values()
+            for source_hostname in file_mtimes
         ]
 
-    piggybacked_host_folder = cmk.utils.paths.piggyback_dir / Path(piggybacked_hostname)
-    return [HostName(source_host.name) for source_host in _files_in(piggybacked_host_folder)]
+    return list(index.files.get(piggybacked_hostname, {}))
 
 
 def _get_piggybacked_host_folders() -> Sequence[Path]:
@@ -452,6 +493,13 @@ def _get_source_status_file_path(source_hostname: HostName) -> Path:
     return cmk.utils.paths.piggyback_source_dir / str(source_hostname)
 
 
+def _get_status_file_mtime(source_hostname: HostName) -> float | None:
+    try:
+        return _get_mtime(_get_source_status_file_path(source_hostname))
+    except FileNotFoundError:
+        return None
+
+
 def _get_piggybacked_file_path(
     source_hostname: HostName,
     piggybacked_hostname: HostName | HostAddress,
@@ -459,6 +507,192 @@ def _get_piggybacked_file_path(
     return cmk.utils.paths.piggyback_dir / piggybacked_hostname / source_hostname
 
 
+# .
+#   .--index---------------------------------------------------------------.
+#   |                        _           _                                 |
+#   |                       (_)_ __   __| | _____  __                      |
+#   |                       | | '_ \ / _` |/ _ \ \/ /                      |
+#   |                       | | | | | (_| |  __/>  <                       |
+#   |                       |_|_| |_|\__,_|\___/_/\_\                      |
+#   |                                                                      |
+#   '----------------------------------------------------------------------'
+
+
+@dataclass
+class _PiggybackIndex:
+    """The known piggyback files with their modification times
+
+    The index saves the readers from listing the piggyback directories and stat'ing every
+    single piggyback file. The files written by the latest store of a source have the
+    modification time of its status file. Their modification time is not kept in the index,
+    so the index only has to be updated if a source sends data for other hosts than the
+    last time, and not every time piggyback data is stored.
+    """
+
+    # piggybacked hostname -> source hostname -> mtime of the piggyback file,
+    # None for the files written by the latest store of the source
+    files: dict[HostName, dict[HostName, float | None]] = field(default_factory=dict)
+
+    def are_latest_files_of(
+        self,
+        source_hostname: HostName,
+        piggybacked_hostnames: Iterable[HostName],
+    ) -> bool:
+        """Whether the given hosts are exactly the ones of the latest store of the source"""
+        return self._latest_files_of(source_hostname) == set(piggybacked_hostnames)
+
+    def has_latest_files_of(self, source_hostname: HostName) -> bool:
+        return bool(self._latest_files_of(source_hostname))
+
+    def _latest_files_of(self, source_hostname: HostName) -> set[HostName]:
+        return {
+            piggybacked_hostname
+            for piggybacked_hostname, file_mtimes in self.files.items()
+            if source_hostname in file_mtimes and file_mtimes[source_hostname] is None
+        }
+
+    def set_latest_files(
+        self,
+        source_hostname: HostName,
+        piggybacked_hostnames: Iterable[HostName],
+    ) -> None:
+        self.freeze(source_hostname)
+        for piggybacked_hostname in piggybacked_hostnames:
+            self.files.setdefault(piggybacked_hostname, {})[source_hostname] = None
+
+    def freeze(self, source_hostname: HostName) -> None:
+        """Keep the modification times of the latest files of the source in the index"""
+        for piggybacked_hostname, file_mtimes in list(self.files.items()):
+            if source_hostname not in file_mtimes or file_mtimes[source_hostname] is not None:
+                continue
+            try:
+                file_mtimes[source_hostname] = _get_mtime(
+                    _get_piggybacked_file_path(source_hostname, piggybacked_hostname)
+                )
+            except FileNotFoundError:
+                self.discard(source_hostname, piggybacked_hostname)
+
+    def discard(self, source_hostname: HostName, piggybacked_hostname: HostName) -> None:
+        file_mtimes = self.files.get(piggybacked_hostname, {})
+        file_mtimes.pop(source_hostname, None)
+        if not file_mtimes:
+            self.files.pop(piggybacked_hostname, None)
+
+    def rename(self, old_hostname: HostName, new_hostname: HostName) -> None:
+        """Follow the renaming of the piggyback files of a host
+
+        The piggyback files of the renamed host replace the ones of the new name, both as
+        piggybacked host and as source. The status file of a source is not renamed, so the
+        files it has sent keep their own modification times.
+        """
+        self.files.pop(new_hostname, None)
+        if (file_mtimes := self.files.pop(old_hostname, None)) is not None:
+            self.files[new_hostname] = file_mtimes
+
+        for piggybacked_hostname, file_mtimes in list(self.files.items()):
+            file_mtimes.pop(new_hostname, None)
+            if old_hostname not in file_mtimes:
+                if not file_mtimes:
+                    del self.files[piggybacked_hostname]
+                continue
+            del file_mtimes[old_hostname]
+            with suppress(FileNotFoundError):
+                file_mtimes[new_hostname] = _get_mtime(
+                    _get_piggybacked_file_path(new_hostname, piggybacked_hostname)
+                )
+            if not file_mtimes:
+                del self.files[piggybacked_hostname]
+
+
+_index_cache: tuple[tuple[Path, int, int, int], _PiggybackIndex] | None = None
+
+
+def rebuild_piggyback_index() -> None:
+    """Recreate the piggyback index from the files in the piggyback directories
+
+    Only needed in case the piggyback directories have been modified without using
+    the functions of this module."""
+    _update_index(lambda index: None, rebuild=True)
+
+
+def rename_host_in_piggyback_index(old_hostname: HostName, new_hostname: HostName) -> None:
+    """Update the piggyback index after the piggyback files of a host have been renamed"""
+    _update_index(lambda index: index.rename(old_hostname, new_hostname))
+
+
+def _load_index() -> _PiggybackIndex:
+    """Read the piggyback index
+
+    In case there is no (valid) index yet, the piggyback directories are scanned instead.
+    The index will then be created by the next update of the piggyback data.
+    """
+    global _index_cache
+
+    index_file_path = _get_index_file_path()
+    try:
+        stat = index_file_path.stat()
+    except FileNotFoundError:
+        return _scan_piggyback_files()
+
+    signature = (index_file_path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _index_cache is not None and _index_cache[0] == signature:
+        return _index_cache[1]
+
+    if (index := _read_index(index_file_path)) is None:
+        return _scan_piggyback_files()
+
+    _index_cache = (signature, index)
+    return index
+
+
+def _update_index(
+    update: Callable[[_PiggybackIndex], object],
+    *,
+    rebuild: bool = False,
+) -> None:
+    index_file_path = _get_index_file_path()
+    with store.locked(index_file_path):
+        index = None if rebuild else _read_index(index_file_path)
+        if index is None:
+            index = _scan_piggyback_files()
+        update(index)
+        store.save_object_to_pickle_file(index_file_path, index)
+
+
+def _read_index(index_file_path: Path) -> _PiggybackIndex | None:
+    try:
+        index = store.load_object_from_pickle_file(index_file_path, default=None)
+    except Exception:
+        if cmk.utils.debug.enabled():
+            raise
+        logger.log(VERBOSE, "Cannot read piggyback index '%s'", index_file_path)
+        return None
+    return index if isinstance(index, _PiggybackIndex) else None
+
+
+def _scan_piggyback_files() -> _PiggybackIndex:
+    index = _PiggybackIndex()
+    for piggybacked_host_folder in _get_piggybacked_host_folders():
+        for piggybacked_host_source in _files_in(piggybacked_host_folder):
+            with suppress(FileNotFoundError):
+                index.files.setdefault(HostName(piggybacked_host_folder.name), {})[
+                    HostName(piggybacked_host_source.name)
+                ] = _get_mtime(piggybacked_host_source)
+
+    return index
+
+
+def _get_mtime(path: Path) -> float:
+    # Only use full seconds: On POSIX platforms Python reads atime and mtime at nanosecond
+    # resolution but only writes them at microsecond resolution (We're using os.utime() in
+    # _store_status_file_of()).
+    return float(int(path.stat().st_mtime))
+
+
+def _get_index_file_path() -> Path:
+    return cmk.utils.paths.piggyback_dir / ".index"
+
+
 # .
 #   .--clean up------------------------------------------------------------.
 #   |                     _                                                |
@@ -484,61 +718,60 @@ def cleanup_piggyback_files(time_settings: PiggybackTimeSettings) -> None:
         time_settings,
     )
 
-    piggybacked_hosts_settings = _get_piggybacked_hosts_settings(time_settings)
+    _update_index(lambda index: _cleanup_piggyback_files_of(index, time_settings))
 
-    _cleanup_old_source_status_files(piggybacked_hosts_settings)
-    _cleanup_old_piggybacked_files(piggybacked_hosts_settings)
+
+def _cleanup_piggyback_files_of(
+    index: _PiggybackIndex,
+    time_settings: PiggybackTimeSettings,
+) -> None:
+    piggybacked_hosts_settings = _get_piggybacked_hosts_settings(index, time_settings)
+
+    _cleanup_old_source_status_files(index, piggybacked_hosts_settings)
+    _cleanup_old_piggybacked_files(index, piggybacked_hosts_settings)
 
 
 def _get_piggybacked_hosts_settings(
+    index: _PiggybackIndex,
     time_settings: PiggybackTimeSettings,
-) -> Sequence[tuple[Path, Sequence[Path], _TimeSettingsMap]]:
-    piggybacked_hosts_settings = []
-    for piggybacked_host_folder in _get_piggybacked_host_folders():
-        source_hosts = _files_in(piggybacked_host_folder)
-        time_settings_map = _TimeSettingsMap(
-            [HostName(source_host.name) for source_host in source_hosts],
-            HostName(piggybacked_host_folder.name),
-            time_settings,
-        )
-        piggybacked_hosts_settings.append(
-            (piggybacked_host_folder, source_hosts, time_settings_map)
-        )
-    return piggybacked_hosts_settings
+) -> Mapping[HostName, _TimeSettingsMap]:
+    return {
+        piggybacked_hostname: _TimeSettingsMap(file_mtimes, piggybacked_hostname, time_settings)
+        for piggybacked_hostname, file_mtimes in index.files.items()
+    }
 
 
 def _cleanup_old_source_status_files(
-    piggybacked_hosts_settings: Iterable[tuple[Path, Iterable[Path], _TimeSettingsMap]]
+    index: _PiggybackIndex,
+    piggybacked_hosts_settings: Mapping[HostName, _TimeSettingsMap],
 ) -> None:
     """Remove source status files which exceed configured maximum cache age.
     There may be several 'Piggybacked Host Files' rules where the max age is configured.
     We simply use the greatest one per source."""
 
     max_cache_age_by_sources: dict[str, int] = {}
-    for piggybacked_host_folder, source_hosts, time_settings in piggybacked_hosts_settings:
-        for source_host in source_hosts:
-            max_cache_age = time_settings.max_cache_age(
-                HostName(source_host.name),
-                HostName(piggybacked_host_folder.name),
-            )
+    for piggybacked_hostname, time_settings in piggybacked_hosts_settings.items():
+        for source_hostname in index.files[piggybacked_hostname]:
+            max_cache_age = time_settings.max_cache_age(source_hostname, piggybacked_hostname)
 
-            max_cache_age_of_source = max_cache_age_by_sources.get(source_host.name)
+            max_cache_age_of_source = max_cache_age_by_sources.get(source_hostname)
             if max_cache_age_of_source is None or max_cache_age_of_source <= max_cache_age:
-                max_cache_age_by_sources[source_host.name] = max_cache_age
+                max_cache_age_by_sources[source_hostname] = max_cache_age
 
     for source_state_file in _get_source_state_files():
+        source_hostname = HostName(source_state_file.name)
         try:
-            file_age = cmk.utils.cachefile_age(source_state_file)
+            file_age = time.time() - _get_mtime(source_state_file)
         except FileNotFoundError:
             continue  # File has been removed, that's OK.
 
         # No entry -> no file
-        max_cache_age_of_source = max_cache_age_by_sources.get(source_state_file.name)
+        max_cache_age_of_source = max_cache_age_by_sources.get(source_hostname)
         if max_cache_age_of_source is None:
             logger.log(
                 VERBOSE,
                 "No piggyback data from source '%s'",
-                source_state_file.name,
+                source_hostname,
             )
             continue
 
@@ -549,20 +782,35 @@ def _cleanup_old_source_status_files(
                 source_state_file,
                 Age(file_age - max_cache_age_of_source),
             )
+            index.freeze(source_hostname)
             _remove_piggyback_file(source_state_file)
 
 
 def _cleanup_old_piggybacked_files(
-    piggybacked_hosts_settings: Iterable[tuple[Path, Iterable[Path], _TimeSettingsMap]]
+    index: _PiggybackIndex,
+    piggybacked_hosts_settings: Mapping[HostName, _TimeSettingsMap],
 ) -> None:
     """Remove piggybacked data files which exceed configured maximum cache age."""
 
-    for piggybacked_host_folder, source_hosts, time_settings in piggybacked_hosts_settings:
-        for piggybacked_host_source in source_hosts:
+    for piggybacked_hostname, time_settings in piggybacked_hosts_settings.items():
+        for source_hostname, indexed_mtime in list(index.files[piggybacked_hostname].items()):
+            piggybacked_host_source = _get_piggybacked_file_path(
+                source_hostname, piggybacked_hostname
+            )
+            status_file_mtime = _get_status_file_mtime(source_hostname)
+            try:
+                file_mtime = _get_file_mtime(
+                    piggybacked_host_source, indexed_mtime, status_file_mtime
+                )
+            except FileNotFoundError:
+                index.discard(source_hostname, piggybacked_hostname)
+                continue
             file_info = _get_piggyback_processed_file_info(
-                HostName(piggybacked_host_source.name),
-                piggybacked_hostname=HostName(piggybacked_host_folder.name),
+                source_hostname,
+                piggybacked_hostname=piggybacked_hostname,
                 piggyback_file_path=piggybacked_host_source,
+                file_mtime=file_mtime,
+                status_file_mtime=status_file_mtime,
                 settings=time_settings,
             )
 
@@ -574,10 +822,17 @@ def _cleanup_old_piggybacked_files(
                     file_info.message,
                 )
                 _remove_piggyback_file(piggybacked_host_source)
+                index.discard(source_hostname, piggybacked_hostname)
+
+        if piggybacked_hostname in index.files:
+            continue
 
         # Remove empty backed host directory
+        piggybacked_host_folder = cmk.utils.paths.piggyback_dir / piggybacked_hostname
         try:
             piggybacked_host_folder.rmdir()
+        except FileNotFoundError:
+            continue
         except OSError as e:
             if e.errno == errno.ENOTEMPTY:
                 continue
@@ -4,7 +4,12 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 
-from ._plugin_interface import estimate_levels, EstimatedLevels, get_predictive_levels
+from ._plugin_interface import (
+    estimate_levels,
+    EstimatedLevels,
+    get_predictive_levels,
+    precompute_predictions,
+)
 from ._prediction import (
     DataStats,
     get_rrd_data,
@@ -37,6 +42,7 @@ __all__ = [
     "PredictionInfo",
     "PredictionStore",
     "PredictionParameters",
+    "precompute_predictions",
     "rrd_timestamps",
     "Seconds",
     "Timegroup",
@@ -6,9 +6,13 @@
 
 import logging
 import time
-from typing import assert_never, Literal
+from pathlib import Path
+from typing import assert_never, Final, Literal
 
+import cmk.utils.debug
+import cmk.utils.paths
 from cmk.utils.log import VERBOSE
+from cmk.utils.store import try_locked
 
 from ._prediction import (
     compute_prediction,
@@ -19,19 +23,47 @@ from ._prediction import (
     PredictionData,
     PredictionInfo,
     PredictionParameters,
+    PredictionRequest,
+    PredictionRequestStore,
     PredictionStore,
     Timegroup,
+    Timestamp,
 )
 
 EstimatedLevels = tuple[float | None, float | None, float | None, float | None]
 
 logger = logging.getLogger("cmk.prediction")
 
+# The predictions of the next slice are computed during this time before the slice begins
+_PRECOMPUTE_LEAD_TIME: Final = 6 * 3600
+
+
+def _has_valid_prediction(
+    store: PredictionStore,
+    timegroup: Timegroup,
+    params: PredictionParameters,
+    now: float,
+) -> bool:
+    if (last_info := store.get_info(timegroup)) is None:
+        return False
+
+    period_info = PREDICTION_PERIODS[params.period]
+    if last_info.time + period_info.valid * period_info.slice < now:
+        logger.log(VERBOSE, "Prediction of %s outdated", timegroup)
+        return False
+
+    if last_info.params != params:
+        logger.log(VERBOSE, "Prediction parameters have changed.")
+        return False
+
+    return True
+
 
 def _get_prediction(
     store: PredictionStore,
     timegroup: Timegroup,
     params: PredictionParameters,
+    now: float,
 ) -> PredictionData | None:
     """Return a valid prediction, if available
 
@@ -41,20 +73,36 @@ def _get_prediction(
     * no prediction for these parameters (time group) has been made yet
     * no prediction data file is found
     """
-    if (last_info := store.get_info(timegroup)) is None:
+    if not _has_valid_prediction(store, timegroup, params, now):
         return None
 
-    period_info = PREDICTION_PERIODS[params.period]
-    now = time.time()
-    if last_info.time + period_info.valid * period_info.slice < now:
-        logger.log(VERBOSE, "Prediction of %s outdated", timegroup)
-        return None
+    return store.get_data(timegroup)
 
-    if last_info.params != params:
-        logger.log(VERBOSE, "Prediction parameters have changed.")
-        return None
 
-    return store.get_data(timegroup)
+def _compute_prediction_at(
+    request: PredictionRequest,
+    store: PredictionStore,
+    now: Timestamp,
+) -> PredictionData:
+    period_info = PREDICTION_PERIODS[request.params.period]
+    timegroup, slice_start, slice_end, _rel_time = get_timegroup_relative_time(now, period_info)
+    info = PredictionInfo(
+        name=timegroup,
+        time=now,
+        range=(slice_start, slice_end),
+        cf=request.cf,
+        dsname=request.dsname,
+        slice=period_info.slice,
+        params=request.params,
+    )
+    return compute_prediction(
+        info,
+        store,
+        now,
+        period_info,
+        request.host_name,
+        request.service_description,
+    )
 
 
 # cf: consilidation function (MAX, MIN, AVERAGE)
@@ -72,9 +120,16 @@ def get_predictive_levels(
     now = int(time.time())
     period_info = PREDICTION_PERIODS[params.period]
 
-    timegroup, current_slice_start, current_slice_end, rel_time = get_timegroup_relative_time(
-        now, period_info
+    timegroup, _slice_start, _slice_end, rel_time = get_timegroup_relative_time(now, period_info)
+
+    request = PredictionRequest(
+        host_name=hostname,
+        service_description=service_description,
+        dsname=dsname,
+        cf=cf,
+        params=params,
     )
+    PredictionRequestStore().add(request, now)
 
     prediction_store = PredictionStore(hostname, service_description, dsname)
 
@@ -83,25 +138,10 @@ def get_predictive_levels(
             store=prediction_store,
             timegroup=timegroup,
             params=params,
+            now=now,
         )
     ) is None:
-        info = PredictionInfo(
-            name=timegroup,
-            time=now,
-            range=(current_slice_start, current_slice_end),
-            cf=cf,
-            dsname=dsname,
-            slice=period_info.slice,
-            params=params,
-        )
-        data_for_pred = compute_prediction(
-            info,
-            prediction_store,
-            now,
-            period_info,
-            hostname,
-            service_description,
-        )
+        data_for_pred = _compute_prediction_at(request, prediction_store, now)
 
     # Find reference value in data_for_pred
     index = int(rel_time / data_for_pred.step)
@@ -120,6 +160,63 @@ def get_predictive_levels(
     )
 
 
+def precompute_predictions(now: Timestamp, interval: int) -> None:
+    """Compute the predictions which the checks are going to need until the next run
+
+    This is meant to be run every interval seconds. The predictions of the next slices (e.g.
+    of the next day) are computed during the lead time before the slices begin, spread evenly
+    over the requests, instead of by all checks right after midnight.
+
+    A run is skipped if the previous one is still running.
+    """
+    with try_locked(_precompute_lock_file()) as acquired:
+        if not acquired:
+            logger.info("Predictions are still being computed by the previous run, skipping")
+            return
+
+        for request in PredictionRequestStore().requests(now):
+            try:
+                _precompute_prediction(request, now, interval)
+            except Exception as e:
+                if cmk.utils.debug.enabled():
+                    raise
+                logger.warning(
+                    "Cannot compute prediction of %s/%s/%s: %s",
+                    request.host_name,
+                    request.service_description,
+                    request.dsname,
+                    e,
+                )
+
+
+def _precompute_lock_file() -> Path:
+    return cmk.utils.paths.tmp_dir / "precompute_predictions.lock"
+
+
+def _precompute_prediction(request: PredictionRequest, now: Timestamp, interval: int) -> None:
+    period_info = PREDICTION_PERIODS[request.params.period]
+    store = PredictionStore(request.host_name, request.service_description, request.dsname)
+
+    timegroup, _slice_start, slice_end, _rel_time = get_timegroup_relative_time(now, period_info)
+    if not _has_valid_prediction(store, timegroup, request.params, now + interval):
+        _compute_prediction_at(request, store, now)
+
+    next_timegroup, next_slice_start = get_timegroup_relative_time(slice_end, period_info)[:2]
+    if (
+        next_timegroup != timegroup
+        and now >= next_slice_start - _PRECOMPUTE_LEAD_TIME + _spread(request, interval)
+        and not _has_valid_prediction(
+            store, next_timegroup, request.params, next_slice_start + interval
+        )
+    ):
+        _compute_prediction_at(request, store, next_slice_start)
+
+
+def _spread(request: PredictionRequest, interval: int) -> int:
+    """The offset within the lead time at which the next prediction of the request is computed"""
+    return int(request.key(), 16) % max(_PRECOMPUTE_LEAD_TIME - interval, 1)
+
+
 def estimate_levels(
     *,
     reference_value: float,
@@ -3,8 +3,10 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import hashlib
 import logging
 import math
+import os
 import time
 from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
@@ -21,6 +23,7 @@ import cmk.utils.paths
 from cmk.utils import dateutils
 from cmk.utils.exceptions import MKGeneralException
 from cmk.utils.log import VERBOSE
+from cmk.utils.store import PydanticStore
 
 logger = logging.getLogger("cmk.prediction")
 
@@ -56,6 +59,10 @@ DataStats = list[_DataStat]
 
 _GroupByFunction = Callable[[Timestamp], tuple[Timegroup, Timestamp]]
 
+# Requests are touched at most once in this interval and dropped if not touched in the expiry
+_REQUEST_REFRESH_INTERVAL: Final = 3600
+_REQUEST_EXPIRY: Final = 2 * 86400
+
 
 @dataclass(frozen=True)
 class _RRDResponse:
@@ -313,15 +320,14 @@ def get_rrd_data(
           x---v---v---v---v---y
 
     """
-
-    step = 1
-    rpn = f"{metric_name}.{cf.lower()}"  # "MAX" -> "max"
-    point_range = ":".join(
-        livestatus.lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries)
+    lql = (
+        livestatus_lql(
+            [hostname],
+            [_rrd_column("m1", metric_name, cf, fromtime, untiltime, max_entries)],
+            service_description,
+        )
+        + "OutputFormat: python\n"
     )
-    column = f"rrddata:m1:{rpn}:{point_range}"
-
-    lql = livestatus_lql([hostname], [column], service_description) + "OutputFormat: python\n"
 
     try:
         response = connection.query_value(lql)
@@ -330,6 +336,65 @@ def get_rrd_data(
             raise
         raise MKGeneralException(f"Cannot get historic metrics via Livestatus: {e}")
 
+    return _parse_rrd_response(response)
+
+
+def get_rrd_data_of_slices(
+    connection: livestatus.SingleSiteConnection,
+    hostname: str,
+    service_description: str,
+    metric_name: str,
+    cf: ConsolidationFunctionName,
+    time_slices: Sequence[tuple[Timestamp, Timestamp]],
+    max_entries: int = 400,
+) -> list[_RRDResponse]:
+    """Fetch RRD historic metrics data of a specific service for several time ranges at once
+
+    Same as calling get_rrd_data for each of the time ranges, but with a single Livestatus
+    query: Every time range is fetched by a column of its own.
+    """
+    if not time_slices:
+        return []
+
+    lql = (
+        livestatus_lql(
+            [hostname],
+            [
+                _rrd_column(f"m{index}", metric_name, cf, fromtime, untiltime, max_entries)
+                for index, (fromtime, untiltime) in enumerate(time_slices)
+            ],
+            service_description,
+        )
+        + "OutputFormat: python\n"
+    )
+
+    try:
+        row = connection.query_row(lql)
+    except livestatus.MKLivestatusNotFoundError as e:
+        if cmk.utils.debug.enabled():
+            raise
+        raise MKGeneralException(f"Cannot get historic metrics via Livestatus: {e}")
+
+    return [_parse_rrd_response(response) for response in row]
+
+
+def _rrd_column(
+    name: str,
+    metric_name: str,
+    cf: ConsolidationFunctionName,
+    fromtime: Timestamp,
+    untiltime: Timestamp,
+    max_entries: int,
+) -> str:
+    step = 1
+    rpn = f"{metric_name}.{cf.lower()}"  # "MAX" -> "max"
+    point_range = ":".join(
+        livestatus.lqencode(str(x)) for x in (fromtime, untiltime, step, max_entries)
+    )
+    return f"rrddata:{name}:{rpn}:{point_range}"
+
+
+def _parse_rrd_response(response: livestatus.LivestatusColumn) -> _RRDResponse:
     if response is None:
         raise MKGeneralException("Cannot retrieve historic data with Nagios Core")
 
@@ -370,9 +435,11 @@ class PredictionStore:
         info: PredictionInfo,
         data: PredictionData,
     ) -> None:
+        # The files are replaced atomically and the info file last, so the checks can read them
+        # without locking while they are being recomputed.
         self._dir.mkdir(exist_ok=True, parents=True)
-        self._info_file(info.name).write_text(info.json())
-        self._data_file(info.name).write_text(data.json())
+        PydanticStore(self._data_file(info.name), PredictionData).write_obj(data)
+        PydanticStore(self._info_file(info.name), PredictionInfo).write_obj(info)
 
     def remove_prediction(self, timegroup: Timegroup) -> None:
         self._data_file(timegroup).unlink(missing_ok=True)
@@ -395,6 +462,58 @@ class PredictionStore:
         return None
 
 
+class PredictionRequest(BaseModel, frozen=True):
+    """Everything needed for computing the predictions of a metric"""
+
+    host_name: str
+    service_description: str
+    dsname: str
+    cf: ConsolidationFunctionName
+    params: PredictionParameters
+
+    def key(self) -> str:
+        return hashlib.sha256(self.json().encode("utf-8")).hexdigest()
+
+
+class PredictionRequestStore:
+    """The predictions requested by the checks, which are precomputed off the check path
+
+    Identical requests of several checks are stored in the same file. The file is touched when
+    the request is made again, requests which have not been made for a while are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._dir = Path(cmk.utils.paths.var_dir, "prediction_requests")
+
+    def _request_file(self, request: PredictionRequest) -> Path:
+        return self._dir / f"{request.key()}.json"
+
+    def add(self, request: PredictionRequest, now: float) -> None:
+        file_path = self._request_file(request)
+        try:
+            if file_path.stat().st_mtime < now - _REQUEST_REFRESH_INTERVAL:
+                os.utime(file_path, (now, now))
+            return
+        except FileNotFoundError:
+            pass
+        self._dir.mkdir(exist_ok=True, parents=True)
+        PydanticStore(file_path, PredictionRequest).write_obj(request)
+        os.utime(file_path, (now, now))
+
+    def requests(self, now: float) -> Iterator[PredictionRequest]:
+        for file_path in self._dir.glob("*.json"):
+            try:
+                if file_path.stat().st_mtime < now - _REQUEST_EXPIRY:
+                    logger.log(VERBOSE, "Dropping outdated prediction request %s", file_path.stem)
+                    file_path.unlink(missing_ok=True)
+                    continue
+                yield PredictionRequest.parse_raw(file_path.read_text())
+            except FileNotFoundError:
+                continue
+            except ValueError as e:
+                logger.warning("Cannot read prediction request %s: %s", file_path.stem, e)
+
+
 def compute_prediction(
     info: PredictionInfo,
     prediction_store: PredictionStore,
@@ -404,30 +523,22 @@ def compute_prediction(
     service_description: str,
 ) -> PredictionData:
     logger.log(VERBOSE, "Calculating prediction data for time group %s", info.name)
-    prediction_store.remove_prediction(info.name)
 
     time_windows = _time_slices(now, info.params.horizon * 86400, period_info, info.name)
 
     from_time = time_windows[0][0]
-    rrd_responses = [
-        (
-            get_rrd_data(
-                livestatus.LocalConnection(),
-                hostname,
-                service_description,
-                info.dsname,
-                info.cf,
-                start,
-                end,
-            ),
-            from_time - start,
-        )
-        for start, end in time_windows
-    ]
+    rrd_responses = get_rrd_data_of_slices(
+        livestatus.LocalConnection(),
+        hostname,
+        service_description,
+        info.dsname,
+        info.cf,
+        time_windows,
+    )
 
     raw_slices = [
-        (TimeSeries(list(rrd_response.values), rrd_response.window), offset)
-        for rrd_response, offset in rrd_responses
+        (TimeSeries(list(rrd_response.values), rrd_response.window), from_time - start)
+        for rrd_response, (start, _end) in zip(rrd_responses, time_windows)
     ]
 
     data_for_pred = _calculate_data_for_prediction(raw_slices)
@@ -537,30 +648,50 @@ def _calculate_data_for_prediction(
 ) -> PredictionData:
     twindow, slices = _upsample(raw_slices)
 
+    # The statistics only consist of floats and Nones, so only the other fields are validated.
+    # Skipping the validation of the thousands of points saves more time than computing them takes.
     return PredictionData(
         columns=["average", "min", "max", "stdev"],
-        points=_data_stats(slices),
+        points=[],
         data_twindow=list(twindow[:2]),
         step=twindow[2],
-    )
+    ).copy(update={"points": _data_stats(slices)})
 
 
-def _data_stats(slices: list[TimeSeriesValues]) -> DataStats:
-    "Statistically summarize all the upsampled RRD data"
+def _data_stats(slices: Sequence[TimeSeriesValues]) -> DataStats:
+    """Statistically summarize all the upsampled RRD data
 
-    descriptors: DataStats = []
+    Instead of collecting the values of every point in time from all the slices, we go through
+    the slices one after another and add their values to lists holding the count, sum, sum of
+    squares, minimum and maximum of every point in time. This is considerably faster.
+    """
+    num_points = min((len(values) for values in slices), default=0)
+    counts = [0] * num_points
+    sums = [0.0] * num_points
+    squares = [0.0] * num_points
+    minima = [math.inf] * num_points
+    maxima = [-math.inf] * num_points
+
+    for values in slices:
+        for index, value in enumerate(values[:num_points]):
+            if value is None:
+                continue
+            counts[index] += 1
+            sums[index] += value
+            squares[index] += value**2
+            if value < minima[index]:
+                minima[index] = value
+            if value > maxima[index]:
+                maxima[index] = value
 
-    for time_column in zip(*slices):
-        point_line = [x for x in time_column if x is not None]
-        if point_line:
-            average = sum(point_line) / float(len(point_line))
+    descriptors: DataStats = []
+    for samples, sum_, sum_of_squares, minimum, maximum in zip(
+        counts, sums, squares, minima, maxima
+    ):
+        if samples:
+            average = sum_ / float(samples)
             descriptors.append(
-                [
-                    average,
-                    min(point_line),
-                    max(point_line),
-                    _std_dev(point_line, average),
-                ]
+                [average, minimum, maximum, _std_dev(samples, sum_of_squares, average)]
             )
         else:
             descriptors.append([None, None, None, None])
@@ -568,16 +699,13 @@ def _data_stats(slices: list[TimeSeriesValues]) -> DataStats:
     return descriptors
 
 
-def _std_dev(point_line: list[float], average: float) -> float:
-    samples = len(point_line)
+def _std_dev(samples: int, sum_of_squares: float, average: float) -> float:
     # In the case of a single data-point an unbiased standard deviation is
     # undefined. In this case we take the magnitude of the measured value
     # itself as a measure of the dispersion.
     if samples == 1:
         return abs(average)
-    return math.sqrt(
-        abs(sum(p**2 for p in point_line) - average**2 * samples) / float(samples - 1)
-    )
+    return math.sqrt(abs(sum_of_squares - average**2 * samples) / float(samples - 1))
 
 
 def _upsample(
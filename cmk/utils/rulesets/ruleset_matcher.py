@@ -6,7 +6,17 @@
 
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from re import Pattern
-from typing import cast, Generic, Literal, NamedTuple, Required, TypeAlias, TypedDict, TypeVar
+from typing import (
+    cast,
+    Final,
+    Generic,
+    Literal,
+    NamedTuple,
+    Required,
+    TypeAlias,
+    TypedDict,
+    TypeVar,
+)
 
 from cmk.utils.caching import instance_method_lru_cache
 from cmk.utils.exceptions import MKGeneralException
@@ -407,6 +417,169 @@ _ConditionCacheID: TypeAlias = tuple[
 ]
 
 
+# Positions of the set bits for every possible byte value
+_SET_BITS_OF_BYTE: Final = tuple(
+    tuple(bit for bit in range(8) if byte & (1 << bit)) for byte in range(256)
+)
+
+
+class _HostBitsetIndex:
+    """Inverted index from host properties to the hosts having them
+
+    Sets of hosts are represented as bitsets (python ints, bit n stands for the n-th host), so
+    that the host conditions of a rule can be evaluated by intersecting the bitsets of the
+    individual conditions. The index is built once per configuration, the bitsets of labels,
+    folders and host name regexes are computed when they are needed.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[HostName],
+        host_tags: Mapping[HostName, set[tuple[TagGroupID, TagID]]],
+        host_paths: Mapping[HostName, str],
+    ) -> None:
+        self._hosts: Final = sorted(hosts)
+        self._index_of: Final[Mapping[str, int]] = {
+            hostname: idx for idx, hostname in enumerate(self._hosts)
+        }
+        self.all_hosts: Final = (1 << len(self._hosts)) - 1
+
+        tag_postings: dict[tuple[TagGroupID, TagID | None], list[int]] = {}
+        path_postings: dict[str, list[int]] = {}
+        for idx, hostname in enumerate(self._hosts):
+            for tag in host_tags[hostname]:
+                tag_postings.setdefault(tag, []).append(idx)
+            path_postings.setdefault(host_paths.get(hostname, "/"), []).append(idx)
+
+        self._tag_bits: Final = {tag: self._to_bits(idxs) for tag, idxs in tag_postings.items()}
+        self._path_postings: Final = path_postings
+        self._folder_bits: dict[str, int] = {}
+        self._regex_bits: dict[str, int] = {}
+
+        # Labels are only known after loading them host by host (which is expensive), so
+        # the label index is only filled for the hosts that actually had to be checked.
+        self._labels_indexed = 0
+        self._label_postings: dict[tuple[str, object], list[int]] = {}
+        self._label_bits: dict[tuple[str, object], int] = {}
+
+    def _to_bits(self, idxs: Iterable[int]) -> int:
+        raw = bytearray((len(self._hosts) + 7) // 8)
+        for idx in idxs:
+            raw[idx >> 3] |= 1 << (idx & 7)
+        return int.from_bytes(raw, "little")
+
+    def _indices_of(self, bits: int) -> Iterator[int]:
+        for pos, byte in enumerate(bits.to_bytes((len(self._hosts) + 7) // 8, "little")):
+            if byte:
+                yield from (pos * 8 + bit for bit in _SET_BITS_OF_BYTE[byte])
+
+    def bits_of(self, hostnames: Iterable[str]) -> int:
+        return self._to_bits(
+            idx for hostname in hostnames if (idx := self._index_of.get(hostname)) is not None
+        )
+
+    def hosts_of(self, bits: int) -> set[HostName]:
+        if bits == self.all_hosts:
+            return set(self._hosts)
+        return {self._hosts[idx] for idx in self._indices_of(bits)}
+
+    def folder_bits(self, folder_path: str) -> int:
+        try:
+            return self._folder_bits[folder_path]
+        except KeyError:
+            pass
+
+        bits = self._folder_bits[folder_path] = self._to_bits(
+            idx
+            for host_path, idxs in self._path_postings.items()
+            if host_path.startswith(folder_path)
+            for idx in idxs
+        )
+        return bits
+
+    def tag_condition_bits(self, taggroup_id: TagGroupID, tag_condition: TagCondition) -> int:
+        if isinstance(tag_condition, dict):
+            if "$ne" in tag_condition:
+                return self.all_hosts & ~self._tag_bits.get(
+                    (taggroup_id, cast(TagConditionNE, tag_condition)["$ne"]), 0
+                )
+
+            if "$or" in tag_condition:
+                bits = 0
+                for tag_id in cast(TagConditionOR, tag_condition)["$or"]:
+                    bits |= self._tag_bits.get((taggroup_id, tag_id), 0)
+                return bits
+
+            if "$nor" in tag_condition:
+                bits = 0
+                for tag_id in cast(TagConditionNOR, tag_condition)["$nor"]:
+                    bits |= self._tag_bits.get((taggroup_id, tag_id), 0)
+                return self.all_hosts & ~bits
+
+            raise NotImplementedError()
+
+        return self._tag_bits.get((taggroup_id, tag_condition), 0)
+
+    def host_name_bits(self, host_entries: HostOrServiceConditions) -> int:
+        negate, host_entries = parse_negated_condition_list(host_entries)
+        bits = self.bits_of(entry for entry in host_entries if not isinstance(entry, dict))
+        for entry in host_entries:
+            if isinstance(entry, dict):
+                bits |= self._host_regex_bits(entry["$regex"])
+        return self.all_hosts & ~bits if negate else bits
+
+    def _host_regex_bits(self, pattern: str) -> int:
+        try:
+            return self._regex_bits[pattern]
+        except KeyError:
+            pass
+
+        compiled = regex(pattern)
+        bits = self._regex_bits[pattern] = self._to_bits(
+            idx for idx, hostname in enumerate(self._hosts) if compiled.match(hostname)
+        )
+        return bits
+
+    def label_condition_bits(
+        self,
+        candidates: int,
+        label_conditions: LabelConditions,
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> int:
+        """Narrow the candidates down to the hosts matching all label conditions"""
+        self._index_labels(candidates, labels_of_host)
+        for label_id, label_spec in label_conditions.items():
+            if isinstance(label_spec, dict):
+                candidates &= ~self._label_bits_of(label_id, label_spec["$ne"])
+            else:
+                candidates &= self._label_bits_of(label_id, label_spec)
+            if not candidates:
+                break
+        return candidates
+
+    def _index_labels(self, bits: int, labels_of_host: Callable[[HostName], Labels]) -> None:
+        if not (missing := bits & ~self._labels_indexed):
+            return
+
+        for idx in self._indices_of(missing):
+            for label in labels_of_host(self._hosts[idx]).items():
+                self._label_postings.setdefault(label, []).append(idx)
+        self._labels_indexed |= missing
+        # The postings may have changed
+        self._label_bits.clear()
+
+    def _label_bits_of(self, label_id: str, value: object) -> int:
+        try:
+            return self._label_bits[(label_id, value)]
+        except KeyError:
+            pass
+
+        bits = self._label_bits[(label_id, value)] = self._to_bits(
+            self._label_postings.get((label_id, value), ())
+        )
+        return bits
+
+
 class RulesetOptimizer:
     """Performs some precalculations on the configured rulesets to improve the
     processing performance"""
@@ -459,6 +632,11 @@ class RulesetOptimizer:
         # TODO: Clean this one up?
         self._initialize_host_lookup()
 
+        self._host_index = _HostBitsetIndex(
+            self._all_configured_hosts, self._host_tags, self._host_paths
+        )
+        self._all_processed_hosts_bits = self._host_index.all_hosts
+
     def clear_ruleset_caches(self) -> None:
         self._host_ruleset_cache.clear()
         self._service_ruleset_cache.clear()
@@ -493,6 +671,7 @@ class RulesetOptimizer:
         # the scope of relevant hosts has changed. This is -good-, since the values in this
         # lookup are iterated one by one later on in all_matching_hosts
         self._folder_host_lookup = {}
+        self._all_processed_hosts_bits = self._host_index.bits_of(self._all_processed_hosts)
 
         self._adjust_processed_hosts_similarity()
 
@@ -614,7 +793,7 @@ class RulesetOptimizer:
 
         return negate, regex("(?:%s)" % "|".join("(?:%s)" % p for p in pattern_parts))
 
-    def _all_matching_hosts(  # pylint: disable=too-many-branches
+    def _all_matching_hosts(
         self, condition: RuleConditionsSpec, with_foreign_hosts: bool
     ) -> set[HostName]:
         """Returns a set containing the names of hosts that match the given
@@ -639,6 +818,53 @@ class RulesetOptimizer:
         except KeyError:
             pass
 
+        matching = self._all_matching_hosts_by_index(
+            hostlist, tag_conditions, labels, rule_path, with_foreign_hosts
+        )
+        self._all_matching_hosts_match_cache[cache_id] = matching
+        return matching
+
+    def _all_matching_hosts_by_index(
+        self,
+        hostlist: HostOrServiceConditions | None,
+        tag_conditions: Mapping[TagGroupID, TagCondition],
+        labels: LabelConditions,
+        rule_path: str,
+        with_foreign_hosts: bool,
+    ) -> set[HostName]:
+        index = self._host_index
+        bits = (
+            index.all_hosts if with_foreign_hosts else self._all_processed_hosts_bits
+        ) & index.folder_bits(rule_path)
+
+        if hostlist == []:
+            return set()  # Empty host list -> Nothing matches
+
+        if hostlist:
+            bits &= index.host_name_bits(hostlist)
+
+        for taggroup_id, tag_condition in tag_conditions.items():
+            if not bits:
+                break
+            bits &= index.tag_condition_bits(taggroup_id, tag_condition)
+
+        if labels and bits:
+            bits = index.label_condition_bits(bits, labels, self.labels_of_host)
+
+        return index.hosts_of(bits)
+
+    def _all_matching_hosts_by_scanning(  # pylint: disable=too-many-branches
+        self, condition: RuleConditionsSpec, with_foreign_hosts: bool
+    ) -> set[HostName]:
+        """Reference implementation of _all_matching_hosts() working on the host sets
+
+        It is not used by the configuration processing anymore, but kept to be able to
+        verify the index based matching against it."""
+        hostlist = condition.get("host_name")
+        tag_conditions: Mapping[TagGroupID, TagCondition] = condition.get("host_tags", {})
+        labels = condition.get("host_labels", {})
+        rule_path = condition.get("host_folder", "/")
+
         if with_foreign_hosts:
             valid_hosts = self._all_configured_hosts
         else:
@@ -652,7 +878,7 @@ class RulesetOptimizer:
 
         if tag_conditions and hostlist is None and not labels:
             # TODO: Labels could also be optimized like the tags
-            matched_by_tags = self._match_hosts_by_tags(cache_id, valid_hosts, tag_conditions)
+            matched_by_tags = self._match_hosts_by_tags(valid_hosts, tag_conditions)
             if matched_by_tags is not None:
                 return matched_by_tags
 
@@ -700,7 +926,6 @@ class RulesetOptimizer:
 
                 matching.add(hostname)
 
-        self._all_matching_hosts_match_cache[cache_id] = matching
         return matching
 
     def matches_host_name(
@@ -772,7 +997,6 @@ class RulesetOptimizer:
     # (positive, negative, ...). Make it work with the new tag group based "$or" handling.
     def _match_hosts_by_tags(
         self,
-        cache_id: tuple[_ConditionCacheID, bool],
         valid_hosts: set[HostName],
         tag_conditions: Mapping[TagGroupID, TagCondition],
     ) -> set[HostName] | None:
@@ -810,7 +1034,6 @@ class RulesetOptimizer:
                 ] and not negative_match_tags.intersection(self._host_tags[hostname]):
                     matching.add(hostname)
 
-            self._all_matching_hosts_match_cache[cache_id] = matching
             return matching
 
         # With shared folders
@@ -827,7 +1050,6 @@ class RulesetOptimizer:
             ] and not negative_match_tags.intersection(self._host_tags[hostname]):
                 matching.update(hosts_with_same_tag)
 
-        self._all_matching_hosts_match_cache[cache_id] = matching
         return matching
 
     def _filter_hosts_with_same_tags_as_host(
@@ -7,11 +7,15 @@ from __future__ import annotations
 import abc
 import enum
 import io
+import os
+import pickle
+import struct
+from array import array
 from collections.abc import Callable, Mapping
 from dataclasses import asdict, dataclass
 from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any, Generic, Sequence, TypedDict, TypeVar
+from typing import Any, ClassVar, Final, Generic, Sequence, TypedDict, TypeVar
 
 from cmk.utils import store
 from cmk.utils.hostaddress import HostName
@@ -276,12 +280,180 @@ class RawHostsStorage(ABCHostsStorage[HostsData]):
         return store.load_object_from_file(str(file_path), default={})
 
 
+class IndexedHostsStorage(ABCHostsStorage[HostsData]):
+    """Stores the hosts of a folder in a way that the host names can be read cheaply
+
+    The file starts with a header containing the data of the folder, the names of the hosts
+    and an offset table per host specific field. Each field of each host is stored in its own
+    record after the header, so that the host names can be read without deserializing all hosts
+    of the folder.
+
+    Layout: MAGIC | length of the header | header | records
+    """
+
+    MAGIC: Final = b"CMKHOSTS\x01"
+    _HEADER_LENGTH: Final = struct.Struct("!Q")
+    HOST_FIELDS: Final = (
+        "host_attributes",
+        "host_tags",
+        "host_labels",
+        "attributes",
+        "explicit_host_conf",
+    )
+
+    # The host names per file, valid as long as the file has not been replaced or modified
+    _host_names_cache: ClassVar[dict[Path, tuple[tuple[int, int], tuple[HostName, ...]]]] = {}
+
+    def __init__(self) -> None:
+        super().__init__(StorageFormat.INDEXED)
+
+    def _write(
+        self, file_path: Path, data: HostsStorageData, value_formatter: Callable[[Any], str]
+    ) -> None:
+        host_names = list(dict.fromkeys([*data.host_attributes, *data.all_hosts, *data.clusters]))
+        per_host_fields: dict[str, Mapping[HostName, Any]] = {
+            "host_attributes": data.host_attributes,
+            "host_tags": data.host_tags,
+            "host_labels": data.host_labels,
+            # Stored per host: {cmk_base_varname: value}
+            "attributes": _invert_host_mappings(data.attributes),
+            "explicit_host_conf": _invert_host_mappings(data.explicit_host_conf),
+        }
+
+        records = io.BytesIO()
+        offsets: dict[str, bytes] = {}
+        for field in self.HOST_FIELDS:
+            values = per_host_fields[field]
+            field_offsets = array("Q", [records.tell()])
+            for host_name in host_names:
+                if host_name in values:
+                    records.write(pickle.dumps(values[host_name], pickle.HIGHEST_PROTOCOL))
+                field_offsets.append(records.tell())
+            offsets[field] = field_offsets.tobytes()
+
+        header = pickle.dumps(
+            {
+                "folder": {
+                    "locked_hosts": data.locked_hosts,
+                    "all_hosts": data.all_hosts,
+                    "clusters": data.clusters,
+                    "custom_macros": data.custom_macros,
+                    "contact_groups": data.contact_groups,
+                    "folder_attributes": data.folder_attributes,
+                    "attribute_names": list(data.attributes),
+                    "explicit_host_conf_names": list(data.explicit_host_conf),
+                },
+                "host_names": host_names,
+                "offsets": offsets,
+            },
+            pickle.HIGHEST_PROTOCOL,
+        )
+        store.save_bytes_to_file(
+            file_path,
+            self.MAGIC + self._HEADER_LENGTH.pack(len(header)) + header + records.getvalue(),
+        )
+
+    def _read(self, file_path: Path) -> HostsData:
+        try:
+            content = memoryview(file_path.read_bytes())
+        except FileNotFoundError:
+            return {}
+        header, records_start = self._parse_header(content)
+        folder = header["folder"]
+        host_names: list[HostName] = header["host_names"]
+
+        fields: dict[str, dict[HostName, Any]] = {}
+        for field in self.HOST_FIELDS:
+            offsets = _offsets(header, field)
+            fields[field] = {
+                host_name: pickle.loads(content[records_start + start : records_start + end])
+                for host_name, start, end in zip(host_names, offsets, offsets[1:])
+                if start != end
+            }
+
+        return {
+            "locked_hosts": folder["locked_hosts"],
+            "all_hosts": folder["all_hosts"],
+            "clusters": folder["clusters"],
+            "attributes": _merge_host_mappings(folder["attribute_names"], fields["attributes"]),
+            "custom_macros": folder["custom_macros"],
+            "host_tags": fields["host_tags"],
+            "host_labels": fields["host_labels"],
+            "contact_groups": folder["contact_groups"],
+            "explicit_host_conf": _merge_host_mappings(
+                folder["explicit_host_conf_names"], fields["explicit_host_conf"]
+            ),
+            "host_attributes": fields["host_attributes"],
+            "folder_attributes": folder["folder_attributes"],
+        }
+
+    def read_host_names(self, file_path_without_extension: Path) -> Sequence[HostName]:
+        file_path = self.add_file_extension(file_path_without_extension)
+        with file_path.open("rb") as f:
+            stat = os.fstat(f.fileno())
+            file_id = (stat.st_ino, stat.st_mtime_ns)
+            if (cached := self._host_names_cache.get(file_path)) and cached[0] == file_id:
+                return cached[1]
+            header, _records_start = self._read_header(f)
+        host_names = tuple(header["host_names"])
+        self._host_names_cache[file_path] = (file_id, host_names)
+        return host_names
+
+    def _read_header(self, f: io.BufferedReader) -> tuple[dict[str, Any], int]:
+        prefix = f.read(len(self.MAGIC) + self._HEADER_LENGTH.size)
+        header_length = self._header_length(prefix)
+        return pickle.loads(f.read(header_length)), len(prefix) + header_length
+
+    def _parse_header(self, content: memoryview) -> tuple[dict[str, Any], int]:
+        header_start = len(self.MAGIC) + self._HEADER_LENGTH.size
+        header_length = self._header_length(content[:header_start])
+        return (
+            pickle.loads(content[header_start : header_start + header_length]),
+            header_start + header_length,
+        )
+
+    def _header_length(self, prefix: bytes | memoryview) -> int:
+        if bytes(prefix[: len(self.MAGIC)]) != self.MAGIC:
+            raise ValueError("Not an indexed hosts file")
+        return self._HEADER_LENGTH.unpack(prefix[len(self.MAGIC) :])[0]
+
+
+def _offsets(header: Mapping[str, Any], field: str) -> array[int]:
+    offsets = array("Q")
+    offsets.frombytes(header["offsets"][field])
+    return offsets
+
+
+def _invert_host_mappings(
+    mappings: Mapping[str, Mapping[HostName, Any]]
+) -> dict[HostName, dict[str, Any]]:
+    """{varname: {host: value}} -> {host: {varname: value}}"""
+    inverted: dict[HostName, dict[str, Any]] = {}
+    for varname, values in mappings.items():
+        for host_name, value in values.items():
+            inverted.setdefault(host_name, {})[varname] = value
+    return inverted
+
+
+def _merge_host_mappings(
+    varnames: Sequence[str], per_host: Mapping[HostName, Mapping[str, Any]]
+) -> dict[str, dict[HostName, Any]]:
+    """{host: {varname: value}} -> {varname: {host: value}}"""
+    merged: dict[str, dict[HostName, Any]] = {varname: {} for varname in varnames}
+    for host_name, values in per_host.items():
+        for varname, value in values.items():
+            merged.setdefault(varname, {})[host_name] = value
+    return merged
+
+
 @cache
 def make_experimental_hosts_storage(storage_format: StorageFormat) -> ABCHostsStorage | None:
     if storage_format == StorageFormat.RAW:
         return RawHostsStorage()
     if storage_format == StorageFormat.PICKLE:
         return PickleHostsStorage()
+    if storage_format == StorageFormat.INDEXED:
+        return IndexedHostsStorage()
     return None
 
 
@@ -429,6 +601,7 @@ class StorageFormat(enum.Enum):
     STANDARD = "standard"
     PICKLE = "pickle"
     RAW = "raw"
+    INDEXED = "indexed"
 
     def __str__(self) -> str:
         return str(self.value)
@@ -442,6 +615,7 @@ class StorageFormat(enum.Enum):
             StorageFormat.STANDARD: ".mk",
             StorageFormat.PICKLE: ".pkl",
             StorageFormat.RAW: ".cfg",
+            StorageFormat.INDEXED: ".idx",
         }[self]
 
 
@@ -450,6 +624,7 @@ def get_all_storage_readers() -> list[ABCHostsStorage]:
         StandardHostsStorage(),
         RawHostsStorage(),
         PickleHostsStorage(),
+        IndexedHostsStorage(),
     ]
 
 
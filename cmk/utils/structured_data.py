@@ -10,13 +10,16 @@ structured monitoring data of Check_MK.
 from __future__ import annotations
 
 import gzip
-import io
+import os
+import pickle
 import pprint
+import zlib
+from ast import literal_eval
 from collections import Counter
 from collections.abc import Callable, Iterable, Mapping, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Generic, Literal, NamedTuple, Self, TypedDict, TypeVar
+from typing import Final, Generic, Literal, NamedTuple, Self, TypedDict, TypeVar
 
 from cmk.utils import store
 from cmk.utils.hostaddress import HostName
@@ -1593,12 +1596,297 @@ class ImmutableDeltaTree:
 #   '----------------------------------------------------------------------'
 
 
+# Livestatus serves the tree files as they are (columns "mk_inventory" and "structured_status"),
+# so they stay Python literals. Parsing these is slow for large trees, so a compressed pickle of
+# the tree is stored next to it, prefixed by this marker. The archived trees are stored in this
+# format directly. Archived trees written by former versions are Python literals.
+_TREE_FILE_MAGIC: Final = b"CMKTREE\x01"
+_TREE_PICKLE_SUFFIX: Final = ".pkl"
+
+
+def serialize_tree_file(raw_tree: SDRawTree) -> bytes:
+    return _TREE_FILE_MAGIC + zlib.compress(
+        pickle.dumps(raw_tree, protocol=pickle.HIGHEST_PROTOCOL), level=1
+    )
+
+
+def deserialize_tree_file(content: bytes) -> SDRawTree | None:
+    if not content.strip():
+        return None
+    if content.startswith(_TREE_FILE_MAGIC):
+        return pickle.loads(zlib.decompress(content[len(_TREE_FILE_MAGIC) :]))
+    return literal_eval(content.decode("utf-8"))
+
+
+def _tree_pickle_file(filepath: Path) -> Path:
+    return filepath.with_name(filepath.name + _TREE_PICKLE_SUFFIX)
+
+
+def _is_tree_pickle_up_to_date(filepath: Path) -> bool:
+    # The pickle gets the modification time of the tree file it has been created for. A tree file
+    # written by someone else, e.g. restored from a backup, makes us fall back to the tree file.
+    try:
+        return _tree_pickle_file(filepath).stat().st_mtime_ns == filepath.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def _save_tree_pickle(filepath: Path, raw_tree: SDRawTree) -> None:
+    stat = filepath.stat()
+    pickle_file = _tree_pickle_file(filepath)
+    store.save_bytes_to_file(pickle_file, serialize_tree_file(raw_tree))
+    os.utime(pickle_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
 def load_tree(filepath: Path) -> ImmutableTree:
-    if raw_tree := store.load_object_from_file(filepath, default=None):
+    if _is_tree_pickle_up_to_date(filepath):
+        try:
+            content = store.load_bytes_from_file(_tree_pickle_file(filepath))
+            if raw_tree := deserialize_tree_file(content):
+                return ImmutableTree.deserialize(raw_tree)
+        except (pickle.UnpicklingError, zlib.error, EOFError):
+            pass  # Fall back to the tree file
+    if raw_tree := deserialize_tree_file(store.load_bytes_from_file(filepath)):
         return ImmutableTree.deserialize(raw_tree)
     return ImmutableTree()
 
 
+def convert_tree_file(filepath: Path) -> bool:
+    """Rewrite an archived tree of former versions in the current format"""
+    content = store.load_bytes_from_file(filepath)
+    if content.startswith(_TREE_FILE_MAGIC) or (raw_tree := deserialize_tree_file(content)) is None:
+        return False
+    stat = filepath.stat()
+    store.save_bytes_to_file(filepath, serialize_tree_file(raw_tree))
+    # The archive and the delta cache rely on the modification time of the trees
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return True
+
+
+def create_tree_pickle(filepath: Path) -> bool:
+    """Create the missing pickle of a tree file
+
+    Tree files which have been stored as pickles themselves are rewritten as Python literals,
+    which can be read by Livestatus again."""
+    if _is_tree_pickle_up_to_date(filepath):
+        return False
+    content = store.load_bytes_from_file(filepath)
+    if (raw_tree := deserialize_tree_file(content)) is None:
+        return False
+    if content.startswith(_TREE_FILE_MAGIC):
+        stat = filepath.stat()
+        store.save_object_to_file(filepath, raw_tree)
+        os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    _save_tree_pickle(filepath, raw_tree)
+    return True
+
+
+# The archive of a host holds the archived trees in files named by their timestamps. In order
+# to save disk space, all but the latest tree and a keyframe every few trees are stored as
+# deltas: "<timestamp>.delta" holds the patch which turns the next newer tree into this one.
+_ARCHIVE_DELTA_SUFFIX: Final = ".delta"
+_ARCHIVE_DELTA_MAGIC: Final = b"CMKTREEDELTA\x01"
+# Holds the paths of the nodes which changed compared to the previous archived tree
+_ARCHIVE_INDEX_FILE: Final = ".index"
+_ARCHIVE_KEYFRAME_INTERVAL: Final = 10
+
+
+class _SDRawTablePatch(TypedDict, total=False):
+    KeyColumns: Sequence[SDKey]
+    Retentions: Mapping[
+        SDRowIdent, Mapping[SDKey, tuple[int, int, int, Literal["previous", "current"]]]
+    ]
+    RemovedRows: Sequence[int]
+    AddedRows: Sequence[Mapping[SDKey, SDValue]]
+
+
+class _SDRawTreePatch(TypedDict, total=False):
+    Attributes: SDRawAttributes
+    Table: _SDRawTablePatch
+    Nodes: Mapping[SDNodeName, _SDRawTreePatch]
+    RemovedNodes: Sequence[SDNodeName]
+
+
+def _row_key(row: Mapping[SDKey, SDValue]) -> str:
+    return repr(sorted(row.items()))
+
+
+def _make_table_patch(old: SDRawTable, new: SDRawTable) -> _SDRawTablePatch | None:
+    if old == new:
+        return None
+
+    old_indices_by_key: dict[str, list[int]] = {}
+    for index, row in enumerate(old.get("Rows", [])):
+        old_indices_by_key.setdefault(_row_key(row), []).append(index)
+
+    added_rows = []
+    for row in new.get("Rows", []):
+        if old_indices := old_indices_by_key.get(_row_key(row)):
+            old_indices.pop()
+        else:
+            added_rows.append(row)
+
+    return {
+        "KeyColumns": new.get("KeyColumns", []),
+        "Retentions": new.get("Retentions", {}),
+        "RemovedRows": sorted(i for indices in old_indices_by_key.values() for i in indices),
+        "AddedRows": added_rows,
+    }
+
+
+def _apply_table_patch(table: SDRawTable, patch: _SDRawTablePatch) -> SDRawTable:
+    removed_rows = set(patch["RemovedRows"])
+    rows = [
+        row for index, row in enumerate(table.get("Rows", [])) if index not in removed_rows
+    ] + list(patch["AddedRows"])
+    patched: SDRawTable = {"KeyColumns": patch["KeyColumns"], "Rows": rows} if rows else {}
+    if retentions := patch["Retentions"]:
+        patched["Retentions"] = retentions
+    return patched
+
+
+def _make_tree_patch(old: SDRawTree, new: SDRawTree) -> _SDRawTreePatch:
+    """Compute the patch which turns the old into the new tree
+
+    In contrast to the delta trees, the patches are lossless."""
+    patch: _SDRawTreePatch = {}
+    if (attributes := new["Attributes"]) != old["Attributes"]:
+        patch["Attributes"] = attributes
+    if (table_patch := _make_table_patch(old["Table"], new["Table"])) is not None:
+        patch["Table"] = table_patch
+
+    nodes: dict[SDNodeName, _SDRawTreePatch] = {}
+    for name, new_node in new["Nodes"].items():
+        if (old_node := old["Nodes"].get(name)) is None:
+            old_node = {"Attributes": {}, "Table": {}, "Nodes": {}}
+        if node_patch := _make_tree_patch(old_node, new_node):
+            nodes[name] = node_patch
+    if nodes:
+        patch["Nodes"] = nodes
+    if removed_nodes := [name for name in old["Nodes"] if name not in new["Nodes"]]:
+        patch["RemovedNodes"] = removed_nodes
+    return patch
+
+
+def _apply_tree_patch(tree: SDRawTree, patch: _SDRawTreePatch) -> SDRawTree:
+    nodes = {
+        name: node
+        for name, node in tree["Nodes"].items()
+        if name not in patch.get("RemovedNodes", [])
+    }
+    for name, node_patch in patch.get("Nodes", {}).items():
+        nodes[name] = _apply_tree_patch(
+            nodes.get(name, {"Attributes": {}, "Table": {}, "Nodes": {}}), node_patch
+        )
+    return {
+        "Attributes": patch.get("Attributes", tree["Attributes"]),
+        "Table": (
+            _apply_table_patch(tree["Table"], table_patch)
+            if (table_patch := patch.get("Table")) is not None
+            else tree["Table"]
+        ),
+        "Nodes": nodes,
+    }
+
+
+def _changed_paths(patch: _SDRawTreePatch, path: SDPath = ()) -> list[SDPath]:
+    paths = [path] if "Attributes" in patch or "Table" in patch else []
+    paths.extend(path + (name,) for name in patch.get("RemovedNodes", []))
+    for name, node_patch in patch.get("Nodes", {}).items():
+        paths.extend(_changed_paths(node_patch, path + (name,)))
+    return paths
+
+
+def _load_canonical_raw_tree(filepath: Path) -> SDRawTree:
+    # Normalizes legacy trees, the patches are computed on the current raw format
+    return load_tree(filepath).serialize()
+
+
+class ArchivedTreeFile(NamedTuple):
+    path: Path
+    timestamp: int
+    # Paths of the nodes which changed compared to the previous archived tree, None if unknown
+    changed_paths: Sequence[SDPath] | None
+
+    @property
+    def is_delta(self) -> bool:
+        return self.path.name.endswith(_ARCHIVE_DELTA_SUFFIX)
+
+
+def list_archived_tree_files(archive_host_dir: Path) -> Sequence[ArchivedTreeFile]:
+    """The index of the archive of a host, sorted by timestamps"""
+    changed_paths_by_timestamp: Mapping[int, Sequence[SDPath]] = store.load_object_from_pickle_file(
+        archive_host_dir / _ARCHIVE_INDEX_FILE, default={}
+    )
+    archived_tree_files = []
+    for filepath in archive_host_dir.iterdir():
+        if not (name := filepath.name.removesuffix(_ARCHIVE_DELTA_SUFFIX)).isdigit():
+            continue
+        archived_tree_files.append(
+            ArchivedTreeFile(
+                path=filepath,
+                timestamp=int(name),
+                changed_paths=changed_paths_by_timestamp.get(int(name)),
+            )
+        )
+    return sorted(archived_tree_files, key=lambda f: f.timestamp)
+
+
+class ArchivedTreeLoader:
+    """Materializes the archived trees of a host
+
+    Deltas are resolved starting from the next newer full or already materialized tree."""
+
+    def __init__(self, archive_host_dir: Path) -> None:
+        self.archive_host_dir: Final = archive_host_dir
+        self._archived_tree_files = list_archived_tree_files(archive_host_dir)
+        self._raw_trees: dict[Path, SDRawTree] = {}
+
+    @property
+    def archived_tree_files(self) -> Sequence[ArchivedTreeFile]:
+        return self._archived_tree_files
+
+    def load(self, filepath: Path) -> ImmutableTree:
+        paths = [f.path for f in self._archived_tree_files]
+        try:
+            index = paths.index(filepath)
+        except ValueError:
+            raise FileNotFoundError(filepath) from None
+        return ImmutableTree.deserialize(self._load_raw(index))
+
+    def _load_raw(self, index: int) -> SDRawTree:
+        start = index
+        while (
+            self._archived_tree_files[start].path not in self._raw_trees
+            and self._archived_tree_files[start].is_delta
+        ):
+            start += 1
+            if start == len(self._archived_tree_files):
+                raise FileNotFoundError(self._archived_tree_files[index].path)
+
+        if (start_path := self._archived_tree_files[start].path) not in self._raw_trees:
+            self._raw_trees[start_path] = _load_canonical_raw_tree(start_path)
+        raw_tree = self._raw_trees[start_path]
+
+        for archived_tree_file in reversed(self._archived_tree_files[index:start]):
+            raw_tree = _apply_tree_patch(raw_tree, _load_tree_patch(archived_tree_file.path))
+            self._raw_trees[archived_tree_file.path] = raw_tree
+        return raw_tree
+
+
+def _load_tree_patch(filepath: Path) -> _SDRawTreePatch:
+    content = store.load_bytes_from_file(filepath)
+    if not content.startswith(_ARCHIVE_DELTA_MAGIC):
+        raise ValueError(filepath)
+    return pickle.loads(zlib.decompress(content[len(_ARCHIVE_DELTA_MAGIC) :]))
+
+
+def _serialize_tree_patch(patch: _SDRawTreePatch) -> bytes:
+    return _ARCHIVE_DELTA_MAGIC + zlib.compress(
+        pickle.dumps(patch, protocol=pickle.HIGHEST_PROTOCOL), level=1
+    )
+
+
 class TreeStore:
     def __init__(self, tree_dir: Path | str) -> None:
         self._tree_dir = Path(tree_dir)
@@ -1614,11 +1902,12 @@ class TreeStore:
 
         output = tree.serialize()
         store.save_object_to_file(tree_file, output, pretty=pretty)
+        _save_tree_pickle(tree_file, output)
 
-        buf = io.BytesIO()
-        with gzip.GzipFile(fileobj=buf, mode="wb") as f:
-            f.write((repr(output) + "\n").encode("utf-8"))
-        store.save_bytes_to_file(self._gz_file(host_name), buf.getvalue())
+        store.save_bytes_to_file(
+            self._gz_file(host_name),
+            gzip.compress((repr(output) + "\n").encode("utf-8"), compresslevel=1),
+        )
 
         # Inform Livestatus about the latest inventory update
         self._last_filepath.touch()
@@ -1626,6 +1915,7 @@ class TreeStore:
     def remove(self, *, host_name: HostName) -> None:
         self._tree_file(host_name).unlink(missing_ok=True)
         self._gz_file(host_name).unlink(missing_ok=True)
+        _tree_pickle_file(self._tree_file(host_name)).unlink(missing_ok=True)
 
     def _tree_file(self, host_name: HostName) -> Path:
         return self._tree_dir / str(host_name)
@@ -1644,13 +1934,15 @@ class TreeOrArchiveStore(TreeStore):
             return load_tree(tree_file)
 
         try:
-            latest_archive_tree_file = max(
-                self._archive_host_dir(host_name).iterdir(), key=lambda tp: int(tp.name)
-            )
-        except (FileNotFoundError, ValueError):
+            archived_tree_loader = ArchivedTreeLoader(self._archive_host_dir(host_name))
+        except FileNotFoundError:
             return ImmutableTree()
 
-        return load_tree(latest_archive_tree_file)
+        if not archived_tree_loader.archived_tree_files:
+            return ImmutableTree()
+
+        # The latest archived tree is always stored in full
+        return archived_tree_loader.load(archived_tree_loader.archived_tree_files[-1].path)
 
     def _archive_host_dir(self, host_name: HostName) -> Path:
         return self._archive_dir / str(host_name)
@@ -1660,8 +1952,62 @@ class TreeOrArchiveStore(TreeStore):
             return
         target_dir = self._archive_host_dir(host_name)
         target_dir.mkdir(parents=True, exist_ok=True)
-        tree_file.rename(target_dir / str(int(tree_file.stat().st_mtime)))
+        archived_tree_files = list_archived_tree_files(target_dir)
+        archived_tree_file = target_dir / str(timestamp := int(tree_file.stat().st_mtime))
+        if archived_tree_files and timestamp <= archived_tree_files[-1].timestamp:
+            # The deltas are based on the next newer tree. Replacing the latest archived tree or
+            # inserting a tree before it would break them, so this tree is dropped instead.
+            self.remove(host_name=host_name)
+            return
+
+        if _is_tree_pickle_up_to_date(tree_file):
+            _tree_pickle_file(tree_file).rename(archived_tree_file)
+            tree_file.unlink()
+        else:
+            tree_file.rename(archived_tree_file)
+            _tree_pickle_file(tree_file).unlink(missing_ok=True)
         self._gz_file(host_name).unlink(missing_ok=True)
 
+        if not archived_tree_files or archived_tree_files[-1].is_delta:
+            return
+
+        try:
+            self._replace_by_delta(archived_tree_files, archived_tree_file)
+        except (ValueError, SyntaxError, pickle.UnpicklingError, zlib.error):
+            pass  # Keep unreadable trees as they are
+
+    @staticmethod
+    def _replace_by_delta(
+        archived_tree_files: Sequence[ArchivedTreeFile], archived_tree_file: Path
+    ) -> None:
+        """Store the previously latest archived tree as delta to the newly archived one"""
+        previous = archived_tree_files[-1]
+        current_raw_tree = _load_canonical_raw_tree(archived_tree_file)
+        previous_raw_tree = _load_canonical_raw_tree(previous.path)
+
+        patch = _make_tree_patch(current_raw_tree, previous_raw_tree)
+        index_path = archived_tree_file.parent / _ARCHIVE_INDEX_FILE
+        changed_paths_by_timestamp = store.load_object_from_pickle_file(
+            index_path, default={}, lock=True
+        )
+        changed_paths_by_timestamp[int(archived_tree_file.name)] = _changed_paths(patch)
+        store.save_object_to_pickle_file(index_path, changed_paths_by_timestamp)
+
+        num_deltas = 0
+        for older in reversed(archived_tree_files[:-1]):
+            if not older.is_delta:
+                break
+            num_deltas += 1
+        if num_deltas >= _ARCHIVE_KEYFRAME_INTERVAL - 1:
+            return  # Keep a full keyframe
+
+        delta = _serialize_tree_patch(patch)
+        if len(delta) * 2 > previous.path.stat().st_size:
+            return  # Not worth it
+        store.save_bytes_to_file(
+            previous.path.with_name(previous.path.name + _ARCHIVE_DELTA_SUFFIX), delta
+        )
+        previous.path.unlink()
+
 
 # .
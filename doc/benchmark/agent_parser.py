@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Benchmark the splitting of agent output into sections
+
+Compares the fast path of the agent parser with its state machine on synthetic Linux and Windows
+agent outputs of a few megabytes, like they are sent by big database hosts.
+
+Usage: PYTHONPATH=. python3 doc/benchmark/agent_parser.py [--size MB] [--repeat N]
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+from cmk.utils.agentdatatype import AgentRawData
+from cmk.utils.hostaddress import HostName
+from cmk.utils.translations import TranslationOptions
+
+from cmk.fetchers.cache import SectionStore
+
+from cmk.checkengine.parser import AgentParser, AgentRawDataSectionElem
+
+
+def _linux_output(size: int) -> bytes:
+    head = [
+        b"<<<check_mk>>>",
+        b"Version: 2.2.0",
+        b"AgentOS: linux",
+        b"<<<df>>>",
+        *(b"/dev/sda%d ext4 102400000 %d 51200000 50%% /data%d" % (i, i, i) for i in range(50)),
+        b"<<<mem>>>",
+        b"MemTotal:       32765916 kB",
+        b"MemFree:         1234567 kB",
+        b"<<<cpu>>>",
+        b"0.42 0.37 0.30 2/1024 12345 16",
+        b"<<<kernel>>>",
+        b"1690000000",
+        b"cpu  1 2 3 4 5 6 7 8 9 10",
+        b"<<<ps_lnx>>>",
+        b"[header] CGROUP USER VSZ RSS TIME ELAPSED PID COMMAND",
+        *(
+            b"1:name=systemd:/ oracle 2097152 1048576 00:00:01 1-00:00:00 %d ora_pmon_DB%d" % (i, i)
+            for i in range(500)
+        ),
+    ]
+    body = []
+    for instance in range(10_000):
+        body.append(b"<<<oracle_tablespaces:sep(124)>>>")
+        body.extend(
+            b"DB%d|/u01/oradata/DB%d/users%02d.dbf|USERS%d|ONLINE|YES|4194302|2560|2240|160|8192|"
+            b"ONLINE|0|PERMANENT|12.1.0.2.0" % (instance, instance, i, i)
+            for i in range(20)
+        )
+        body.append(b"<<<logwatch>>>")
+        body.append(b"[[[/var/log/messages]]]")
+        body.extend(b"W kernel: something happened on instance %d " % instance for _i in range(5))
+        if len(body) * 80 > size:
+            break
+    return b"\n".join(head + body) + b"\n"
+
+
+def _windows_output(size: int) -> bytes:
+    head = [
+        b"<<<check_mk>>>",
+        b"Version: 2.2.0",
+        b"AgentOS: windows",
+        b"<<<wmi_cpuload:sep(124)>>>",
+        b"[system_perf]",
+        b"AlignmentFixupsPersec,Caption,ContextSwitchesPersec,Description",
+        b"<<<winperf_processor>>>",
+        b"1690000000.00 238 10000000",
+        *(b"%d 8 %d %d %d %d bulk_count" % (i, i, i, i, i) for i in range(-232, -200)),
+        b"<<<ps:sep(9)>>>",
+        *(b"(SYSTEM,0,0,0,%d,0,0,0,0,1,0)\tsqlservr.exe\t%d" % (i, i) for i in range(500)),
+    ]
+    body = []
+    for instance in range(10_000):
+        body.append(b"<<<mssql_tablespaces>>>")
+        body.extend(
+            b"MSSQL_SQL%d db%d 2104.38 MB 1120.58 MB 863760 KB 805232 KB 57672 KB 856 KB"
+            % (instance, i)
+            for i in range(20)
+        )
+        body.append(b"<<<mssql_counters:sep(124)>>>")
+        body.extend(
+            b"MSSQL_SQL%d:Locks|lock_requests/sec|_Total|%d" % (instance, i) for i in range(10)
+        )
+        if len(body) * 70 > size:
+            break
+    return b"\r\n".join(head + body) + b"\r\n"
+
+
+def _measure(parse: Callable[[], object], repeat: int) -> float:
+    return min(timeit.repeat(parse, number=1, repeat=repeat))
+
+
+def main(args: Sequence[str]) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    arg_parser.add_argument("--size", type=float, default=4.0, help="size of the outputs in MB")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of measurements")
+    options = arg_parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = logging.getLogger("benchmark")
+        parser = AgentParser(
+            HostName("benchmark"),
+            SectionStore[Sequence[AgentRawDataSectionElem]](Path(tmpdir, "store"), logger=logger),
+            check_interval=60,
+            keep_outdated=True,
+            translation=TranslationOptions(),
+            encoding_fallback="ascii",
+            simulation=False,
+            logger=logger,
+        )
+
+        size = int(options.size * 1024 * 1024)
+        for name, raw_data in [
+            ("linux", AgentRawData(_linux_output(size))),
+            ("windows", AgentRawData(_windows_output(size))),
+        ]:
+            # pylint: disable=protected-access
+            if parser._parse_host_section(raw_data) != parser._parse_host_section_by_states(
+                raw_data
+            ):
+                sys.stderr.write(f"{name}: the fast path gives a different result\n")
+                return 1
+
+            fast = _measure(lambda: parser._parse_host_section(raw_data), options.repeat)
+            states = _measure(
+                lambda: parser._parse_host_section_by_states(raw_data), options.repeat
+            )
+            megabytes = len(raw_data) / 1024 / 1024
+            sys.stdout.write(
+                f"{name:8} {megabytes:6.1f} MB  state machine {states * 1000:8.1f} ms"
+                f"  fast path {fast * 1000:8.1f} ms  speedup {states / fast:5.1f}x\n"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Benchmark the computation of predictions
+
+Compares the statistics of the upsampled slices computed point by point with the ones computed
+slice by slice, on synthetic slices like the ones of a weekly prediction with a horizon of 90 days.
+
+When run as site user with the name of a host, a service and a metric, it also compares fetching
+the slices with one Livestatus query per slice to fetching them with one query for all slices.
+
+Usage: PYTHONPATH=. python3 doc/benchmark/prediction.py [--slices N] [--points N] [--repeat N]
+                                                         [--host HOST --service SERVICE --dsname DS]
+"""
+
+import argparse
+import random
+import sys
+import time
+import timeit
+from collections.abc import Callable, Sequence
+
+import livestatus
+
+from cmk.utils.prediction import _prediction
+
+
+def _raw_slices(
+    num_slices: int, num_points: int
+) -> list[tuple[_prediction.TimeSeries, _prediction.Seconds]]:
+    rng = random.Random(42)
+    step = 86400 // num_points
+    from_time = 1690000000 - 1690000000 % 86400
+    raw_slices = []
+    for number in range(num_slices):
+        start = from_time - number * 7 * 86400
+        # Older slices have a coarser resolution, like the RRDs have
+        slice_step = step * (1 if number < 2 else 5)
+        values: _prediction.TimeSeriesValues = [
+            None if rng.random() < 0.05 else rng.uniform(0.0, 8.0)
+            for _ in range(86400 // slice_step)
+        ]
+        raw_slices.append(
+            (
+                _prediction.TimeSeries(values, (start, start + 86400, slice_step)),
+                from_time - start,
+            )
+        )
+    return raw_slices
+
+
+def _data_stats_by_columns(slices: Sequence[_prediction.TimeSeriesValues]) -> _prediction.DataStats:
+    "Statistically summarize the upsampled slices the obvious way, one point in time after another"
+    # pylint: disable=protected-access
+    descriptors: _prediction.DataStats = []
+    for time_column in zip(*slices):
+        point_line = [x for x in time_column if x is not None]
+        if point_line:
+            average = sum(point_line) / float(len(point_line))
+            descriptors.append(
+                [
+                    average,
+                    min(point_line),
+                    max(point_line),
+                    _prediction._std_dev(len(point_line), sum(p**2 for p in point_line), average),
+                ]
+            )
+        else:
+            descriptors.append([None, None, None, None])
+    return descriptors
+
+
+def _calculate_data_by_columns(
+    raw_slices: Sequence[tuple[_prediction.TimeSeries, _prediction.Seconds]]
+) -> _prediction.PredictionData:
+    # pylint: disable=protected-access
+    twindow, slices = _prediction._upsample(raw_slices)
+    return _prediction.PredictionData(
+        columns=["average", "min", "max", "stdev"],
+        points=_data_stats_by_columns(slices),
+        data_twindow=list(twindow[:2]),
+        step=twindow[2],
+    )
+
+
+def _measure(function: Callable[[], object], repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def _benchmark_statistics(num_slices: int, num_points: int, repeat: int) -> int:
+    # pylint: disable=protected-access
+    raw_slices = _raw_slices(num_slices, num_points)
+    if _prediction._calculate_data_for_prediction(raw_slices) != _calculate_data_by_columns(
+        raw_slices
+    ):
+        sys.stderr.write("statistics: the slice by slice computation gives a different result\n")
+        return 1
+
+    by_columns = _measure(lambda: _calculate_data_by_columns(raw_slices), repeat)
+    by_slices = _measure(lambda: _prediction._calculate_data_for_prediction(raw_slices), repeat)
+    sys.stdout.write(
+        f"statistics {num_slices:3} slices  point by point {by_columns * 1000:8.1f} ms"
+        f"  slice by slice {by_slices * 1000:8.1f} ms  speedup {by_columns / by_slices:5.1f}x\n"
+    )
+    return 0
+
+
+def _benchmark_fetching(host: str, service: str, dsname: str, repeat: int) -> int:
+    # pylint: disable=protected-access
+    period_info = _prediction.PREDICTION_PERIODS["wday"]
+    now = int(time.time())
+    timegroup = period_info.groupby(now)[0]
+    time_slices = _prediction._time_slices(now, 90 * 86400, period_info, timegroup)
+
+    def fetch_one_by_one() -> list[_prediction._RRDResponse]:
+        return [
+            _prediction.get_rrd_data(
+                livestatus.LocalConnection(), host, service, dsname, "MAX", start, end
+            )
+            for start, end in time_slices
+        ]
+
+    def fetch_at_once() -> list[_prediction._RRDResponse]:
+        return _prediction.get_rrd_data_of_slices(
+            livestatus.LocalConnection(), host, service, dsname, "MAX", time_slices
+        )
+
+    if fetch_one_by_one() != fetch_at_once():
+        sys.stderr.write("fetching: the single query gives a different result\n")
+        return 1
+
+    one_by_one = _measure(fetch_one_by_one, repeat)
+    at_once = _measure(fetch_at_once, repeat)
+    sys.stdout.write(
+        f"fetching   {len(time_slices):3} slices  one query each {one_by_one * 1000:8.1f} ms"
+        f"  single query   {at_once * 1000:8.1f} ms  speedup {one_by_one / at_once:5.1f}x\n"
+    )
+    return 0
+
+
+def main(args: Sequence[str]) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    arg_parser.add_argument("--slices", type=int, default=13, help="number of slices")
+    arg_parser.add_argument("--points", type=int, default=1440, help="points of the finest slice")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of measurements")
+    arg_parser.add_argument("--host", help="host to fetch the slices of")
+    arg_parser.add_argument("--service", default="CPU load", help="service to fetch the slices of")
+    arg_parser.add_argument("--dsname", default="load15", help="metric to fetch the slices of")
+    options = arg_parser.parse_args(args)
+
+    if exit_code := _benchmark_statistics(options.slices, options.points, options.repeat):
+        return exit_code
+    if options.host:
+        return _benchmark_fetching(options.host, options.service, options.dsname, options.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
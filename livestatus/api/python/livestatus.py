@@ -12,6 +12,7 @@ import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
@@ -149,6 +150,12 @@ persistent_connections: dict[str, socket.socket] = {}
 # Regular expression for removing Cache: headers if caching is not allowed
 remove_cache_regex = re.compile("\nCache:[^\n]*")
 
+# Seconds to wait for the data of a response once its header has been received
+RESPONSE_DATA_TIMEOUT = 30
+
+# Number of bytes to read at once when decoding a response while receiving it
+RESPONSE_CHUNK_SIZE = 65536
+
 # Pattern for allowed UserId values
 validate_user_id_regex = re.compile(r"^[\w$][-@.\w$]*$", re.UNICODE)
 
@@ -270,6 +277,9 @@ class Helpers:
     def query(self, query: QueryTypes, add_headers: str = "") -> LivestatusResponse:
         raise NotImplementedError()
 
+    def query_iter(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        raise NotImplementedError()
+
     def query_value(self, query: QueryTypes, deflt: Any = no_default) -> LivestatusColumn:
         """Issues a query that returns exactly one line and one columns and returns
         the response as a single value"""
@@ -327,6 +337,13 @@ class Helpers:
 
         return self.query(normalized_query, "ColumnHeaders: off\n")
 
+    def query_table_iter(self, query: QueryTypes) -> Iterator[LivestatusRow]:
+        """Like query_table(), but the rows are decoded and handed out while the response is
+        still being received. Use this for huge responses, e.g. of the log table."""
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+
+        return self.query_iter(normalized_query, "ColumnHeaders: off\n")
+
     def query_table_assoc(self, query: QueryTypes) -> list[dict[str, Any]]:
         """Issues a query that may return multiple lines and columns and returns
         a dictionary from column names to values for each line. This can be
@@ -440,6 +457,95 @@ QueryTypes = str | Query
 OnlySites = list[SiteId] | None
 DeadSite = dict[str, str | int | Exception | SiteConfiguration]
 
+
+class ResponseRowDecoder:
+    """Incrementally decodes the rows of a response in "python3" or "json" output format
+
+    Both formats consist of one outer list that contains one list per row. The raw data can be
+    fed in chunks of arbitrary size, each row is decoded as soon as it is complete.
+
+    >>> decoder = ResponseRowDecoder(json_format=False)
+    >>> decoder.feed(b"[['a', b'x]'], ['b")
+    [['a', b'x]']]
+    >>> decoder.feed(b"', {1: [2]}]]")
+    [['b', {1: [2]}]]
+    >>> decoder.close()
+    """
+
+    _token = re.compile(rb"[][{}'\"]")
+    _string_end = {
+        ord("'"): re.compile(rb"[\\']"),
+        ord('"'): re.compile(rb'[\\"]'),
+    }
+
+    def __init__(self, json_format: bool) -> None:
+        self._json_format = json_format
+        self._buffer = bytearray()
+        self._pos = 0  # position in the buffer up to which the data has been scanned
+        self._row_start = 0
+        self._depth = 0
+        self._quote: int | None = None
+        self._finished = False
+
+    def feed(self, data: bytes) -> list[LivestatusRow]:
+        self._buffer += data
+        rows = []
+        buf = self._buffer
+        pos = self._pos
+        while pos < len(buf):
+            if self._quote is not None:
+                if (match := self._string_end[self._quote].search(buf, pos)) is None:
+                    pos = len(buf)
+                    break
+                pos = match.start()
+                if buf[pos] == 0x5C:  # backslash: skip the escaped character
+                    if pos + 1 >= len(buf):
+                        break  # wait for the escaped character
+                    pos += 2
+                    continue
+                self._quote = None
+                pos += 1
+                continue
+
+            if (match := self._token.search(buf, pos)) is None:
+                pos = len(buf)
+                break
+            pos = match.start()
+            char = buf[pos]
+            if char in b"'\"":
+                self._quote = char
+            elif char in b"[{":
+                self._depth += 1
+                if self._depth == 2:
+                    self._row_start = pos
+            else:
+                self._depth -= 1
+                if self._depth == 1:
+                    rows.append(self._decode_row(bytes(buf[self._row_start : pos + 1])))
+                elif self._depth == 0:
+                    self._finished = True
+            pos += 1
+
+        # Forget about everything that does not belong to an incomplete row
+        consumed = self._row_start if self._depth > 1 else pos
+        del buf[:consumed]
+        self._pos = pos - consumed
+        self._row_start = 0
+        return rows
+
+    def close(self) -> None:
+        if not self._finished or self._buffer.strip():
+            raise MKLivestatusQueryError("Malformed raw response output")
+
+    def _decode_row(self, raw_row: bytes) -> LivestatusRow:
+        data = raw_row.decode("utf-8")
+        try:
+            row: LivestatusRow = json.loads(data) if self._json_format else ast.literal_eval(data)
+            return row
+        except (ValueError, SyntaxError):
+            raise MKLivestatusQueryError("Malformed raw response output")
+
+
 # .
 #   .--SingleSiteConn------------------------------------------------------.
 #   |  ____  _             _      ____  _ _        ____                    |
@@ -737,61 +843,18 @@ class SingleSiteConnection(Helpers):
     ) -> bytes:
         try:
             # Headers are always ASCII encoded
-            resp = self.receive_data(16)
-            code = resp[0:3].decode("ascii")
-            try:
-                length = int(resp[4:15].lstrip())
-            except Exception:
-                self.disconnect()
-                raise MKLivestatusSocketError(
-                    f"Malformed response header {resp!r}. Livestatus TCP socket might be unreachable or wrong encryption settings are used."
-                )
+            code, length = self.parse_response_header(self.receive_data(16))
 
             # Apply a lower timeout for the content because the data is already available
             # in the socket. The liveproxyd (same system) has the complete data available
             # while the data from a standard connection can still take some time.
             # 30 seconds should be more than enough for the maximum telegram size of 100MB
-            data = self.receive_data(length, 30)
-
-            if code == "200":
-                return data
-
-            error_info = data.decode("utf-8")
-            if code == "404":
-                raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+            data = self.receive_data(length, RESPONSE_DATA_TIMEOUT)
 
-            if code == "502":
-                raise MKLivestatusBadGatewayError(error_info)
-
-            raise MKLivestatusQueryError(f"{code}: {error_info}")
+            return self.check_response(code, data)
 
         except (MKLivestatusSocketClosed, OSError) as e:
-            # In case of an IO error or the other side having
-            # closed the socket do a reconnect and try again
-            self.disconnect()
-
-            # In case of unix socket connections, do not start any reconnection attempts
-            # The other side (liveproxyd) might have had a good reason to disconnect
-            # Note: In most scenarios the liveproxyd still tries to send back a reasonable
-            # error response back to the client
-            if self.socket and self.socket.family == socket.AF_UNIX:
-                raise MKLivestatusSocketError("Unix socket was closed by peer")
-
-            now = time.time()
-            if not timeout_at or timeout_at > now:
-                if timeout_at is None:
-                    # Try until timeout reached in case there was a timeout configured.
-                    # Otherwise only retry once.
-                    timeout_at = now
-                    if self.timeout:
-                        timeout_at += self.timeout
-
-                time.sleep(0.1)
-                self.connect()
-                self.send_query(query)
-                # do not send query again -> danger of infinite loop
-                return self.receive_raw_response(query, suppress_exceptions, timeout_at)
-            raise MKLivestatusSocketError(str(e))
+            return self.retry_receive_raw_response(query, suppress_exceptions, timeout_at, e)
 
         except suppress_exceptions:
             raise
@@ -803,6 +866,64 @@ class SingleSiteConnection(Helpers):
             # FIXME: ? self.disconnect()
             raise MKLivestatusSocketError("Unhandled exception: %s" % e)
 
+    def retry_receive_raw_response(
+        self,
+        query: str,
+        suppress_exceptions: tuple[type[Exception], ...],
+        timeout_at: float | None,
+        error: Exception,
+    ) -> bytes:
+        # In case of an IO error or the other side having
+        # closed the socket do a reconnect and try again
+        self.disconnect()
+
+        # In case of unix socket connections, do not start any reconnection attempts
+        # The other side (liveproxyd) might have had a good reason to disconnect
+        # Note: In most scenarios the liveproxyd still tries to send back a reasonable
+        # error response back to the client
+        if self.socket and self.socket.family == socket.AF_UNIX:
+            raise MKLivestatusSocketError("Unix socket was closed by peer")
+
+        now = time.time()
+        if not timeout_at or timeout_at > now:
+            if timeout_at is None:
+                # Try until timeout reached in case there was a timeout configured.
+                # Otherwise only retry once.
+                timeout_at = now
+                if self.timeout:
+                    timeout_at += self.timeout
+
+            time.sleep(0.1)
+            self.connect()
+            self.send_query(query)
+            # do not send query again -> danger of infinite loop
+            return self.receive_raw_response(query, suppress_exceptions, timeout_at)
+        raise MKLivestatusSocketError(str(error))
+
+    def parse_response_header(self, header: bytes) -> tuple[str, int]:
+        """Return the status code and the length of the data of a "fixed16" response header"""
+        code = header[0:3].decode("ascii")
+        try:
+            return code, int(header[4:15].lstrip())
+        except Exception:
+            self.disconnect()
+            raise MKLivestatusSocketError(
+                f"Malformed response header {header!r}. Livestatus TCP socket might be unreachable or wrong encryption settings are used."
+            )
+
+    def check_response(self, code: str, data: bytes) -> bytes:
+        if code == "200":
+            return data
+
+        error_info = data.decode("utf-8")
+        if code == "404":
+            raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+
+        if code == "502":
+            raise MKLivestatusBadGatewayError(error_info)
+
+        raise MKLivestatusQueryError(f"{code}: {error_info}")
+
     def parse_raw_response(self, raw_response: bytes, query: Query) -> LivestatusResponse:
         data = raw_response.decode("utf-8")
         try:
@@ -845,6 +966,59 @@ class SingleSiteConnection(Helpers):
                 row.insert(0, b"")
         return response
 
+    def query_iter(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query(), but hand out the rows while the response is still being received"""
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+
+        if self.limit is not None:
+            normalized_query = Query(
+                "%sLimit: %d\n" % (normalized_query, self.limit),
+                normalized_query.suppress_exceptions,
+            )
+
+        with _livestatus_output_format_switcher(normalized_query, self):
+            str_query = self.build_query(normalized_query, add_headers)
+            self.send_query(str_query)
+
+        for row in self.receive_rows(str_query, normalized_query):
+            if self.prepend_site:
+                row.insert(0, b"")
+            yield row
+
+    def receive_rows(self, str_query: str, query: Query) -> Iterator[LivestatusRow]:
+        """Receive a response chunk by chunk and decode its rows on the fly"""
+        decoder = ResponseRowDecoder(json_format=query.supports_json_format())
+        try:
+            header = self.receive_data(16)
+        except (MKLivestatusSocketClosed, OSError) as e:
+            # Reconnects are rare, take the non streaming way in this case
+            yield from decoder.feed(
+                self.retry_receive_raw_response(str_query, query.suppress_exceptions, None, e)
+            )
+            decoder.close()
+            return
+
+        code, length = self.parse_response_header(header)
+        try:
+            if code != "200":
+                data = self.receive_data(length, RESPONSE_DATA_TIMEOUT)
+                length = 0
+                self.check_response(code, data)
+
+            while length > 0:
+                chunk = self.receive_data(min(length, RESPONSE_CHUNK_SIZE), RESPONSE_DATA_TIMEOUT)
+                length -= len(chunk)
+                yield from decoder.feed(chunk)
+            decoder.close()
+        except (MKLivestatusSocketClosed, OSError) as e:
+            self.disconnect()
+            raise MKLivestatusSocketError(str(e))
+        finally:
+            if length > 0:
+                # The rest of the response is still waiting in the socket, e.g. in case the
+                # caller stopped iterating. The connection is unusable for further queries.
+                self.disconnect()
+
     def command(self, command: str, site: SiteId | None = None) -> None:
         command_str = command.rstrip("\n")
         if not command_str.startswith("["):
@@ -914,6 +1088,88 @@ class ConnectedSite(NamedTuple):
 ConnectedSites = list[ConnectedSite]
 
 
+@dataclass
+class SiteQueryTiming:
+    """Points in time (as returned by time.time()) of the processing of a query on one site"""
+
+    sent: float
+    first_byte: float | None = None
+    received: float | None = None
+    parsed: float | None = None
+
+    @property
+    def duration(self) -> float | None:
+        """Duration from sending the query until the response has been parsed"""
+        return None if self.parsed is None else self.parsed - self.sent
+
+
+class _RawResponseReceiver:
+    """Incrementally collects the raw "fixed16" response of a site
+
+    This is the non blocking counterpart of SingleSiteConnection.receive_raw_response(). It is
+    fed whenever the socket of the site is readable, so that the responses of many sites can be
+    received concurrently.
+    """
+
+    def __init__(self, connected_site: ConnectedSite, query: str, timing: SiteQueryTiming) -> None:
+        self.connected_site = connected_site
+        self.query = query
+        self.timing = timing
+        self._buffer = BytesIO()
+        self._code: str | None = None
+        self._missing = 16
+
+    @property
+    def connection(self) -> SingleSiteConnection:
+        return self.connected_site.connection
+
+    def has_pending_data(self) -> bool:
+        # Data of SSL sockets may already be decrypted and waiting in the SSL object, in which
+        # case the file descriptor does not become readable.
+        sock = self.connection.socket
+        return isinstance(sock, ssl.SSLSocket) and sock.pending() > 0
+
+    def is_timed_out(self, now: float) -> bool:
+        # Like SingleSiteConnection.receive_raw_response(), only the data part has a timeout.
+        return (
+            self._code is not None
+            and self.timing.first_byte is not None
+            and now - self.timing.first_byte > RESPONSE_DATA_TIMEOUT
+        )
+
+    def receive(self) -> bytes | None:
+        """Consume the available data and return the response data once it is complete"""
+        if (sock := self.connection.socket) is None:
+            raise MKLivestatusSocketError(
+                "Socket to '%s' is not connected" % self.connection.socketurl
+            )
+
+        # Never read beyond the end of the response
+        packet = sock.recv(min(self._missing, 65536))
+        if not packet:
+            raise MKLivestatusSocketClosed(
+                "Read zero data from socket, remote peer closed connection."
+            )
+        if self.timing.first_byte is None:
+            self.timing.first_byte = time.time()
+
+        self._missing -= len(packet)
+        self._buffer.write(packet)
+        if self._missing > 0:
+            return None
+
+        if self._code is None:
+            self._code, self._missing = self.connection.parse_response_header(
+                self._buffer.getvalue()
+            )
+            self._buffer = BytesIO()
+            if self._missing > 0:
+                return None
+
+        self.timing.received = time.time()
+        return self.connection.check_response(self._code, self._buffer.getvalue())
+
+
 class MultiSiteConnection(Helpers):
     def __init__(  # pylint: disable=too-many-branches
         self, sites: SiteConfigurations, disabled_sites: SiteConfigurations | None = None
@@ -928,6 +1184,7 @@ class MultiSiteConnection(Helpers):
         self.only_sites: OnlySites = None
         self.limit: int | None = None
         self.parallelize = True
+        self.timings: dict[SiteId, SiteQueryTiming] = {}
 
         # Status host: A status host helps to prevent trying to connect
         # to a remote site which is unreachable. This is done by looking
@@ -1108,6 +1365,10 @@ class MultiSiteConnection(Helpers):
     def alive_sites(self) -> list[SiteId]:
         return [s.id for s in self.connections]
 
+    def query_timings(self) -> dict[SiteId, SiteQueryTiming]:
+        """Timings of the sites contacted by the last parallel query"""
+        return self.timings
+
     def successfully_persisted(self) -> bool:
         for connected_site in self.connections:
             if connected_site.connection.successfully_persisted():
@@ -1176,6 +1437,43 @@ class MultiSiteConnection(Helpers):
         self.connections = stillalive
         return result
 
+    def query_iter(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query(), but hand out the rows while the responses are being received
+
+        To keep the memory usage low, the sites are queried one after another.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+
+        died: set[SiteId] = set()
+        limit = self.limit
+        try:
+            for connected_site in self.connections:
+                if self.only_sites is not None and connected_site.id not in self.only_sites:
+                    continue
+                limit_header = "" if limit is None else "Limit: %d\n" % limit
+                try:
+                    for row in connected_site.connection.query_iter(
+                        normalized_query, add_headers + limit_header
+                    ):
+                        if self.prepend_site:
+                            row.insert(0, connected_site.id)
+                        if limit is not None:
+                            limit -= 1  # Account for portion of limit used by this site
+                        yield row
+                except normalized_query.suppress_exceptions:
+                    continue
+                except LivestatusTestingError:
+                    raise
+                except Exception as e:
+                    connected_site.connection.disconnect()
+                    self.deadsites[connected_site.id] = {
+                        "exception": e,
+                        "site": connected_site.config,
+                    }
+                    died.add(connected_site.id)
+        finally:
+            self.connections = [c for c in self.connections if c.id not in died]
+
     # New parallelized version of query(). The semantics differs in the handling
     # of Limit: since all sites are queried in parallel, the Limit: is simply
     # applied to all sites - resulting in possibly more results then Limit requests.
@@ -1199,12 +1497,15 @@ class MultiSiteConnection(Helpers):
             limit_header = ""
 
         # First send all queries
-        retrieve_responses: list[tuple[str, ConnectedSite]] = []
+        self.timings = {}
+        receivers: list[_RawResponseReceiver] = []
         for connected_site in connect_to_sites:
             try:
+                timing = SiteQueryTiming(sent=time.time())
                 str_query = connected_site.connection.build_query(query, add_headers + limit_header)
                 connected_site.connection.send_query(str_query)
-                retrieve_responses.append((str_query, connected_site))
+                receivers.append(_RawResponseReceiver(connected_site, str_query, timing))
+                self.timings[connected_site.id] = timing
             except LivestatusTestingError:
                 raise
             except Exception as e:
@@ -1213,42 +1514,24 @@ class MultiSiteConnection(Helpers):
                     "site": connected_site.config,
                 }
 
-        # Then retrieve all raw responses. We will be as slow as the slowest of all connections.
-        site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, connected_site in retrieve_responses:
-            try:
-                site_responses.append(
-                    (
-                        connected_site,
-                        connected_site.connection.receive_raw_response(
-                            str_query, query.suppress_exceptions
-                        ),
-                    )
-                )
-            except query.suppress_exceptions:
-                # Mostly handles exception types MKLivestatusTableNotFoundError
-                stillalive.append(connected_site)
-                continue
-            except LivestatusTestingError:
-                raise
-            except Exception as e:
-                connected_site.connection.disconnect()
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
-
-        # Convert responses to python format
+        # Then retrieve the raw responses of all sites concurrently and convert each of them to
+        # python format as soon as it is complete. We will be as slow as the slowest of all
+        # connections.
         result = LivestatusResponse([])
-        for connected_site, raw_response in site_responses:
+        for receiver, raw_response in self._receive_raw_responses(receivers, query):
+            connected_site = receiver.connected_site
             try:
+                if isinstance(raw_response, Exception):
+                    raise raw_response
                 rows = connected_site.connection.parse_raw_response(raw_response, query)
+                receiver.timing.parsed = time.time()
                 stillalive.append(connected_site)
                 if self.prepend_site:
                     for row in rows:
                         row.insert(0, connected_site.id)
                 result.extend(rows)
             except query.suppress_exceptions:
+                # Mostly handles exception types MKLivestatusTableNotFoundError
                 stillalive.append(connected_site)
                 continue
             except LivestatusTestingError:
@@ -1263,6 +1546,62 @@ class MultiSiteConnection(Helpers):
         self.connections = stillalive
         return result
 
+    def _receive_raw_responses(
+        self, receivers: Sequence[_RawResponseReceiver], query: Query
+    ) -> Iterator[tuple[_RawResponseReceiver, bytes | Exception]]:
+        """Drain the sockets of all sites and yield each raw response as soon as it is complete"""
+        with selectors.DefaultSelector() as selector:
+            for receiver in receivers:
+                if receiver.connection.socket is None:
+                    yield receiver, MKLivestatusSocketError(
+                        "Socket to '%s' is not connected" % receiver.connection.socketurl
+                    )
+                    continue
+                selector.register(receiver.connection.socket, selectors.EVENT_READ, receiver)
+
+            while receiving := {key.data: key.fileobj for key in selector.get_map().values()}:
+                active = [r for r in receiving if r.has_pending_data()] or [
+                    key.data for key, _events in selector.select(0.1)
+                ]
+                now = time.time()
+                active.extend(r for r in receiving if r not in active and r.is_timed_out(now))
+
+                for receiver in active:
+                    try:
+                        if receiver.is_timed_out(now):
+                            raise MKLivestatusSocketError(
+                                f"{RESPONSE_DATA_TIMEOUT}s while reading data from socket."
+                            )
+                        if (raw_response := receiver.receive()) is None:
+                            continue
+                        selector.unregister(receiving[receiver])
+                        yield receiver, raw_response
+                    except (MKLivestatusSocketClosed, OSError) as e:
+                        selector.unregister(receiving[receiver])
+                        yield receiver, self._retry_receive(receiver, query, e)
+                    except LivestatusTestingError:
+                        raise
+                    except query.suppress_exceptions as e:
+                        selector.unregister(receiving[receiver])
+                        yield receiver, e
+                    except Exception as e:
+                        selector.unregister(receiving[receiver])
+                        yield receiver, MKLivestatusSocketError("Unhandled exception: %s" % e)
+
+    @staticmethod
+    def _retry_receive(
+        receiver: _RawResponseReceiver, query: Query, error: Exception
+    ) -> bytes | Exception:
+        # Reconnects are rare, so we simply fall back to the blocking receive in this case.
+        try:
+            return receiver.connection.retry_receive_raw_response(
+                receiver.query, query.suppress_exceptions, None, error
+            )
+        except LivestatusTestingError:
+            raise
+        except Exception as e:
+            return e
+
     def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
         if sitename in self.deadsites:
             raise MKLivestatusSocketError(
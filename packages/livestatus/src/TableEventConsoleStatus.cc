@@ -87,6 +87,13 @@ TableEventConsoleStatus::TableEventConsoleStatus(ICore *mc)
                                       offsets));
     addColumn(ECRow::makeDoubleColumn("status_average_sync_time",
                                       "The average sync time", offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_queue_length",
+        "The number of messages waiting in the processing queue", offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_queue_drops",
+        "The number of messages dropped because the processing queue was full",
+        offsets));
     addColumn(ECRow::makeStringColumn(
         "status_replication_slavemode",
         "The replication slavemode (empty or one of sync/takeover)", offsets));
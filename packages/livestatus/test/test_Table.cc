@@ -671,6 +671,8 @@ ColumnDefinitions event_console_status_columns() {
         {"status_num_open_events", ColumnType::int_},
         {"status_overflow_rate", ColumnType::double_},
         {"status_overflows", ColumnType::int_},
+        {"status_queue_drops", ColumnType::int_},
+        {"status_queue_length", ColumnType::int_},
         {"status_replication_last_sync", ColumnType::time},
         {"status_replication_slavemode", ColumnType::string},
         {"status_replication_success", ColumnType::int_},
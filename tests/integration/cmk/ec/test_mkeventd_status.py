@@ -61,6 +61,8 @@ def test_status_table_via_core(site: Site, ec, via_core: bool) -> None:  # type:
         "status_average_processing_time",
         "status_average_request_time",
         "status_average_sync_time",
+        "status_queue_length",
+        "status_queue_drops",
         "status_replication_slavemode",
         "status_replication_last_sync",
         "status_replication_success",
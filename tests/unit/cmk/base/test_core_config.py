@@ -411,3 +411,31 @@ def test_write_and_read_notify_host_file(
         lambda host_name: notify_labels_path / host_name,
     )
     assert read_notify_host_file(host_name) == expected
+
+
+def test_host_config_fingerprints(monkeypatch: MonkeyPatch) -> None:
+    hostnames = [HostName(f"host{idx}") for idx in range(3)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.set_option(
+        "ipaddresses", {hostname: f"127.0.0.{idx}" for idx, hostname in enumerate(hostnames, 1)}
+    )
+    ts.set_option(
+        "host_attributes",
+        {hostname: {"meta_data": {"updated_at": 1.0}} for hostname in hostnames},
+    )
+    config_cache = ts.apply(monkeypatch)
+    fingerprints = core_config.host_config_fingerprints(config_cache, hostnames)
+    assert len(set(fingerprints.values())) == 3
+
+    # Editing host1 updates the meta data of all hosts of its folder, e.g. via hosts.mk
+    monkeypatch.setattr(
+        config,
+        "host_attributes",
+        {hostname: {"meta_data": {"updated_at": 2.0}} for hostname in hostnames},
+    )
+    monkeypatch.setitem(config.ipaddresses, HostName("host1"), HostAddress("127.0.0.42"))
+    new_fingerprints = core_config.host_config_fingerprints(config_cache, hostnames)
+
+    assert [fingerprints[h] == new_fingerprints[h] for h in hostnames] == [True, False, True]
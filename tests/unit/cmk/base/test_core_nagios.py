@@ -19,6 +19,7 @@ from pytest import MonkeyPatch
 from tests.testlib.base import Scenario
 
 import cmk.utils.exceptions as exceptions
+import cmk.utils.paths
 import cmk.utils.version as cmk_version
 from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.hostaddress import HostName
@@ -26,6 +27,7 @@ from cmk.utils.hostaddress import HostName
 from cmk.checkengine.checking import CheckPluginName
 
 import cmk.base.config as config
+import cmk.base.core_config as core_config
 import cmk.base.core_nagios as core_nagios
 
 
@@ -922,3 +924,133 @@ def test_create_nagios_config_commands(
 
     assert license_counter["services"] == 1
     assert outfile.getvalue() == expected_result
+
+
+def test_merge_nagios_config_fragments(monkeypatch: MonkeyPatch) -> None:
+    hostnames = [HostName(f"host{idx}") for idx in range(6)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.set_option(
+        "ipaddresses", {hostname: f"127.0.0.{idx}" for idx, hostname in enumerate(hostnames, 1)}
+    )
+    ts.set_ruleset(
+        "host_check_commands",
+        [
+            {
+                "condition": {"host_name": ["host1", "host2", "host5"]},
+                "value": ("service", "Service $HOSTNAME$"),
+            },
+        ],
+    )
+    config_cache = ts.apply(monkeypatch)
+
+    expected_outfile = io.StringIO()
+    expected = core_nagios.NagiosConfig(expected_outfile, hostnames)
+    expected_counter = Counter("services")
+    expected_labels = {
+        hostname: core_nagios._create_nagios_config_host(
+            expected, config_cache, hostname, {}, expected_counter
+        )
+        for hostname in hostnames
+    }
+
+    outfile = io.StringIO()
+    cfg = core_nagios.NagiosConfig(outfile, hostnames)
+    license_counter = Counter("services")
+    host_labels = {}
+    for hostname, fragment in core_nagios._create_nagios_config_host_fragments_in_workers(
+        hostnames, {}, 2
+    ):
+        host_labels[hostname] = fragment.merge_into(cfg, license_counter)
+
+    assert [command for command, _line in cfg.hostcheck_commands_to_define] == [
+        "check-mk-host-custom-1",
+        "check-mk-host-custom-2",
+        "check-mk-host-custom-3",
+    ]
+    assert cfg.hostcheck_commands_to_define == expected.hostcheck_commands_to_define
+    assert "check-mk-host-custom-3\n" in outfile.getvalue()
+    assert outfile.getvalue() == expected_outfile.getvalue()
+    assert cfg.hostgroups_to_define == expected.hostgroups_to_define
+    assert cfg.checknames_to_define == expected.checknames_to_define
+    assert license_counter == expected_counter
+    assert host_labels == expected_labels
+
+
+def test_create_nagios_config_hosts_incremental(monkeypatch: MonkeyPatch) -> None:
+    hostnames = [HostName(f"host{idx}") for idx in range(3)]
+    ts = Scenario()
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.set_option(
+        "ipaddresses", {hostname: f"127.0.0.{idx}" for idx, hostname in enumerate(hostnames, 1)}
+    )
+    config_cache = ts.apply(monkeypatch)
+
+    created = []
+    create_fragment = core_nagios._create_nagios_config_host_fragment
+
+    def _create_fragment(
+        config_cache: config.ConfigCache, hostname: HostName, stored_passwords: Mapping[str, str]
+    ) -> Any:
+        created.append(hostname)
+        return create_fragment(config_cache, hostname, stored_passwords)
+
+    monkeypatch.setattr(core_nagios, "_create_nagios_config_host_fragment", _create_fragment)
+
+    def _create(config_path: VersionedConfigPath) -> str:
+        outfile = io.StringIO()
+        with config_path.create(is_cmc=False):
+            core_nagios._create_nagios_config_hosts(
+                core_nagios.NagiosConfig(outfile, hostnames),
+                config_cache,
+                config_path,
+                hostnames,
+                {},
+                Counter("services"),
+                incremental=True,
+            )
+        return outfile.getvalue()
+
+    first = _create(VersionedConfigPath(1))
+    assert created == hostnames
+
+    created.clear()
+    assert _create(VersionedConfigPath(2)) == first
+    assert not created
+
+    Path(cmk.utils.paths.autochecks_dir).mkdir(parents=True, exist_ok=True)
+    (Path(cmk.utils.paths.autochecks_dir) / "host1.mk").write_text("[]\n")
+    assert _create(VersionedConfigPath(3)) == first
+    assert created == [HostName("host1")]
+
+
+def test_take_over_unchanged_hostchecks(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "delay_precompile", False)
+    fingerprint_store = core_config.HostConfigFingerprintStore()
+    hostnames = [HostName("changed"), HostName("unchanged"), HostName("without_check")]
+
+    previous_path = VersionedConfigPath(1)
+    with previous_path.create(is_cmc=False):
+        fingerprint_store.write(previous_path, {hostname: "old" for hostname in hostnames})
+        core_nagios.HostCheckStore().write(previous_path, HostName("unchanged"), "pass\n")
+
+    config_path = VersionedConfigPath(2)
+    with config_path.create(is_cmc=False):
+        fingerprint_store.write(
+            config_path,
+            {
+                HostName("changed"): "new",
+                HostName("unchanged"): "old",
+                HostName("without_check"): "old",
+            },
+        )
+        assert core_nagios._take_over_unchanged_hostchecks(config_path, hostnames) == [
+            HostName("changed"),
+            HostName("without_check"),
+        ]
+
+    assert core_nagios.HostCheckStore.host_check_file_path(
+        config_path, HostName("unchanged")
+    ).exists()
@@ -4,6 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import math
+import random
 import time
 from collections.abc import Callable, Sequence
 from pprint import pprint
@@ -199,3 +200,38 @@ def test_data_stats(
     slices: list[_prediction.TimeSeriesValues], result: _prediction.DataStats
 ) -> None:
     assert _prediction._data_stats(slices) == result
+
+
+def _data_stats_by_columns(slices: Sequence[_prediction.TimeSeriesValues]) -> _prediction.DataStats:
+    "Statistically summarize the upsampled slices the obvious way, one point in time after another"
+    descriptors: _prediction.DataStats = []
+    for time_column in zip(*slices):
+        point_line = [x for x in time_column if x is not None]
+        if point_line:
+            average = sum(point_line) / float(len(point_line))
+            descriptors.append(
+                [
+                    average,
+                    min(point_line),
+                    max(point_line),
+                    _prediction._std_dev(len(point_line), sum(p**2 for p in point_line), average),
+                ]
+            )
+        else:
+            descriptors.append([None, None, None, None])
+    return descriptors
+
+
+def test_data_stats_equals_data_stats_by_columns() -> None:
+    rng = random.Random(4711)
+    slices: list[_prediction.TimeSeriesValues] = [
+        [None if rng.random() < 0.2 else rng.uniform(-10, 100) for _ in range(200)]
+        for _ in range(13)
+    ]
+    slices.append([None] * 200)
+    slices.append([3.0] * 190)
+
+    data_stats = _prediction._data_stats(slices)
+
+    assert len(data_stats) == 190
+    assert data_stats == _data_stats_by_columns(slices)
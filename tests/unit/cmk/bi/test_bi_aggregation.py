@@ -5,8 +5,16 @@
 
 import pytest
 
+from livestatus import SiteId
+
+from cmk.utils.hostaddress import HostName
+from cmk.utils.tags import TagGroupID, TagID
+
 from cmk.bi.actions import BICallARuleAction
 from cmk.bi.aggregation import BIAggregation
+from cmk.bi.data_fetcher import BIStructureFetcher
+from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.searcher import BISearcher
 
 from .bi_test_data import sample_config
 
@@ -74,3 +82,30 @@ def test_compute_aggregation(
     assert actual_result.acknowledged == expected_acknowledgment
     assert actual_result.downtime_state == expected_downtime_state
     assert actual_result.in_service_period == expected_service_period
+
+
+def test_compile_aggregation_records_dependencies(
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_structure_fetcher: BIStructureFetcher,
+    bi_searcher: BISearcher,
+) -> None:
+    bi_structure_fetcher.add_site_data(SiteId("heute"), sample_config.bi_structure_states)
+    bi_searcher.set_hosts(bi_structure_fetcher.hosts)
+
+    bi_aggregation = bi_packs_sample_config.get_aggregation("default_aggregation")
+    assert bi_aggregation is not None
+    with bi_searcher.record_dependencies() as dependencies:
+        bi_aggregation.compile(bi_searcher)
+    assert dependencies.host_names == {"heute", "heute_clone"}
+
+    heute = bi_structure_fetcher.hosts["heute"]
+    new_tcp_host = heute._replace(name=HostName("new_tcp_host"))
+    new_snmp_host = heute._replace(
+        name=HostName("new_snmp_host"), tags={(TagGroupID("tcp"), TagID("no-agent"))}
+    )
+
+    assert dependencies.affected_by({"heute": heute})
+    assert dependencies.affected_by({"heute_clone": None})
+    assert dependencies.affected_by({"new_tcp_host": new_tcp_host})
+    assert not dependencies.affected_by({"new_snmp_host": new_snmp_host})
+    assert not dependencies.affected_by({"removed_host": None})
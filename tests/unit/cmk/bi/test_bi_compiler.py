@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import copy
+import shutil
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from livestatus import LivestatusOutputFormat, LivestatusResponse, LivestatusRow, SiteId
+
+from cmk.utils.hostaddress import HostName
+
+import cmk.bi.compiler as bi_compiler
+from cmk.bi.aggregation import BIAggregation
+from cmk.bi.compiler import BICompiler
+from cmk.bi.data_fetcher import BIStructureFetcher, get_cache_dir
+from cmk.bi.lib import SitesCallback
+from cmk.bi.searcher import BISearcher
+from cmk.bi.trees import BICompiledAggregation
+
+from .bi_test_data import sample_config
+from .conftest import MockBIAggregationPack
+
+
+class _FakeSite:
+    """Answers the queries of the BI compiler from the structure data of the sample config"""
+
+    def __init__(self) -> None:
+        self.site_id = SiteId("heute")
+        self.program_start = 1000
+        self.hosts: dict[HostName, tuple[Any, ...]] = dict(
+            copy.deepcopy(sample_config.bi_structure_states)
+        )
+
+    def sites_callback(self) -> SitesCallback:
+        return SitesCallback(lambda: [(self.site_id, True)], self.query, lambda s: s)
+
+    def query(
+        self,
+        query: str,
+        only_sites: list[SiteId] | None = None,
+        output_format: LivestatusOutputFormat = LivestatusOutputFormat.PYTHON,
+        fetch_full_data: bool = False,
+    ) -> LivestatusResponse:
+        if query.startswith("GET status"):
+            return LivestatusResponse([LivestatusRow([self.site_id, self.program_start])])
+        if query.startswith("GET hosts"):
+            return LivestatusResponse(
+                [
+                    LivestatusRow(
+                        [
+                            site,
+                            host_name,
+                            dict(tags),
+                            labels,
+                            children,
+                            parents,
+                            alias,
+                            "/wato/hosts.mk",
+                        ]
+                    )
+                    for site, tags, labels, _folder, _services, children, parents, alias, host_name in (
+                        self.hosts.values()
+                    )
+                ]
+            )
+        if query.startswith("GET services"):
+            return LivestatusResponse(
+                [
+                    LivestatusRow([site, host_name, description, list(tags), labels])
+                    for site, _tags, _labels, _folder, services, *_rest, host_name in (
+                        self.hosts.values()
+                    )
+                    for description, (tags, labels) in services.items()
+                ]
+            )
+        raise NotImplementedError(query)
+
+    def reload(self, host_name: HostName | None = None, alias: str | None = None) -> None:
+        if host_name is not None and alias is not None:
+            host = list(self.hosts[host_name])
+            host[7] = alias
+            self.hosts[host_name] = tuple(host)
+        self.program_start += 1
+
+
+def _host_aggregation(aggr_id: str, host_name_regex: str) -> dict[str, Any]:
+    bi_packs_config: dict[str, Any] = sample_config.bi_packs_config
+    aggregation = copy.deepcopy(bi_packs_config["packs"][0]["aggregations"][0])
+    aggregation["id"] = aggr_id
+    aggregation["node"]["search"]["conditions"]["host_choice"] = {
+        "type": "host_name_regex",
+        "pattern": host_name_regex,
+    }
+    return aggregation
+
+
+@pytest.fixture(name="fake_site")
+def _fake_site(monkeypatch: pytest.MonkeyPatch) -> Iterator[_FakeSite]:
+    shutil.rmtree(get_cache_dir())
+    bi_packs_config: dict[str, Any] = copy.deepcopy(sample_config.bi_packs_config)
+    bi_packs_config["packs"][0]["aggregations"] = [
+        _host_aggregation("heute_aggregation", "heute$"),
+        _host_aggregation("clone_aggregation", "heute_clone$"),
+    ]
+    monkeypatch.setattr(
+        bi_compiler, "BIAggregationPacks", lambda _path: MockBIAggregationPack(bi_packs_config)
+    )
+    yield _FakeSite()
+
+
+def _compile(fake_site: _FakeSite, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Load the compiled aggregations like a new apache process, return the recompiled ones"""
+    compiled_aggr_ids = []
+    compile_aggregation = BIAggregation.compile
+
+    def _compile_aggregation(self: BIAggregation, bi_searcher: BISearcher) -> BICompiledAggregation:
+        compiled_aggr_ids.append(self.id)
+        return compile_aggregation(self, bi_searcher)
+
+    with monkeypatch.context() as m:
+        m.setattr(BIAggregation, "compile", _compile_aggregation)
+        BICompiler("bi_config.bi", fake_site.sites_callback()).load_compiled_aggregations()
+    return compiled_aggr_ids
+
+
+def _compiled_aggregations(fake_site: _FakeSite) -> dict[str, dict]:
+    compiler = BICompiler("bi_config.bi", fake_site.sites_callback())
+    compiler.load_compiled_aggregations()
+    return {
+        aggr_id: compiled_aggregation.serialize()
+        for aggr_id, compiled_aggregation in compiler.compiled_aggregations.items()
+    }
+
+
+def test_compile_only_aggregations_of_changed_hosts(
+    fake_site: _FakeSite, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    assert sorted(_compile(fake_site, monkeypatch)) == ["clone_aggregation", "heute_aggregation"]
+    assert not _compile(fake_site, monkeypatch)
+    compiled_aggregations = _compiled_aggregations(fake_site)
+
+    fake_site.reload(HostName("heute_clone"), alias="Heute Klon")
+    assert _compile(fake_site, monkeypatch) == ["clone_aggregation"]
+    assert _compiled_aggregations(fake_site) == compiled_aggregations
+
+    # Without the structure data of the previous program start, everything is compiled again
+    for path in (get_cache_dir() / "site_structure_data").iterdir():
+        path.unlink()
+    fake_site.reload()
+    assert sorted(_compile(fake_site, monkeypatch)) == ["clone_aggregation", "heute_aggregation"]
+
+
+def test_get_changed_hosts(fake_site: _FakeSite) -> None:
+    structure_fetcher = BIStructureFetcher(fake_site.sites_callback())
+    first_start = (fake_site.site_id, fake_site.program_start)
+    structure_fetcher.update_data({first_start})
+    fake_site.reload(HostName("heute_clone"), alias="Heute Klon")
+    second_start = (fake_site.site_id, fake_site.program_start)
+    structure_fetcher.update_data({second_start})
+
+    assert structure_fetcher.get_changed_hosts({first_start}, {first_start}) == set()
+    assert structure_fetcher.get_changed_hosts({first_start}, {second_start}) == {"heute_clone"}
+    # The site went offline
+    assert structure_fetcher.get_changed_hosts({first_start}, set()) == {"heute", "heute_clone"}
+    # The structure data of a program start is not cached
+    assert structure_fetcher.get_changed_hosts({first_start}, {(fake_site.site_id, 4711)}) is None
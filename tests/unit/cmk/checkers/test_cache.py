@@ -6,9 +6,13 @@
 import copy
 import json
 import logging
+import pickle
+from pathlib import Path
+
+from cmk.utils.sectionname import SectionName
 
 from cmk.fetchers import Mode
-from cmk.fetchers.cache import SectionStore
+from cmk.fetchers.cache import _LazySection, SectionStore
 from cmk.fetchers.filecache import MaxAge
 
 
@@ -36,6 +40,44 @@ class TestSectionStore:
             str,
         )
 
+    def test_store_and_load(self, tmp_path: Path) -> None:
+        section_store = SectionStore[object](tmp_path / "store", logger=logging.getLogger("test"))
+        sections: dict[SectionName, tuple[int, int, object]] = {
+            SectionName("agent"): (1, 2, [["a", "b"], ["c"]]),
+            SectionName("snmp"): (3, 4, [[["1", b"\x00"]], [[["2"]]]]),
+            SectionName("unmarshallable"): (5, 6, [[frozenset({"x"}), Path("y")]]),
+        }
+        section_store.store(sections)
+
+        loaded = section_store.load()
+        assert all(isinstance(content, _LazySection) for _c, _v, content in loaded.values())
+        assert loaded == sections
+
+    def test_sections_are_only_decoded_on_access(self, tmp_path: Path) -> None:
+        section_store = SectionStore[object](tmp_path / "store", logger=logging.getLogger("test"))
+        section_store.store({SectionName("a"): (1, 2, [["a"]]), SectionName("b"): (3, 4, [["b"]])})
+
+        loaded = section_store.load()
+        assert loaded[SectionName("a")][2] == [["a"]]
+        # Write back without decoding the untouched section
+        section_store.store(loaded)
+        content_b = loaded[SectionName("b")][2]
+        assert isinstance(content_b, _LazySection) and content_b._content is None
+
+        assert section_store.load() == {
+            SectionName("a"): (1, 2, [["a"]]),
+            SectionName("b"): (3, 4, [["b"]]),
+        }
+
+    def test_load_pickled_sections(self, tmp_path: Path) -> None:
+        path = tmp_path / "store"
+        path.write_bytes(
+            pickle.dumps({"new": (1, 2, [["content"]]), "old": (1, [["outdated format"]])})
+        )
+        section_store = SectionStore[object](path, logger=logging.getLogger("test"))
+
+        assert section_store.load() == {SectionName("new"): (1, 2, [["content"]])}
+
 
 class TestMaxAge:
     def test_repr(self) -> None:
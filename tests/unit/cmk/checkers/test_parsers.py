@@ -27,6 +27,7 @@ from cmk.snmplib import SNMPRawData
 from cmk.fetchers.cache import SectionStore
 
 from cmk.checkengine.parser import AgentParser, AgentRawDataSectionElem, NO_SELECTION, SNMPParser
+from cmk.checkengine.parser._agent import _split_host_sections
 from cmk.checkengine.parser._markers import PiggybackMarker, SectionMarker
 
 from cmk.base.plugins.agent_based.agent_based_api.v1.type_defs import StringTable
@@ -696,6 +697,36 @@ class TestAgentParser:
         }
         assert store.load() == {}
 
+    @pytest.mark.parametrize(
+        "raw_data",
+        [
+            pytest.param(b"", id="empty"),
+            pytest.param(b"no\nheader\n", id="no header"),
+            pytest.param(b"<<<a>>>", id="header only"),
+            pytest.param(b"<<<a>>>\n 1 2 \n\n  \n3\n", id="strip and skip empty lines"),
+            pytest.param(b"<<<a:nostrip()>>>\n 1 2 \n\n  \n3\r\n", id="nostrip"),
+            pytest.param(b"<<<a>>>\r\n1\r\n<<<b:sep(124)>>>\r\n2|3\r\n", id="windows"),
+            pytest.param(b"ignored\n<<<a>>>\n1\n<<<>>>\nignored\n<<<b>>>\n2", id="footer"),
+            pytest.param(b"<<<a>>>\n1\n<<<:cached(1,2)>>>\n2\n<<<a>>>\n3", id="nameless"),
+            pytest.param(b"<<<a>>>\n1\n<<<b>>>\n2\n<<<a>>>\n3\n<<<a>>>\n4", id="repeated"),
+            pytest.param(b"<<<a>>>\n<<< 1\n>>> 2\n3 >>>\n<<<a>>> 4\n <<<b>>>", id="no markers"),
+        ],
+    )
+    def test_fast_path_matches_state_machine(self, parser: AgentParser, raw_data: bytes) -> None:
+        sections = _split_host_sections(AgentRawData(raw_data))
+        assert sections is not None
+        assert (sections, {}) == parser._parse_host_section_by_states(AgentRawData(raw_data))
+
+    @pytest.mark.parametrize(
+        "raw_data",
+        [
+            pytest.param(b"<<<a>>>\n1\n<<<<piggy>>>>\n<<<a>>>\n2\n<<<<>>>>", id="piggyback"),
+            pytest.param(b"<<<a:cached(1)>>>\n1", id="invalid header"),
+        ],
+    )
+    def test_fast_path_falls_back_to_state_machine(self, raw_data: bytes) -> None:
+        assert _split_host_sections(AgentRawData(raw_data)) is None
+
 
 class TestSectionMarker:
     def test_options_serialize_options(self) -> None:
@@ -3,12 +3,35 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import logging
+import os
 from pathlib import Path
 
 import pytest
 
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig
+
 import cmk.fetchers.snmp_backend._utils as utils
 from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend.stored_walk import _WalkIndex
+
+SNMP_HOST_CONFIG = SNMPHostConfig(
+    False,
+    HostName("unittest"),
+    HostAddress("127.0.0.1"),
+    "",
+    0,
+    False,
+    False,
+    0,
+    {},
+    {},
+    [],
+    None,
+    SNMPBackendEnum.STORED_WALK,
+)
 
 
 @pytest.mark.parametrize(
@@ -52,6 +75,69 @@ class TestStoredWalkSNMPBackend:
         ]
 
 
+class TestStoredWalkSNMPBackendWalk:
+    @pytest.fixture(name="walk_path")
+    def fixture_walk_path(self, tmp_path: Path) -> Path:
+        walk_path = tmp_path / "walk"
+        walk_path.write_text(
+            ".1.2.3 foo\n"
+            '.1.2.3.1 "bar"\n'
+            ".1.2.3.2 multi\nline\n"
+            ".1.2.3.10 ten\n"
+            ".1.2.30 other\n"
+            ".1.3\n"
+        )
+        return walk_path
+
+    @pytest.fixture(name="backend")
+    def fixture_backend(self, walk_path: Path) -> StoredWalkSNMPBackend:
+        return StoredWalkSNMPBackend(SNMP_HOST_CONFIG, logging.getLogger("test"), walk_path)
+
+    @pytest.mark.parametrize(
+        "oid, expected",
+        [
+            (
+                ".1.2.3",
+                [
+                    (".1.2.3", b"foo"),
+                    (".1.2.3.1", b"bar"),
+                    (".1.2.3.2", b"multi\nline"),
+                    (".1.2.3.10", b"ten"),
+                ],
+            ),
+            ("1.2.3.2", [(".1.2.3.2", b"multi\nline")]),
+            (".1.2.3.*", [(".1.2.3.1", b"bar")]),
+            (".1.2.30", [(".1.2.30", b"other")]),
+            (".1.3", [(".1.3", b"")]),
+            (".1.2.4", []),
+            (".1.4", []),
+        ],
+    )
+    def test_walk(self, backend: StoredWalkSNMPBackend, oid: str, expected: list) -> None:
+        assert backend.walk(oid) == expected
+
+    def test_get(self, backend: StoredWalkSNMPBackend) -> None:
+        assert backend.get(".1.2.30") == b"other"
+        assert backend.get(".1.2.3.*") == b"bar"
+        assert backend.get(".1.2.3") is None
+
+    def test_index_is_persisted(self, backend: StoredWalkSNMPBackend, walk_path: Path) -> None:
+        backend.walk(".1.2.30")
+        assert _WalkIndex.path_for(walk_path).exists()
+
+    def test_index_is_invalidated(self, backend: StoredWalkSNMPBackend, walk_path: Path) -> None:
+        assert backend.walk(".1.2.30") == [(".1.2.30", b"other")]
+        walk_path.write_text(".1.2.30 changed\n")
+        os.utime(walk_path, ns=(0, 0))
+        assert backend.walk(".1.2.30") == [(".1.2.30", b"changed")]
+
+    def test_unsorted_walk(self, tmp_path: Path) -> None:
+        walk_path = tmp_path / "walk"
+        walk_path.write_text(".1.2.10 b\n.1.2.2 a\n")
+        backend = StoredWalkSNMPBackend(SNMP_HOST_CONFIG, logging.getLogger("test"), walk_path)
+        assert backend.walk(".1.2") == [(".1.2.2", b"a"), (".1.2.10", b"b")]
+
+
 @pytest.fixture
 def create_files(tmpdir):
     tmpdir.mkdir("walkdata")
@@ -7,7 +7,16 @@ import logging
 import shlex
 from pathlib import Path
 
+import pytest
+
+from tests.testlib import CMKEventConsole
+
+from cmk.utils.hostaddress import HostName
+
 from cmk.ec.history import _grep_pipeline, convert_history_line, History, parse_history_file
+from cmk.ec.main import StatusServer
+from cmk.ec.query import QueryGET
+from cmk.ec.settings import Settings
 
 
 def test_convert_history_line(history: History) -> None:
@@ -51,3 +60,36 @@ def test_history_parse(history: History, tmp_path: Path) -> None:
 
     assert len(new_entries) == 4
     assert new_entries[0][1] == 1666942292.3000507
+
+
+@pytest.mark.parametrize(
+    "filter_lines",
+    [
+        ["Filter: event_host = host-1"],
+        ["Filter: event_host in HOST-1 host-2"],
+        ["Filter: event_host =~ HOST-1", "Filter: event_id = 4"],
+        ["Filter: event_rule_id = 815", "Filter: event_text ~ text [0-4]"],
+        ["Filter: event_rule_id in 815 other", "Filter: history_time > 0"],
+        ["Filter: event_host = host-1", "Limit: 2"],
+    ],
+)
+def test_get_history_with_index(
+    settings: Settings, history: History, status_server: StatusServer, filter_lines: list[str]
+) -> None:
+    for num in range(10):
+        history.add(
+            CMKEventConsole.new_event(
+                {"id": num, "host": HostName(f"host-{num % 3}"), "text": f"text {num}"}
+            ),
+            "NEW",
+        )
+    (path,) = settings.paths.history_dir.value.glob("*.log")
+    path.rename(path.with_name(f"{int(path.stem) - 86400}.log"))
+    history.add(CMKEventConsole.new_event({"id": 10, "host": HostName("host-1")}), "NEW")
+
+    query = QueryGET(status_server, ["GET history", *filter_lines], logging.getLogger())
+    scanned = history.get(query)
+    history.housekeeping()
+    assert len(list(settings.paths.history_dir.value.glob("*.idx"))) == 1
+    assert scanned
+    assert history.get(query) == scanned
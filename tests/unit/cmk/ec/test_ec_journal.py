@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import logging
+
+import pytest
+
+from tests.testlib import CMKEventConsole
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.ec.config import Config
+from cmk.ec.history import History
+from cmk.ec.main import EventServer, EventStatus
+from cmk.ec.perfcounters import Perfcounters
+from cmk.ec.settings import Settings
+
+
+@pytest.fixture(name="journal_config")
+def fixture_journal_config(config: Config) -> Config:
+    config["retention_journal"] = True
+    return config
+
+
+def _event_status(
+    settings: Settings, config: Config, perfcounters: Perfcounters, history: History
+) -> EventStatus:
+    settings.paths.status_file.value.parent.mkdir(parents=True, exist_ok=True)
+    return EventStatus(
+        settings, config, perfcounters, history, logging.getLogger("cmk.mkeventd.EventStatus")
+    )
+
+
+def _new_event(event_status: EventStatus, host_name: str) -> None:
+    event_status.new_event(
+        CMKEventConsole.new_event({"host": HostName(host_name), "core_host": HostName(host_name)})
+    )
+
+
+def test_save_and_load_status_with_journal(
+    settings: Settings,
+    journal_config: Config,
+    perfcounters: Perfcounters,
+    history: History,
+    event_server: EventServer,
+) -> None:
+    event_status = _event_status(settings, journal_config, perfcounters, history)
+    for num in range(3):
+        _new_event(event_status, f"host-{num}")
+    event_status.save_status()
+    snapshot = settings.paths.status_file.value.read_bytes()
+
+    _new_event(event_status, "host-3")
+    event_status.remove_event(event_status.events()[0], "DELETE")
+    event_status.events()[0]["comment"] = "changed"
+    event_status.count_rule_match("815")
+    event_status.save_status()
+
+    assert settings.paths.status_file.value.read_bytes() == snapshot
+    assert len(settings.paths.status_journal_file.value.read_bytes().splitlines()) == 5
+
+    loaded_status = _event_status(settings, journal_config, perfcounters, history)
+    loaded_status.load_status(event_server)
+    assert loaded_status.pack_status() == event_status.pack_status()
+
+
+def test_load_status_ignores_journal_of_other_snapshot(
+    settings: Settings,
+    journal_config: Config,
+    perfcounters: Perfcounters,
+    history: History,
+    event_server: EventServer,
+) -> None:
+    event_status = _event_status(settings, journal_config, perfcounters, history)
+    event_status.save_status()
+    _new_event(event_status, "host-0")
+    event_status.save_status()
+    journal = settings.paths.status_journal_file.value.read_bytes()
+
+    journal_config["retention_journal"] = False
+    event_status.save_status()
+    assert not settings.paths.status_journal_file.value.exists()
+    _new_event(event_status, "host-1")
+    event_status.save_status()
+
+    settings.paths.status_journal_file.value.write_bytes(journal)
+    loaded_status = _event_status(settings, journal_config, perfcounters, history)
+    loaded_status.load_status(event_server)
+    assert loaded_status.pack_status() == event_status.pack_status()
+
+
+def test_load_status_ignores_incomplete_journal_record(
+    settings: Settings,
+    journal_config: Config,
+    perfcounters: Perfcounters,
+    history: History,
+    event_server: EventServer,
+) -> None:
+    event_status = _event_status(settings, journal_config, perfcounters, history)
+    event_status.save_status()
+    _new_event(event_status, "host-0")
+    event_status.save_status()
+    with settings.paths.status_journal_file.value.open("ab") as f:
+        f.write(b"('event', {'id': 2, 'host': 'ho")
+
+    loaded_status = _event_status(settings, journal_config, perfcounters, history)
+    loaded_status.load_status(event_server)
+    assert loaded_status.pack_status() == event_status.pack_status()
@@ -15,7 +15,7 @@ from cmk.utils.hostaddress import HostName
 
 from cmk.ec.config import ConfigFromWATO
 from cmk.ec.event import Event
-from cmk.ec.main import EventStatus, StatusServer
+from cmk.ec.main import EventStatus, LimitKind, StatusServer
 
 
 def test_handle_client(status_server: StatusServer) -> None:
@@ -132,3 +132,75 @@ def test_mkevent_query_filters(
     status_server.handle_client(status_socket, True, "127.0.0.1")
     response = status_socket.get_response()
     assert (len(response) == 2) is is_match
+
+
+def _new_events(event_status: EventStatus, events: list[tuple[str, str]]) -> None:
+    for rule_id, host_name in events:
+        event_status.new_event(
+            CMKEventConsole.new_event(
+                {"rule_id": rule_id, "host": HostName(host_name), "core_host": HostName(host_name)}
+            )
+        )
+
+
+@pytest.mark.parametrize(
+    "limit_kind, remaining_ids",
+    [
+        ("overall", [2, 3, 4]),
+        ("by_rule", [1, 3, 4]),
+        ("by_host", [2, 3, 4]),
+    ],
+)
+def test_remove_oldest_event(
+    event_status: EventStatus, limit_kind: LimitKind, remaining_ids: list[int]
+) -> None:
+    _new_events(event_status, [("r1", "h1"), ("r2", "h2"), ("r2", "h1"), ("r1", "h2")])
+
+    event_status.remove_oldest_event(
+        limit_kind,
+        CMKEventConsole.new_event(
+            {"rule_id": "r2", "host": HostName("h1"), "core_host": HostName("h1")}
+        ),
+    )
+
+    assert [e["id"] for e in event_status.events()] == remaining_ids
+    assert event_status.num_existing_events == 3
+
+
+def test_event_status_indexes_after_unpack(event_status: EventStatus) -> None:
+    _new_events(event_status, [("r1", "h1"), ("r2", "h2"), ("r1", "h2")])
+    status = event_status.pack_status()
+
+    event_status.flush()
+    assert not event_status.events_of_rule("r1")
+
+    event_status.unpack_status(status)
+    assert [e["id"] for e in event_status.events_of_rule("r1")] == [1, 3]
+    assert (
+        event_status.get_num_existing_events_by(
+            "by_host",
+            CMKEventConsole.new_event({"host": HostName("h2"), "core_host": HostName("h2")}),
+        )
+        == 2
+    )
+    assert (event := event_status.event(2)) is not None
+    assert event["rule_id"] == "r2"
+
+
+def test_count_event_up_moves_event_to_new_host(event_status: EventStatus) -> None:
+    _new_events(event_status, [("r1", "h1")])
+    found = event_status.events()[0]
+
+    event_status.count_event_up(
+        found,
+        CMKEventConsole.new_event(
+            {"rule_id": "r1", "host": HostName("h2"), "core_host": HostName("h2")}
+        ),
+    )
+    event_status.remove_event(found, "DELETE")
+
+    assert not event_status.events()
+    assert event_status.num_existing_events_by_host == {
+        (HostName("h1"), HostName("h1")): 0,
+        (HostName("h2"), HostName("h2")): 0,
+    }
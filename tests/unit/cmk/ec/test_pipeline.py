@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import logging
+import random
+import time
+from collections.abc import Callable
+
+from cmk.ec.config import Config
+from cmk.ec.main import EventServer
+from cmk.ec.pipeline import EventPipeline
+from cmk.ec.settings import Settings
+
+logger = logging.getLogger("cmk.mkeventd")
+
+
+def _task(
+    key: str, number: int, applied: list[tuple[str, int]]
+) -> Callable[[], tuple[str, Callable[[], None]]]:
+    def classify() -> tuple[str, Callable[[], None]]:
+        time.sleep(random.uniform(0, 0.002))
+        return key, lambda: applied.append((key, number))
+
+    return classify
+
+
+def test_pipeline_applies_in_order_per_key() -> None:
+    applied: list[tuple[str, int]] = []
+    pipeline = EventPipeline(logger, 4, 10)
+    pipeline.start()
+    for number in range(200):
+        assert pipeline.submit(_task(random.choice("abc"), number, applied))
+    pipeline.stop()
+
+    assert len(applied) == 200
+    for key in "abc":
+        numbers = [number for k, number in applied if k == key]
+        assert numbers == sorted(numbers)
+
+
+def test_pipeline_drops_when_full() -> None:
+    applied: list[tuple[str, int]] = []
+    pipeline = EventPipeline(logger, 1, 1)
+    assert pipeline.submit(_task("a", 0, applied), block=False)
+    assert not pipeline.submit(_task("a", 1, applied), block=False)
+    assert pipeline.queue_length() == 1
+
+    pipeline.start()
+    pipeline.stop()
+    assert applied == [("a", 0)]
+    assert pipeline.queue_length() == 0
+
+
+def test_pipeline_skips_failing_messages() -> None:
+    def fail() -> tuple[str, Callable[[], None]]:
+        raise ValueError()
+
+    applied: list[tuple[str, int]] = []
+    pipeline = EventPipeline(logger, 2, 10)
+    pipeline.start()
+    pipeline.submit(_task("a", 0, applied))
+    pipeline.submit(fail)
+    pipeline.submit(_task("a", 2, applied))
+    pipeline.stop()
+    assert applied == [("a", 0), ("a", 2)]
+
+
+def test_event_server_with_pipeline(
+    event_server: EventServer, settings: Settings, config: Config
+) -> None:
+    config["processing_pipeline"] = {"threads": 2, "max_queued_messages": 10}
+    config["archive_orphans"] = True
+    event_server.reload_configuration(config)
+    event_server._update_pipeline()
+    event_server.handle_snmptrap([("1.3.6.1.2.1.1.3.0", "9954")], "127.0.0.1")
+    event_server.process_raw_lines(b"message 1\nmessage 2\n", None)
+    event_server._stop_pipeline()
+
+    status = dict(
+        zip(
+            [column_name for column_name, _default in event_server.status_columns()],
+            event_server.get_status()[0],
+        )
+    )
+    assert status["status_messages"] == 3
+    assert status["status_queue_length"] == 0
+    assert status["status_queue_drops"] == 0
+    # Nothing matches without rules, so the events have been archived
+    assert (
+        sum(
+            len(path.read_bytes().splitlines())
+            for path in settings.paths.history_dir.value.glob("*.log")
+        )
+        == 3
+    )
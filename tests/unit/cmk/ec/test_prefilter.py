@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import re
+
+import pytest
+
+from tests.testlib import CMKEventConsole
+
+from cmk.ec.config import Rule
+from cmk.ec.main import EventServer
+from cmk.ec.prefilter import _Automaton, required_literals, RulePrefilter
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("disk full", {"disk full"}),
+        (re.compile("link (up|down)", re.IGNORECASE), {"link "}),
+        (re.compile("(error|warning)s?", re.IGNORECASE), {"error", "warning"}),
+        (re.compile("foo.*barbaz", re.IGNORECASE), {"barbaz"}),
+        (re.compile("(Kernel)+ oops", re.IGNORECASE), {"kernel"}),
+        (re.compile("(kernel)* oops", re.IGNORECASE), {" oops"}),
+        (re.compile("(?>kernel|driver) oops", re.IGNORECASE), {"kernel", "driver"}),
+        (re.compile("(?>[0-9]+) errors", re.IGNORECASE), {" errors"}),
+        (re.compile("(?:kernel)++ oops", re.IGNORECASE), {"kernel"}),
+        (re.compile("^[0-9]+$", re.IGNORECASE), None),
+        (re.compile("a|b|.*", re.IGNORECASE), None),
+        (re.compile("schöner", re.IGNORECASE), {"sch"}),
+        (re.compile("ü", re.IGNORECASE), None),
+    ],
+)
+def test_required_literals(pattern: str | re.Pattern[str], expected: set[str] | None) -> None:
+    assert required_literals(pattern) == expected
+
+
+def test_automaton_finds_overlapping_keywords() -> None:
+    automaton = _Automaton(["he", "she", "his", "hers"])
+    assert automaton.find("ushers") == {0, 1, 3}
+    assert automaton.find("hi there") == {0}
+    assert not automaton.find("nothing")
+
+
+def _rule(rule_id: str, **kwargs: object) -> Rule:
+    rule = Rule(id=rule_id)
+    rule.update(kwargs)  # type: ignore[typeddict-item]
+    return rule
+
+
+def test_rule_prefilter() -> None:
+    rules = [
+        _rule("link", match=re.compile("link (up|down)", re.IGNORECASE)),
+        _rule(
+            "cancel",
+            match=re.compile("temperature high", re.IGNORECASE),
+            match_ok=re.compile("temperature ok", re.IGNORECASE),
+        ),
+        _rule("inverted", match=re.compile("link", re.IGNORECASE), invert_matching=True),
+        _rule("anything", match=re.compile(".*", re.IGNORECASE)),
+        _rule("no_match"),
+    ]
+    prefilter = RulePrefilter(rules)
+    assert prefilter.num_filtered_rules == 2
+    assert [rule["id"] for rule in rules if prefilter.filters(rule)] == ["link", "cancel"]
+
+    assert prefilter.possible_rules("LINK UP on eth0") == {"link"}
+    assert prefilter.possible_rules("Temperature OK") == {"cancel"}
+    assert prefilter.possible_rules("something else") == set()
+
+
+def test_event_server_skips_rules_with_prefilter(event_server: EventServer) -> None:
+    event_server.compile_rules(
+        [
+            {
+                "id": "pack",
+                "title": "Pack",
+                "disabled": False,
+                "rules": [
+                    _rule("link", match="link (up|down)"),
+                    _rule("disk", match="disk (full|failed)"),
+                ],
+            }
+        ]
+    )
+    assert event_server._prefilter is not None
+    assert event_server._prefilter.num_filtered_rules == 2
+
+    rule_match = event_server.classify_event(
+        CMKEventConsole.new_event({"text": "Disk failed on /dev/sda"})
+    )
+    assert rule_match is not None
+    assert rule_match[0]["id"] == "disk"
+    assert event_server._prefilter_stats == [2, 1]
@@ -133,6 +133,7 @@ def test_default_config_from_plugins() -> None:
         "wato_pprint_config",
         "wato_icon_categories",
         "wato_activate_changes_comment_mode",
+        "wato_activate_changes_concurrency",
         "rest_api_etag_locking",
         "aggregation_rules",
         "aggregations",
@@ -5,8 +5,11 @@
 
 import io
 import logging
+import shutil
+import subprocess
 import tarfile
 from pathlib import Path
+from typing import Any
 
 import pytest
 from werkzeug import datastructures as werkzeug_datastructures
@@ -20,9 +23,10 @@ import cmk.utils.version as cmk_version
 
 import cmk.gui.watolib.activate_changes as activate_changes
 import cmk.gui.watolib.utils
+from cmk.gui.config import active_config
 from cmk.gui.http import Request
 from cmk.gui.watolib.activate_changes import ConfigSyncFileInfo
-from cmk.gui.watolib.config_sync import ReplicationPath
+from cmk.gui.watolib.config_sync import ReplicationPath, SnapshotSettings
 
 logger = logging.getLogger(__name__)
 
@@ -271,6 +275,7 @@ def test_automation_get_config_sync_state() -> None:
             ),
         },
         0,
+        ["gzip", "chunks"],
     )
 
 
@@ -353,6 +358,98 @@ def test_get_config_sync_file_infos() -> None:
     }
 
 
+def test_get_config_sync_file_infos_with_hash_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    base_dir = cmk.utils.paths.omd_root / "replication"
+    _create_get_config_sync_file_infos_test_config(base_dir)
+    replication_paths = [
+        ReplicationPath("dir", "d4-multiple-files", "etc/d4", []),
+        ReplicationPath("file", "f2", "bla/blub/f2", []),
+    ]
+    expected = activate_changes._get_config_sync_file_infos(replication_paths, base_dir)
+    # Pretend the files have not been modified recently
+    monkeypatch.setattr(activate_changes.ConfigSyncFileHashCache, "_MIN_AGE", -60.0)
+
+    cache_path = cmk.utils.paths.omd_root / "file_hashes.pkl"
+    hash_cache = activate_changes.ConfigSyncFileHashCache.load(cache_path)
+    assert (
+        activate_changes._get_config_sync_file_infos(
+            replication_paths, base_dir, hash_cache=hash_cache
+        )
+        == expected
+    )
+    hash_cache.save()
+
+    hashed = []
+    monkeypatch.setattr(
+        activate_changes,
+        "_create_config_sync_file_hash",
+        lambda file_path: hashed.append(file_path),
+    )
+    hash_cache = activate_changes.ConfigSyncFileHashCache.load(cache_path)
+    assert (
+        activate_changes._get_config_sync_file_infos(
+            replication_paths, base_dir, hash_cache=hash_cache
+        )
+        == expected
+    )
+    assert not hashed
+
+
+def test_config_sync_file_hash_cache_survives_activations(monkeypatch: pytest.MonkeyPatch) -> None:
+    omd_root = cmk.utils.paths.omd_root
+    _create_get_config_sync_file_infos_test_config(omd_root)
+    replication_paths = [
+        ReplicationPath("dir", "d4-multiple-files", "etc/d4", []),
+        ReplicationPath("file", "f2", "bla/blub/f2", []),
+    ]
+    # Pretend the files have not been modified recently
+    monkeypatch.setattr(activate_changes.ConfigSyncFileHashCache, "_MIN_AGE", -60.0)
+    hashed: list[str] = []
+    create_config_sync_file_hash = activate_changes._create_config_sync_file_hash
+
+    def _create_config_sync_file_hash(file_path: str) -> str:
+        hashed.append(file_path)
+        return create_config_sync_file_hash(file_path)
+
+    monkeypatch.setattr(
+        activate_changes, "_create_config_sync_file_hash", _create_config_sync_file_hash
+    )
+
+    file_infos = []
+    for _activation in range(2):
+        hashed.clear()
+        hash_cache = activate_changes.ConfigSyncFileHashCache.load(omd_root / "file_hashes.pkl")
+        file_infos.append(
+            activate_changes._get_config_sync_file_infos_per_inode(replication_paths, hash_cache)
+        )
+        hash_cache.save()
+
+        # The snapshots of the sites hard link the files, which changes their status change times
+        site_configs_dir = omd_root / "site_configs"
+        first_work_dir = site_configs_dir / "first"
+        first_work_dir.mkdir(parents=True)
+        for site_path in ("etc", "bla"):
+            subprocess.run(
+                ["cp", "-al", str(omd_root / site_path), f"{first_work_dir}/"], check=True
+            )
+        activate_changes._clone_site_config_directory(
+            logger,
+            "second",
+            SnapshotSettings(
+                snapshot_path=str(site_configs_dir / "second.tar"),
+                work_dir=str(site_configs_dir / "second"),
+                snapshot_components=replication_paths,
+                component_names=set(),
+                site_config=SiteConfiguration({}),
+            ),
+            str(first_work_dir),
+        )
+        shutil.rmtree(site_configs_dir)
+
+    assert not hashed
+    assert file_infos[0] == file_infos[1]
+
+
 def _create_get_config_sync_file_infos_test_config(base_dir: Path) -> None:
     base_dir.joinpath("etc/d1").mkdir(parents=True, exist_ok=True)
 
@@ -550,6 +647,81 @@ def _get_test_file_infos() -> tuple[dict[str, ConfigSyncFileInfo], dict[str, Con
     return remote, central
 
 
+class _FakeAsyncResult:
+    def __init__(self, result: object, ready: bool) -> None:
+        self._result = result
+        self._ready = ready
+
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> object:
+        return self._result
+
+
+class _FakeTaskPool:
+    def __init__(self) -> None:
+        self.started: list[str] = []
+
+    def apply_async(self, func: object, args: tuple, error_callback: object) -> _FakeAsyncResult:
+        self.started.append(args[2]["_site_id"])
+        return _FakeAsyncResult(None, ready=False)
+
+
+def test_handle_active_tasks_does_not_wait_for_slow_sites() -> None:
+    sync_state = activate_changes.SyncState(
+        central_file_infos={}, remote_file_infos={}, remote_config_generation=1
+    )
+    fetch_sync_state: dict[SiteId, Any] = {
+        SiteId("slow"): _FakeAsyncResult(None, ready=False),
+        SiteId("failed"): _FakeAsyncResult(None, ready=True),
+        SiteId("fast"): _FakeAsyncResult(
+            (sync_state, {"_site_id": SiteId("fast")}, 0.0), ready=True
+        ),
+    }
+    active_tasks = activate_changes.ActiveTasks(
+        collect_central_file_infos={},
+        fetch_sync_state=fetch_sync_state,
+        calc_sync_delta={},
+        synchronize_files={},
+        activate_remote_changes={},
+    )
+    task_pool = _FakeTaskPool()
+    sync_state_per_site: dict[SiteId, activate_changes.SyncState] = {}
+
+    activate_changes._handle_active_tasks(
+        active_tasks,
+        activate_changes.ActivateChanges(),
+        None,
+        False,
+        sync_state_per_site,
+        {},
+        task_pool,  # type: ignore[arg-type]
+    )
+
+    assert list(active_tasks["fetch_sync_state"]) == [SiteId("slow")]
+    assert list(active_tasks["calc_sync_delta"]) == [SiteId("fast")]
+    assert task_pool.started == [SiteId("fast")]
+    assert sync_state_per_site == {SiteId("fast"): sync_state}
+
+
+@pytest.mark.parametrize(
+    "concurrency,num_sites,expected",
+    [
+        (None, 120, 120),
+        (20, 120, 20),
+        (20, 5, 5),
+        (None, 0, 1),
+    ],
+)
+def test_num_activation_threads(
+    monkeypatch: pytest.MonkeyPatch, concurrency: int | None, num_sites: int, expected: int
+) -> None:
+    with monkeypatch.context() as m:
+        m.setattr(active_config, "wato_activate_changes_concurrency", concurrency)
+        assert activate_changes._num_activation_threads(num_sites) == expected
+
+
 def test_get_sync_archive(tmp_path: Path) -> None:
     sync_archive = _get_test_sync_archive(tmp_path)
     with tarfile.TarFile(mode="r", fileobj=io.BytesIO(sync_archive)) as f:
@@ -565,7 +737,13 @@ def test_get_sync_archive(tmp_path: Path) -> None:
         )
 
 
-def _get_test_sync_archive(tmp_path: Path) -> bytes:
+def test_get_compressed_sync_archive(tmp_path: Path) -> None:
+    sync_archive = _get_test_sync_archive(tmp_path, compress=True)
+    with tarfile.open(mode="r:gz", fileobj=io.BytesIO(sync_archive)) as f:
+        assert "etc/abc" in f.getnames()
+
+
+def _get_test_sync_archive(tmp_path: Path, compress: bool = False) -> bytes:
     tmp_path.joinpath("etc").mkdir(parents=True, exist_ok=True)
     with tmp_path.joinpath("etc/abc").open("w", encoding="utf-8") as f:
         f.write("gä")
@@ -593,6 +771,7 @@ def _get_test_sync_archive(tmp_path: Path) -> bytes:
             "working-symlink",
         ],
         tmp_path,
+        compress=compress,
     )
 
 
@@ -663,6 +842,46 @@ class TestAutomationReceiveConfigSync:
         assert file_to_dir.is_dir()
         assert file_to_dir.joinpath("aaa").exists()
 
+    def test_automation_receive_uploaded_config_sync(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        remote_path = tmp_path / "remote"
+        remote_path.mkdir(parents=True)
+        monkeypatch.setattr(cmk.utils.paths, "omd_root", remote_path)
+        monkeypatch.setattr(
+            cmk.gui.watolib.activate_changes,
+            "_execute_post_config_sync_actions",
+            lambda site_id: None,
+        )
+        sync_archive = _get_test_sync_archive(tmp_path.joinpath("central"), compress=True)
+
+        transfer_id = "4c9f3c4b-2f4a-4b8e-9d0f-1f2e3d4c5b6a"
+        chunk_automation = activate_changes.AutomationReceiveConfigSyncChunk()
+        for offset, expected_size in [(0, 10), (10, 20), (10, 20), (30, 20), (20, None)]:
+            request = activate_changes.ReceiveConfigSyncChunkRequest(
+                site_id=SiteId("remote"),
+                transfer_id=transfer_id,
+                offset=offset,
+                chunk=sync_archive[offset : offset + 10 if expected_size else None],
+            )
+            assert chunk_automation.execute(request) == (expected_size or len(sync_archive))
+
+        activate_changes.AutomationReceiveConfigSync().execute(
+            activate_changes.ReceiveConfigSyncRequest(
+                site_id=SiteId("remote"),
+                sync_archive=b"",
+                to_delete=[],
+                config_generation=0,
+                compressed=True,
+                transfer_id=transfer_id,
+            )
+        )
+
+        assert remote_path.joinpath("etc/abc").read_text() == "gä"
+        assert not activate_changes._sync_archive_upload_path(transfer_id).exists()
+
     def test_get_request(
         self,
         monkeypatch: pytest.MonkeyPatch,
@@ -696,6 +915,31 @@ class TestAutomationReceiveConfigSync:
         )
 
 
+def test_upload_sync_archive_continues_after_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(activate_changes, "_SYNC_ARCHIVE_CHUNK_SIZE", 3)
+    received = bytearray()
+    failures = [True, False, False, True]
+
+    def do_remote_automation(
+        site: SiteConfiguration,
+        command: str,
+        vars_: list[tuple[str, str]],
+        files: dict[str, io.BytesIO],
+    ) -> int:
+        assert command == "receive-config-sync-chunk"
+        if int(dict(vars_)["offset"]) == len(received):
+            received.extend(files["chunk"].read())
+        if failures.pop(0) if failures else False:
+            raise ConnectionError()  # The response got lost
+        return len(received)
+
+    monkeypatch.setattr(cmk.gui.watolib.automations, "do_remote_automation", do_remote_automation)
+    activate_changes._upload_sync_archive(
+        SiteConfiguration(), SiteId("remote"), b"0123456789"  # type: ignore[typeddict-item]
+    )
+    assert bytes(received) == b"0123456789"
+
+
 def test_get_current_config_generation() -> None:
     assert activate_changes._get_current_config_generation() == 0
     activate_changes.update_config_generation()
@@ -1012,6 +1012,32 @@ def test_load_redis_folders_on_demand(monkeypatch: MonkeyPatch) -> None:
         assert isinstance(g.wato_folders._raw_dict[""], hosts_and_folders.Folder)
 
 
+@pytest.mark.usefixtures("with_admin_login")
+def test_folder_metadata_index_without_redis(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(hosts_and_folders, "may_use_redis", lambda: False)
+    tree = folder_tree()
+    sub = tree.root_folder().create_subfolder("sub", "Sub", {})
+    sub.create_subfolder("subsub", "Sub sub", {}).create_hosts(
+        [(HostName("host-1"), HostAttributes(), []), (HostName("host-2"), HostAttributes(), [])]
+    )
+    tree.root_folder().create_hosts([(HostName("host-3"), HostAttributes(), [])])
+    tree.invalidate_caches()
+
+    cache = hosts_and_folders.get_folder_metadata_cache(tree)
+    assert isinstance(cache, hosts_and_folders._DiskFolderMetadataCache)
+    assert sorted(cache.folder_paths) == ["/", "sub/", "sub/subsub/"]
+    assert cache.num_hosts_recursively("/") == 3
+    assert cache.num_hosts_recursively("sub/") == 2
+    assert (metadata := cache.folder_metadata("sub/subsub")) is not None
+    assert metadata.title_path_without_root == "Sub/Sub sub"
+
+    # Saving a folder updates the index, without loading all folders again
+    sub.create_hosts([(HostName("host-4"), HostAttributes(), [])])
+    tree.invalidate_caches()
+    assert cache.num_hosts_recursively("sub/") == 3
+    assert cache.loaded_wato_folders is None
+
+
 def test_folder_exists() -> None:
     tree = folder_tree()
     tree.root_folder().create_subfolder("foo", "foo", {}).create_subfolder("bar", "bar", {})
@@ -56,6 +56,7 @@ def test_registered_automation_commands() -> None:
         "ping",
         "get-config-sync-state",
         "receive-config-sync",
+        "receive-config-sync-chunk",
         "service-discovery-job",
         "checkmk-remote-automation-start",
         "checkmk-remote-automation-get-status",
@@ -111,6 +112,7 @@ def test_registered_configvars() -> None:
         "history_rotation",
         "hostname_translation",
         "housekeeping_interval",
+        "incremental_config_creation",
         "http_proxies",
         "inventory_check_autotrigger",
         "inventory_check_interval",
@@ -129,6 +131,7 @@ def test_registered_configvars() -> None:
         "mkeventd_pprint_rules",
         "mkeventd_service_levels",
         "multisite_draw_ruleicon",
+        "nagios_config_workers",
         "notification_backlog",
         "notification_bulk_interval",
         "notification_fallback_email",
@@ -140,6 +143,7 @@ def test_registered_configvars() -> None:
         "password_policy",
         "piggyback_max_cachefile_age",
         "profile",
+        "processing_pipeline",
         "quicksearch_dropdown_limit",
         "quicksearch_search_order",
         "remote_status",
@@ -147,6 +151,7 @@ def test_registered_configvars() -> None:
         "reschedule_timeout",
         "restart_locking",
         "retention_interval",
+        "retention_journal",
         "rrdcached_tuning",
         "rule_optimizer",
         "selection_livetime",
@@ -185,6 +190,7 @@ def test_registered_configvars() -> None:
         "virtual_host_trees",
         "wato_activation_method",
         "wato_activate_changes_comment_mode",
+        "wato_activate_changes_concurrency",
         "wato_hide_filenames",
         "wato_hide_folders_without_read_permissions",
         "wato_hide_help_in_lists",
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# Copyright (C) 2023 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import ast
+from pathlib import Path
+
+from cmk.utils.structured_data import ImmutableTree, load_tree, SDRawTree, serialize_tree_file
+
+from cmk.update_config.plugins.actions.inventory_trees import ConvertInventoryTrees
+
+_RAW_TREE: SDRawTree = {
+    "Attributes": {"Pairs": {"os": "linux"}},
+    "Table": {},
+    "Nodes": {},
+}
+
+
+def test_convert_tree_files(tmp_path: Path) -> None:
+    tree_dir = tmp_path / "inventory"
+    status_data_dir = tmp_path / "status_data"
+    archive_dir = tmp_path / "inventory_archive"
+    (archive_dir / "heute").mkdir(parents=True)
+    tree_dir.mkdir()
+    status_data_dir.mkdir()
+
+    former_tree = tree_dir / "heute"
+    former_tree.write_text(repr(_RAW_TREE))
+    gz_tree = tree_dir / "heute.gz"
+    gz_tree.write_bytes(b"livestatus")
+    former_archived_tree = archive_dir / "heute" / "1700000000"
+    former_archived_tree.write_text(repr(_RAW_TREE))
+    pickled_status_data = status_data_dir / "heute"
+    pickled_status_data.write_bytes(serialize_tree_file(_RAW_TREE))
+    broken_tree = tree_dir / "morgen"
+    broken_tree.write_text("{'Attributes':")
+
+    assert ConvertInventoryTrees.convert_tree_files([tree_dir, status_data_dir], archive_dir) == 3
+
+    # The trees read by Livestatus are Python literals
+    assert ast.literal_eval(former_tree.read_text()) == _RAW_TREE
+    assert ast.literal_eval(pickled_status_data.read_text()) == _RAW_TREE
+    assert (tree_dir / "heute.pkl").read_bytes() == serialize_tree_file(_RAW_TREE)
+    assert (status_data_dir / "heute.pkl").read_bytes() == serialize_tree_file(_RAW_TREE)
+    assert former_archived_tree.read_bytes() == serialize_tree_file(_RAW_TREE)
+    assert load_tree(former_tree) == ImmutableTree.deserialize(_RAW_TREE)
+    assert gz_tree.read_bytes() == b"livestatus"
+    assert broken_tree.read_text() == "{'Attributes':"
+    assert not (tree_dir / "morgen.pkl").exists()
+
+    assert ConvertInventoryTrees.convert_tree_files([tree_dir, status_data_dir], archive_dir) == 0
@@ -3,11 +3,15 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import fcntl
+import os
 from collections.abc import Mapping
 
 import pytest
 
-from cmk.utils.prediction import _plugin_interface
+from tests.testlib import on_time
+
+from cmk.utils.prediction import _plugin_interface, _prediction
 
 
 @pytest.mark.parametrize(
@@ -81,3 +85,121 @@ def test_estimate_levels(
         )
         == result
     )
+
+
+def _request(**kwargs: object) -> _prediction.PredictionRequest:
+    return _prediction.PredictionRequest.parse_obj(
+        {
+            "host_name": "heute",
+            "service_description": "CPU load",
+            "dsname": "load15",
+            "cf": "MAX",
+            "params": {"period": "wday", "horizon": 90},
+            **kwargs,
+        }
+    )
+
+
+def test_prediction_request_store() -> None:
+    request_store = _prediction.PredictionRequestStore()
+    request_store.add(_request(), 1000)
+    request_store.add(_request(), 1100)
+    request_store.add(_request(dsname="load5"), 1100)
+
+    assert sorted(r.dsname for r in request_store.requests(2000)) == ["load15", "load5"]
+
+    request_store.add(_request(), 100000)
+    assert [r.dsname for r in request_store.requests(1100 + 2 * 86400 + 1)] == ["load15"]
+    assert not list(request_store.requests(100000 + 2 * 86400 + 1))
+
+
+@pytest.fixture(name="computed_predictions")
+def fixture_computed_predictions(
+    monkeypatch: pytest.MonkeyPatch,
+) -> list[tuple[_prediction.Timegroup, int]]:
+    computed: list[tuple[_prediction.Timegroup, int]] = []
+
+    def compute_prediction(
+        info: _prediction.PredictionInfo,
+        prediction_store: _prediction.PredictionStore,
+        now: int,
+        *_args: object,
+    ) -> _prediction.PredictionData:
+        computed.append((info.name, now))
+        data = _prediction.PredictionData(
+            columns=["average", "min", "max", "stdev"],
+            points=[[1.0, 0.5, 2.0, 0.3]],
+            data_twindow=list(info.range),
+            step=86400,
+        )
+        prediction_store.save_prediction(info, data)
+        return data
+
+    monkeypatch.setattr(_plugin_interface, "compute_prediction", compute_prediction)
+    monkeypatch.setattr(_plugin_interface, "_spread", lambda request, interval: 0)
+    return computed
+
+
+def test_precompute_predictions(
+    computed_predictions: list[tuple[_prediction.Timegroup, int]]
+) -> None:
+    # Monday, 2023-07-03, 12:00 and 22:00 UTC
+    noon, evening, midnight = 1688385600, 1688421600, 1688428800
+    with on_time(noon, "UTC"):
+        _plugin_interface.get_predictive_levels(
+            "heute",
+            "CPU load",
+            "load15",
+            _prediction.PredictionParameters(period="wday", horizon=90),
+            "MAX",
+        )
+    assert computed_predictions == [("monday", noon)]
+
+    # Nothing to do until the lead time before midnight
+    _plugin_interface.precompute_predictions(noon + 300, 300)
+    assert computed_predictions == [("monday", noon)]
+
+    _plugin_interface.precompute_predictions(evening, 300)
+    _plugin_interface.precompute_predictions(evening + 300, 300)
+    assert computed_predictions == [("monday", noon), ("tuesday", midnight)]
+
+    # The check does not need to compute the prediction at midnight
+    with on_time(midnight + 10, "UTC"):
+        assert _plugin_interface.get_predictive_levels(
+            "heute",
+            "CPU load",
+            "load15",
+            _prediction.PredictionParameters(period="wday", horizon=90),
+            "MAX",
+        ) == (1.0, (None, None, None, None))
+    assert len(computed_predictions) == 2
+
+
+def test_precompute_predictions_skips_while_running(
+    computed_predictions: list[tuple[_prediction.Timegroup, int]]
+) -> None:
+    noon = 1688385600
+    _prediction.PredictionRequestStore().add(
+        _prediction.PredictionRequest(
+            host_name="heute",
+            service_description="CPU load",
+            dsname="load15",
+            cf="MAX",
+            params=_prediction.PredictionParameters(period="wday", horizon=90),
+        ),
+        noon,
+    )
+
+    # The previous run still holds the lock
+    lock_file = _plugin_interface._precompute_lock_file()
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_file, os.O_RDONLY | os.O_CREAT, 0o660)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        _plugin_interface.precompute_predictions(noon, 300)
+        assert not computed_predictions
+    finally:
+        os.close(fd)
+
+    _plugin_interface.precompute_predictions(noon, 300)
+    assert computed_predictions == [("monday", noon)]
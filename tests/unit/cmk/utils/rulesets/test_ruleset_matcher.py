@@ -913,3 +913,67 @@ def test_matches_tag_condition(
         )
         is expected_result
     )
+
+
+_DIFFERENTIAL_CONDITIONS: Sequence[RuleConditionsSpec] = [
+    {},
+    {"host_name": []},
+    {"host_name": ["host1", "unknown"]},
+    {"host_name": {"$nor": ["host1"]}},
+    {"host_name": [{"$regex": "host[12]"}, "lvl2"]},
+    {"host_name": {"$nor": [{"$regex": "lvl"}]}},
+    {"host_folder": "/lvl1/"},
+    {"host_folder": "/lvl1"},
+    {"host_folder": "/lvl1/lvl2/", "host_name": ["lvl2", "host1"]},
+    {"host_tags": {TagGroupID("criticality"): TagID("prod")}},
+    {"host_tags": {TagGroupID("criticality"): {"$ne": TagID("prod")}}},
+    {"host_tags": {TagGroupID("networking"): {"$or": [TagID("lan"), TagID("dmz")]}}},
+    {"host_tags": {TagGroupID("networking"): {"$nor": [TagID("lan"), TagID("dmz")]}}},
+    {
+        "host_tags": {
+            TagGroupID("criticality"): TagID("test"),
+            TagGroupID("networking"): {"$ne": TagID("wan")},
+        },
+        "host_folder": "/lvl1/",
+    },
+    {"host_labels": {"os": "linux"}},
+    {"host_labels": {"os": {"$ne": "linux"}}},
+    {"host_labels": {"os": "linux", "abc": "xä"}, "host_name": {"$nor": ["lvl1"]}},
+    {
+        "host_labels": {"os": "windows"},
+        "host_tags": {TagGroupID("criticality"): TagID("test")},
+    },
+]
+
+
+@pytest.mark.parametrize("with_foreign_hosts", [True, False])
+def test_all_matching_hosts_index_matches_reference(
+    monkeypatch: MonkeyPatch, with_foreign_hosts: bool
+) -> None:
+    ts = Scenario()
+    ts.add_host(
+        HostName("host1"),
+        tags={TagGroupID("criticality"): TagID("prod"), TagGroupID("networking"): TagID("lan")},
+        labels={"os": "linux", "abc": "xä"},
+    )
+    ts.add_host(
+        HostName("host2"),
+        tags={TagGroupID("criticality"): TagID("test"), TagGroupID("networking"): TagID("wan")},
+        labels={"os": "windows"},
+    )
+    ts.add_host(
+        HostName("lvl1"),
+        tags={TagGroupID("criticality"): TagID("test"), TagGroupID("networking"): TagID("dmz")},
+        host_path="/lvl1/hosts.mk",
+        labels={"os": "linux", "abc": "xä"},
+    )
+    ts.add_host(HostName("lvl2"), host_path="/lvl1/lvl2/hosts.mk", labels={"os": "windows"})
+    ts.add_host(HostName("lvl1a"), host_path="/lvl1_a/hosts.mk")
+    optimizer = ts.apply(monkeypatch).ruleset_matcher.ruleset_optimizer
+    optimizer.set_all_processed_hosts({HostName("host1"), HostName("lvl1"), HostName("lvl2")})
+
+    for condition in _DIFFERENTIAL_CONDITIONS:
+        optimizer.clear_caches()
+        assert optimizer._all_matching_hosts(
+            condition, with_foreign_hosts
+        ) == optimizer._all_matching_hosts_by_scanning(condition, with_foreign_hosts), condition
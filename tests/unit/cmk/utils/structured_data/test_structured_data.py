@@ -3,7 +3,9 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import ast
 import gzip
+import os
 import shutil
 from collections.abc import Iterable, Mapping, Sequence
 from pathlib import Path
@@ -15,19 +17,26 @@ from tests.testlib import cmk_path
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.structured_data import (
+    _apply_tree_patch,
+    _make_tree_patch,
     _MutableAttributes,
     _MutableTable,
     _RetentionInterval,
+    _TREE_FILE_MAGIC,
+    ArchivedTreeLoader,
     ImmutableAttributes,
     ImmutableDeltaTree,
     ImmutableTable,
     ImmutableTree,
+    list_archived_tree_files,
+    load_tree,
     MutableTree,
     parse_visible_raw_path,
     SDFilterChoice,
     SDNodeName,
     SDPath,
     SDRetentionFilterChoices,
+    TreeOrArchiveStore,
     TreeStore,
     UpdateResult,
 )
@@ -826,12 +835,53 @@ def test_save_tree(tmp_path: Path) -> None:
     tree_store.save(host_name=host_name, tree=tree)
 
     assert target.exists()
+    # Livestatus serves the tree file as it is
+    assert ImmutableTree.deserialize(ast.literal_eval(target.read_text())) == tree_store.load(
+        host_name=host_name
+    )
+    assert target.with_name(f"{host_name}.pkl").read_bytes().startswith(_TREE_FILE_MAGIC)
 
     gzip_filepath = target.with_suffix(".gz")
     assert gzip_filepath.exists()
 
     with gzip.open(str(gzip_filepath), "rb") as f:
-        f.read()
+        assert ImmutableTree.deserialize(ast.literal_eval(f.read().decode("utf-8"))) == (
+            tree_store.load(host_name=host_name)
+        )
+
+
+def test_load_tree_ignores_outdated_pickle(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=("path-to", "node"), pairs=[{"foo": 1}])
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    # E.g. restored from a backup
+    restored_tree = MutableTree()
+    restored_tree.add(path=("path-to", "node"), pairs=[{"foo": 2}])
+    (tmp_path / "inventory" / str(host_name)).write_text(repr(restored_tree.serialize()))
+
+    assert tree_store.load(host_name=host_name) == ImmutableTree.deserialize(
+        restored_tree.serialize()
+    )
+
+
+def test_load_previous_from_former_format(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=("path-to", "node"), pairs=[{"foo": 1, "bär": 2}])
+    tree_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    tree_store.save(host_name=host_name, tree=tree)
+    expected = tree_store.load(host_name=host_name)
+
+    # Archived trees of former versions are Python literals
+    tree_store.archive(host_name=host_name)
+    (archived_file,) = (tmp_path / "archive" / str(host_name)).iterdir()
+    archived_file.write_text(repr(tree.serialize()))
+
+    assert tree_store.load_previous(host_name=host_name) == expected
+    assert load_tree(archived_file) == expected
 
 
 @pytest.mark.parametrize(
@@ -907,6 +957,117 @@ def test_real_tree_order() -> None:
     assert tree_ordered == tree_unordered
 
 
+@pytest.mark.parametrize(
+    "tree_name_x, tree_name_y",
+    [
+        (HostName("tree_old_heute"), HostName("tree_new_heute")),
+        (HostName("tree_new_heute"), HostName("tree_old_heute")),
+        (HostName("tree_old_interfaces"), HostName("tree_new_interfaces")),
+        (HostName("tree_new_addresses"), HostName("tree_new_addresses_arrays_memory")),
+        (HostName("tree_new_memory"), HostName("tree_new_arrays")),
+        (HostName("tree_new_arrays"), HostName("tree_new_arrays")),
+    ],
+)
+def test_tree_patch(tree_name_x: HostName, tree_name_y: HostName) -> None:
+    tree_store = _get_tree_store()
+    raw_tree_x = tree_store.load(host_name=tree_name_x).serialize()
+    tree_y = tree_store.load(host_name=tree_name_y)
+
+    patch = _make_tree_patch(raw_tree_x, tree_y.serialize())
+    assert ImmutableTree.deserialize(_apply_tree_patch(raw_tree_x, patch)) == tree_y
+    assert bool(patch) is (tree_name_x != tree_name_y)
+
+
+def _make_package_tree(version: int) -> MutableTree:
+    tree = MutableTree()
+    tree.add(
+        path=("software", "packages"),
+        key_columns=["name"],
+        rows=[{"name": f"package-{num}", "version": "1.0"} for num in range(500)]
+        + [{"name": "changing", "version": str(version)}],
+    )
+    tree.add(path=("software", "os"), pairs=[{"version": version // 3}])
+    return tree
+
+
+def _archive_trees(tmp_path: Path, versions: Iterable[int]) -> TreeOrArchiveStore:
+    host_name = HostName("heute")
+    tree_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    for version in versions:
+        tree_store.save(host_name=host_name, tree=_make_package_tree(version))
+        os.utime(tmp_path / "inventory" / str(host_name), (version, version))
+        tree_store.archive(host_name=host_name)
+    tree_store.save(host_name=host_name, tree=_make_package_tree(100))
+    return tree_store
+
+
+def test_archive_deltas(tmp_path: Path) -> None:
+    tree_store = _archive_trees(tmp_path, range(12))
+    archive_host_dir = tmp_path / "archive" / "heute"
+
+    archived_tree_files = list_archived_tree_files(archive_host_dir)
+    assert [f.timestamp for f in archived_tree_files] == list(range(12))
+    # The latest archived tree is always stored in full, plus a keyframe every ten trees
+    assert [f.timestamp for f in archived_tree_files if not f.is_delta] == [9, 11]
+    assert archived_tree_files[0].changed_paths is None
+    assert archived_tree_files[1].changed_paths == [("software", "packages")]
+    assert sorted(archived_tree_files[3].changed_paths or []) == [
+        ("software", "os"),
+        ("software", "packages"),
+    ]
+
+    archived_tree_loader = ArchivedTreeLoader(archive_host_dir)
+    for archived_tree_file in reversed(archived_tree_files):
+        assert archived_tree_loader.load(archived_tree_file.path) == ImmutableTree.deserialize(
+            _make_package_tree(archived_tree_file.timestamp).serialize()
+        )
+
+    assert tree_store.load_previous(host_name=HostName("heute")) == ImmutableTree.deserialize(
+        _make_package_tree(100).serialize()
+    )
+    (tmp_path / "inventory" / "heute").unlink()
+    assert tree_store.load_previous(host_name=HostName("heute")) == ImmutableTree.deserialize(
+        _make_package_tree(11).serialize()
+    )
+
+
+def test_archive_deltas_of_former_archive(tmp_path: Path) -> None:
+    archive_host_dir = tmp_path / "archive" / "heute"
+    archive_host_dir.mkdir(parents=True)
+    for version in range(2):
+        (archive_host_dir / str(version)).write_text(repr(_make_package_tree(version).serialize()))
+
+    _archive_trees(tmp_path, [2])
+
+    assert [(f.timestamp, f.is_delta) for f in list_archived_tree_files(archive_host_dir)] == [
+        (0, False),
+        (1, True),
+        (2, False),
+    ]
+    assert ArchivedTreeLoader(archive_host_dir).load(
+        archive_host_dir / "1.delta"
+    ) == ImmutableTree.deserialize(_make_package_tree(1).serialize())
+
+
+def test_archive_deltas_same_timestamp(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_store = _archive_trees(tmp_path, range(2))
+    # The tree of version 2 is written within the same second as the latest archived one
+    tree_store.save(host_name=host_name, tree=_make_package_tree(2))
+    os.utime(tmp_path / "inventory" / str(host_name), (1, 1))
+    tree_store.archive(host_name=host_name)
+
+    archive_host_dir = tmp_path / "archive" / "heute"
+    archived_tree_files = list_archived_tree_files(archive_host_dir)
+    assert [(f.timestamp, f.is_delta) for f in archived_tree_files] == [(0, True), (1, False)]
+    archived_tree_loader = ArchivedTreeLoader(archive_host_dir)
+    for archived_tree_file in archived_tree_files:
+        assert archived_tree_loader.load(archived_tree_file.path) == ImmutableTree.deserialize(
+            _make_package_tree(archived_tree_file.timestamp).serialize()
+        )
+    assert not (tmp_path / "inventory" / "heute").exists()
+
+
 @pytest.mark.parametrize(
     "tree_name",
     [
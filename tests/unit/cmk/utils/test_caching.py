@@ -3,6 +3,8 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import pytest
+
 import cmk.utils.caching
 
 
@@ -45,3 +47,55 @@ def test_populated() -> None:
     assert cache.is_populated()
     cache.clear()
     assert not cache.is_populated()
+
+
+def test_get_cache_of_other_type() -> None:
+    mgr = cmk.utils.caching.CacheManager()
+    mgr.get("test")
+
+    with pytest.raises(TypeError):
+        mgr.get_lru("test", maxsize=10)
+
+
+def test_lru_cache() -> None:
+    mgr = cmk.utils.caching.CacheManager()
+    cache = mgr.get_lru("test", maxsize=2)
+    assert mgr.get_lru("test", maxsize=2) is cache
+
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b") is None
+    assert "a" in cache
+    assert mgr.dump_stats() == {
+        "test": cmk.utils.caching.CacheStats(size=2, maxsize=2, hits=1, misses=1, evictions=1)
+    }
+    assert mgr.dump_sizes()["test"] > 0
+
+    mgr.clear_all()
+    assert not cache
+
+
+def test_ttl_cache() -> None:
+    now = 0.0
+    cache = cmk.utils.caching.TTLCache[str, int](maxsize=10, ttl=60, timer=lambda: now)
+
+    cache["a"] = 1
+    now = 30
+    cache["b"] = 2
+    assert cache["a"] == 1
+
+    now = 60
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache["b"] == 2
+
+    now = 90
+    assert cache.get("b") is None
+    assert not cache
+    assert cache.stats() == cmk.utils.caching.CacheStats(
+        size=0, maxsize=10, hits=2, misses=2, evictions=2
+    )
@@ -397,6 +397,96 @@ def test_get_source_and_piggyback_hosts() -> None:
     )
 
 
+@pytest.mark.usefixtures("setup_files")
+def test_get_piggyback_raw_data_uses_index(monkeypatch: MonkeyPatch) -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+    piggyback.store_piggyback_raw_data(
+        HostName("source2"), {_TEST_HOST_NAME: [b"<<<check_mk>>>", b"lulu"]}
+    )
+
+    def _no_scan(path: Path) -> list[Path]:
+        raise AssertionError(f"Unexpected scan of {path}")
+
+    monkeypatch.setattr(piggyback, "_files_in", _no_scan)
+
+    assert sorted(piggyback.get_source_hostnames(_TEST_HOST_NAME)) == ["source1", "source2"]
+    assert piggyback.has_piggyback_raw_data(_TEST_HOST_NAME, time_settings) is True
+    assert sorted(piggyback.get_source_and_piggyback_hosts(time_settings)) == [
+        (HostName("source2"), _TEST_HOST_NAME)
+    ]
+
+
+@pytest.mark.usefixtures("setup_files")
+def test_rebuild_piggyback_index() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostName("source2"), {HostName("pig"): [b"<<<check_mk>>>", b"lulu"]}
+    )
+    assert sorted(piggyback.get_source_hostnames()) == ["source1", "source2"]
+
+    (cmk.utils.paths.piggyback_dir / "pig" / "source2").unlink()
+    (cmk.utils.paths.piggyback_source_dir / "source2").unlink()
+    assert sorted(piggyback.get_source_hostnames()) == ["source1", "source2"]
+
+    piggyback.rebuild_piggyback_index()
+
+    assert piggyback.get_source_hostnames() == ["source1"]
+    assert piggyback._load_index() == piggyback._PiggybackIndex(
+        files={_TEST_HOST_NAME: {HostName("source1"): _REF_TIME}},
+    )
+
+
+@pytest.mark.usefixtures("setup_files")
+def test_store_piggyback_raw_data_updates_index_on_changed_hosts() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+    index_file_path = cmk.utils.paths.piggyback_dir / ".index"
+    piggyback.store_piggyback_raw_data(HostName("source2"), {HostName("pig1"): [b"lulu"]})
+    index_stat = index_file_path.stat()
+    index_signature = (index_stat.st_ino, index_stat.st_mtime_ns)
+
+    # Same hosts as the last time: the index is not written
+    piggyback.store_piggyback_raw_data(HostName("source2"), {HostName("pig1"): [b"lulu"]})
+    index_stat = index_file_path.stat()
+    assert (index_stat.st_ino, index_stat.st_mtime_ns) == index_signature
+
+    os.utime(cmk.utils.paths.piggyback_dir / "pig1" / "source2", (_REF_TIME, _REF_TIME))
+    piggyback.store_piggyback_raw_data(HostName("source2"), {HostName("pig2"): [b"lulu"]})
+    assert piggyback._load_index().files[HostName("pig1")] == {HostName("source2"): _REF_TIME}
+    assert sorted(piggyback.get_source_and_piggyback_hosts(time_settings)) == [
+        (HostName("source2"), HostName("pig2"))
+    ]
+
+
+@pytest.mark.usefixtures("setup_files")
+def test_rename_host_in_piggyback_index() -> None:
+    time_settings: piggyback.PiggybackTimeSettings = [
+        (None, "max_cache_age", _PIGGYBACK_MAX_CACHEFILE_AGE),
+    ]
+    piggyback.store_piggyback_raw_data(
+        HostName("source2"), {_TEST_HOST_NAME: [b"lulu"], HostName("source1"): [b"lulu"]}
+    )
+
+    # Rename the files like the host renaming does
+    piggyback_dir = cmk.utils.paths.piggyback_dir
+    (piggyback_dir / "source1").rename(piggyback_dir / "renamed")
+    (piggyback_dir / str(_TEST_HOST_NAME) / "source1").rename(
+        piggyback_dir / str(_TEST_HOST_NAME) / "renamed"
+    )
+    piggyback.rename_host_in_piggyback_index(HostName("source1"), HostName("renamed"))
+
+    assert piggyback.get_source_hostnames(HostName("source1")) == []
+    assert piggyback.get_source_hostnames(HostName("renamed")) == ["source2"]
+    assert sorted(piggyback.get_source_hostnames(_TEST_HOST_NAME)) == ["renamed", "source2"]
+    assert all(
+        raw_data_info.info.file_path.exists()
+        for raw_data_info in piggyback.get_piggyback_raw_data(_TEST_HOST_NAME, time_settings)
+    )
+    assert piggyback.has_piggyback_raw_data(HostName("renamed"), time_settings) is True
+
+
 @pytest.mark.parametrize(
     "time_settings, successfully_processed, reason, reason_status",
     [
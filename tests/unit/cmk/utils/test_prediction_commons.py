@@ -5,6 +5,8 @@
 
 import pytest
 
+import livestatus
+
 from cmk.utils.prediction import _prediction
 
 
@@ -62,6 +64,42 @@ def test_livestatus_lql(args: tuple[list[str], list[str], str], result: str) ->
     assert _prediction.livestatus_lql(*args) == result
 
 
+class _FakeConnection:
+    def __init__(self, row: livestatus.LivestatusRow) -> None:
+        self.row = row
+        self.queries: list[str] = []
+
+    def query_row(self, query: str) -> livestatus.LivestatusRow:
+        self.queries.append(query)
+        return self.row
+
+
+def test_get_rrd_data_of_slices() -> None:
+    connection = _FakeConnection(
+        livestatus.LivestatusRow([[100, 200, 50, 1.0, None], [1000, 1100, 100, 2.0]])
+    )
+    responses = _prediction.get_rrd_data_of_slices(
+        connection,  # type: ignore[arg-type]
+        "heute",
+        "CPU load",
+        "load15",
+        "MAX",
+        [(110, 190), (1010, 1090)],
+    )
+
+    assert connection.queries == [
+        "GET services\n"
+        "Columns: rrddata:m0:load15.max:110:190:1:400 rrddata:m1:load15.max:1010:1090:1:400\n"
+        "Filter: host_name = heute\n"
+        "Filter: service_description = CPU load\n"
+        "OutputFormat: python\n"
+    ]
+    assert [(r.window, list(r.values)) for r in responses] == [
+        ((100, 200, 50), [1.0, None]),
+        ((1000, 1100, 100), [2.0]),
+    ]
+
+
 @pytest.mark.parametrize(
     "twindow, result", [((0, 0, 0), []), ((100, 200, 25), [125, 150, 175, 200])]
 )
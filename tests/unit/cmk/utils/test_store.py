@@ -10,6 +10,7 @@ import stat
 import threading
 import types
 from collections.abc import Callable, Iterator, Sequence
+from dataclasses import asdict, replace
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
 from typing import Generator, Type
@@ -23,14 +24,21 @@ from tests.testlib import import_module_hack, wait_until
 import cmk.utils.debug
 import cmk.utils.store as store
 from cmk.utils.exceptions import MKGeneralException
+from cmk.utils.hostaddress import HostName
 from cmk.utils.store import ObjectStore, TextSerializer
 from cmk.utils.store._file import FileIo, RealIo
 from cmk.utils.store.host_storage import (
+    ContactGroupsField,
+    ExperimentalStorageLoader,
     get_hosts_file_variables,
     get_standard_hosts_storage,
+    HostsStorageData,
+    IndexedHostsStorage,
+    PickleHostsStorage,
     StandardStorageLoader,
     StorageFormat,
 )
+from cmk.utils.tags import TagGroupID, TagID
 
 
 class FakeIo:
@@ -781,6 +789,7 @@ def test_non_blocking_decorated_locking_while_already_locked(
         ("standard", StorageFormat.STANDARD),
         ("raw", StorageFormat.RAW),
         ("pickle", StorageFormat.PICKLE),
+        ("indexed", StorageFormat.INDEXED),
     ],
 )
 def test_storage_format(text: str, storage_format: StorageFormat) -> None:
@@ -795,6 +804,7 @@ def test_storage_format(text: str, storage_format: StorageFormat) -> None:
         (StorageFormat.STANDARD, ".mk"),
         (StorageFormat.RAW, ".cfg"),
         (StorageFormat.PICKLE, ".pkl"),
+        (StorageFormat.INDEXED, ".idx"),
     ],
 )
 def test_storage_format_extension(storage_format: StorageFormat, expected_extension: str) -> None:
@@ -855,6 +865,78 @@ def tests_standard_format_loader():
     assert variables["all_hosts"] == ["test"]
 
 
+def _hosts_storage_data() -> HostsStorageData:
+    return HostsStorageData(
+        locked_hosts=False,
+        all_hosts=[HostName("host-1"), HostName("host-2")],
+        clusters={HostName("cluster"): [HostName("host-1"), HostName("host-2")]},
+        attributes={"ipaddresses": {HostName("host-1"): "1.2.3.4"}, "ipv6addresses": {}},
+        custom_macros={"_ADDRESSES_4": [("1.2.3.4", [HostName("host-1")])]},
+        host_tags={
+            HostName("host-1"): {TagGroupID("criticality"): TagID("prod")},
+            HostName("host-2"): {TagGroupID("criticality"): TagID("test")},
+        },
+        host_labels={HostName("host-2"): {"os": "linux"}},
+        contact_groups=ContactGroupsField(
+            hosts=[{"value": "all", "condition": {"host_name": ["host-1"]}}],
+            services=[],
+            folder_hosts=[],
+            folder_services=[],
+        ),
+        explicit_host_conf={"alias": {HostName("host-2"): "Host 2"}},
+        host_attributes={
+            HostName("host-1"): {"ipaddress": "1.2.3.4"},
+            HostName("host-2"): {"alias": "Host 2"},
+            HostName("cluster"): {},
+        },
+        folder_attributes={},
+    )
+
+
+def test_indexed_hosts_storage(tmp_path: Path) -> None:
+    path = tmp_path / "hosts"
+    data = _hosts_storage_data()
+    storage = IndexedHostsStorage()
+    storage.write(path, data, repr)
+
+    assert path.with_suffix(".idx").read_bytes().startswith(IndexedHostsStorage.MAGIC)
+    assert storage.read(path) == asdict(data)
+    assert storage.read_host_names(path) == ("host-1", "host-2", "cluster")
+
+
+def test_indexed_hosts_storage_caches_host_names(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "hosts"
+    data = _hosts_storage_data()
+    storage = IndexedHostsStorage()
+    storage.write(path, data, repr)
+    assert storage.read_host_names(path) == ("host-1", "host-2", "cluster")
+
+    with monkeypatch.context() as m:
+        m.setattr(IndexedHostsStorage, "_read_header", lambda *args: pytest.fail("not cached"))
+        assert IndexedHostsStorage().read_host_names(path) == ("host-1", "host-2", "cluster")
+
+    storage.write(path, replace(data, host_attributes={HostName("host-3"): {}}), repr)
+    assert storage.read_host_names(path) == ("host-3", "host-1", "host-2", "cluster")
+
+
+def test_indexed_hosts_storage_loader(tmp_path: Path) -> None:
+    path = tmp_path / "hosts"
+    data = _hosts_storage_data()
+    path.with_suffix(".mk").touch()
+    PickleHostsStorage().write(path, data, repr)
+    IndexedHostsStorage().write(path, data, repr)
+
+    pickle_variables = get_hosts_file_variables()
+    ExperimentalStorageLoader(PickleHostsStorage()).read_and_apply(path, pickle_variables)
+    indexed_loader = ExperimentalStorageLoader(IndexedHostsStorage())
+    indexed_variables = get_hosts_file_variables()
+    assert indexed_loader.file_valid(path)
+    indexed_loader.read_and_apply(path, indexed_variables)
+    assert indexed_variables == pickle_variables
+
+
 def test_pydantic_store_serialization(tmp_path: Path) -> None:
     store_path = tmp_path / "MyModel"
 
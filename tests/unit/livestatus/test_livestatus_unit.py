@@ -8,8 +8,11 @@
 import errno
 import socket
 import ssl
+import threading
+import time
 from contextlib import closing
 from pathlib import Path
+from types import GeneratorType
 
 import pytest
 from pytest import MonkeyPatch
@@ -274,3 +277,136 @@ def test_set_auth_user(
             return
 
         livestatus.LocalConnection().set_auth_user("mydomain", user_id)
+
+
+def _fixed16_response(code: int, data: bytes) -> bytes:
+    return b"%03d %11d\n" % (code, len(data)) + data
+
+
+def _serve_site(server: socket.socket, response: bytes, delay: float) -> None:
+    # Read the query (terminated by an empty line), then answer slowly and in small chunks
+    query = b""
+    while not query.endswith(b"\n\n"):
+        query += server.recv(4096)
+    for offset in range(0, len(response), 7):
+        time.sleep(delay)
+        server.sendall(response[offset : offset + 7])
+
+
+def test_query_parallel_receives_concurrently() -> None:
+    responses = {
+        livestatus.SiteId("slow"): _fixed16_response(200, b"[['a', 1], ['b', 2]]"),
+        livestatus.SiteId("fast"): _fixed16_response(200, b"[['c', 3]]"),
+        livestatus.SiteId("missing"): _fixed16_response(404, b"Table 'foo' does not exist"),
+        livestatus.SiteId("broken"): _fixed16_response(400, b"Invalid query"),
+    }
+    live = livestatus.MultiSiteConnection(livestatus.SiteConfigurations({}))
+    live.set_prepend_site(True)
+    threads = []
+    for site_id, response in responses.items():
+        client, server = socket.socketpair()
+        connection = livestatus.SingleSiteConnection("unix:/dev/null", site_id)
+        connection.socket = client
+        live.connections.append(
+            livestatus.ConnectedSite(
+                site_id, livestatus.SiteConfiguration(socket="unix:/dev/null"), connection
+            )
+        )
+        thread = threading.Thread(
+            target=_serve_site, args=(server, response, 0.01 if site_id == "slow" else 0.0)
+        )
+        thread.start()
+        threads.append(thread)
+
+    try:
+        rows = live.query("GET hosts\nColumns: name state")
+    finally:
+        for thread in threads:
+            thread.join()
+
+    assert sorted(rows) == [["fast", "c", 3], ["slow", "a", 1], ["slow", "b", 2]]
+    assert sorted(live.alive_sites()) == ["fast", "missing", "slow"]
+    assert list(live.dead_sites()) == ["broken"]
+
+    timings = live.query_timings()
+    assert sorted(timings) == ["broken", "fast", "missing", "slow"]
+    assert (duration := timings[livestatus.SiteId("slow")].duration) is not None
+    assert duration > 0
+    assert timings[livestatus.SiteId("broken")].parsed is None
+
+
+@pytest.mark.parametrize(
+    "json_format, raw_response, expected",
+    [
+        (False, b"[]\n", []),
+        (True, b"[]", []),
+        (
+            False,
+            b"[['a', b'x]', 1.5],\n['it\\'s [', {'k': [1, None]}, \"\\\\\"]]\n",
+            [["a", b"x]", 1.5], ["it's [", {"k": [1, None]}, "\\"]],
+        ),
+        (
+            True,
+            b'[["a\\"]", 1],\n["\xc3\xa4", {"k": [true, null]}]]\n',
+            [['a"]', 1], ["\xe4", {"k": [True, None]}]],
+        ),
+    ],
+)
+def test_response_row_decoder(
+    json_format: bool, raw_response: bytes, expected: list[list[object]]
+) -> None:
+    for chunk_size in (1, 2, 5, len(raw_response)):
+        decoder = livestatus.ResponseRowDecoder(json_format)
+        rows = []
+        for offset in range(0, len(raw_response), chunk_size):
+            rows.extend(decoder.feed(raw_response[offset : offset + chunk_size]))
+        decoder.close()
+        assert rows == expected
+
+
+@pytest.mark.parametrize("raw_response", [b"[['a'], ['b'", b"[['a'], ['b]]"])
+def test_response_row_decoder_incomplete(raw_response: bytes) -> None:
+    decoder = livestatus.ResponseRowDecoder(json_format=False)
+    decoder.feed(raw_response)
+    with pytest.raises(livestatus.MKLivestatusQueryError):
+        decoder.close()
+
+
+def test_query_iter(mock_livestatus: MockLiveStatusConnection) -> None:
+    live = mock_livestatus
+    live.set_sites(["local", "remote"])
+    live.add_table("hosts", [{"name": "heute"}, {"name": "morgen"}], site="local")
+    live.add_table("hosts", [{"name": "gestern"}], site="remote")
+    live.expect_query("GET hosts\nColumns: name\nColumnHeaders: off", sites=["local"])
+    live.expect_query("GET hosts\nColumns: name\nColumnHeaders: off", sites=["remote"])
+    with mock_livestatus(expect_status_query=False):
+        connection = livestatus.MultiSiteConnection(
+            livestatus.SiteConfigurations(
+                {
+                    livestatus.SiteId("local"): {"socket": "unix:/dev/null"},
+                    livestatus.SiteId("remote"): {"socket": "unix:/dev/null"},
+                }
+            )
+        )
+        connection.set_prepend_site(True)
+        rows = connection.query_table_iter("GET hosts\nColumns: name")
+        assert next(rows) == ["local", "heute"]
+        assert list(rows) == [["local", "morgen"], ["remote", "gestern"]]
+        assert connection.alive_sites() == ["local", "remote"]
+
+
+def test_query_iter_streams_chunks(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(livestatus, "RESPONSE_CHUNK_SIZE", 8)
+    client, server = socket.socketpair()
+    connection = livestatus.SingleSiteConnection("unix:/dev/null")
+    connection.socket = client
+    # The response does not depend on the query, so it can be sent in advance
+    server.sendall(_fixed16_response(200, b"[['a', 1],\n['b', 2],\n['c', 3]]\n"))
+
+    rows = connection.query_iter("GET hosts\nColumns: name state")
+    assert next(rows) == ["a", 1]
+    assert isinstance(rows, GeneratorType)
+    rows.close()
+
+    # The remaining data is still in the socket, the connection can not be used anymore
+    assert connection.socket is None